@@ -0,0 +1,179 @@
+"""
+Benchmarks of conversion modes and storage options on synthetic SWMM output files. Requires pytest-benchmark.
+
+    python -m pytest benchmarks/bench_conversion.py --model-size medium --benchmark-json results.json
+
+Each conversion records its wall time, throughput of the SWMM output file in MiB/s, peak resident memory of the
+converting process and of its worker processes, and the size of the output in the benchmark extra_info.
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple, Union
+
+import pytest
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Conversion target and keyword arguments of each benchmarked conversion
+CONVERSIONS = {
+    'series-toolkit': ('netcdf', dict(engine='toolkit', read_by_series=True)),
+    'series-native': ('netcdf', dict(engine='native', read_by_series=True)),
+    'block-toolkit': ('netcdf', dict(engine='toolkit', read_by_series=False)),
+    'block-native': ('netcdf', dict(engine='native', read_by_series=False)),
+    'prefetch-toolkit': ('netcdf', dict(engine='toolkit', prefetch=2)),
+    'prefetch-native': ('netcdf', dict(engine='native', prefetch=2)),
+    'parallel-native': ('netcdf', dict(engine='native', workers=2)),
+    'snapshot-native': ('netcdf', dict(engine='native', layout='snapshot', chunk_sizes='auto')),
+    'single-native': ('netcdf', dict(engine='native', read_by_series=False, precision='single')),
+    'int16-native': ('netcdf', dict(engine='native', read_by_series=False, precision='int16')),
+    'zlib-native': ('netcdf', dict(engine='native', read_by_series=False, zlib=True, chunk_sizes='auto')),
+    'quantized-zlib-native': ('netcdf', dict(engine='native', read_by_series=False, zlib=True, chunk_sizes='auto',
+                                             least_significant_digit='auto')),
+    'zarr-native': ('zarr', dict(engine='native', chunk_sizes='auto')),
+    'zarr-parallel-native': ('zarr', dict(engine='native', chunk_sizes='auto', zlib=True, workers=2)),
+}
+
+
+def convert(target: str, swmm_output_file: str, output_path: str, options: Dict):
+    """
+    Converts a SWMM output file to a netCDF file or zarr store
+    Args:
+        target (str): 'netcdf' or 'zarr'
+        swmm_output_file (str): SWMM output filepath
+        output_path (str): Output path
+        options (Dict): Keyword arguments of the conversion
+    """
+    if target == 'zarr':
+        from swmmtonetcdf.zarr_output import create_zarr_from_swmm
+        create_zarr_from_swmm(swmm_output_file, output_path, **options)
+    else:
+        from swmmtonetcdf import create_netcdf_from_swmm
+        create_netcdf_from_swmm(swmm_output_file, output_path, **options)
+
+
+def remove_output(output_path: str):
+    """
+    Removes the output of a previous round
+    Args:
+        output_path (str): Output path
+    """
+    if os.path.isdir(output_path):
+        shutil.rmtree(output_path)
+    elif os.path.exists(output_path):
+        os.remove(output_path)
+
+
+def get_output_size(output_path: str) -> int:
+    """
+    Get the size of a netCDF file or of all chunks of a zarr store
+    Args:
+        output_path (str): Output path
+
+    Returns:
+        Size in bytes
+    """
+    if not os.path.isdir(output_path):
+        return os.path.getsize(output_path)
+
+    return sum(os.path.getsize(os.path.join(directory, filename))
+               for directory, _, filenames in os.walk(output_path) for filename in filenames)
+
+
+def get_peak_rss() -> int:
+    """
+    Get peak resident memory of the current process. On Linux this is the high water mark of the process, which
+    unlike ru_maxrss is not inherited from the process it was forked from
+
+    Returns:
+        Peak resident memory in bytes
+    """
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def convert_measuring_peak_rss(target: str, swmm_output_file: str, output_path: str,
+                               options: Dict) -> Tuple[int, int]:
+    """
+    Converts and measures peak resident memory
+    Args:
+        target (str): 'netcdf' or 'zarr'
+        swmm_output_file (str): SWMM output filepath
+        output_path (str): Output path
+        options (Dict): Keyword arguments of the conversion
+
+    Returns:
+        Peak resident memory in bytes of the converting process and of the largest of its worker processes.
+        Worker processes count the memory they share with the converting process when they are forked
+    """
+    # reset the high water mark to the memory of the freshly spawned process
+    if os.path.exists('/proc/self/clear_refs'):
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+
+    convert(target, swmm_output_file, output_path, options)
+
+    return get_peak_rss(), resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * \
+        (1 if sys.platform == 'darwin' else 1024)
+
+
+def measure_peak_rss(target: str, swmm_output_file: str, output_path: str,
+                     options: Dict) -> Tuple[Union[int, None], Union[int, None]]:
+    """
+    Measures peak resident memory of a conversion run in a spawned process so that memory held by the benchmark
+    session is not counted
+    Args:
+        target (str): 'netcdf' or 'zarr'
+        swmm_output_file (str): SWMM output filepath
+        output_path (str): Output path
+        options (Dict): Keyword arguments of the conversion
+
+    Returns:
+        Peak resident memory in bytes of the converting process and of its worker processes or None when the
+        platform does not report resource usage
+    """
+    if resource is None:
+        return None, None
+
+    remove_output(output_path)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(convert_measuring_peak_rss, target, swmm_output_file, output_path, options).result()
+
+
+@pytest.mark.parametrize('name', list(CONVERSIONS))
+def test_conversion(benchmark, swmm_output_file, model_size, conversion_rounds, tmp_path, name):
+    target, options = CONVERSIONS[name]
+
+    if target == 'zarr':
+        pytest.importorskip('zarr')
+
+    output_path = str(tmp_path / (f'{name}.zarr' if target == 'zarr' else f'{name}.nc'))
+
+    benchmark.group = f'conversion-{model_size}'
+    benchmark.pedantic(convert, args=(target, swmm_output_file, output_path, options),
+                       setup=lambda: remove_output(output_path), rounds=conversion_rounds, iterations=1)
+
+    source_bytes = os.path.getsize(swmm_output_file)
+    peak_rss, peak_worker_rss = measure_peak_rss(target, swmm_output_file, output_path, options)
+
+    benchmark.extra_info.update(
+        model_size=model_size,
+        source_bytes=source_bytes,
+        output_bytes=get_output_size(output_path),
+        peak_rss_bytes=peak_rss,
+        peak_worker_rss_bytes=peak_worker_rss,
+    )
+
+    if benchmark.stats is not None:
+        benchmark.extra_info['throughput_mib_s'] = source_bytes / benchmark.stats.stats.mean / 2 ** 20
@@ -0,0 +1,46 @@
+"""
+Benchmarks of reading the geometry of SWMM input files. Requires pytest-benchmark.
+
+    python -m pytest benchmarks/bench_geometry.py --benchmark-json results.json
+
+The input file is a synthetic network of 50000 links with 10 vertices each, so that 500000 vertices are parsed and
+mapped to the elements of the output file.
+"""
+import os
+
+import pytest
+
+from swmmtonetcdf.geometry import get_link_lines, read_inp_geometry
+from swmmtonetcdf.synthetic import write_synthetic_swmm_input
+
+# Synthetic network of the benchmarked input file
+NETWORK = dict(num_subcatchments=20000, num_nodes=50000, num_links=50000, vertices_per_link=10, polygon_points=5)
+
+
+@pytest.fixture(scope='module')
+def inp_file(tmp_path_factory) -> str:
+    inp_file = os.path.join(str(tmp_path_factory.mktemp('models')), 'synthetic.inp')
+    write_synthetic_swmm_input(inp_file, **NETWORK)
+
+    return inp_file
+
+
+def read_link_lines(inp_file: str):
+    """
+    Reads the geometry of an input file and assembles the lines of its links
+    Args:
+        inp_file (str): SWMM input filepath
+    """
+    geometry = read_inp_geometry(inp_file)
+    get_link_lines(geometry, [f'J{i + 1}' for i in range(NETWORK['num_nodes'])],
+                   [f'C{i + 1}' for i in range(NETWORK['num_links'])])
+
+
+def test_read_geometry(benchmark, inp_file):
+    benchmark.group = 'geometry'
+    benchmark.pedantic(read_link_lines, args=(inp_file,), rounds=3, iterations=1)
+
+    benchmark.extra_info.update(
+        source_bytes=os.path.getsize(inp_file),
+        num_vertices=NETWORK['num_links'] * NETWORK['vertices_per_link'],
+    )
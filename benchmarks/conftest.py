@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+
+# Synthetic model sizes. Periods are 5 minute reporting steps, so small is a week and medium and large are a month
+MODEL_SIZES = {
+    'small': dict(num_subcatchments=50, num_nodes=100, num_links=100, num_pollutants=2, num_periods=2016),
+    'medium': dict(num_subcatchments=500, num_nodes=1000, num_links=1000, num_pollutants=2, num_periods=8640),
+    'large': dict(num_subcatchments=2000, num_nodes=5000, num_links=5000, num_pollutants=2, num_periods=8640),
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption('--model-size', help='Size of the synthetic SWMM model converted by benchmarks',
+                     choices=list(MODEL_SIZES), default='small')
+    parser.addoption('--conversion-rounds', help='Number of timed rounds of each conversion', type=int, default=1)
+
+
+@pytest.fixture(scope='session')
+def model_size(request) -> str:
+    return request.config.getoption('--model-size')
+
+
+@pytest.fixture(scope='session')
+def conversion_rounds(request) -> int:
+    return request.config.getoption('--conversion-rounds')
+
+
+@pytest.fixture(scope='session')
+def swmm_output_file(tmp_path_factory, model_size) -> str:
+    swmm_output_file = os.path.join(str(tmp_path_factory.mktemp('models')), f'synthetic_{model_size}.out')
+    write_synthetic_swmm_output(swmm_output_file, **MODEL_SIZES[model_size])
+
+    return swmm_output_file
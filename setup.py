@@ -59,6 +59,12 @@ REQUIREMENTS = [
     'numpy~=1.19.4'
 ]
 
+EXTRAS_REQUIREMENTS = {
+    'xarray': ['xarray>=0.18', 'dask[array]'],
+    'zarr': ['zarr>=2.11,<3'],
+    'benchmark': ['pytest-benchmark'],
+}
+
 
 setup(
     name='swmmtonetcdf',
@@ -70,6 +76,7 @@ setup(
     author='Caleb Buahin, Jennifer Wu',
     author_email='caleb.buahin@gmail.com',
     install_requires=REQUIREMENTS,
+    extras_require=EXTRAS_REQUIREMENTS,
     packages=find_packages(exclude=['contrib', 'docs']),
     package_data={
         '': []
@@ -77,6 +84,9 @@ setup(
     entry_points={
         'console_scripts': [
             'swmmtonetcdf=swmmtonetcdf:main',
+        ],
+        'xarray.backends': [
+            'swmm=swmmtonetcdf.xarray_backend:SwmmBackendEntrypoint',
         ]
     },
     include_package_data=True,
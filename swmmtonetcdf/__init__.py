@@ -1,5 +1,5 @@
-from swmmtonetcdf.swmmtonetcdf import *
-from swmmtonetcdf.__main__ import main
+import importlib
+import importlib.util
 
 VERSION_INFO = (0, 1, 0)
 
@@ -7,3 +7,54 @@ __version__ = '.'.join(map(str, VERSION_INFO))
 __author__ = 'Caleb Buahin and Jenn Wu'
 __copyright__ = 'Copyright (c) 2022 Caleb A. Buahin'
 __licence__ = 'GNU GPLv3'
+
+# Modules of attributes that are not defined by swmmtonetcdf.swmmtonetcdf
+LAZY_ATTRIBUTES = {
+    'append_netcdf_from_swmm': 'swmmtonetcdf.concat',
+    'create_netcdf_diff_from_swmm': 'swmmtonetcdf.diff',
+    'create_netcdf_ensemble_from_swmm': 'swmmtonetcdf.ensemble',
+    'read_swmm_output_header': 'swmmtonetcdf.header',
+    'main': 'swmmtonetcdf.__main__',
+}
+
+# Public attributes of swmmtonetcdf.swmmtonetcdf, exported with LAZY_ATTRIBUTES by star imports
+CONVERSION_ATTRIBUTES = (
+    'create_netcdf_from_swmm',
+    'get_pollutant_enum',
+    'get_pollutant_enum_name',
+    'get_swmm_output_attribute_names',
+    'get_swmm_output_dates',
+    'get_swmm_output_element_names',
+    'open_swmm_output',
+    'ToolkitOutputReader',
+)
+
+__all__ = CONVERSION_ATTRIBUTES + tuple(LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    """
+    Imports the conversion functions when they are first used. The conversion modules import numpy, netCDF4, cftime
+    and the toolkit, which would otherwise slow down every start of the command line interface
+    Args:
+        name (str): Attribute name
+
+    Returns:
+        Attribute of swmmtonetcdf.swmmtonetcdf, a submodule or one of LAZY_ATTRIBUTES
+    """
+    if name.startswith('__'):
+        raise AttributeError(f'module {__name__} has no attribute {name}')
+
+    if name not in LAZY_ATTRIBUTES and importlib.util.find_spec(f'{__name__}.{name}') is not None:
+        return importlib.import_module(f'{__name__}.{name}')
+
+    module = importlib.import_module(LAZY_ATTRIBUTES.get(name, f'{__name__}.swmmtonetcdf'))
+
+    try:
+        value = getattr(module, name)
+    except AttributeError:
+        raise AttributeError(f'module {__name__} has no attribute {name}') from None
+
+    globals()[name] = value
+
+    return value
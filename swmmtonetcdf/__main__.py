@@ -1,10 +1,21 @@
 # Python imports
+import datetime
+import json
 import os
 import sys
-from argparse import ArgumentParser, ArgumentError
-from typing import Any
+from argparse import ArgumentParser, ArgumentError, Namespace
+from typing import Any, Dict, List
 
-from swmmtonetcdf import create_netcdf_from_swmm
+# Modules importing numpy, netCDF4, cftime or the toolkit are imported by the sub-commands that use them so that
+# the parser and the info sub-command start quickly
+from swmmtonetcdf.chunking import ACCESS_PATTERNS
+from swmmtonetcdf.header import read_swmm_output_header
+from swmmtonetcdf.instrumentation import get_progress_printer
+from swmmtonetcdf.layout import LAYOUTS
+from swmmtonetcdf.memory import parse_memory_size
+from swmmtonetcdf.options import AGGREGATIONS, CHECKS, DEFAULT_AGGREGATIONS, ENGINES, PRECISIONS, READ_MODES
+
+OUTPUT_FORMATS = ('netcdf', 'zarr')
 
 def valid_file(parser: ArgumentParser, arg: Any):
     """
@@ -48,6 +59,276 @@ def valid_path(parser: ArgumentParser, arg):
         return arg
 
 
+def valid_output_path(parser: ArgumentParser, arg: str):
+    """
+    Parses the path of an output file. Paths without a folder, such as out.json, are written to the current folder
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        arg (str): Argument to parse
+
+    Returns:
+        Filepath if its parent folder exists.
+    """
+    if not arg or not arg.strip() or not os.path.isdir(os.path.dirname(arg) or os.curdir):
+        parser.error(f'Parent folder for specified path {arg} does not exist!')
+
+    return arg
+
+
+def valid_chunk_sizes(parser: ArgumentParser, args: List[str]):
+    """
+    Parses chunk sizes specified as 'auto' or as variable=size,size,... pairs
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        args (List[str]): Arguments to parse
+
+    Returns:
+        'auto', a mapping of variable names to chunk sizes or None
+    """
+    if args is None:
+        return None
+    elif args == ['auto']:
+        return 'auto'
+
+    chunk_sizes = {}
+    for arg in args:
+        try:
+            variable_name, sizes = arg.split('=')
+            chunk_sizes[variable_name] = tuple(int(size) for size in sizes.split(','))
+        except ValueError:
+            parser.error(f'Chunk sizes {arg} must be auto or specified as variable=size,size,...')
+
+    return chunk_sizes
+
+
+def valid_least_significant_digit(parser: ArgumentParser, arg: str):
+    """
+    Parses least significant digit specified as 'auto' or as an integer
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        arg (str): Argument to parse
+
+    Returns:
+        'auto' or number of decimal digits
+    """
+    if arg == 'auto':
+        return arg
+
+    try:
+        return int(arg)
+    except ValueError:
+        parser.error(f'Least significant digit {arg} must be auto or an integer')
+
+
+def valid_datetime(parser: ArgumentParser, arg: str):
+    """
+    Parses an ISO 8601 date and time
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        arg (str): Argument to parse
+
+    Returns:
+        Date and time
+    """
+    try:
+        return datetime.datetime.fromisoformat(arg)
+    except ValueError:
+        parser.error(f'Date {arg} must be in ISO 8601 format such as 2022-01-01T06:00')
+
+
+def valid_memory_size(parser: ArgumentParser, arg: str):
+    """
+    Parses a memory size such as 512M or 8G
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        arg (str): Argument to parse
+
+    Returns:
+        Size in bytes
+    """
+    try:
+        return parse_memory_size(arg)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def valid_window(parser: ArgumentParser, arg: str):
+    """
+    Parses a window length such as 15min, 1h or 1d
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        arg (str): Argument to parse
+
+    Returns:
+        Window length in seconds
+    """
+    from swmmtonetcdf.aggregation import parse_window
+
+    try:
+        return parse_window(arg)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def get_output_format(path: str, output_format: str = None) -> str:
+    """
+    Get the format of a conversion target
+
+    Args:
+        path (str): Output path
+        output_format (str): Format given on the command line or None to infer it from the output path
+
+    Returns:
+        'netcdf' or 'zarr'
+    """
+    if output_format is not None:
+        return output_format
+
+    return 'zarr' if os.path.splitext(path.rstrip('/\\'))[1].lower() == '.zarr' else 'netcdf'
+
+
+def add_conversion_arguments(parser: ArgumentParser, command: ArgumentParser):
+    """
+    Adds conversion options shared by sub-commands
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        command (ArgumentParser): Sub-command parser
+    """
+    command.add_argument("--engine", help='Engine used to read SWMM output', choices=ENGINES, default='toolkit')
+    command.add_argument("--read", help='Read the whole series of each element and attribute or the results of all '
+                                        'elements in blocks of periods', dest='read_mode', choices=READ_MODES,
+                         default='series')
+    command.add_argument("--block-size", help='Number of periods read and written per block', type=int, default=256)
+    command.add_argument("--zlib", help='Compress timeseries variables', action='store_true')
+    command.add_argument("--complevel", help='Compression level from 1 to 9', type=int, default=4)
+    command.add_argument("--no-shuffle", help='Disable shuffle filter', dest='shuffle', action='store_false')
+    command.add_argument("--chunks", help='Chunk sizes of timeseries variables as auto or variable=size,size,...',
+                         nargs='+')
+    command.add_argument("--access-pattern", help='Expected read access used to plan chunk sizes',
+                         choices=ACCESS_PATTERNS, default='series')
+    command.add_argument("--layout", help='Layout of timeseries variables. snapshot stores time first and both '
+                                          'writes time-first copies alongside', choices=LAYOUTS, default='series')
+    command.add_argument("--precision", help='Storage precision of timeseries variables', choices=PRECISIONS,
+                         default='double')
+    command.add_argument("--least-significant-digit", help='Quantize timeseries as auto or number of decimal '
+                                                           'digits to retain',
+                         type=lambda x: valid_least_significant_digit(parser, x))
+    command.add_argument("--workers", help='Number of worker processes', type=int, default=1)
+    command.add_argument("--prefetch", help='Number of blocks read ahead on a background thread while the previous '
+                                            'block is written', type=int, default=0)
+    command.add_argument("--max-memory", help='Memory budget of read and write buffers such as 512M or 8G',
+                         type=lambda x: valid_memory_size(parser, x))
+    command.add_argument("--aggregate", help='Window lengths to compute statistics over such as 1h or 1d',
+                         dest='aggregation_windows', nargs='+', type=lambda x: valid_window(parser, x), default=[])
+    command.add_argument("--aggregations", help='Statistics computed over each window', choices=AGGREGATIONS,
+                         nargs='+', default=list(DEFAULT_AGGREGATIONS))
+    command.add_argument("--summaries", help='Write the maximum, time of maximum, minimum, mean, volume and number '
+                                             'of nonzero periods of each element and attribute', dest='summary',
+                         action='store_true')
+    command.add_argument("--no-raw", help='Write only the statistics of the aggregation windows and summaries',
+                         dest='raw', action='store_false')
+    command.add_argument("--skip-constant", help='Leave series that do not change over the converted periods '
+                                                 'unwritten and record their values in *_constant variables',
+                         action='store_true')
+    command.add_argument("--drop-constant", help='Drop attributes that are constant for every element from the '
+                                                 'timeseries and record their values in *_constant_attribute_values '
+                                                 'variables', action='store_true')
+    command.add_argument("--resume", help='Resume unfinished conversions from their last checkpoint',
+                         action='store_true')
+    command.add_argument("--checkpoint-interval", help='Number of attributes, blocks or partitions written between '
+                                                       'checkpoints that interrupted conversions resume from. 0 for '
+                                                       'no checkpoints. Defaults to 1 with --resume and 0 otherwise',
+                         type=int)
+    command.add_argument("--sidecar", help='Read element names and periods from an index persisted next to the SWMM '
+                                           'output file, writing it when missing or stale', action='store_true')
+    add_selection_arguments(parser, command)
+
+
+def add_selection_arguments(parser: ArgumentParser, command: ArgumentParser):
+    """
+    Adds options selecting the elements, attributes and periods read by sub-commands
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        command (ArgumentParser): Sub-command parser
+    """
+    command.add_argument("--nodes", help='IDs of nodes to convert', nargs='*')
+    command.add_argument("--links", help='IDs of links to convert', nargs='*')
+    command.add_argument("--catchments", help='IDs of catchments to convert', nargs='*')
+    command.add_argument("--regex", help='Match element IDs as regular expressions', action='store_true')
+    command.add_argument("--attributes", help='Names of attributes to convert', nargs='+')
+    command.add_argument("--start", help='First date of periods to convert', type=lambda x: valid_datetime(parser, x))
+    command.add_argument("--end", help='Last date of periods to convert', type=lambda x: valid_datetime(parser, x))
+
+
+def get_conversion_options(parser: ArgumentParser, args: Namespace) -> Dict[str, Any]:
+    """
+    Get keyword arguments of create_netcdf_from_swmm from parsed conversion options
+
+    Args:
+        parser (ArgumentParser): Argument parser.
+        args (Namespace): Parsed arguments
+
+    Returns:
+        Keyword arguments
+    """
+    return dict(
+        engine=args.engine,
+        read_by_series=args.read_mode == 'series',
+        block_size=args.block_size,
+        zlib=args.zlib,
+        complevel=args.complevel,
+        shuffle=args.shuffle,
+        chunk_sizes=valid_chunk_sizes(parser, args.chunks),
+        access_pattern=args.access_pattern,
+        layout=args.layout,
+        precision=args.precision,
+        least_significant_digit=args.least_significant_digit,
+        workers=args.workers,
+        max_memory=args.max_memory,
+        prefetch=args.prefetch,
+        aggregation_windows=args.aggregation_windows,
+        aggregations=args.aggregations,
+        summary=args.summary,
+        raw=args.raw,
+        skip_constant=args.skip_constant,
+        drop_constant=args.drop_constant,
+        resume=args.resume,
+        checkpoint_interval=args.checkpoint_interval,
+        sidecar=args.sidecar,
+        elements=get_element_selection(args),
+        attributes=args.attributes,
+        start_date=args.start,
+        end_date=args.end
+    )
+
+
+def get_element_selection(args: Namespace) -> Dict[str, Any]:
+    """
+    Get element selections from parsed selection options
+
+    Args:
+        args (Namespace): Parsed arguments
+
+    Returns:
+        Mapping of element dimension names to element IDs or regular expressions
+    """
+    elements = {}
+    for name in ('nodes', 'links', 'catchments'):
+        selection = getattr(args, name)
+        if selection is not None:
+            elements[name] = '|'.join(f'(?:{pattern})' for pattern in selection) if args.regex else selection
+
+    return elements
+
+
 def main():
     """
 
@@ -59,20 +340,264 @@ def main():
 
     subparsers = parser.add_subparsers(help="Sub-command help", dest='sub_parser_name')
 
-    # Calculates diff and writes to json
+    # Converts a SWMM output file
     convert_command = subparsers.add_parser(name="convert", help="Converts SWMM output file to netcdf")
-    convert_command.add_argument("--out", help='Path to base SWMM output file', type=lambda x: valid_file(parser, x))
-    convert_command.add_argument("--nc", help='Path to NetCDF file', type=lambda x: valid_path(parser, x))
-    convert_command.add_argument("--inp", help='Input file to extract geometry from', action='store_true')
+    convert_command.add_argument("--out", help='Path to base SWMM output file', required=True)
+    convert_command.add_argument("--nc", help='Path to NetCDF file or Zarr store', required=True,
+                                 type=lambda x: valid_output_path(parser, x))
+    convert_command.add_argument("--format", help='Output format. Inferred from the output path when not specified',
+                                 dest='output_format', choices=OUTPUT_FORMATS)
+    convert_command.add_argument("--inp", help='Input file to extract geometry from')
     convert_command.add_argument("--geom", help='Save geometry', action='store_true')
-    convert_command.add_argument("--no-geom", help='Save geometry', action='store_false')
+    convert_command.add_argument("--no-geom", help='Do not save geometry', dest='geom', action='store_false')
     convert_command.set_defaults(geom=True)
-    convert_command.add_argument("--prj", help='WKT projection to use for geometry', default='EPSG:4326')
+    convert_command.add_argument("--prj", help='EPSG code, WKT or .prj file of the projection of the geometry',
+                                 default='EPSG:4326')
+    convert_command.add_argument("--follow", help='Append periods to netcdf while SWMM is still writing the '
+                                                  'output file', action='store_true')
+    convert_command.add_argument("--poll-interval", help='Seconds between polls of the output file when following',
+                                 type=float, default=5.0)
+    convert_command.add_argument("--follow-timeout", help='Seconds to wait for new periods when following',
+                                 type=float)
+    convert_command.add_argument("--stats", help='Path to JSON file of phase timings and bytes read and written',
+                                 type=lambda x: valid_output_path(parser, x))
+    add_conversion_arguments(parser, convert_command)
+
+    batch_command = subparsers.add_parser(name="batch", help="Converts many SWMM output files to netcdf")
+    batch_command.add_argument("sources", help='Directories, glob patterns, SWMM output files or manifest files '
+                                               'listing SWMM output files and optional netcdf paths', nargs='+')
+    batch_command.add_argument("--output-dir", help='Directory to write netcdf files to',
+                               type=lambda x: valid_path(parser, os.path.join(x, '')))
+    batch_command.add_argument("--jobs", help='Maximum number of conversions running at once', type=int, default=1)
+    batch_command.add_argument("--check", help='Check used to skip up to date netcdf files', choices=CHECKS,
+                               default='mtime')
+    batch_command.add_argument("--force", help='Convert even if netcdf files are up to date', action='store_true')
+    batch_command.add_argument("--summary", help='Path to JSON summary of per file timings and failures',
+                               type=lambda x: valid_output_path(parser, x))
+    add_conversion_arguments(parser, batch_command)
+
+    # Calculates differences between scenarios and writes them to netcdf
+    diff_command = subparsers.add_parser(name="diff", help="Writes differences between two SWMM output files of the "
+                                                           "same network to netcdf")
+    diff_command.add_argument("--base", help='Path to SWMM output file of the base scenario', required=True)
+    diff_command.add_argument("--alternative", help='Path to SWMM output file of the alternative scenario',
+                              required=True)
+    diff_command.add_argument("--nc", help='Path to NetCDF file of alternative minus base results', required=True,
+                              type=lambda x: valid_output_path(parser, x))
+    diff_command.add_argument("--engine", help='Engine used to read SWMM output', choices=ENGINES, default='toolkit')
+    diff_command.add_argument("--block-size", help='Number of periods read from each file at a time', type=int,
+                              default=256)
+    diff_command.add_argument("--zlib", help='Compress timeseries variables', action='store_true')
+    diff_command.add_argument("--complevel", help='Compression level from 1 to 9', type=int, default=4)
+    diff_command.add_argument("--no-shuffle", help='Disable shuffle filter', dest='shuffle', action='store_false')
+    diff_command.add_argument("--chunks", help='Chunk sizes of timeseries variables as auto or '
+                                               'variable=size,size,...', nargs='+')
+    diff_command.add_argument("--access-pattern", help='Expected read access used to plan chunk sizes',
+                              choices=ACCESS_PATTERNS, default='series')
+    diff_command.add_argument("--layout", help='Layout of timeseries variables', choices=LAYOUTS, default='series')
+    diff_command.add_argument("--precision", help='Storage precision of differences', choices=('double', 'single'),
+                              default='double')
+    diff_command.add_argument("--stats", help='Path to JSON file of phase timings and bytes read and written',
+                              type=lambda x: valid_output_path(parser, x))
+    add_selection_arguments(parser, diff_command)
+
+    # Appends a continuation run to a converted netcdf file
+    append_command = subparsers.add_parser(name="append", help="Appends the periods of a continuation run, such as "
+                                                               "the next run of a simulation chained by hot start "
+                                                               "files, to a netcdf file converted by convert")
+    append_command.add_argument("--out", help='Path to SWMM output file of the continuation run', required=True)
+    append_command.add_argument("--nc", help='Path to NetCDF file of the runs before it', required=True)
+    append_command.add_argument("--engine", help='Engine used to read SWMM output', choices=ENGINES,
+                                default='toolkit')
+    append_command.add_argument("--block-size", help='Number of periods read and written at a time', type=int,
+                                default=256)
+    append_command.add_argument("--least-significant-digit", help='Quantize timeseries as auto or number of '
+                                                                  'decimal digits to retain. Use the option the '
+                                                                  'netcdf file was converted with',
+                                type=lambda x: valid_least_significant_digit(parser, x))
+    append_command.add_argument("--stats", help='Path to JSON file of phase timings and bytes read and written',
+                                type=lambda x: valid_output_path(parser, x))
+
+    # Stacks the runs of an ensemble along a member dimension
+    ensemble_command = subparsers.add_parser(name="ensemble", help="Stacks SWMM output files of the same network, "
+                                                                   "such as Monte Carlo or design storm runs, into "
+                                                                   "one netcdf file with an ensemble dimension")
+    ensemble_command.add_argument("sources", help='Directories, glob patterns, SWMM output files or manifest files '
+                                                  'listing the SWMM output files of the members', nargs='+')
+    ensemble_command.add_argument("--nc", help='Path to NetCDF file of the ensemble', required=True,
+                                  type=lambda x: valid_output_path(parser, x))
+    ensemble_command.add_argument("--engine", help='Engine used to read SWMM output', choices=ENGINES,
+                                  default='toolkit')
+    ensemble_command.add_argument("--block-size", help='Number of periods read from each member at a time', type=int,
+                                  default=256)
+    ensemble_command.add_argument("--zlib", help='Compress timeseries variables', action='store_true')
+    ensemble_command.add_argument("--complevel", help='Compression level from 1 to 9', type=int, default=4)
+    ensemble_command.add_argument("--no-shuffle", help='Disable shuffle filter', dest='shuffle',
+                                  action='store_false')
+    ensemble_command.add_argument("--chunks", help='Chunk sizes of timeseries variables as auto or '
+                                                   'variable=size,size,...', nargs='+')
+    ensemble_command.add_argument("--precision", help='Storage precision of timeseries variables',
+                                  choices=('double', 'single'), default='double')
+    ensemble_command.add_argument("--least-significant-digit", help='Quantize timeseries as auto or number of '
+                                                                    'decimal digits to retain',
+                                  type=lambda x: valid_least_significant_digit(parser, x))
+    ensemble_command.add_argument("--workers", help='Number of worker processes reading members', type=int,
+                                  default=1)
+    ensemble_command.add_argument("--stats", help='Path to JSON file of phase timings and bytes read and written',
+                                  type=lambda x: valid_output_path(parser, x))
+    add_selection_arguments(parser, ensemble_command)
+
+    # Prints the project size and reporting periods of a SWMM output file
+    info_command = subparsers.add_parser(name="info", help="Prints the header of a SWMM output file as JSON without "
+                                                           "reading its results")
+    info_command.add_argument("--out", help='Path to SWMM output file', required=True)
 
     args = parser.parse_args()
 
-    if args.sub_parser_name.lower() == 'convert':
-        create_netcdf_from_swmm(swmm_output_file=args.out, netcdf_output_file=args.nc)
+    if args.sub_parser_name.lower() == 'info':
+        valid_file(parser, args.out)
+
+        try:
+            header = read_swmm_output_header(args.out)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+
+        print(json.dumps(header._asdict(), default=datetime.datetime.isoformat, indent=2))
+    elif args.sub_parser_name.lower() == 'convert':
+        # the output file of a running simulation may not exist yet
+        if not args.follow:
+            valid_file(parser, args.out)
+
+        if args.inp and args.geom:
+            valid_file(parser, args.inp)
+
+        if get_output_format(args.nc, args.output_format) == 'zarr':
+            if args.follow or args.resume or args.checkpoint_interval or args.prefetch or args.aggregation_windows \
+                    or args.summary or not args.raw or args.skip_constant or args.drop_constant or \
+                    (args.inp and args.geom):
+                parser.error('Zarr output does not support --follow, --resume, --checkpoint-interval, --prefetch, '
+                             '--aggregate, --summaries, --no-raw, --skip-constant, --drop-constant or --inp')
+
+            # zarr is an optional dependency
+            from swmmtonetcdf.zarr_output import create_zarr_from_swmm
+
+            conversion_options = get_conversion_options(parser, args)
+            # zarr partitions are aligned to chunks rather than read by series or blocks
+            for option in ('read_by_series', 'block_size', 'resume', 'checkpoint_interval', 'prefetch',
+                           'aggregation_windows', 'aggregations', 'summary', 'raw', 'skip_constant', 'drop_constant'):
+                del conversion_options[option]
+
+            stats = create_zarr_from_swmm(
+                swmm_output_file=args.out,
+                zarr_output_path=args.nc,
+                progress=get_progress_printer(),
+                **conversion_options
+            )
+        else:
+            from swmmtonetcdf.swmmtonetcdf import create_netcdf_from_swmm
+
+            stats = create_netcdf_from_swmm(
+                swmm_output_file=args.out,
+                netcdf_output_file=args.nc,
+                follow=args.follow,
+                poll_interval=args.poll_interval,
+                follow_timeout=args.follow_timeout,
+                inp_file=args.inp if args.geom else None,
+                projection=args.prj,
+                progress=get_progress_printer(),
+                **get_conversion_options(parser, args)
+            )
+
+        if args.stats:
+            stats.write_json(args.stats)
+    elif args.sub_parser_name.lower() == 'batch':
+        from swmmtonetcdf.batch import convert_batch, find_conversion_jobs
+
+        summaries = convert_batch(
+            jobs=find_conversion_jobs(args.sources, output_dir=args.output_dir),
+            max_jobs=args.jobs,
+            check=args.check,
+            force=args.force,
+            summary_file=args.summary,
+            **get_conversion_options(parser, args)
+        )
+
+        failed = [summary for summary in summaries if summary['status'] == 'failed']
+        for summary in failed:
+            print(f"Failed to convert {summary['swmm_output_file']}: {summary['error']}", file=sys.stderr)
+
+        return 1 if failed else 0
+    elif args.sub_parser_name.lower() == 'append':
+        valid_file(parser, args.out)
+        valid_file(parser, args.nc)
+
+        from swmmtonetcdf.concat import append_netcdf_from_swmm
+
+        stats = append_netcdf_from_swmm(
+            swmm_output_file=args.out,
+            netcdf_output_file=args.nc,
+            engine=args.engine,
+            block_size=args.block_size,
+            least_significant_digit=args.least_significant_digit,
+            progress=get_progress_printer()
+        )
+
+        if args.stats:
+            stats.write_json(args.stats)
+    elif args.sub_parser_name.lower() == 'ensemble':
+        from swmmtonetcdf.batch import find_conversion_jobs
+        from swmmtonetcdf.ensemble import create_netcdf_ensemble_from_swmm
+
+        stats = create_netcdf_ensemble_from_swmm(
+            swmm_output_files=[job.swmm_output_file for job in find_conversion_jobs(args.sources)],
+            netcdf_output_file=args.nc,
+            engine=args.engine,
+            block_size=args.block_size,
+            zlib=args.zlib,
+            complevel=args.complevel,
+            shuffle=args.shuffle,
+            chunk_sizes=valid_chunk_sizes(parser, args.chunks) or 'auto',
+            precision=args.precision,
+            least_significant_digit=args.least_significant_digit,
+            workers=args.workers,
+            elements=get_element_selection(args),
+            attributes=args.attributes,
+            start_date=args.start,
+            end_date=args.end,
+            progress=get_progress_printer()
+        )
+
+        if args.stats:
+            stats.write_json(args.stats)
+    elif args.sub_parser_name.lower() == 'diff':
+        valid_file(parser, args.base)
+        valid_file(parser, args.alternative)
+
+        from swmmtonetcdf.diff import create_netcdf_diff_from_swmm
+
+        stats = create_netcdf_diff_from_swmm(
+            base_output_file=args.base,
+            alternative_output_file=args.alternative,
+            netcdf_output_file=args.nc,
+            engine=args.engine,
+            block_size=args.block_size,
+            zlib=args.zlib,
+            complevel=args.complevel,
+            shuffle=args.shuffle,
+            chunk_sizes=valid_chunk_sizes(parser, args.chunks),
+            access_pattern=args.access_pattern,
+            layout=args.layout,
+            precision=args.precision,
+            elements=get_element_selection(args),
+            attributes=args.attributes,
+            start_date=args.start,
+            end_date=args.end,
+            progress=get_progress_printer()
+        )
+
+        if args.stats:
+            stats.write_json(args.stats)
 
 
 if __name__ == '__main__':
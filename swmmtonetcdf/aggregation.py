@@ -0,0 +1,304 @@
+# python imports
+import datetime
+import re
+from typing import Dict, List, Sequence, Tuple, Union
+
+# external imports
+import cftime
+import netCDF4 as nc
+import numpy as np
+
+# local imports
+from swmmtonetcdf.options import AGGREGATIONS
+
+# CF cell methods of each statistic
+CELL_METHODS = {
+    'mean': 'time: mean',
+    'min': 'time: minimum',
+    'max': 'time: maximum',
+    'sum': 'time: sum',
+    'volume': 'time: sum',
+}
+
+# Window length suffixes in seconds
+WINDOW_UNITS = {
+    's': 1,
+    'min': 60,
+    'h': 3600,
+    'd': 86400,
+}
+
+# Prefix of the netCDF groups holding the statistics of each window length
+AGGREGATION_GROUP_PREFIX = 'aggregate_'
+
+
+def parse_window(window: Union[str, int]) -> int:
+    """
+    Parses a window length given in seconds or with an s, min, h or d suffix such as 15min or 1d
+    Args:
+        window: Window length
+
+    Returns:
+        Window length in seconds
+    """
+    if isinstance(window, int):
+        seconds = window
+    else:
+        match = re.fullmatch(r'\s*(\d+)\s*(s|min|h|d)?\s*', str(window), flags=re.IGNORECASE)
+
+        if match is None:
+            raise ValueError(f'Window {window} must be a number of seconds or use an s, min, h or d suffix such as 1h')
+
+        seconds = int(match.group(1)) * WINDOW_UNITS[(match.group(2) or 's').lower()]
+
+    if seconds <= 0:
+        raise ValueError(f'Window {window} must be longer than zero seconds')
+
+    return seconds
+
+
+def get_window_label(seconds: int) -> str:
+    """
+    Get the shortest label of a window length
+    Args:
+        seconds (int): Window length in seconds
+
+    Returns:
+        Label such as 15min, 1h or 1d
+    """
+    for suffix in ('d', 'h', 'min'):
+        if seconds % WINDOW_UNITS[suffix] == 0:
+            return f'{seconds // WINDOW_UNITS[suffix]}{suffix}'
+
+    return f'{seconds}s'
+
+
+def get_window_periods(seconds: int, report_step: int) -> int:
+    """
+    Get the number of reporting periods in a window
+    Args:
+        seconds (int): Window length in seconds
+        report_step (int): Reporting time step in seconds
+
+    Returns:
+        Number of periods
+    """
+    if seconds % report_step != 0:
+        raise ValueError(f'Window of {get_window_label(seconds)} is not a multiple of the {report_step} second '
+                         f'reporting time step')
+
+    return seconds // report_step
+
+
+def define_aggregation_group(netcdf_output: nc.Dataset, seconds: int, aggregations: Sequence[str],
+                             timeseries: Sequence[Tuple[str, Tuple[str, ...]]], datatype, num_windows: Union[int, None],
+                             zlib: bool = False, complevel: int = 4,
+                             shuffle: bool = True) -> Tuple[nc.Group, Dict[str, Dict[str, nc.Variable]]]:
+    """
+    Defines the group of statistics of a window length. Each timeseries variable has a statistic variable per
+    aggregation named after its element type, such as node_mean, with the element and attribute dimensions of the
+    root group and a time dimension of windows. Window times are the start of each window and their bounds are
+    written to time_bounds
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset opened for writing
+        seconds (int): Window length in seconds
+        aggregations: Statistics to compute
+        timeseries: Element type prefixes and dimensions of their timeseries variables with time last
+        datatype: Storage datatype of statistics
+        num_windows (int): Number of windows or None for an unlimited time dimension
+        zlib (bool): Compress statistic variables with zlib
+        complevel (int): Compression level from 1 to 9
+        shuffle (bool): Apply HDF5 shuffle filter before compression
+
+    Returns:
+        Group and mapping of element type prefixes to mappings of aggregations to statistic variables
+    """
+    unknown_aggregations = set(aggregations).difference(AGGREGATIONS)
+    if unknown_aggregations:
+        raise ValueError(f'Unknown aggregations {sorted(unknown_aggregations)}. Expected {AGGREGATIONS}')
+
+    group = netcdf_output.createGroup(f'{AGGREGATION_GROUP_PREFIX}{get_window_label(seconds)}')
+    group.window_seconds = seconds
+
+    group.createDimension('time', num_windows)
+    group.createDimension('nv', 2)
+
+    nc_time_variable = group.createVariable('time', np.float64, ('time',))
+    nc_time_variable.units = netcdf_output.variables['time'].units
+    nc_time_variable.calendar = netcdf_output.variables['time'].calendar
+    nc_time_variable.bounds = 'time_bounds'
+    group.createVariable('time_bounds', np.float64, ('time', 'nv'))
+
+    variables = {}
+    for prefix, dimensions in timeseries:
+        variables[prefix] = {}
+
+        for aggregation in aggregations:
+            nc_variable = group.createVariable(f'{prefix}_{aggregation}', datatype, dimensions, zlib=zlib,
+                                               complevel=complevel, shuffle=shuffle)
+            nc_variable.cell_methods = CELL_METHODS[aggregation]
+            variables[prefix][aggregation] = nc_variable
+
+    return group, variables
+
+
+class WindowAggregator(object):
+    """
+    Computes statistics of the timeseries of an element type over fixed windows of periods as blocks of results
+    are converted, so that the statistics are written in the same pass over the SWMM output file. Windows start at
+    the first converted period and statistics of a window are written once its last period is added
+    """
+
+    def __init__(self, group: nc.Group, variables: Dict[str, nc.Variable], window_periods: int, report_step: int,
+                 first_timestamp: float, num_attributes: int):
+        """
+        Args:
+            group (nc.Group): Group of the window length
+            variables: Mapping of aggregations to statistic variables with time last
+            window_periods (int): Number of periods in a window
+            report_step (int): Reporting time step in seconds
+            first_timestamp (float): POSIX timestamp of the first converted period, which marks the end of its
+                reporting time step
+            num_attributes (int): Number of attributes
+        """
+        self.group = group
+        self.variables = variables
+        self.window_periods = window_periods
+        self.report_step = report_step
+        self.origin = first_timestamp - report_step
+        self.num_attributes = num_attributes
+
+        # sums, minimums, maximums and number of periods of the window that is not complete yet
+        self.window = None
+        self.state = None
+
+    def add(self, start_period: int, block: np.ndarray):
+        """
+        Adds a block of results. Blocks must be added in order of periods
+        Args:
+            start_period (int): Period of first record in block
+            block (np.ndarray): Results with shape (time, element, attribute) or (time, attribute) for the system
+        """
+        if block.shape[0] == 0 or (block.ndim == 3 and block.shape[1] == 0):
+            return
+
+        values = np.asarray(block[..., 0:self.num_attributes], dtype=np.float64)
+        end_period = start_period + values.shape[0]
+
+        # segments of the block in each window
+        first_boundary = -(-start_period // self.window_periods) * self.window_periods
+        starts = np.array([start_period] + [period for period in
+                                            range(first_boundary, end_period, self.window_periods)
+                                            if period != start_period])
+        indexes = starts - start_period
+
+        sums = np.add.reduceat(values, indexes, axis=0)
+        minimums = np.minimum.reduceat(values, indexes, axis=0)
+        maximums = np.maximum.reduceat(values, indexes, axis=0)
+        counts = np.diff(np.append(indexes, values.shape[0]))
+        first_window = start_period // self.window_periods
+
+        if self.state is not None and self.window == first_window:
+            window_sums, window_minimums, window_maximums, window_count = self.state
+            sums[0] += window_sums
+            minimums[0] = np.minimum(minimums[0], window_minimums)
+            maximums[0] = np.maximum(maximums[0], window_maximums)
+            counts[0] += window_count
+
+        # every segment but the last ends at a window boundary
+        num_complete = len(starts) if end_period % self.window_periods == 0 else len(starts) - 1
+
+        if num_complete < len(starts):
+            self.window = first_window + num_complete
+            self.state = (sums[-1], minimums[-1], maximums[-1], counts[-1])
+        else:
+            self.window, self.state = None, None
+
+        if num_complete > 0:
+            self._write(first_window, sums[0:num_complete], minimums[0:num_complete], maximums[0:num_complete],
+                        counts[0:num_complete])
+
+    def finish(self):
+        """
+        Writes the statistics of the last window when it is not complete
+        """
+        if self.state is not None:
+            sums, minimums, maximums, count = self.state
+            self._write(self.window, sums[np.newaxis], minimums[np.newaxis], maximums[np.newaxis],
+                        np.array([count]))
+            self.window, self.state = None, None
+
+    def _write(self, first_window: int, sums: np.ndarray, minimums: np.ndarray, maximums: np.ndarray,
+               counts: np.ndarray):
+        """
+        Writes statistics of consecutive windows
+        Args:
+            first_window (int): Index of first window
+            sums (np.ndarray): Sums with shape (window, element, attribute) or (window, attribute)
+            minimums (np.ndarray): Minimums
+            maximums (np.ndarray): Maximums
+            counts (np.ndarray): Number of periods in each window
+        """
+        end_window = first_window + len(counts)
+        window_counts = counts.reshape((-1,) + (1,) * (sums.ndim - 1))
+        statistics = {
+            'mean': lambda: sums / window_counts,
+            'min': lambda: minimums,
+            'max': lambda: maximums,
+            'sum': lambda: sums,
+            'volume': lambda: sums * self.report_step,
+        }
+
+        for aggregation, nc_variable in self.variables.items():
+            nc_variable[..., first_window:end_window] = np.moveaxis(statistics[aggregation](), 0, -1)
+
+        # window times are shared by the element types of the group
+        starts = self.origin + np.arange(first_window, end_window) * self.window_periods * self.report_step
+        ends = starts + counts * self.report_step
+        nc_time_variable = self.group.variables['time']
+
+        nc_time_variable[first_window:end_window] = self._to_time(starts, nc_time_variable)
+        self.group.variables['time_bounds'][first_window:end_window, :] = np.stack(
+            [self._to_time(starts, nc_time_variable), self._to_time(ends, nc_time_variable)], axis=-1)
+
+    @staticmethod
+    def _to_time(timestamps: np.ndarray, nc_time_variable: nc.Variable) -> np.ndarray:
+        """
+        Converts POSIX timestamps to the units of the time variable
+        Args:
+            timestamps (np.ndarray): POSIX timestamps
+            nc_time_variable (nc.Variable): Time variable
+
+        Returns:
+            Times
+        """
+        return cftime.date2num([datetime.datetime.fromtimestamp(t) for t in timestamps],
+                               units=nc_time_variable.units, calendar=nc_time_variable.calendar)
+
+
+def get_num_windows(num_steps: int, window_periods: int) -> int:
+    """
+    Get the number of windows covering a number of periods
+    Args:
+        num_steps (int): Number of periods
+        window_periods (int): Number of periods in a window
+
+    Returns:
+        Number of windows including a last window that is not complete
+    """
+    return -(-num_steps // window_periods)
+
+
+def get_aggregation_windows(windows: Sequence[Union[str, int]], report_step: int) -> List[Tuple[int, int]]:
+    """
+    Parses window lengths
+    Args:
+        windows: Window lengths
+        report_step (int): Reporting time step in seconds
+
+    Returns:
+        Window lengths in seconds and in periods
+    """
+    seconds = sorted({parse_window(window) for window in windows})
+
+    return [(window_seconds, get_window_periods(window_seconds, report_step)) for window_seconds in seconds]
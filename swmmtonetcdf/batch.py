@@ -0,0 +1,275 @@
+# python imports
+import glob
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Sequence, Union
+
+# external imports
+import netCDF4 as nc
+
+# local imports
+from swmmtonetcdf.checkpoint import CHECKPOINT_ATTRIBUTE
+from swmmtonetcdf.options import CHECKS
+
+HASH_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class ConversionJob(NamedTuple):
+    """
+    Conversion of a SWMM output file to a netCDF file
+    """
+    swmm_output_file: str
+    netcdf_output_file: str
+
+
+def get_netcdf_output_file(swmm_output_file: str, output_dir: Union[str, None] = None) -> str:
+    """
+    Get default netCDF filepath for a SWMM output file
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        output_dir (str): Directory to write netCDF files to. Defaults to the directory of the SWMM output file
+
+    Returns:
+        NetCDF filepath
+    """
+    netcdf_output_file = os.path.splitext(swmm_output_file)[0] + '.nc'
+
+    if output_dir is not None:
+        netcdf_output_file = os.path.join(output_dir, os.path.basename(netcdf_output_file))
+
+    return netcdf_output_file
+
+
+def read_manifest(manifest_file: str, output_dir: Union[str, None] = None) -> List[ConversionJob]:
+    """
+    Reads conversion jobs from a manifest file. Each line contains a SWMM output filepath optionally followed by a
+    comma and a netCDF filepath. Blank lines and lines starting with # are ignored and relative paths are
+    resolved against the directory of the manifest.
+    Args:
+        manifest_file (str): Manifest filepath
+        output_dir (str): Directory to write netCDF files without an explicit path to
+
+    Returns:
+        List of conversion jobs
+    """
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_file))
+    jobs = []
+
+    with open(manifest_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            paths = [os.path.join(manifest_dir, path.strip()) for path in line.split(',')]
+            netcdf_output_file = paths[1] if len(paths) > 1 else get_netcdf_output_file(paths[0], output_dir)
+            jobs.append(ConversionJob(paths[0], netcdf_output_file))
+
+    return jobs
+
+
+class OrderedJobs(object):
+    """
+    Conversion jobs in insertion order keyed on the SWMM output file
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self._swmm_output_files = set()
+
+    def add(self, job: ConversionJob):
+        """
+        Adds job unless a job for the same SWMM output file exists
+        Args:
+            job (ConversionJob): Conversion job
+        """
+        key = os.path.abspath(job.swmm_output_file)
+        if key not in self._swmm_output_files:
+            self._swmm_output_files.add(key)
+            self.jobs.append(job)
+
+
+def find_conversion_jobs(sources: Sequence[str], output_dir: Union[str, None] = None) -> List[ConversionJob]:
+    """
+    Finds conversion jobs from directories, glob patterns, SWMM output files and manifest files
+    Args:
+        sources: Directories searched for .out files, glob patterns, .out files or manifest files
+        output_dir (str): Directory to write netCDF files to. Defaults to the directory of each SWMM output file
+
+    Returns:
+        List of conversion jobs without duplicates
+    """
+    jobs = OrderedJobs()
+
+    for source in sources:
+        if os.path.isdir(source):
+            for swmm_output_file in sorted(glob.glob(os.path.join(source, '*.out'))):
+                jobs.add(ConversionJob(swmm_output_file, get_netcdf_output_file(swmm_output_file, output_dir)))
+        elif os.path.isfile(source) and source.lower().endswith('.out'):
+            jobs.add(ConversionJob(source, get_netcdf_output_file(source, output_dir)))
+        elif os.path.isfile(source):
+            for job in read_manifest(source, output_dir):
+                jobs.add(job)
+        else:
+            for swmm_output_file in sorted(glob.glob(source, recursive=True)):
+                jobs.add(ConversionJob(swmm_output_file, get_netcdf_output_file(swmm_output_file, output_dir)))
+
+    return jobs.jobs
+
+
+def get_file_hash(filepath: str) -> str:
+    """
+    Get SHA-256 digest of a file
+    Args:
+        filepath (str): Filepath
+
+    Returns:
+        Hexadecimal digest
+    """
+    digest = hashlib.sha256()
+
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def is_up_to_date(swmm_output_file: str, netcdf_output_file: str, check: str = 'mtime') -> bool:
+    """
+    Checks whether a netCDF file is a complete conversion of the current SWMM output file using the source
+    signature written by create_netcdf_from_swmm
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        netcdf_output_file (str): NetCDF filepath
+        check (str): 'mtime' to compare size and modification time, 'size' to compare size only or 'hash' to
+            compare SHA-256 digests
+
+    Returns:
+        True if netCDF file is up to date
+    """
+    if check not in CHECKS:
+        raise ValueError(f'Unknown check {check}. Expected one of {CHECKS}')
+
+    if not os.path.exists(netcdf_output_file):
+        return False
+
+    try:
+        with nc.Dataset(netcdf_output_file, mode='r') as netcdf_output:
+            attributes = {name: netcdf_output.getncattr(name) for name in netcdf_output.ncattrs()}
+    except OSError:
+        return False
+
+    # unfinished conversions keep a checkpoint
+    if CHECKPOINT_ATTRIBUTE in attributes:
+        return False
+
+    source_stat = os.stat(swmm_output_file)
+
+    if attributes.get('source_size') != source_stat.st_size:
+        return False
+    elif check == 'mtime':
+        return attributes.get('source_mtime') == source_stat.st_mtime
+    elif check == 'hash':
+        return attributes.get('source_sha256') == get_file_hash(swmm_output_file)
+    else:
+        return True
+
+
+def run_conversion_job(job: ConversionJob, check: str, force: bool, options: Dict) -> Dict:
+    """
+    Runs a conversion job, skipping it if the netCDF file is up to date
+    Args:
+        job (ConversionJob): Conversion job
+        check (str): Up to date check
+        force (bool): Convert even if the netCDF file is up to date
+        options (Dict): Keyword arguments passed to create_netcdf_from_swmm
+
+    Returns:
+        Job summary
+    """
+    from swmmtonetcdf.swmmtonetcdf import create_netcdf_from_swmm
+
+    summary = {
+        'swmm_output_file': job.swmm_output_file,
+        'netcdf_output_file': job.netcdf_output_file,
+        'status': None,
+        'seconds': 0.0,
+        'error': None,
+    }
+
+    start = time.perf_counter()
+
+    try:
+        if not force and is_up_to_date(job.swmm_output_file, job.netcdf_output_file, check):
+            summary['status'] = 'skipped'
+        else:
+            stats = create_netcdf_from_swmm(swmm_output_file=job.swmm_output_file,
+                                            netcdf_output_file=job.netcdf_output_file, **options)
+
+            if check == 'hash':
+                with nc.Dataset(job.netcdf_output_file, mode='a') as netcdf_output:
+                    netcdf_output.source_sha256 = get_file_hash(job.swmm_output_file)
+
+            summary['status'] = 'converted'
+            summary['netcdf_size'] = os.path.getsize(job.netcdf_output_file)
+            summary['stats'] = stats.to_dict()
+    except Exception as e:
+        summary['status'] = 'failed'
+        summary['error'] = f'{type(e).__name__}: {e}'
+        summary['traceback'] = traceback.format_exc()
+
+    summary['seconds'] = time.perf_counter() - start
+
+    return summary
+
+
+def convert_batch(jobs: Sequence[ConversionJob], max_jobs: int = 1, check: str = 'mtime',
+                  force: bool = False, summary_file: Union[str, None] = None, **options) -> List[Dict]:
+    """
+    Converts many SWMM output files on a bounded process pool
+    Args:
+        jobs: Conversion jobs
+        max_jobs (int): Maximum number of conversions running at once
+        check (str): 'mtime', 'size' or 'hash' check used to skip up to date netCDF files
+        force (bool): Convert even if netCDF files are up to date
+        summary_file (str): JSON filepath to write per file timings and failures to
+        **options: Keyword arguments passed to create_netcdf_from_swmm
+
+    Returns:
+        Summaries of jobs in the order of jobs
+    """
+    if check not in CHECKS:
+        raise ValueError(f'Unknown check {check}. Expected one of {CHECKS}')
+
+    start = time.perf_counter()
+    summaries = [None] * len(jobs)
+
+    if max_jobs > 1:
+        with ProcessPoolExecutor(max_workers=max_jobs) as executor:
+            futures = {
+                executor.submit(run_conversion_job, job, check, force, options): i for i, job in enumerate(jobs)
+            }
+
+            for future in as_completed(futures):
+                summaries[futures[future]] = future.result()
+    else:
+        for i, job in enumerate(jobs):
+            summaries[i] = run_conversion_job(job, check, force, options)
+
+    if summary_file is not None:
+        statuses = [summary['status'] for summary in summaries]
+        with open(summary_file, 'w') as f:
+            json.dump({
+                'seconds': time.perf_counter() - start,
+                'converted': statuses.count('converted'),
+                'skipped': statuses.count('skipped'),
+                'failed': statuses.count('failed'),
+                'jobs': summaries,
+            }, f, indent=2)
+
+    return summaries
@@ -0,0 +1,140 @@
+# python imports
+import json
+import os
+from typing import Dict, Union
+
+# external imports
+import netCDF4 as nc
+
+# Global attribute holding the progress of an unfinished conversion
+CHECKPOINT_ATTRIBUTE = 'checkpoint'
+
+
+def get_source_signature(swmm_output_file: str) -> Dict:
+    """
+    Get signature of a SWMM output file used to detect changes to it
+    Args:
+        swmm_output_file (str): SWMM output filepath
+
+    Returns:
+        Mapping of global attribute names to values
+    """
+    source_stat = os.stat(swmm_output_file)
+
+    return {
+        'source_file': os.path.basename(swmm_output_file),
+        'source_size': source_stat.st_size,
+        'source_mtime': source_stat.st_mtime,
+    }
+
+
+def write_source_signature(netcdf_output: nc.Dataset, swmm_output_file: str):
+    """
+    Writes signature of a SWMM output file as global attributes
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset
+        swmm_output_file (str): SWMM output filepath
+    """
+    for name, value in get_source_signature(swmm_output_file).items():
+        netcdf_output.setncattr(name, value)
+
+
+class Checkpoint(object):
+    """
+    Progress of a conversion recorded in the netCDF file itself. A conversion is a deterministic sequence of
+    units (an attribute of an element type when reading by series, a window of periods when reading by blocks
+    or a partition when reading in parallel). Every interval units, the units written are committed once their
+    values are synced, so a resumed conversion can skip the committed units.
+    """
+
+    def __init__(self, netcdf_output: nc.Dataset, options: Dict, committed: int = 0, interval: int = 0):
+        """
+        Args:
+            netcdf_output (nc.Dataset): NetCDF dataset
+            options (Dict): Conversion options that determine the sequence of units and the values written
+            committed (int): Number of units already committed
+            interval (int): Number of units written between commits. 0 to commit no units, so that the dataset is
+                only synced when the conversion finishes and a resumed conversion starts from the first unit
+        """
+        self.netcdf_output = netcdf_output
+        self.options = options
+        self.committed = committed
+        self.interval = interval
+        self.cursor = 0
+
+    def skip(self) -> bool:
+        """
+        Advances past the next unit if it is already committed
+
+        Returns:
+            True if the next unit is committed and should be skipped
+        """
+        if self.cursor < self.committed:
+            self.cursor += 1
+            return True
+
+        return False
+
+    def save(self):
+        """
+        Records the committed units and syncs the dataset
+        """
+        self.netcdf_output.setncattr(CHECKPOINT_ATTRIBUTE,
+                                     json.dumps(dict(self.options, committed=self.committed)))
+        self.netcdf_output.sync()
+
+    def commit(self):
+        """
+        Records the next unit as written. Once interval units are written since the last commit, their values are
+        synced and they are recorded as committed
+        """
+        self.cursor += 1
+
+        if self.interval > 0 and self.cursor - self.committed >= self.interval:
+            self.netcdf_output.sync()
+            self.committed = self.cursor
+            self.save()
+
+    def finish(self):
+        """
+        Removes the checkpoint once the conversion is complete
+        """
+        if CHECKPOINT_ATTRIBUTE in self.netcdf_output.ncattrs():
+            self.netcdf_output.delncattr(CHECKPOINT_ATTRIBUTE)
+
+
+def read_checkpoint(netcdf_output_file: str, swmm_output_file: str, options: Dict) -> Union[int, None]:
+    """
+    Reads the progress of an unfinished conversion
+    Args:
+        netcdf_output_file (str): NetCDF filepath
+        swmm_output_file (str): SWMM output filepath
+        options (Dict): Conversion options of the resumed conversion
+
+    Returns:
+        Number of committed units or None when there is no unfinished conversion to resume
+    """
+    if not os.path.exists(netcdf_output_file):
+        return None
+
+    try:
+        with nc.Dataset(netcdf_output_file, mode='r') as netcdf_output:
+            attributes = {name: netcdf_output.getncattr(name) for name in netcdf_output.ncattrs()}
+    except OSError:
+        return None
+
+    if CHECKPOINT_ATTRIBUTE not in attributes:
+        return None
+
+    for name, value in get_source_signature(swmm_output_file).items():
+        if name != 'source_file' and attributes.get(name) != value:
+            raise ValueError(f'{swmm_output_file} has changed since the conversion to {netcdf_output_file} started')
+
+    checkpoint_options = json.loads(attributes[CHECKPOINT_ATTRIBUTE])
+    committed = checkpoint_options.pop('committed')
+
+    if checkpoint_options != json.loads(json.dumps(options)):
+        raise ValueError(f'Conversion options {options} differ from the options {checkpoint_options} of the '
+                         f'conversion to {netcdf_output_file} being resumed')
+
+    return committed
@@ -0,0 +1,91 @@
+# python imports
+from typing import Dict, Tuple, Union
+
+# local imports
+from swmmtonetcdf.layout import to_time_major
+
+ACCESS_PATTERNS = ('series', 'snapshot')
+
+# Target uncompressed chunk size. This matches the default HDF5 chunk cache size so that a chunk being
+# read or written can always be held in the cache.
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+
+
+def plan_chunk_sizes(num_elements: int, num_attributes: int, num_steps: int, access_pattern: str = 'series',
+                     item_size: int = 8, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Tuple[int, int, int]:
+    """
+    Plans chunk shape for an (element, attribute, time) timeseries variable
+    Args:
+        num_elements (int): Number of elements
+        num_attributes (int): Number of attributes
+        num_steps (int): Number of periods
+        access_pattern (str): 'series' when whole histories of individual elements are read or 'snapshot'
+            when all elements are read at individual periods
+        item_size (int): Size of a stored value in bytes
+        chunk_bytes (int): Target uncompressed chunk size in bytes
+
+    Returns:
+        Chunk sizes for element, attribute and time dimensions
+    """
+    if access_pattern not in ACCESS_PATTERNS:
+        raise ValueError(f'Unknown access pattern {access_pattern}. Expected one of {ACCESS_PATTERNS}')
+
+    num_elements = max(num_elements, 1)
+    num_attributes = max(num_attributes, 1)
+    num_steps = max(num_steps, 1)
+    chunk_values = max(chunk_bytes // item_size, 1)
+
+    if access_pattern == 'series':
+        # Long runs along time for a single element and attribute, widened across attributes and elements
+        # once the whole history fits in a chunk
+        time_chunk = min(num_steps, chunk_values)
+        attribute_chunk = min(num_attributes, max(chunk_values // time_chunk, 1))
+        element_chunk = min(num_elements, max(chunk_values // (time_chunk * attribute_chunk), 1))
+    else:
+        # All attributes of as many elements as possible at a single period, lengthened along time once
+        # a whole snapshot fits in a chunk
+        attribute_chunk = min(num_attributes, chunk_values)
+        element_chunk = min(num_elements, max(chunk_values // attribute_chunk, 1))
+        time_chunk = min(num_steps, max(chunk_values // (element_chunk * attribute_chunk), 1))
+
+    return element_chunk, attribute_chunk, time_chunk
+
+
+def get_variable_chunk_sizes(chunk_sizes: Union[str, Dict[str, Tuple[int, ...]], None], variable_name: str,
+                             dimension_sizes: Tuple[int, ...], access_pattern: str = 'series',
+                             item_size: int = 8, time_major: bool = False,
+                             chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Union[Tuple[int, ...], None]:
+    """
+    Resolves chunk sizes of a timeseries variable
+    Args:
+        chunk_sizes: None for library defaults, 'auto' to plan chunk sizes or a mapping of variable names to
+            chunk sizes
+        variable_name (str): Timeseries variable name
+        dimension_sizes: Sizes of variable dimensions with time last
+        access_pattern (str): 'series' or 'snapshot'
+        item_size (int): Size of a stored value in bytes
+        time_major (bool): Order planned chunk sizes with time first for time-major variables. Chunk sizes
+            given in a mapping are already in the order of the variable dimensions
+        chunk_bytes (int): Target uncompressed size of planned chunks in bytes
+
+    Returns:
+        Chunk sizes or None for library defaults
+    """
+    if chunk_sizes is None:
+        return None
+    elif isinstance(chunk_sizes, str):
+        if chunk_sizes != 'auto':
+            raise ValueError(f'Unknown chunk sizes {chunk_sizes}. Expected auto or a mapping of variable names')
+
+        if len(dimension_sizes) == 2:
+            _, attribute_chunk, time_chunk = plan_chunk_sizes(1, dimension_sizes[0], dimension_sizes[1],
+                                                              access_pattern, item_size, chunk_bytes)
+            planned_chunk_sizes = (attribute_chunk, time_chunk)
+        else:
+            planned_chunk_sizes = plan_chunk_sizes(*dimension_sizes, access_pattern=access_pattern,
+                                                   item_size=item_size, chunk_bytes=chunk_bytes)
+
+        return to_time_major(planned_chunk_sizes) if time_major else planned_chunk_sizes
+    else:
+        variable_chunk_sizes = chunk_sizes.get(variable_name)
+        return tuple(variable_chunk_sizes) if variable_chunk_sizes is not None else None
@@ -0,0 +1,268 @@
+# python imports
+import datetime
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Union
+
+# external imports
+import cftime
+import netCDF4 as nc
+import numpy as np
+from swmm.toolkit import shared_enum
+
+# local imports
+from swmmtonetcdf.aggregation import AGGREGATION_GROUP_PREFIX
+from swmmtonetcdf.checkpoint import CHECKPOINT_ATTRIBUTE
+from swmmtonetcdf.constant import CONSTANT_VARIABLES
+from swmmtonetcdf.ensemble import ENSEMBLE_DIMENSION
+from swmmtonetcdf.instrumentation import ConversionStats
+from swmmtonetcdf.layout import get_layout_variables
+from swmmtonetcdf.reader import SwmmOutputReader
+from swmmtonetcdf.storage import get_least_significant_digits, get_packed_range, get_variable_packing
+from swmmtonetcdf.subset import Subset, get_subset_block
+from swmmtonetcdf.summary import SUMMARY_STATISTICS
+from swmmtonetcdf.swmmtonetcdf import ToolkitOutputReader, get_attribute_ranges, get_swmm_output_attribute_names, \
+    open_swmm_output, write_timeseries_block
+from swmmtonetcdf.tail import append_time
+
+# Global attribute listing the SWMM output files appended to a conversion as a JSON array
+APPENDED_FILES_ATTRIBUTE = 'appended_source_files'
+
+# Element types with the names of their variables and element dimensions
+APPEND_ELEMENT_TYPES = (
+    (shared_enum.ElementType.SUBCATCH, 'catchment', 'catchments'),
+    (shared_enum.ElementType.NODE, 'node', 'nodes'),
+    (shared_enum.ElementType.LINK, 'link', 'links'),
+    (shared_enum.ElementType.SYSTEM, 'system', None),
+)
+
+# Seconds by which timestamps of consecutive runs may differ and still be the same period
+TIME_TOLERANCE = 1e-3
+
+
+class ContinuationMatch(NamedTuple):
+    """
+    Periods of a continuation run that follow the periods written to a netCDF file, with the elements and
+    attributes of the netCDF file selected from the run in the order they are written
+    """
+    subset: Subset
+    timestamps: np.ndarray
+    start_period: int
+    attributes: Dict[str, List[str]]
+
+
+def get_written_periods(nc_time_variable: nc.Variable) -> np.ndarray:
+    """
+    Get the times of the periods written to a netCDF file. Periods of an interrupted append have their values
+    written before their time, so periods without a time are not counted and are written again
+    Args:
+        nc_time_variable (nc.Variable): NetCDF time variable
+
+    Returns:
+        Times in the units of the time variable
+    """
+    times = nc_time_variable[:]
+    mask = np.ma.getmaskarray(times)
+    num_written = int(np.argmax(mask)) if mask.any() else len(mask)
+
+    return np.ma.getdata(times)[:num_written]
+
+
+def match_continuation(netcdf_output: nc.Dataset, swmm_output: Union[ToolkitOutputReader, SwmmOutputReader],
+                       swmm_output_file: str) -> ContinuationMatch:
+    """
+    Matches a continuation run to the elements, attributes and periods of a netCDF file converted from the runs
+    before it. Every element and attribute of the netCDF file must be reported by the run. Periods of the run up
+    to the last period written are skipped and the remaining periods must continue the time axis at its reporting
+    time step
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset created by create_netcdf_from_swmm
+        swmm_output: SWMM output reader of the continuation run
+        swmm_output_file (str): SWMM output filepath of the continuation run
+
+    Returns:
+        Elements, attributes and periods to append
+    """
+    if CHECKPOINT_ATTRIBUTE in netcdf_output.ncattrs():
+        raise ValueError(f'The conversion to {netcdf_output.filepath()} is unfinished and must be resumed before '
+                         f'runs are appended to it')
+    elif 'difference' in netcdf_output.ncattrs():
+        raise ValueError(f'{netcdf_output.filepath()} holds differences between scenarios')
+    elif ENSEMBLE_DIMENSION in netcdf_output.dimensions:
+        raise ValueError(f'{netcdf_output.filepath()} holds an ensemble of runs')
+    elif any(name.startswith(AGGREGATION_GROUP_PREFIX) for name in netcdf_output.groups) or \
+            any(f'{prefix}_{statistic}' in netcdf_output.variables
+                for _, prefix, _ in APPEND_ELEMENT_TYPES for statistic in SUMMARY_STATISTICS + CONSTANT_VARIABLES):
+        raise ValueError(f'Aggregation windows, summaries and constant series of {netcdf_output.filepath()} cover '
+                         f'the converted periods only. Convert the runs again to include them')
+
+    pollutant_names = list(swmm_output.get_element_names(shared_enum.ElementType.POLLUT).keys())
+    element_indexes = {}
+    attribute_indexes = {}
+    attributes = OrderedDict()
+
+    for element_type, prefix, dimension in APPEND_ELEMENT_TYPES:
+        if dimension is not None:
+            names = swmm_output.get_element_names(element_type)
+            written_names = list(netcdf_output.variables[dimension][:])
+            missing = [name for name in written_names if name not in names]
+
+            if missing:
+                raise ValueError(f'{swmm_output_file} does not report {dimension} {missing}')
+
+            element_indexes[element_type.value] = [names[name] for name in written_names]
+
+        names = {name: i for i, name in enumerate(get_swmm_output_attribute_names(element_type, pollutant_names))}
+        written_names = list(netcdf_output.variables[f'{prefix}_attribute_names'][:])
+        missing = [name for name in written_names if name not in names]
+
+        if missing:
+            raise ValueError(f'{swmm_output_file} does not report {prefix} attributes {missing}')
+
+        attribute_indexes[element_type.value] = [names[name] for name in written_names]
+        attributes[prefix] = written_names
+
+    nc_time_variable = netcdf_output.variables['time']
+    written_times = get_written_periods(nc_time_variable)
+    timestamps = swmm_output.get_dates()
+    report_step = swmm_output.report_step
+    first_period = 0
+
+    if len(written_times) > 1 and abs((written_times[-1] - written_times[-2]) * 3600.0 - report_step) > 1.0:
+        raise ValueError(f'The reporting time step of {report_step} seconds of {swmm_output_file} differs from '
+                         f'the time step of {netcdf_output.filepath()}')
+
+    if len(written_times) > 0 and len(timestamps) > 0:
+        # times of the run in the units of the time axis, converting its first timestamp only
+        times = cftime.date2num(datetime.datetime.fromtimestamp(timestamps[0]), units=nc_time_variable.units,
+                                calendar=nc_time_variable.calendar) + (timestamps - timestamps[0]) / 3600.0
+
+        # periods of the run up to the last period written overlap the time axis
+        first_period = int(np.searchsorted(times, written_times[-1] + TIME_TOLERANCE / 3600.0))
+
+        if first_period < len(times) and \
+                abs((times[first_period] - written_times[-1]) * 3600.0 - report_step) > TIME_TOLERANCE:
+            raise ValueError(f'The periods of {swmm_output_file} do not continue the time axis of '
+                             f'{netcdf_output.filepath()} after its last period')
+
+    return ContinuationMatch(
+        subset=Subset(element_indexes=element_indexes, attribute_indexes=attribute_indexes,
+                      start_period=first_period, end_period=len(timestamps)),
+        timestamps=timestamps[first_period:],
+        start_period=len(written_times),
+        attributes=attributes
+    )
+
+
+def append_netcdf_from_swmm(swmm_output_file: str, netcdf_output_file: str, engine: str = 'toolkit',
+                            block_size: int = 256,
+                            least_significant_digit: Union[int, str, Dict[str, int], None] = None,
+                            progress: Union[Callable[[int, int], None], None] = None) -> ConversionStats:
+    """
+    Appends the results of a continuation run, such as the next run of a long simulation split into runs chained
+    by hot start files, to a netCDF file created by create_netcdf_from_swmm. Only the periods after the last
+    period of the netCDF file are read and written onto its unlimited time dimension, so the runs before it are
+    not converted again. The elements and attributes of the netCDF file are selected from the run by name and
+    any others it reports are ignored. Appending a run again is a no-op, and an interrupted append is completed
+    by appending the run again
+
+    Args:
+        swmm_output_file (str): SWMM output filepath of the continuation run
+        netcdf_output_file (str): NetCDF filepath of the conversion of the runs before it
+        engine (str): Engine used to read SWMM output. 'toolkit' or 'native'
+        block_size (int): Number of periods read and written per block
+        least_significant_digit: Quantizes timeseries values as create_netcdf_from_swmm does. Use the option the
+            netCDF file was converted with
+        progress: Callback called with the number of completed and total blocks of periods
+
+    Returns:
+        ConversionStats: Phase timings, bytes read and written, and progress of the append
+    """
+    stats = ConversionStats(progress)
+    swmm_output = open_swmm_output(swmm_output_file=swmm_output_file, engine=engine)
+
+    # the netCDF file is validated read-only so that it is left untouched when the run does not continue it
+    with nc.Dataset(netcdf_output_file, mode='r') as netcdf_output:
+        match = match_continuation(netcdf_output, swmm_output, swmm_output_file)
+        layout = netcdf_output.layout if 'layout' in netcdf_output.ncattrs() else 'series'
+        num_steps = len(match.timestamps)
+
+        for element_type, prefix, _ in APPEND_ELEMENT_TYPES:
+            for name, _ in get_layout_variables(prefix, layout):
+                nc_variable = netcdf_output.variables.get(name)
+                packing = None if nc_variable is None else get_variable_packing(netcdf_output, nc_variable)
+
+                if packing is None:
+                    continue
+
+                minimums, maximums = get_attribute_ranges(swmm_output, element_type, len(match.attributes[prefix]),
+                                                          num_steps, block_size, match.subset)
+                packed_minimums, packed_maximums = get_packed_range(*packing)
+                tolerances = packing[0] / 2.0
+
+                for attribute, minimum, maximum, packed_minimum, packed_maximum, tolerance in zip(
+                        match.attributes[prefix], minimums, maximums, packed_minimums, packed_maximums, tolerances):
+                    if minimum < packed_minimum - tolerance or maximum > packed_maximum + tolerance:
+                        raise ValueError(f'{attribute} results of {swmm_output_file} range from {minimum} to '
+                                         f'{maximum}, outside the range of the int16 packing of {name}. Convert the '
+                                         f'runs again to pack them')
+
+    netcdf_output = nc.Dataset(netcdf_output_file, mode='a')
+    nc_time_variable = netcdf_output.variables['time']
+    pollutant_names = list(swmm_output.get_element_names(shared_enum.ElementType.POLLUT).keys())
+
+    timeseries = [
+        (element_type,
+         [(netcdf_output.variables[name], get_variable_packing(netcdf_output, netcdf_output.variables[name]))
+          for name, _ in get_layout_variables(prefix, layout) if name in netcdf_output.variables],
+         len(match.attributes[prefix]),
+         get_least_significant_digits(least_significant_digit, match.attributes[prefix], pollutant_names))
+        for element_type, prefix, _ in APPEND_ELEMENT_TYPES
+    ]
+
+    stats.timings['metadata'] = time.perf_counter() - stats.start_time
+    stats.start(len(range(0, num_steps, block_size)))
+
+    for block_start in range(0, num_steps, block_size):
+        block_end = min(block_start + block_size, num_steps)
+        start_period = match.start_period + block_start
+
+        for element_type, element_variables, num_attributes, digits in timeseries:
+            with stats.phase('read'):
+                block = get_subset_block(swmm_output, match.subset, element_type, block_start, block_end)
+
+            stats.bytes_read += block.nbytes
+
+            for nc_variable, packing in element_variables:
+                write_timeseries_block(
+                    nc_variable=nc_variable,
+                    block=block,
+                    start_period=start_period,
+                    num_attributes=num_attributes,
+                    least_significant_digits=digits,
+                    stats=stats,
+                    packing=packing
+                )
+
+        # the time of a block is written last so that an interrupted block is written again
+        with stats.phase('sync'):
+            append_time(nc_time_variable, match.timestamps[block_start:block_end], start_period)
+            netcdf_output.sync()
+
+        stats.advance()
+
+    with stats.phase('sync'):
+        if num_steps > 0:
+            appended_files = json.loads(netcdf_output.getncattr(APPENDED_FILES_ATTRIBUTE)) \
+                if APPENDED_FILES_ATTRIBUTE in netcdf_output.ncattrs() else []
+            appended_files.append(os.path.basename(swmm_output_file))
+            netcdf_output.setncattr(APPENDED_FILES_ATTRIBUTE, json.dumps(appended_files))
+
+        netcdf_output.close()
+
+    swmm_output.close()
+    stats.finish()
+
+    return stats
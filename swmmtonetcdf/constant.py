@@ -0,0 +1,227 @@
+# python imports
+from typing import List, Sequence, Tuple, Union
+
+# external imports
+import netCDF4 as nc
+import numpy as np
+
+# local imports
+from swmmtonetcdf.layout import is_time_major
+from swmmtonetcdf.storage import get_variable_packing, unpack_attributes
+from swmmtonetcdf.subset import Subset, get_subset_block
+
+# Suffixes of the variables of each element type recording constant series and constant attributes dropped from the
+# timeseries variables
+CONSTANT_VARIABLES = ('constant', 'constant_attribute_values')
+
+
+def find_constant_series(swmm_output, element_type, num_attributes: int, num_steps: int, block_size: int = 256,
+                         subset: Union[Subset, None] = None) -> np.ndarray:
+    """
+    Finds the series of an element type whose value does not change over the selected periods, such as the
+    concentrations of pollutants that never reach an element or the flooding losses of nodes that never flood
+    Args:
+        swmm_output: SWMM output reader
+        element_type: Element type
+        num_attributes (int): Number of attributes
+        num_steps (int): Number of periods
+        block_size (int): Number of periods read per block
+        subset (Subset): Selected elements, attributes and periods. None for all
+
+    Returns:
+        Value of each constant series with shape (element, attribute) or (attribute,) for the system, NaN for
+        series that are not constant
+    """
+    first_period = 0 if subset is None else subset.start_period
+    values, constant = None, None
+
+    for start_period in range(0, num_steps, block_size):
+        end_period = min(start_period + block_size, num_steps)
+        block = get_subset_block(swmm_output, subset, element_type, start_period, end_period)[..., 0:num_attributes]
+
+        if values is None:
+            values = np.array(block[0], dtype=np.float64)
+            constant = np.ones(values.shape, dtype=bool)
+
+        constant &= (block == block[0]).all(axis=0)
+
+        # the series are scanned in a pass of their own, so the block is not read again until it is converted
+        swmm_output.release(first_period + start_period, first_period + end_period)
+
+    if values is None:
+        # no periods are selected, so there is no value to record
+        shape = get_subset_block(swmm_output, subset, element_type, 0, 0)[..., 0:num_attributes].shape[1:]
+        return np.full(shape, np.nan)
+
+    values[~constant] = np.nan
+
+    return values
+
+
+def get_constant_attributes(constant_values: np.ndarray) -> np.ndarray:
+    """
+    Get the attributes whose series are constant for every element
+    Args:
+        constant_values (np.ndarray): Values of constant series from find_constant_series
+
+    Returns:
+        Boolean mask of attributes. Attributes of element types without elements are not constant
+    """
+    if constant_values.ndim == 1:
+        return np.isfinite(constant_values)
+
+    return np.isfinite(constant_values).all(axis=0) & (constant_values.shape[0] > 0)
+
+
+def define_constant_series(netcdf_output: nc.Dataset, prefix: str, dimensions: Tuple[str, ...],
+                           constant_values: np.ndarray, datatype,
+                           timeseries_variables: Sequence[nc.Variable] = ()) -> nc.Variable:
+    """
+    Writes the values of constant series of an element type to a variable such as node_constant, with the element
+    and attribute dimensions of its timeseries variable and no time dimension. Series that are not constant are
+    masked. The variable is listed as an ancillary variable of the timeseries variables so that readers can restore
+    the constant series left unwritten with read_timeseries
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset opened for writing
+        prefix (str): Variable name prefix of the element type such as 'node'
+        dimensions: Element and attribute dimensions of the timeseries variable
+        constant_values (np.ndarray): Values of constant series from find_constant_series
+        datatype: Storage datatype of values
+        timeseries_variables: Timeseries variables of the element type
+
+    Returns:
+        Constant series variable
+    """
+    nc_variable = netcdf_output.createVariable(f'{prefix}_constant', datatype, dimensions)
+    nc_variable[...] = np.ma.masked_invalid(constant_values)
+
+    for nc_timeseries_variable in timeseries_variables:
+        nc_timeseries_variable.ancillary_variables = nc_variable.name
+
+    return nc_variable
+
+
+def define_constant_attributes(netcdf_output: nc.Dataset, prefix: str, element_dimension: Union[str, None],
+                               attribute_names: Sequence[str], constant_values: np.ndarray, datatype):
+    """
+    Writes the names and values of attributes dropped from the timeseries of an element type because they are
+    constant for every element, to variables such as node_constant_attribute_names and
+    node_constant_attribute_values over a node_constant_attributes dimension
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset opened for writing
+        prefix (str): Variable name prefix of the element type such as 'node'
+        element_dimension (str): Element dimension of the timeseries variable or None for the system
+        attribute_names: Names of the dropped attributes
+        constant_values (np.ndarray): Values of the dropped attributes with shape (element, attribute) or
+            (attribute,) for the system
+        datatype: Storage datatype of values
+    """
+    attribute_dimension = f'{prefix}_constant_attributes'
+    netcdf_output.createDimension(dimname=attribute_dimension, size=len(attribute_names))
+
+    nc_names_variable = netcdf_output.createVariable(f'{prefix}_constant_attribute_names', str,
+                                                     (attribute_dimension,))
+    nc_names_variable[:] = np.array(list(attribute_names), dtype=object)
+
+    dimensions = (attribute_dimension,) if element_dimension is None else (element_dimension, attribute_dimension)
+    nc_values_variable = netcdf_output.createVariable(f'{prefix}_constant_attribute_values', datatype, dimensions)
+
+    if constant_values.size > 0:
+        nc_values_variable[...] = constant_values
+
+
+def plan_written_regions(nc_variable: nc.Variable, constant_values: Union[np.ndarray, None]) -> \
+        Union[List[Tuple[slice, ...]], None]:
+    """
+    Plans the regions of a timeseries variable written for each block of periods so that chunks holding only
+    constant series are never written. Unwritten chunks take no space in the file and read as fill values
+    Args:
+        nc_variable (nc.Variable): NetCDF timeseries variable
+        constant_values (np.ndarray): Values of constant series from find_constant_series. None for no constant
+            series
+
+    Returns:
+        Element and attribute slices, or attribute slices for the system, of the regions to write. None when every
+        chunk is written
+    """
+    if constant_values is None or not np.isfinite(constant_values).any():
+        return None
+
+    chunking = nc_variable.chunking()
+    constant = np.isfinite(constant_values)
+
+    if chunking == 'contiguous':
+        return None
+
+    # chunk sizes of the element and attribute dimensions
+    chunk_sizes = chunking[1:] if is_time_major(nc_variable) else chunking[:-1]
+
+    if constant.ndim == 1:
+        constant = constant[np.newaxis]
+        chunk_sizes = [1] + list(chunk_sizes)
+
+    num_elements, num_attributes = constant.shape
+    element_chunk, attribute_chunk = chunk_sizes
+    bands = []
+    skipped = False
+
+    for element_start in range(0, num_elements, element_chunk):
+        element_end = min(element_start + element_chunk, num_elements)
+        ranges = []
+
+        for attribute_start in range(0, num_attributes, attribute_chunk):
+            attribute_end = min(attribute_start + attribute_chunk, num_attributes)
+
+            if constant[element_start:element_end, attribute_start:attribute_end].all():
+                skipped = True
+            elif ranges and ranges[-1][1] == attribute_start:
+                ranges[-1] = (ranges[-1][0], attribute_end)
+            else:
+                ranges.append((attribute_start, attribute_end))
+
+        # bands of elements with the same attributes to write are written together
+        if bands and bands[-1][2] == ranges:
+            bands[-1] = (bands[-1][0], element_end, ranges)
+        else:
+            bands.append((element_start, element_end, ranges))
+
+    if not skipped:
+        return None
+
+    return [(slice(attribute_start, attribute_end),) if constant_values.ndim == 1 else
+            (slice(element_start, element_end), slice(attribute_start, attribute_end))
+            for element_start, element_end, ranges in bands for attribute_start, attribute_end in ranges]
+
+
+def read_timeseries(netcdf_output: nc.Dataset, variable_name: str) -> np.ma.MaskedArray:
+    """
+    Reads a timeseries variable, unpacking the values of int16 variables with the packing of each attribute and
+    restoring the constant series left unwritten from its ancillary constant series variable
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset
+        variable_name (str): Timeseries variable name such as 'node_timeseries'
+
+    Returns:
+        Values of the timeseries variable
+    """
+    nc_variable = netcdf_output.variables[variable_name]
+    values = nc_variable[...]
+    packing = get_variable_packing(netcdf_output, nc_variable)
+
+    if packing is not None:
+        values = unpack_attributes(values, *packing, axis=values.ndim - 1 if is_time_major(nc_variable)
+                                   else values.ndim - 2)
+
+    if 'ancillary_variables' not in nc_variable.ncattrs():
+        return values
+
+    constant_values = np.ma.filled(netcdf_output.variables[nc_variable.ancillary_variables][...].astype(np.float64),
+                                   np.nan)
+    constant_values = np.broadcast_to(constant_values[np.newaxis] if is_time_major(nc_variable)
+                                      else constant_values[..., np.newaxis], values.shape)
+    restored = np.ma.getmaskarray(values) & np.isfinite(constant_values)
+
+    values = np.ma.array(values)
+    values[restored] = constant_values[restored]
+
+    return values
@@ -0,0 +1,284 @@
+# python imports
+import datetime
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple, Union
+
+# external imports
+import numpy as np
+import netCDF4 as nc
+from swmm.toolkit import shared_enum
+
+# local imports
+from swmmtonetcdf.instrumentation import ConversionStats
+from swmmtonetcdf.layout import LAYOUTS, get_layout_variables
+from swmmtonetcdf.storage import get_datatype
+from swmmtonetcdf.subset import Subset, get_subset_block
+from swmmtonetcdf.summary import ElementSummary, define_summary_variables
+from swmmtonetcdf.swmmtonetcdf import ConversionSelection, define_netcdf_output, open_swmm_output, \
+    select_conversion, write_timeseries_block
+
+# Statistics of the absolute differences of each element and attribute, written to variables such as
+# node_abs_diff_max. The number of nonzero periods counts the periods in which the scenarios differ
+DIFF_STATISTICS = ('max', 'time_of_max', 'mean', 'nonzero_count')
+
+# Element types with the names of their variables and selections
+DIFF_ELEMENT_TYPES = (
+    (shared_enum.ElementType.SUBCATCH, 'catchment', 'catchments'),
+    (shared_enum.ElementType.NODE, 'node', 'nodes'),
+    (shared_enum.ElementType.LINK, 'link', 'links'),
+    (shared_enum.ElementType.SYSTEM, 'system', None),
+)
+
+
+class ScenarioMatch(NamedTuple):
+    """
+    Elements, attributes and periods shared by a base and an alternative SWMM output file. Names are in the order
+    of the base file and the subsets select them from each file in that order
+    """
+    base_subset: Subset
+    alternative_subset: Subset
+    timestamps: np.ndarray
+    elements: Dict[str, Dict[str, int]]
+    attributes: Dict[str, List[str]]
+
+
+def match_names(base_names: Sequence[str], alternative_names: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    Matches names reported by two files
+    Args:
+        base_names: Names in the base file
+        alternative_names: Names in the alternative file
+
+    Returns:
+        Indexes of the names in both files into the base and the alternative names, in the order of the base file
+    """
+    alternative_indexes = {name: i for i, name in enumerate(alternative_names)}
+    base_indexes = [i for i, name in enumerate(base_names) if name in alternative_indexes]
+
+    return base_indexes, [alternative_indexes[base_names[i]] for i in base_indexes]
+
+
+def match_scenarios(base: ConversionSelection, alternative: ConversionSelection, report_step: int) -> ScenarioMatch:
+    """
+    Matches the elements and attributes of two selections by name and their periods by time. Elements and
+    attributes reported by one file only, such as pollutants or elements added to a scenario, are not compared
+    Args:
+        base (ConversionSelection): Selection of the base file
+        alternative (ConversionSelection): Selection of the alternative file
+        report_step (int): Reporting time step in seconds shared by both files
+
+    Returns:
+        Matched elements, attributes and periods
+    """
+    if len(base.timestamps) == 0 or len(alternative.timestamps) == 0 or \
+            max(base.timestamps[0], alternative.timestamps[0]) > min(base.timestamps[-1], alternative.timestamps[-1]):
+        raise ValueError('The base and alternative SWMM output files do not share any reporting periods')
+
+    # periods reported by both files
+    start_time = max(base.timestamps[0], alternative.timestamps[0])
+    end_time = min(base.timestamps[-1], alternative.timestamps[-1])
+
+    base_start = int(np.searchsorted(base.timestamps, start_time))
+    alternative_start = int(np.searchsorted(alternative.timestamps, start_time))
+    num_steps = int(round((end_time - start_time) / report_step)) + 1
+
+    if abs(alternative.timestamps[alternative_start] - base.timestamps[base_start]) > 1e-3:
+        raise ValueError('Reporting periods of the base and alternative SWMM output files are not aligned')
+
+    element_indexes = ({}, {})
+    attribute_indexes = ({}, {})
+    elements = OrderedDict()
+    attributes = OrderedDict()
+
+    for element_type, prefix, dimension in DIFF_ELEMENT_TYPES:
+        if dimension is not None:
+            base_names, alternative_names = getattr(base, dimension), getattr(alternative, dimension)
+            base_keys, base_values = list(base_names.keys()), list(base_names.values())
+            alternative_values = list(alternative_names.values())
+            base_indexes, alternative_indexes = match_names(base_keys, list(alternative_names.keys()))
+
+            element_indexes[0][element_type.value] = [base_values[i] for i in base_indexes]
+            element_indexes[1][element_type.value] = [alternative_values[i] for i in alternative_indexes]
+            elements[dimension] = OrderedDict((base_keys[i], base_values[i]) for i in base_indexes)
+
+        # attribute indexes of each selection index the attributes reported by its file
+        base_names, alternative_names = getattr(base, f'{prefix}_attributes'), \
+            getattr(alternative, f'{prefix}_attributes')
+        base_indexes, alternative_indexes = match_names(base_names, alternative_names)
+
+        attribute_indexes[0][element_type.value] = [base.subset.attribute_indexes[element_type.value][i]
+                                                    for i in base_indexes]
+        attribute_indexes[1][element_type.value] = [alternative.subset.attribute_indexes[element_type.value][i]
+                                                    for i in alternative_indexes]
+        attributes[prefix] = [base_names[i] for i in base_indexes]
+
+    timestamps = base.timestamps[base_start:base_start + num_steps]
+
+    # selection timestamps start at the first selected period of each file
+    base_start += base.subset.start_period
+    alternative_start += alternative.subset.start_period
+
+    return ScenarioMatch(
+        base_subset=Subset(element_indexes=element_indexes[0], attribute_indexes=attribute_indexes[0],
+                           start_period=base_start, end_period=base_start + num_steps),
+        alternative_subset=Subset(element_indexes=element_indexes[1], attribute_indexes=attribute_indexes[1],
+                                  start_period=alternative_start, end_period=alternative_start + num_steps),
+        timestamps=timestamps,
+        elements=elements,
+        attributes=attributes
+    )
+
+
+def create_netcdf_diff_from_swmm(base_output_file: str, alternative_output_file: str, netcdf_output_file: str,
+                                 engine: str = 'toolkit', block_size: int = 256, zlib: bool = False,
+                                 complevel: int = 4, shuffle: bool = True,
+                                 chunk_sizes: Union[str, Dict[str, Tuple[int, ...]], None] = None,
+                                 access_pattern: str = 'series', layout: str = 'series', precision: str = 'double',
+                                 elements: Union[Dict[str, Union[Sequence[str], str]], None] = None,
+                                 attributes: Union[Sequence[str], None] = None,
+                                 start_date: Union[datetime.datetime, None] = None,
+                                 end_date: Union[datetime.datetime, None] = None,
+                                 progress: Union[Callable[[int, int], None], None] = None) -> ConversionStats:
+    """
+    Creates netcdf output of the differences between an alternative and a base SWMM output file of the same
+    network. Both files are read in lockstep in blocks of periods and only their differences are written, to the
+    timeseries variables of create_netcdf_from_swmm, so that scenarios are compared in a single pass without
+    converting both files. Elements and attributes are matched by name and periods by time. The maximum, time of
+    maximum and mean of the absolute differences and the number of periods that differ are written to variables
+    such as node_abs_diff_max
+
+    Args:
+        base_output_file (str): SWMM output filepath of the base scenario
+        alternative_output_file (str): SWMM output filepath of the alternative scenario
+        netcdf_output_file (str): Output netcdf filepath of alternative minus base results
+        engine (str): Engine used to read SWMM output. 'toolkit' or 'native'
+        block_size (int): Number of periods read from each file at a time
+        zlib (bool): Compress timeseries variables with zlib
+        complevel (int): Compression level from 1 to 9
+        shuffle (bool): Apply HDF5 shuffle filter before compression
+        chunk_sizes: Chunk sizes of timeseries variables as 'auto', a mapping of variable names to chunk sizes or
+            None for the netCDF4 defaults
+        access_pattern (str): Expected read access used to plan 'auto' chunk sizes
+        layout (str): Layout of timeseries variables. 'series', 'snapshot' or 'both'
+        precision (str): Storage precision of differences. 'double' or 'single'
+        elements: Mapping of 'nodes', 'links' or 'catchments' to a sequence of element IDs or a regular expression
+            matching whole IDs. None for all elements
+        attributes: Names of attributes to compare. None for all attributes
+        start_date (datetime.datetime): First date of periods to compare. None to start at the first shared period
+        end_date (datetime.datetime): Last date of periods to compare. None to end at the last shared period
+        progress: Callback called with the number of completed and total blocks of periods
+
+    Returns:
+        ConversionStats: Phase timings, bytes read and written, and progress of the comparison
+    """
+    stats = ConversionStats(progress)
+
+    if precision == 'int16':
+        raise ValueError('Differences cannot be packed as int16 because their range is only known once compared')
+    elif layout not in LAYOUTS:
+        raise ValueError(f'Unknown layout {layout}. Expected one of {LAYOUTS}')
+
+    datatype = get_datatype(precision)
+
+    base_output = open_swmm_output(swmm_output_file=base_output_file, engine=engine)
+    alternative_output = open_swmm_output(swmm_output_file=alternative_output_file, engine=engine)
+
+    if base_output.report_step != alternative_output.report_step:
+        raise ValueError(f'Reporting time steps of {base_output.report_step} and {alternative_output.report_step} '
+                         f'seconds of the base and alternative SWMM output files differ')
+
+    match = match_scenarios(select_conversion(base_output, elements, attributes, start_date, end_date),
+                            select_conversion(alternative_output, elements, attributes, start_date, end_date),
+                            base_output.report_step)
+    num_steps = len(match.timestamps)
+
+    netcdf_output = nc.Dataset(netcdf_output_file, mode='w')
+    nc_variables = define_netcdf_output(
+        netcdf_output=netcdf_output,
+        swmm_output=base_output,
+        timestamps=match.timestamps,
+        nodes=match.elements['nodes'],
+        links=match.elements['links'],
+        catchments=match.elements['catchments'],
+        node_attributes=match.attributes['node'],
+        link_attributes=match.attributes['link'],
+        catchment_attributes=match.attributes['catchment'],
+        system_attributes=match.attributes['system'],
+        datatype=datatype,
+        zlib=zlib,
+        complevel=complevel,
+        shuffle=shuffle,
+        chunk_sizes=chunk_sizes,
+        access_pattern=access_pattern,
+        planned_steps=num_steps,
+        precision=precision,
+        block_size=block_size,
+        layout=layout
+    )
+    netcdf_output.difference = 'alternative - base'
+    netcdf_output.base_output_file = os.path.basename(base_output_file)
+    netcdf_output.alternative_output_file = os.path.basename(alternative_output_file)
+
+    summary_variables = define_summary_variables(
+        netcdf_output=netcdf_output,
+        timeseries=(('catchment_abs_diff', ('catchments', 'catchment_attributes')),
+                    ('node_abs_diff', ('nodes', 'node_attributes')),
+                    ('link_abs_diff', ('links', 'link_attributes')),
+                    ('system_abs_diff', ('system_attributes',))),
+        datatype=datatype,
+        zlib=zlib,
+        complevel=complevel,
+        shuffle=shuffle,
+        statistics=DIFF_STATISTICS
+    )
+
+    first_timestamp = match.timestamps[0] if num_steps > 0 else 0.0
+    timeseries = [
+        (element_type, [nc_variables[name] for name, _ in get_layout_variables(prefix, layout)],
+         ElementSummary(summary_variables[f'{prefix}_abs_diff'], base_output.report_step, first_timestamp,
+                        len(match.attributes[prefix])))
+        for element_type, prefix, _ in DIFF_ELEMENT_TYPES
+    ]
+
+    stats.timings['metadata'] = time.perf_counter() - stats.start_time
+    stats.start(len(range(0, num_steps, block_size)))
+
+    for block_start in range(0, num_steps, block_size):
+        block_end = min(block_start + block_size, num_steps)
+
+        for element_type, element_variables, element_summary in timeseries:
+            with stats.phase('read'):
+                base_block = get_subset_block(base_output, match.base_subset, element_type, block_start, block_end)
+                alternative_block = get_subset_block(alternative_output, match.alternative_subset, element_type,
+                                                     block_start, block_end)
+
+            stats.bytes_read += base_block.nbytes + alternative_block.nbytes
+
+            with stats.phase('transpose'):
+                differences = np.subtract(alternative_block, base_block, dtype=np.float64)
+                element_summary.add(block_start, np.abs(differences))
+
+            for nc_variable in element_variables:
+                write_timeseries_block(
+                    nc_variable=nc_variable,
+                    block=differences,
+                    start_period=block_start,
+                    num_attributes=differences.shape[-1],
+                    stats=stats
+                )
+
+        stats.advance()
+
+    with stats.phase('sync'):
+        for _, _, element_summary in timeseries:
+            element_summary.finish()
+
+        netcdf_output.close()
+
+    base_output.close()
+    alternative_output.close()
+    stats.finish()
+
+    return stats
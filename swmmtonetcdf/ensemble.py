@@ -0,0 +1,353 @@
+# python imports
+import datetime
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+# external imports
+import numpy as np
+import netCDF4 as nc
+from swmm.toolkit import shared_enum
+
+# local imports
+from swmmtonetcdf.chunking import DEFAULT_CHUNK_BYTES, get_variable_chunk_sizes
+from swmmtonetcdf.header import read_swmm_output_signature
+from swmmtonetcdf.instrumentation import ConversionStats
+from swmmtonetcdf.parallel import imap_bounded
+from swmmtonetcdf.storage import get_datatype, get_least_significant_digits, quantize_attributes
+from swmmtonetcdf.subset import Subset, get_subset_block
+from swmmtonetcdf.swmmtonetcdf import define_netcdf_output, open_swmm_output, select_conversion
+
+# Dimension and variable of the names of ensemble members
+ENSEMBLE_DIMENSION = 'ensemble'
+
+# Element types with the names of their variables and the dimensions preceding the ensemble dimension
+ENSEMBLE_ELEMENT_TYPES = (
+    (shared_enum.ElementType.SUBCATCH, 'catchment', ('catchments', 'catchment_attributes')),
+    (shared_enum.ElementType.NODE, 'node', ('nodes', 'node_attributes')),
+    (shared_enum.ElementType.LINK, 'link', ('links', 'link_attributes')),
+    (shared_enum.ElementType.SYSTEM, 'system', ('system_attributes',)),
+)
+
+# Member files, readers opened by a worker process and the selection they read
+_worker_files = ()
+_worker_engine = None
+_worker_subset = None
+_worker_readers = {}
+
+
+def get_member_names(swmm_output_files: Sequence[str]) -> List[str]:
+    """
+    Get names of ensemble members from the names of their SWMM output files
+    Args:
+        swmm_output_files: SWMM output filepaths of the members
+
+    Returns:
+        Member names
+    """
+    names = [os.path.splitext(os.path.basename(swmm_output_file))[0] for swmm_output_file in swmm_output_files]
+
+    if len(set(names)) != len(names):
+        raise ValueError('SWMM output files of ensemble members must have distinct names unless member names are '
+                         'given')
+
+    return names
+
+
+def check_ensemble_members(swmm_output_files: Sequence[str]):
+    """
+    Checks that SWMM output files are runs of the same network reporting the same periods by comparing their
+    stored headers, so that the metadata of the first member applies to all of them
+    Args:
+        swmm_output_files: SWMM output filepaths of the members
+    """
+    signature = read_swmm_output_signature(swmm_output_files[0])
+
+    for swmm_output_file in swmm_output_files[1:]:
+        if read_swmm_output_signature(swmm_output_file) != signature:
+            raise ValueError(f'{swmm_output_file} is not a run of the network of {swmm_output_files[0]} reporting '
+                             f'the same periods')
+
+
+def get_ensemble_chunk_sizes(chunk_sizes: Union[str, Dict[str, Tuple[int, ...]], None], variable_name: str,
+                             dimension_sizes: Tuple[int, ...], num_members: int, item_size: int = 8,
+                             chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Union[Tuple[int, ...], None]:
+    """
+    Resolves chunk sizes of an ensemble timeseries variable. Planned chunks hold all members of their elements,
+    attributes and periods so that the members of a series are read from contiguous chunks
+    Args:
+        chunk_sizes: None for library defaults, 'auto' to plan chunk sizes or a mapping of variable names to
+            chunk sizes including the ensemble dimension
+        variable_name (str): Timeseries variable name
+        dimension_sizes: Sizes of the variable dimensions other than the ensemble dimension with time last
+        num_members (int): Number of ensemble members
+        item_size (int): Size of a stored value in bytes
+        chunk_bytes (int): Target uncompressed size of planned chunks in bytes
+
+    Returns:
+        Chunk sizes or None for library defaults
+    """
+    if chunk_sizes != 'auto':
+        return get_variable_chunk_sizes(chunk_sizes, variable_name, dimension_sizes)
+
+    # chunks are planned for series of all members as if each value held the values of every member
+    planned_chunk_sizes = get_variable_chunk_sizes(chunk_sizes, variable_name, dimension_sizes, 'series',
+                                                   item_size * max(num_members, 1), chunk_bytes=chunk_bytes)
+
+    return planned_chunk_sizes[:-1] + (max(num_members, 1),) + planned_chunk_sizes[-1:]
+
+
+def init_ensemble_worker(swmm_output_files: Sequence[str], engine: str, subset: Subset):
+    """
+    Shares the member files and the selection of the first member with a worker process. Readers of the members
+    are opened as the worker first reads them
+    Args:
+        swmm_output_files: SWMM output filepaths of the members
+        engine (str): Engine used to read SWMM output
+        subset (Subset): Selected elements, attributes and periods
+    """
+    global _worker_files, _worker_engine, _worker_subset, _worker_readers
+
+    _worker_files = tuple(swmm_output_files)
+    _worker_engine = engine
+    _worker_subset = subset
+    _worker_readers = {}
+
+
+def read_member_block(task: Tuple[int, int, int]) -> List[np.ndarray]:
+    """
+    Reads a block of periods of a member with the readers of the worker process
+    Args:
+        task: Member index, first period and period after the last period
+
+    Returns:
+        Results of each element type with shape (time, element, attribute) or (time, attribute) for the system
+    """
+    member, start_period, end_period = task
+
+    if member not in _worker_readers:
+        _worker_readers[member] = open_swmm_output(swmm_output_file=_worker_files[member], engine=_worker_engine)
+
+    return read_member_blocks(_worker_readers[member], _worker_subset, start_period, end_period)
+
+
+def read_member_blocks(swmm_output, subset: Subset, start_period: int, end_period: int) -> List[np.ndarray]:
+    """
+    Reads a block of periods of all element types of a member
+    Args:
+        swmm_output: SWMM output reader of the member
+        subset (Subset): Selected elements, attributes and periods
+        start_period (int): First period relative to the start of the selection
+        end_period (int): Period after last period relative to the start of the selection
+
+    Returns:
+        Results of each element type with shape (time, element, attribute) or (time, attribute) for the system
+    """
+    blocks = [np.array(get_subset_block(swmm_output, subset, element_type, start_period, end_period))
+              for element_type, _, _ in ENSEMBLE_ELEMENT_TYPES]
+
+    # the block is not read again
+    swmm_output.release(subset.start_period + start_period, subset.start_period + end_period)
+
+    return blocks
+
+
+def stack_members(blocks: Sequence[np.ndarray], num_attributes: int,
+                  least_significant_digits: Sequence[Union[int, None]]) -> np.ndarray:
+    """
+    Stacks a block of periods read from each member into the layout of the ensemble timeseries variables
+    Args:
+        blocks: Results of each member with shape (time, element, attribute) or (time, attribute) for the system
+        num_attributes (int): Number of attributes to write
+        least_significant_digits: Digits retained for each attribute
+
+    Returns:
+        Values with shape (element, attribute, member, time) or (attribute, member, time) for the system
+    """
+    values = np.stack([block[..., 0:num_attributes] for block in blocks])
+
+    if values.ndim == 4:
+        values = np.ascontiguousarray(values.transpose((2, 3, 0, 1)), dtype=np.float64)
+        return quantize_attributes(values, least_significant_digits, axis=1)
+    else:
+        values = np.ascontiguousarray(values.transpose((2, 0, 1)), dtype=np.float64)
+        return quantize_attributes(values, least_significant_digits, axis=0)
+
+
+def create_netcdf_ensemble_from_swmm(swmm_output_files: Sequence[str], netcdf_output_file: str,
+                                     member_names: Union[Sequence[str], None] = None, engine: str = 'toolkit',
+                                     block_size: int = 256, zlib: bool = False, complevel: int = 4,
+                                     shuffle: bool = True,
+                                     chunk_sizes: Union[str, Dict[str, Tuple[int, ...]], None] = 'auto',
+                                     precision: str = 'double',
+                                     least_significant_digit: Union[int, str, Dict[str, int], None] = None,
+                                     workers: int = 1,
+                                     elements: Union[Dict[str, Union[Sequence[str], str]], None] = None,
+                                     attributes: Union[Sequence[str], None] = None,
+                                     start_date: Union[datetime.datetime, None] = None,
+                                     end_date: Union[datetime.datetime, None] = None,
+                                     chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                                     progress: Union[Callable[[int, int], None], None] = None) -> ConversionStats:
+    """
+    Creates netcdf output stacking the runs of an ensemble, such as Monte Carlo realizations or design storms
+    run on the same network, along an ensemble dimension. The timeseries variables of create_netcdf_from_swmm
+    gain an ensemble dimension before time, such as node_timeseries(nodes, node_attributes, ensemble, time), so
+    that the members of a series are a contiguous slice. The elements, attributes and periods are selected once
+    from the first member and shared with the others, whose headers must match it. Blocks of periods of each
+    member are read on a process pool and stacked, so a block of all members is held in memory at a time
+
+    Args:
+        swmm_output_files: SWMM output filepaths of the members
+        netcdf_output_file (str): Output netcdf filepath
+        member_names: Names of the members written to the ensemble variable. None for the names of their files
+        engine (str): Engine used to read SWMM output. 'toolkit' or 'native'
+        block_size (int): Number of periods read from each member and written at a time
+        zlib (bool): Compress timeseries variables with zlib
+        complevel (int): Compression level from 1 to 9
+        shuffle (bool): Apply HDF5 shuffle filter before compression
+        chunk_sizes: Chunk sizes of timeseries variables. 'auto' to plan chunks holding all members, None for
+            library defaults or a mapping of timeseries variable names to chunk sizes
+        precision (str): Storage precision of timeseries variables. 'double' or 'single'
+        least_significant_digit: Quantizes timeseries values as create_netcdf_from_swmm does
+        workers (int): Number of worker processes reading members
+        elements: Mapping of 'nodes', 'links' or 'catchments' to a sequence of element IDs or a regular expression
+            matching whole IDs. None for all elements
+        attributes: Names of attributes to convert. None for all attributes
+        start_date (datetime.datetime): First date of periods to convert. None to start at the first period
+        end_date (datetime.datetime): Last date of periods to convert. None to end at the last period
+        chunk_bytes (int): Target uncompressed size of planned chunks in bytes
+        progress: Callback called with the number of completed and total blocks of periods
+
+    Returns:
+        ConversionStats: Phase timings, bytes read and written, and progress of the conversion
+    """
+    stats = ConversionStats(progress)
+
+    if precision == 'int16':
+        raise ValueError('Ensembles cannot be packed as int16 because the range of every member would have to be '
+                         'read first')
+    elif len(swmm_output_files) == 0:
+        raise ValueError('An ensemble requires at least one SWMM output file')
+
+    datatype = get_datatype(precision)
+    member_names = get_member_names(swmm_output_files) if member_names is None else list(member_names)
+    num_members = len(swmm_output_files)
+
+    if len(member_names) != num_members:
+        raise ValueError(f'{len(member_names)} member names were given for {num_members} SWMM output files')
+
+    check_ensemble_members(swmm_output_files)
+
+    # the selection of the first member applies to every member
+    swmm_output = open_swmm_output(swmm_output_file=swmm_output_files[0], engine=engine)
+    selection = select_conversion(swmm_output, elements, attributes, start_date, end_date)
+    subset = selection.subset
+    num_steps = len(selection.timestamps)
+    pollutant_names = selection.pollutant_names
+
+    netcdf_output = nc.Dataset(netcdf_output_file, mode='w', format="NETCDF4")
+    define_netcdf_output(
+        netcdf_output=netcdf_output,
+        swmm_output=swmm_output,
+        timestamps=selection.timestamps,
+        nodes=selection.nodes,
+        links=selection.links,
+        catchments=selection.catchments,
+        node_attributes=selection.node_attributes,
+        link_attributes=selection.link_attributes,
+        catchment_attributes=selection.catchment_attributes,
+        system_attributes=selection.system_attributes,
+        datatype=datatype,
+        zlib=zlib,
+        complevel=complevel,
+        shuffle=shuffle,
+        chunk_sizes=None,
+        access_pattern='series',
+        planned_steps=num_steps,
+        precision=precision,
+        block_size=block_size,
+        raw=False
+    )
+    swmm_output.close()
+
+    netcdf_output.createDimension(dimname=ENSEMBLE_DIMENSION, size=num_members)
+    nc_member_names_variable = netcdf_output.createVariable(
+        varname=ENSEMBLE_DIMENSION,
+        datatype=str,
+        dimensions=(ENSEMBLE_DIMENSION,)
+    )
+    nc_member_names_variable[:] = np.array(member_names, dtype=object)
+
+    timeseries = []
+    for element_type, prefix, dimensions in ENSEMBLE_ELEMENT_TYPES:
+        attribute_names = getattr(selection, f'{prefix}_attributes')
+        dimension_sizes = tuple(len(netcdf_output.dimensions[dimension]) for dimension in dimensions) + (num_steps,)
+
+        nc_variable = netcdf_output.createVariable(
+            varname=f'{prefix}_timeseries',
+            datatype=datatype,
+            dimensions=dimensions + (ENSEMBLE_DIMENSION, 'time'),
+            zlib=zlib,
+            complevel=complevel,
+            shuffle=shuffle,
+            chunksizes=get_ensemble_chunk_sizes(chunk_sizes, f'{prefix}_timeseries', dimension_sizes, num_members,
+                                                np.dtype(datatype).itemsize, chunk_bytes)
+        )
+
+        timeseries.append((nc_variable, len(attribute_names),
+                           get_least_significant_digits(least_significant_digit, attribute_names, pollutant_names)))
+
+    blocks = [(start_period, min(start_period + block_size, num_steps))
+              for start_period in range(0, num_steps, block_size)]
+    tasks = [(member, start_period, end_period)
+             for start_period, end_period in blocks for member in range(num_members)]
+
+    stats.timings['metadata'] = time.perf_counter() - stats.start_time
+    stats.start(len(blocks))
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_ensemble_worker,
+                                       initargs=(swmm_output_files, engine, subset))
+        results = imap_bounded(executor, read_member_block, tasks, max_pending=max(2 * workers, num_members))
+    else:
+        executor = None
+        init_ensemble_worker(swmm_output_files, engine, subset)
+        results = map(read_member_block, tasks)
+
+    try:
+        for start_period, end_period in blocks:
+            with stats.phase('read'):
+                member_blocks = [next(results) for _ in range(num_members)]
+
+            for i, (nc_variable, num_attributes, digits) in enumerate(timeseries):
+                element_blocks = [blocks_read[i] for blocks_read in member_blocks]
+                stats.bytes_read += sum(block.nbytes for block in element_blocks)
+
+                if element_blocks[0].ndim == 3 and element_blocks[0].shape[1] == 0:
+                    continue
+
+                with stats.phase('transpose'):
+                    values = stack_members(element_blocks, num_attributes, digits)
+
+                with stats.phase('write'):
+                    nc_variable[..., start_period:end_period] = values
+
+                stats.bytes_written += values.size * nc_variable.dtype.itemsize
+
+            stats.advance()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        else:
+            for reader in _worker_readers.values():
+                reader.close()
+
+            init_ensemble_worker((), None, None)
+
+    with stats.phase('sync'):
+        netcdf_output.close()
+
+    stats.finish()
+
+    return stats
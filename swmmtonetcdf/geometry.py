@@ -0,0 +1,315 @@
+# python imports
+import os
+import re
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+# external imports
+import netCDF4 as nc
+import numpy as np
+
+# Sections of SWMM input files listing links with their inlet and outlet nodes
+LINK_SECTIONS = ('CONDUITS', 'PUMPS', 'ORIFICES', 'WEIRS', 'OUTLETS')
+
+# Sections of SWMM input files with element names and coordinates
+COORDINATE_SECTIONS = ('COORDINATES', 'VERTICES', 'POLYGONS')
+
+# Projections given as EPSG codes
+EPSG_PATTERN = re.compile(r'EPSG:\d+', flags=re.IGNORECASE)
+
+
+class InpGeometry(NamedTuple):
+    """
+    Geometry of a SWMM input file. Coordinates are in the order of the input file and vertices and polygon
+    points of the same element are consecutive
+    """
+    node_names: np.ndarray
+    node_x: np.ndarray
+    node_y: np.ndarray
+    link_names: np.ndarray
+    link_inlets: np.ndarray
+    link_outlets: np.ndarray
+    vertex_links: np.ndarray
+    vertex_x: np.ndarray
+    vertex_y: np.ndarray
+    polygon_catchments: np.ndarray
+    polygon_x: np.ndarray
+    polygon_y: np.ndarray
+
+
+def read_inp_geometry(inp_file: str) -> InpGeometry:
+    """
+    Reads node coordinates, link vertices, subcatchment polygons and the nodes links connect from a SWMM input file
+    in a single pass over its lines. Rows of those sections are parsed as they are read, keeping only their first
+    three columns
+    Args:
+        inp_file (str): SWMM input filepath
+
+    Returns:
+        Geometry of the input file
+    """
+    columns = {section: ([], [], []) for section in COORDINATE_SECTIONS + ('LINKS',)}
+    section_columns = None
+
+    with open(inp_file, 'r', errors='replace') as f:
+        for line in f:
+            if ';' in line:
+                line = line.split(';', 1)[0]
+
+            if not line or line.isspace():
+                continue
+            elif line.lstrip().startswith('['):
+                section = line.strip().strip('[]').upper()
+                section_columns = columns['LINKS'] if section in LINK_SECTIONS else columns.get(section)
+            elif section_columns is not None:
+                # rows with fewer than three columns have missing coordinates or nodes
+                tokens = line.split()
+                names, first, second = section_columns
+                names.append(tokens[0])
+                first.append(tokens[1] if len(tokens) > 1 else 'nan')
+                second.append(tokens[2] if len(tokens) > 2 else 'nan')
+
+    def to_coordinates(section: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        names, x, y = columns.pop(section)
+        return np.array(names, dtype=str), np.array(x, dtype=np.float64), np.array(y, dtype=np.float64)
+
+    node_names, node_x, node_y = to_coordinates('COORDINATES')
+    vertex_links, vertex_x, vertex_y = to_coordinates('VERTICES')
+    polygon_catchments, polygon_x, polygon_y = to_coordinates('POLYGONS')
+    link_names, link_inlets, link_outlets = (np.array(column, dtype=str) for column in columns.pop('LINKS'))
+
+    return InpGeometry(
+        node_names=node_names,
+        node_x=node_x,
+        node_y=node_y,
+        link_names=link_names,
+        link_inlets=link_inlets,
+        link_outlets=link_outlets,
+        vertex_links=vertex_links,
+        vertex_x=vertex_x,
+        vertex_y=vertex_y,
+        polygon_catchments=polygon_catchments,
+        polygon_x=polygon_x,
+        polygon_y=polygon_y
+    )
+
+
+def lookup_element_indexes(element_names: Sequence[str], names: np.ndarray) -> np.ndarray:
+    """
+    Looks up the indexes of names in the elements of an output file with a sorted search of fixed width strings
+    rather than a dictionary lookup per name
+    Args:
+        element_names: Names of the elements of the output file in the order of the output file
+        names (np.ndarray): Names to look up
+
+    Returns:
+        Indexes of names into element_names, or -1 for names that are not elements of the output file
+    """
+    element_names = np.array(list(element_names), dtype=str)
+
+    if len(element_names) == 0 or len(names) == 0:
+        return np.full(len(names), -1, dtype=np.int64)
+
+    order = np.argsort(element_names)
+    sorted_names = element_names[order]
+    positions = np.minimum(np.searchsorted(sorted_names, names), len(sorted_names) - 1)
+
+    return np.where(sorted_names[positions] == names, order[positions], -1)
+
+
+def get_node_coordinates(geometry: InpGeometry, nodes: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the coordinates of nodes
+    Args:
+        geometry (InpGeometry): Geometry of a SWMM input file
+        nodes: Names of nodes in the order of the output file
+
+    Returns:
+        X and y coordinates of nodes. Nodes missing from the input file have NaN coordinates
+    """
+    node_x, node_y = np.full(len(nodes), np.nan), np.full(len(nodes), np.nan)
+    node_indexes = lookup_element_indexes(nodes, geometry.node_names)
+    selected = node_indexes >= 0
+
+    node_x[node_indexes[selected]] = geometry.node_x[selected]
+    node_y[node_indexes[selected]] = geometry.node_y[selected]
+
+    return node_x, node_y
+
+
+def group_points(indexes: np.ndarray, x: np.ndarray, y: np.ndarray,
+                 num_elements: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Groups the points of elements by element index, keeping their order within each element
+    Args:
+        indexes (np.ndarray): Element index of each point or -1 for points that are dropped
+        x (np.ndarray): X coordinates
+        y (np.ndarray): Y coordinates
+        num_elements (int): Number of elements
+
+    Returns:
+        Number of points of each element and x and y coordinates ordered by element
+    """
+    selected = indexes >= 0
+    indexes, x, y = indexes[selected], x[selected], y[selected]
+    order = np.argsort(indexes, kind='stable')
+
+    return np.bincount(indexes, minlength=num_elements), x[order], y[order]
+
+
+def get_link_lines(geometry: InpGeometry, nodes: Sequence[str], links: Sequence[str]) -> \
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the lines of links from their inlet node through their vertices to their outlet node
+    Args:
+        geometry (InpGeometry): Geometry of a SWMM input file
+        nodes: Names of nodes in the order of the output file
+        links: Names of links in the order of the output file
+
+    Returns:
+        Inlet and outlet node indexes of each link with shape (link, 2), the number of points of each line, and x and
+        y coordinates of the points. Links and nodes missing from the input file have indexes of -1 and NaN
+        coordinates
+    """
+    num_links = len(links)
+    node_x, node_y = get_node_coordinates(geometry, nodes)
+
+    link_nodes = np.full((num_links, 2), -1, dtype=np.int64)
+    link_indexes = lookup_element_indexes(links, geometry.link_names)
+    selected = link_indexes >= 0
+    link_nodes[link_indexes[selected], 0] = lookup_element_indexes(nodes, geometry.link_inlets[selected])
+    link_nodes[link_indexes[selected], 1] = lookup_element_indexes(nodes, geometry.link_outlets[selected])
+
+    vertex_counts, vertex_x, vertex_y = group_points(lookup_element_indexes(links, geometry.vertex_links),
+                                                     geometry.vertex_x, geometry.vertex_y, num_links)
+
+    # each line is its inlet, its vertices and its outlet
+    point_counts = vertex_counts + 2
+    ends = np.cumsum(point_counts)
+    starts = ends - point_counts
+    x, y = np.empty(point_counts.sum()), np.empty(point_counts.sum())
+
+    vertex_starts = np.repeat(starts + 1, vertex_counts)
+    vertex_ranks = np.arange(len(vertex_x)) - np.repeat(np.cumsum(vertex_counts) - vertex_counts, vertex_counts)
+    x[vertex_starts + vertex_ranks], y[vertex_starts + vertex_ranks] = vertex_x, vertex_y
+
+    for positions, endpoints in ((starts, link_nodes[:, 0]), (ends - 1, link_nodes[:, 1])):
+        x[positions] = np.where(endpoints >= 0, node_x[endpoints], np.nan)
+        y[positions] = np.where(endpoints >= 0, node_y[endpoints], np.nan)
+
+    return link_nodes, point_counts, x, y
+
+
+def get_crs_attributes(projection: str) -> Dict[str, str]:
+    """
+    Get the attributes of the grid mapping variable of a projection
+    Args:
+        projection (str): EPSG code such as EPSG:4326, WKT, or the path of a .prj file of WKT
+
+    Returns:
+        Attributes of the grid mapping variable
+    """
+    if os.path.isfile(projection):
+        with open(projection, 'r') as f:
+            projection = f.read().strip()
+
+    if EPSG_PATTERN.fullmatch(projection.strip()):
+        attributes = {'epsg_code': projection.strip().upper()}
+
+        if attributes['epsg_code'] == 'EPSG:4326':
+            attributes['grid_mapping_name'] = 'latitude_longitude'
+
+        return attributes
+
+    return {'crs_wkt': projection, 'spatial_ref': projection}
+
+
+def write_netcdf_geometry(netcdf_output: nc.Dataset, inp_file: str, nodes: Sequence[str], links: Sequence[str],
+                          catchments: Sequence[str], projection: str = 'EPSG:4326'):
+    """
+    Writes the geometry of a SWMM input file to a netCDF file defined by define_netcdf_output. Nodes and links form
+    a UGRID 1D network topology variable named network, and link lines and subcatchment polygons are CF simple
+    geometries named link_geometry and catchment_geometry. Timeseries variables reference their geometry
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset opened for writing
+        inp_file (str): SWMM input filepath
+        nodes: Names of nodes in the order of the output file
+        links: Names of links in the order of the output file
+        catchments: Names of subcatchments in the order of the output file
+        projection (str): EPSG code, WKT, or path of a .prj file of the coordinates of the input file
+    """
+    geometry = read_inp_geometry(inp_file)
+    nodes, links, catchments = list(nodes), list(links), list(catchments)
+    element_variables = [name for name in netcdf_output.variables if name not in ('nodes', 'links', 'catchments')]
+
+    nc_crs = netcdf_output.createVariable('crs', np.int32)
+    crs_attributes = get_crs_attributes(projection)
+    nc_crs.setncatts(crs_attributes)
+    geographic = crs_attributes.get('grid_mapping_name') == 'latitude_longitude'
+
+    def create_coordinates(x_name: str, y_name: str, dimension: str, x: np.ndarray, y: np.ndarray):
+        for name, values, axis in ((x_name, x, 'x'), (y_name, y, 'y')):
+            nc_variable = netcdf_output.createVariable(name, np.float64, (dimension,), fill_value=np.nan)
+            nc_variable.axis = axis.upper()
+
+            if geographic:
+                nc_variable.standard_name = 'longitude' if axis == 'x' else 'latitude'
+                nc_variable.units = 'degrees_east' if axis == 'x' else 'degrees_north'
+            else:
+                nc_variable.standard_name = f'projection_{axis}_coordinate'
+
+            nc_variable[:] = values
+
+    # network of nodes connected by links
+    link_nodes, point_counts, line_x, line_y = get_link_lines(geometry, nodes, links)
+
+    nc_network = netcdf_output.createVariable('network', np.int32)
+    nc_network.setncatts({
+        'cf_role': 'mesh_topology',
+        'topology_dimension': 1,
+        'node_dimension': 'nodes',
+        'edge_dimension': 'links',
+        'node_coordinates': 'node_x node_y',
+        'edge_node_connectivity': 'link_nodes',
+    })
+
+    create_coordinates('node_x', 'node_y', 'nodes', *get_node_coordinates(geometry, nodes))
+
+    netcdf_output.createDimension('link_ends', 2)
+    nc_link_nodes = netcdf_output.createVariable('link_nodes', np.int32, ('links', 'link_ends'), fill_value=-1)
+    nc_link_nodes.cf_role = 'edge_node_connectivity'
+    nc_link_nodes.start_index = 0
+    nc_link_nodes[:] = link_nodes
+
+    # lines of links and polygons of subcatchments
+    polygon_counts, polygon_x, polygon_y = group_points(
+        lookup_element_indexes(catchments, geometry.polygon_catchments), geometry.polygon_x, geometry.polygon_y,
+        len(catchments))
+
+    for prefix, dimension, geometry_type, counts, x, y in (
+            ('link', 'links', 'line', point_counts, line_x, line_y),
+            ('catchment', 'catchments', 'polygon', polygon_counts, polygon_x, polygon_y)):
+        netcdf_output.createDimension(f'{prefix}_points', len(x))
+
+        nc_geometry = netcdf_output.createVariable(f'{prefix}_geometry', np.int32)
+        nc_geometry.setncatts({
+            'geometry_type': geometry_type,
+            'node_count': f'{prefix}_point_count',
+            'node_coordinates': f'{prefix}_x {prefix}_y',
+            'grid_mapping': 'crs',
+        })
+
+        nc_counts = netcdf_output.createVariable(f'{prefix}_point_count', np.int32, (dimension,))
+        nc_counts[:] = counts
+        create_coordinates(f'{prefix}_x', f'{prefix}_y', f'{prefix}_points', x, y)
+
+    # timeseries variables of each element type reference their geometry
+    for name in element_variables:
+        nc_variable = netcdf_output.variables[name]
+
+        if 'nodes' in nc_variable.dimensions:
+            nc_variable.setncatts({'mesh': 'network', 'location': 'node', 'grid_mapping': 'crs'})
+        elif 'links' in nc_variable.dimensions:
+            nc_variable.setncatts({'mesh': 'network', 'location': 'edge', 'geometry': 'link_geometry',
+                                   'grid_mapping': 'crs'})
+        elif 'catchments' in nc_variable.dimensions:
+            nc_variable.setncatts({'geometry': 'catchment_geometry', 'grid_mapping': 'crs'})
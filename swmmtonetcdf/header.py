@@ -0,0 +1,167 @@
+# python imports
+import datetime
+import os
+import struct
+from typing import List, NamedTuple, Tuple
+
+# SWMM binary output constants
+MAGIC_NUMBER = 516114522
+RECORD_SIZE = 4
+DATE_SIZE = 8
+NUM_OPENING_RECORDS = 7
+NUM_CLOSING_RECORDS = 6
+
+# SWMM stores dates as decimal days since 12/30/1899
+SWMM_EPOCH = datetime.datetime(1899, 12, 30)
+
+# Names of the flow unit and pollutant concentration unit codes of the header
+FLOW_UNITS = ('CFS', 'GPM', 'MGD', 'CMS', 'LPS', 'MLD')
+CONCENTRATION_UNITS = ('mg/L', 'ug/L', 'count/L')
+
+
+class SwmmOutputHeader(NamedTuple):
+    """
+    Project size and reporting periods of a SWMM output file
+    """
+    version: int
+    flow_units: str
+    num_subcatchments: int
+    num_nodes: int
+    num_links: int
+    num_pollutants: int
+    pollutants: List[str]
+    pollutant_units: List[str]
+    num_periods: int
+    report_step: int
+    start_date: datetime.datetime
+    end_date: datetime.datetime
+    error_code: int
+
+
+def get_unit_name(names: tuple, code: int) -> str:
+    """
+    Get name of a unit code
+    Args:
+        names (tuple): Unit names in the order of their codes
+        code (int): Unit code
+
+    Returns:
+        Unit name or the code for unknown units
+    """
+    return names[code] if 0 <= code < len(names) else str(code)
+
+
+def read_records(f, swmm_output_file: str) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Reads and validates the opening and closing records of a SWMM output file
+    Args:
+        f: Binary file object
+        swmm_output_file (str): SWMM output filepath
+
+    Returns:
+        Opening and closing records
+    """
+    opening_size = NUM_OPENING_RECORDS * RECORD_SIZE
+    closing_size = NUM_CLOSING_RECORDS * RECORD_SIZE
+    file_size = os.fstat(f.fileno()).st_size
+
+    f.seek(0)
+    opening = f.read(opening_size)
+
+    if len(opening) < opening_size or struct.unpack_from('<i', opening)[0] != MAGIC_NUMBER:
+        raise ValueError(f'{swmm_output_file} is not a valid SWMM output file')
+
+    if file_size < opening_size + closing_size:
+        raise ValueError(f'{swmm_output_file} is not a complete SWMM output file')
+
+    f.seek(file_size - closing_size)
+    closing = struct.unpack(f'<{NUM_CLOSING_RECORDS}i', f.read(closing_size))
+    id_position, properties_position, output_start_position, _, _, magic = closing
+
+    if magic != MAGIC_NUMBER:
+        raise ValueError(f'{swmm_output_file} is not a complete SWMM output file')
+
+    if not opening_size <= id_position <= properties_position <= output_start_position - DATE_SIZE - RECORD_SIZE:
+        raise ValueError(f'{swmm_output_file} has inconsistent section offsets')
+
+    return struct.unpack(f'<{NUM_OPENING_RECORDS}i', opening), closing
+
+
+def read_swmm_output_signature(swmm_output_file: str) -> bytes:
+    """
+    Reads the records of a SWMM output file that identify its network and reporting periods as they are stored, so
+    that output files can be compared without parsing them. Runs of the same network reporting the same periods
+    have equal signatures
+    Args:
+        swmm_output_file (str): SWMM output filepath
+
+    Returns:
+        Opening records, element names, pollutant names and units, start date, report step and number of periods
+    """
+    with open(swmm_output_file, 'rb') as f:
+        opening, (id_position, properties_position, output_start_position, num_periods, _, _) = \
+            read_records(f, swmm_output_file)
+
+        f.seek(id_position)
+        ids = f.read(properties_position - id_position)
+
+        f.seek(output_start_position - DATE_SIZE - RECORD_SIZE)
+        dates = f.read(DATE_SIZE + RECORD_SIZE)
+
+    return struct.pack(f'<{NUM_OPENING_RECORDS}i', *opening) + ids + dates + struct.pack('<i', num_periods)
+
+
+def read_swmm_output_header(swmm_output_file: str) -> SwmmOutputHeader:
+    """
+    Reads the opening and closing records of a SWMM output file without reading its results or importing the
+    toolkit or numpy. Only the element names are walked to find the pollutant names
+    Args:
+        swmm_output_file (str): SWMM output filepath
+
+    Returns:
+        Header of the output file
+    """
+    with open(swmm_output_file, 'rb') as f:
+        (_, version, flow_units, num_subcatchments, num_nodes, num_links, num_pollutants), \
+            (id_position, properties_position, output_start_position, num_periods, error_code, _) = \
+            read_records(f, swmm_output_file)
+
+        # the start date and report step precede the period records
+        f.seek(output_start_position - DATE_SIZE - RECORD_SIZE)
+        start_date, report_step = struct.unpack('<di', f.read(DATE_SIZE + RECORD_SIZE))
+
+        # element names are followed by the pollutant names and the pollutant units
+        f.seek(id_position)
+        ids = f.read(properties_position - id_position)
+
+    offset = 0
+    for _ in range(num_subcatchments + num_nodes + num_links):
+        length, = struct.unpack_from('<i', ids, offset)
+        offset += RECORD_SIZE + length
+
+    pollutants = []
+    for _ in range(num_pollutants):
+        length, = struct.unpack_from('<i', ids, offset)
+        pollutants.append(ids[offset + RECORD_SIZE:offset + RECORD_SIZE + length].decode('utf-8', errors='replace'))
+        offset += RECORD_SIZE + length
+
+    pollutant_units = struct.unpack_from(f'<{num_pollutants}i', ids, offset)
+
+    # round to the second to remove the error of storing dates as decimal days
+    start_date = SWMM_EPOCH + datetime.timedelta(seconds=round(start_date * 86400))
+
+    return SwmmOutputHeader(
+        version=version,
+        flow_units=get_unit_name(FLOW_UNITS, flow_units),
+        num_subcatchments=num_subcatchments,
+        num_nodes=num_nodes,
+        num_links=num_links,
+        num_pollutants=num_pollutants,
+        pollutants=pollutants,
+        pollutant_units=[get_unit_name(CONCENTRATION_UNITS, code) for code in pollutant_units],
+        num_periods=num_periods,
+        report_step=report_step,
+        start_date=start_date,
+        end_date=start_date + datetime.timedelta(seconds=num_periods * report_step),
+        error_code=error_code,
+    )
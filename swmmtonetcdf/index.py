@@ -0,0 +1,317 @@
+# python imports
+import datetime
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple, Union
+
+# external imports
+import julian
+import numpy as np
+from swmm.toolkit import output, shared_enum
+
+# local imports
+from swmmtonetcdf.checkpoint import get_source_signature
+from swmmtonetcdf.reader import POLLUT, element_type_value
+
+# Version of the sidecar format. Sidecars of other versions are rebuilt
+INDEX_VERSION = 1
+
+# Suffix appended to SWMM output filepaths for persisted indexes
+INDEX_SUFFIX = '.index.json'
+
+# Most recently used indexes keyed on the path, size and modification time of their output file, so that a rewritten
+# output file is indexed again without asking the toolkit whether the cached index still describes it. Indexes of
+# handles opened without load_swmm_output_index are keyed on the address of the handle
+MAX_CACHED_INDEXES = 32
+_cached_indexes = OrderedDict()
+
+# Paths of the output files of open file handles keyed on the address of the handle. SWIG handles are not hashable
+# and addresses are reused once a handle is closed, so readers forget the path of a handle when closing it
+_handle_paths = {}
+
+
+class SwmmOutputIndex(object):
+    """
+    Metadata of a SWMM output file read once and shared by the helpers that look up element names, pollutant
+    enumerations, attribute names and timestamps
+    """
+
+    def __init__(self, project_size: Sequence[int], names: Dict[int, List[str]], start_date: float,
+                 report_step: int, num_periods: int):
+        """
+        Args:
+            project_size: Number of subcatchments, nodes, links, systems and pollutants
+            names: Mapping of element type codes to element names in the order of the output file
+            start_date (float): Report start date in decimal days since 12/30/1899
+            report_step (int): Reporting time step in seconds
+            num_periods (int): Number of reporting periods
+        """
+        self.project_size = list(project_size)
+        self.names = {element_type_value(element_type): list(element_names)
+                      for element_type, element_names in names.items()}
+        self.start_date = start_date
+        self.report_step = report_step
+        self.num_periods = num_periods
+
+        self.element_indexes = {element_type: OrderedDict((name, i) for i, name in enumerate(element_names))
+                                for element_type, element_names in self.names.items()}
+        self._attribute_names = {}
+        self._dates = None
+
+    @classmethod
+    def from_file_handle(cls, file_handle) -> 'SwmmOutputIndex':
+        """
+        Reads metadata through swmm.toolkit.output
+        Args:
+            file_handle: SWMM output file handle
+
+        Returns:
+            Index
+        """
+        project_size = output.get_proj_size(file_handle)
+        names = {}
+
+        for element_type in (shared_enum.ElementType.SUBCATCH, shared_enum.ElementType.NODE,
+                             shared_enum.ElementType.LINK, shared_enum.ElementType.POLLUT):
+            names[element_type.value] = [output.get_elem_name(file_handle, element_type, i)
+                                         for i in range(project_size[element_type.value])]
+
+        return cls(
+            project_size=project_size,
+            names=names,
+            start_date=output.get_start_date(file_handle),
+            report_step=output.get_times(file_handle, shared_enum.Time.REPORT_STEP),
+            num_periods=output.get_times(file_handle, shared_enum.Time.NUM_PERIODS)
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SwmmOutputIndex':
+        """
+        Creates index from its JSON serializable mapping
+        Args:
+            data (Dict): Mapping created by to_dict
+
+        Returns:
+            Index
+        """
+        return cls(
+            project_size=data['project_size'],
+            names={int(element_type): names for element_type, names in data['names'].items()},
+            start_date=data['start_date'],
+            report_step=data['report_step'],
+            num_periods=data['num_periods']
+        )
+
+    def to_dict(self) -> Dict:
+        """
+        Get index as a JSON serializable mapping
+
+        Returns:
+            Mapping of metadata names to values
+        """
+        return {
+            'project_size': self.project_size,
+            'names': {str(element_type): names for element_type, names in self.names.items()},
+            'start_date': self.start_date,
+            'report_step': self.report_step,
+            'num_periods': self.num_periods,
+        }
+
+    def get_element_names(self, element_type) -> Dict[str, int]:
+        """
+        Get element names
+        Args:
+            element_type: Element type
+
+        Returns:
+            Ordered mapping of element names to element indexes. The mapping is shared and must not be modified
+        """
+        return self.element_indexes[element_type_value(element_type)]
+
+    def get_pollutant_enum_name(self, pollutant_name: str) -> str:
+        """
+        Get name of the attribute enumeration of a pollutant
+        Args:
+            pollutant_name (str): Pollutant name
+
+        Returns:
+            Enumeration name
+        """
+        return f'POLLUT_CONC_{self.element_indexes[POLLUT][pollutant_name]}'
+
+    def get_attribute_names(self, element_type) -> List[str]:
+        """
+        Get names of attributes reported for an element type
+        Args:
+            element_type: Element type
+
+        Returns:
+            Attribute names in the order of the output file. The list is shared and must not be modified
+        """
+        element_type = element_type_value(element_type)
+
+        if element_type not in self._attribute_names:
+            from swmmtonetcdf.swmmtonetcdf import get_swmm_output_attribute_names
+            self._attribute_names[element_type] = get_swmm_output_attribute_names(element_type, self.names[POLLUT])
+
+        return self._attribute_names[element_type]
+
+    def get_dates(self) -> np.ndarray:
+        """
+        Get timestamps of periods
+        Returns:
+            Array of POSIX timestamps. The array is shared and must not be modified
+        """
+        if self._dates is None:
+            start_date_time = julian.from_jd(self.start_date + 2415018.5) + \
+                datetime.timedelta(seconds=self.report_step)
+            end_date_time = start_date_time + datetime.timedelta(seconds=self.num_periods * self.report_step)
+
+            self._dates = np.arange(
+                start=start_date_time.timestamp(),
+                stop=end_date_time.timestamp(),
+                step=self.report_step
+            )
+
+        return self._dates
+
+
+def get_index_key(swmm_output_file: str) -> Tuple[str, int, float]:
+    """
+    Get the key of the cached index of a SWMM output file
+    Args:
+        swmm_output_file (str): SWMM output filepath
+
+    Returns:
+        Absolute path, size and modification time of the output file
+    """
+    source_stat = os.stat(swmm_output_file)
+
+    return os.path.abspath(swmm_output_file), source_stat.st_size, source_stat.st_mtime
+
+
+def get_swmm_output_index(file_handle) -> SwmmOutputIndex:
+    """
+    Get the index of an open SWMM output file handle. Handles opened by load_swmm_output_index share the cached index
+    of their output file, while the index of other handles is read on first use and cached for the handle
+    Args:
+        file_handle: SWMM output file handle
+
+    Returns:
+        Index
+    """
+    swmm_output_file = _handle_paths.get(int(file_handle))
+    key = int(file_handle) if swmm_output_file is None else get_index_key(swmm_output_file)
+    index = _cached_indexes.get(key)
+
+    if index is not None:
+        _cached_indexes.move_to_end(key)
+        return index
+
+    return cache_swmm_output_index(key, SwmmOutputIndex.from_file_handle(file_handle))
+
+
+def cache_swmm_output_index(key: Union[int, Tuple[str, int, float]], index: SwmmOutputIndex) -> SwmmOutputIndex:
+    """
+    Caches the index of a SWMM output file
+    Args:
+        key: Key of the output file from get_index_key, or the address of a file handle without a known path
+        index (SwmmOutputIndex): Index
+
+    Returns:
+        Index
+    """
+    _cached_indexes[key] = index
+
+    if len(_cached_indexes) > MAX_CACHED_INDEXES:
+        _cached_indexes.popitem(last=False)
+
+    return index
+
+
+def forget_swmm_output_index(file_handle):
+    """
+    Drops the output file path of a file handle that is closed. The index stays cached for the next handle opened on
+    the unchanged output file, while the index cached for a handle without a known path is dropped
+    Args:
+        file_handle: SWMM output file handle
+    """
+    if _handle_paths.pop(int(file_handle), None) is None:
+        _cached_indexes.pop(int(file_handle), None)
+
+
+def load_swmm_output_index(swmm_output_file: str, file_handle, sidecar: bool = False) -> SwmmOutputIndex:
+    """
+    Loads the index of a SWMM output file opened through swmm.toolkit.output and caches it for the file handle
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        file_handle: SWMM output file handle
+        sidecar (bool): Read the index from its persisted sidecar when it matches the size and modification time of
+            the output file, and persist it otherwise
+
+    Returns:
+        Index
+    """
+    _handle_paths[int(file_handle)] = swmm_output_file
+    key = get_index_key(swmm_output_file)
+    index = _cached_indexes.get(key)
+    sidecar_index = read_index_sidecar(swmm_output_file) if sidecar else None
+
+    if index is None:
+        index = sidecar_index or SwmmOutputIndex.from_file_handle(file_handle)
+
+    if sidecar and sidecar_index is None:
+        write_index_sidecar(swmm_output_file, index)
+
+    return cache_swmm_output_index(key, index)
+
+
+def get_index_sidecar_path(swmm_output_file: str) -> str:
+    """
+    Get the filepath of the persisted index of a SWMM output file
+    Args:
+        swmm_output_file (str): SWMM output filepath
+
+    Returns:
+        Sidecar filepath
+    """
+    return swmm_output_file + INDEX_SUFFIX
+
+
+def read_index_sidecar(swmm_output_file: str) -> Union[SwmmOutputIndex, None]:
+    """
+    Reads the persisted index of a SWMM output file
+    Args:
+        swmm_output_file (str): SWMM output filepath
+
+    Returns:
+        Index or None if there is no sidecar or it was written for a different version of the output file
+    """
+    try:
+        with open(get_index_sidecar_path(swmm_output_file), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get('version') != INDEX_VERSION or data.get('signature') != get_source_signature(swmm_output_file):
+        return None
+
+    return SwmmOutputIndex.from_dict(data)
+
+
+def write_index_sidecar(swmm_output_file: str, index: SwmmOutputIndex):
+    """
+    Persists the index of a SWMM output file next to it, keyed on the size and modification time of the file
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        index (SwmmOutputIndex): Index
+    """
+    data = dict(index.to_dict(), version=INDEX_VERSION, signature=get_source_signature(swmm_output_file))
+    sidecar_path = get_index_sidecar_path(swmm_output_file)
+
+    # write then rename so that concurrent readers never see a partial sidecar
+    with open(sidecar_path + '.tmp', 'w') as f:
+        json.dump(data, f)
+
+    os.replace(sidecar_path + '.tmp', sidecar_path)
@@ -0,0 +1,125 @@
+# python imports
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Union
+
+# Phases timed during a conversion. Reads include waiting for worker processes when converting in parallel and
+# transposes include quantizing and packing values into the layout of the output
+PHASES = ('metadata', 'read', 'transpose', 'write', 'sync')
+
+
+class ConversionStats(object):
+    """
+    Phase timings, byte counts and progress of a conversion. Bytes read are the float32 results read from the
+    SWMM output file and bytes written are the uncompressed values handed to the output library
+    """
+
+    def __init__(self, progress: Union[Callable[[int, int], None], None] = None):
+        """
+        Args:
+            progress: Callback called with the number of completed and total units of work (attributes when
+                reading by series, blocks of periods or partitions) after each unit is committed
+        """
+        self.progress = progress
+        self.timings = OrderedDict((phase, 0.0) for phase in PHASES)
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.completed = 0
+        self.total = 0
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times a phase of the conversion. Time spent in nested phases is counted in each of them
+        Args:
+            name (str): Phase name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def start(self, total: int, completed: int = 0):
+        """
+        Sets the number of units of work of the conversion
+        Args:
+            total (int): Number of units
+            completed (int): Number of units already completed by a previous conversion that is resumed
+        """
+        self.total = total
+        self.completed = completed
+
+        if self.progress is not None:
+            self.progress(self.completed, self.total)
+
+    def advance(self, units: int = 1):
+        """
+        Records completed units of work and reports progress
+        Args:
+            units (int): Number of units completed
+        """
+        self.completed += units
+
+        if self.progress is not None:
+            self.progress(self.completed, self.total)
+
+    def finish(self):
+        """
+        Records the elapsed time of the conversion
+        """
+        self.elapsed = time.perf_counter() - self.start_time
+
+    def to_dict(self) -> Dict:
+        """
+        Get statistics as a JSON serializable mapping
+
+        Returns:
+            Mapping of statistic names to values
+        """
+        elapsed = self.elapsed if self.elapsed > 0.0 else time.perf_counter() - self.start_time
+        read_seconds = self.timings['read']
+        write_seconds = self.timings['write']
+
+        return {
+            'seconds': elapsed,
+            'phases': dict(self.timings),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'read_mib_per_second': self.bytes_read / read_seconds / 2 ** 20 if read_seconds > 0.0 else None,
+            'write_mib_per_second': self.bytes_written / write_seconds / 2 ** 20 if write_seconds > 0.0 else None,
+            'units_completed': self.completed,
+            'units_total': self.total,
+        }
+
+    def write_json(self, stats_file: str):
+        """
+        Writes statistics to a JSON file
+        Args:
+            stats_file (str): JSON filepath
+        """
+        with open(stats_file, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def get_progress_printer() -> Callable[[int, int], None]:
+    """
+    Get a progress callback printing the percentage of completed units only when it changes
+
+    Returns:
+        Progress callback
+    """
+    last_percent = [None]
+
+    def print_progress(completed: int, total: int):
+        percent = int(completed * 100 / total) if total > 0 else 100
+
+        if percent != last_percent[0]:
+            last_percent[0] = percent
+            print(rf'Progress: {percent}%/{100}', end='\n' if completed >= total else '\r')
+
+    return print_progress
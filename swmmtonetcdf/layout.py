@@ -0,0 +1,51 @@
+# python imports
+from typing import List, Sequence, Tuple
+
+# 'series' stores timeseries as (element, attribute, time) for reading histories of individual elements,
+# 'snapshot' stores them as (time, element, attribute) for reading all elements at individual periods and
+# 'both' writes the time-major copies alongside as *_snapshots variables
+LAYOUTS = ('series', 'snapshot', 'both')
+
+
+def get_layout_variables(prefix: str, layout: str = 'series') -> List[Tuple[str, bool]]:
+    """
+    Get timeseries variables written for an element type
+    Args:
+        prefix (str): Variable name prefix of the element type such as 'node'
+        layout (str): 'series', 'snapshot' or 'both'
+
+    Returns:
+        Variable names and whether each variable is time-major
+    """
+    if layout == 'series':
+        return [(f'{prefix}_timeseries', False)]
+    elif layout == 'snapshot':
+        return [(f'{prefix}_timeseries', True)]
+    elif layout == 'both':
+        return [(f'{prefix}_timeseries', False), (f'{prefix}_snapshots', True)]
+    else:
+        raise ValueError(f'Unknown layout {layout}. Expected one of {LAYOUTS}')
+
+
+def to_time_major(values: Sequence) -> Tuple:
+    """
+    Moves the last (time) entry of dimension names, sizes or chunk sizes to the front
+    Args:
+        values: Values ordered with time last
+
+    Returns:
+        Values ordered with time first
+    """
+    return (values[-1],) + tuple(values[:-1])
+
+
+def is_time_major(nc_variable) -> bool:
+    """
+    Checks whether a netCDF timeseries variable stores time as its first dimension
+    Args:
+        nc_variable: NetCDF variable
+
+    Returns:
+        True if time is the first dimension
+    """
+    return nc_variable.dimensions[0] == 'time'
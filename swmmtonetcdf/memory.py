@@ -0,0 +1,103 @@
+# python imports
+import re
+from typing import NamedTuple, Union
+
+# Bytes held per value of a block while it is written: the float32 results read, a float32 copy when selecting a
+# subset, the float64 transposed values and the copy netCDF4 converts to the storage type
+BLOCK_BYTES_PER_VALUE = 24
+
+# Bytes held per value of a series while it is written: the list of Python floats returned by swmm.toolkit, its
+# float32 copy, the float64 quantized values and the copy netCDF4 converts to the storage type
+SERIES_BYTES_PER_VALUE = 56
+
+# Values of the series of several elements buffered and written together as one hyperslab when there is no budget
+DEFAULT_SERIES_VALUES = 4 * 2 ** 20
+
+# Share of the budget given to the HDF5 chunk caches of the timeseries variables
+CHUNK_CACHE_FRACTION = 0.125
+
+# Memory size suffixes. Sizes are binary so that 8G is 8 GiB
+MEMORY_UNITS = {
+    '': 1,
+    'K': 2 ** 10,
+    'M': 2 ** 20,
+    'G': 2 ** 30,
+    'T': 2 ** 40,
+}
+
+
+class MemoryPlan(NamedTuple):
+    """
+    Buffer sizes of a conversion sized to a memory budget
+    """
+    block_size: int
+    series_window: int
+    series_values: int
+    partition_bytes: int
+    chunk_cache_bytes: int
+
+
+def parse_memory_size(size: Union[str, int]) -> int:
+    """
+    Parses a memory size given in bytes or with a K, M, G or T suffix such as 512M or 8GiB
+    Args:
+        size: Memory size
+
+    Returns:
+        Size in bytes
+    """
+    if isinstance(size, int):
+        return size
+
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*', str(size), flags=re.IGNORECASE)
+
+    if match is None:
+        raise ValueError(f'Memory size {size} must be a number of bytes or use a K, M, G or T suffix such as 8G')
+
+    return int(float(match.group(1)) * MEMORY_UNITS[match.group(2).upper()])
+
+
+def plan_memory(max_memory: int, period_values: int, record_bytes: int, num_steps: int, num_variables: int,
+                workers: int = 1, block_size: Union[int, None] = None, prefetch_bytes: int = 0) -> MemoryPlan:
+    """
+    Sizes read and transposition buffers so that a conversion stays within a memory budget whatever the size of
+    the model. The budget covers the buffers, the HDF5 chunk caches and the pages of the SWMM output file mapped
+    by the native engine, not the interpreter and libraries
+    Args:
+        max_memory (int): Budget in bytes
+        period_values (int): Number of values of the element type with the most results in a period
+        record_bytes (int): Bytes of the SWMM output file mapped per period. 0 when the output is not memory mapped
+        num_steps (int): Number of periods
+        num_variables (int): Number of timeseries variables written
+        workers (int): Number of worker processes. Partitions in flight are held by the converting process
+        block_size (int): Largest number of periods per block or None for no limit
+        prefetch_bytes (int): Bytes per period of the buffers blocks are read ahead into
+
+    Returns:
+        Buffer sizes
+    """
+    chunk_cache_bytes = int(max_memory * CHUNK_CACHE_FRACTION) // max(num_variables, 1)
+    buffer_bytes = max_memory - chunk_cache_bytes * num_variables
+
+    periods = buffer_bytes // (period_values * BLOCK_BYTES_PER_VALUE + record_bytes + prefetch_bytes)
+
+    if periods < 1:
+        raise ValueError(f'A memory budget of {max_memory} bytes cannot hold a single period of '
+                         f'{period_values} results')
+
+    max_periods = max(num_steps, 1) if block_size is None else min(block_size, max(num_steps, 1))
+    series_window = max(min(buffer_bytes // (SERIES_BYTES_PER_VALUE + record_bytes), num_steps), 1)
+
+    # the series being read and the windows of series of other elements buffered until they are written together
+    series_values = (buffer_bytes - series_window * (SERIES_BYTES_PER_VALUE + record_bytes)) // BLOCK_BYTES_PER_VALUE
+
+    # partitions waiting to be written and the partition being written
+    partition_bytes = buffer_bytes * 4 // (BLOCK_BYTES_PER_VALUE * (2 * workers + 1))
+
+    return MemoryPlan(
+        block_size=min(periods, max_periods),
+        series_window=series_window,
+        series_values=max(series_values, series_window),
+        partition_bytes=max(partition_bytes, 4),
+        chunk_cache_bytes=chunk_cache_bytes
+    )
@@ -0,0 +1,21 @@
+# Choices of conversion options. They are kept free of third party imports so that the command line interface can
+# build its parser without importing numpy, netCDF4 or the toolkit
+
+# Engines used to read SWMM output
+ENGINES = ('toolkit', 'native')
+
+# Orders results are read in. 'series' reads the whole series of each element and attribute and 'block' reads the
+# results of all elements in blocks of periods
+READ_MODES = ('series', 'block')
+
+# Storage precisions of timeseries variables
+PRECISIONS = ('double', 'single', 'int16')
+
+# Statistics computed over each window. 'volume' integrates rates over the window by multiplying the sum of
+# the values by the reporting time step in seconds
+AGGREGATIONS = ('mean', 'min', 'max', 'sum', 'volume')
+
+DEFAULT_AGGREGATIONS = ('mean', 'min', 'max')
+
+# Checks used to skip up to date netcdf files of batch conversions
+CHECKS = ('mtime', 'size', 'hash')
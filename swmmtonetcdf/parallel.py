@@ -0,0 +1,242 @@
+# python imports
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Union
+
+# external imports
+import numpy as np
+
+# local imports
+from swmmtonetcdf.instrumentation import ConversionStats
+from swmmtonetcdf.layout import is_time_major
+from swmmtonetcdf.reader import SYSTEM, element_type_value
+from swmmtonetcdf.storage import pack_attributes, quantize_attributes
+from swmmtonetcdf.subset import Subset, get_subset_block
+
+# Target size of the results read by a worker for a single partition
+DEFAULT_PARTITION_BYTES = 64 * 1024 * 1024
+
+# Reader opened once in each worker process and the selection it reads
+_worker_reader = None
+_worker_subset = None
+
+
+class Partition(NamedTuple):
+    """
+    Share of the timeseries of an element type read by a worker
+    """
+    element_type: int
+    element_start: int
+    element_end: int
+    start_period: int
+    end_period: int
+    num_attributes: int
+    least_significant_digits: Sequence[Union[int, None]]
+
+
+def plan_partitions(element_type, num_elements: int, num_attributes: int, num_steps: int, partition_by: str,
+                    least_significant_digits: Sequence[Union[int, None]] = (),
+                    partition_bytes: int = DEFAULT_PARTITION_BYTES, alignment: int = 1) -> List[Partition]:
+    """
+    Splits the timeseries of an element type into partitions
+    Args:
+        element_type: Element type
+        num_elements (int): Number of elements. Ignored for the system
+        num_attributes (int): Number of attributes
+        num_steps (int): Number of periods
+        partition_by (str): 'time' to split into windows of periods covering all elements or 'element' to split
+            into ranges of elements covering all periods
+        least_significant_digits: Digits retained for each attribute
+        partition_bytes (int): Target size of results read for a partition
+        alignment (int): Partition windows are a multiple of this number of periods or elements so that partitions
+            cover whole chunks of the output
+
+    Returns:
+        List of partitions
+    """
+    element_type = element_type_value(element_type)
+
+    if element_type == SYSTEM:
+        num_elements = 1
+        partition_by = 'time'
+
+    if num_elements == 0 or num_steps == 0:
+        return []
+
+    least_significant_digits = tuple(least_significant_digits)
+    value_bytes = 4 * max(num_attributes, 1)
+    partitions = []
+
+    if partition_by == 'time':
+        window = max(partition_bytes // (value_bytes * num_elements * alignment), 1) * alignment
+        for start_period in range(0, num_steps, window):
+            partitions.append(Partition(element_type, 0, num_elements, start_period,
+                                        min(start_period + window, num_steps), num_attributes,
+                                        least_significant_digits))
+    elif partition_by == 'element':
+        window = max(partition_bytes // (value_bytes * num_steps * alignment), 1) * alignment
+        for element_start in range(0, num_elements, window):
+            partitions.append(Partition(element_type, element_start, min(element_start + window, num_elements), 0,
+                                        num_steps, num_attributes, least_significant_digits))
+    else:
+        raise ValueError(f'Unknown partitioning {partition_by}. Expected time or element')
+
+    return partitions
+
+
+def init_worker(swmm_output_file: str, engine: str, subset: Union[Subset, None] = None, sidecar: bool = False):
+    """
+    Opens SWMM output reader in a worker process
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        engine (str): Engine used to read SWMM output
+        subset (Subset): Selected elements, attributes and periods. None for all
+        sidecar (bool): Read the index persisted next to the SWMM output file
+    """
+    global _worker_reader, _worker_subset
+
+    from swmmtonetcdf.swmmtonetcdf import open_swmm_output
+    _worker_reader = open_swmm_output(swmm_output_file=swmm_output_file, engine=engine, sidecar=sidecar)
+    _worker_subset = subset
+
+
+def read_partition(partition: Partition) -> np.ndarray:
+    """
+    Reads partition with the reader of the worker process
+    Args:
+        partition (Partition): Partition to read
+
+    Returns:
+        Values with shape (element, attribute, time) or (attribute, time) for the system
+    """
+    values = read_partition_values(_worker_reader, partition, _worker_subset)
+
+    # partitions of the native engine are windows of periods that are not read again
+    first_period = 0 if _worker_subset is None else _worker_subset.start_period
+    _worker_reader.release(first_period + partition.start_period, first_period + partition.end_period)
+
+    return values
+
+
+def read_partition_values(swmm_output, partition: Partition, subset: Union[Subset, None] = None) -> np.ndarray:
+    """
+    Reads partition values in the (element, attribute, time) layout
+    Args:
+        swmm_output: SWMM output reader
+        partition (Partition): Partition to read. Elements and periods are positions within the subset
+        subset (Subset): Selected elements, attributes and periods. None for all
+
+    Returns:
+        Values with shape (element, attribute, time) or (attribute, time) for the system
+    """
+    element_type, element_start, element_end, start_period, end_period, num_attributes, digits = partition
+
+    if element_type == SYSTEM:
+        block = get_subset_block(swmm_output, subset, element_type, start_period, end_period)
+        values = np.array(block[:, 0:num_attributes].T, dtype=np.float64)
+        return quantize_attributes(values, digits, axis=0)
+
+    if subset is None:
+        element_indexes = range(swmm_output.project_size[element_type])
+        attribute_indexes = range(num_attributes)
+        first_period, num_periods = 0, swmm_output.num_periods
+    else:
+        element_indexes = subset.element_indexes[element_type]
+        attribute_indexes = subset.attribute_indexes[element_type]
+        first_period, num_periods = subset.start_period, subset.end_period - subset.start_period
+
+    num_elements = element_end - element_start
+    covers_elements = num_elements == len(element_indexes)
+
+    if covers_elements or start_period != 0 or end_period != num_periods:
+        block = get_subset_block(swmm_output, subset, element_type, start_period, end_period)
+        values = np.array(block[:, element_start:element_end, 0:num_attributes].transpose((1, 2, 0)),
+                          dtype=np.float64)
+    else:
+        values = np.empty((num_elements, num_attributes, end_period - start_period), dtype=np.float64)
+        for j in range(num_elements):
+            for i in range(num_attributes):
+                values[j, i, :] = swmm_output.get_series(element_type, element_indexes[element_start + j],
+                                                         attribute_indexes[i], first_period + start_period,
+                                                         first_period + end_period)
+
+    return quantize_attributes(values, digits, axis=1)
+
+
+def imap_bounded(executor: Executor, function: Callable, items: Iterable, max_pending: int) -> Iterator:
+    """
+    Maps function over items with an executor, yielding results in order while keeping at most
+    max_pending results in flight so that memory stays bounded
+    Args:
+        executor (Executor): Executor
+        function (Callable): Function to map
+        items (Iterable): Items to map
+        max_pending (int): Maximum number of submitted items whose results have not been yielded
+
+    Returns:
+        Iterator over results
+    """
+    pending = deque()
+
+    for item in items:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(function, item))
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def write_partitions_parallel(swmm_output_file: str, engine: str, checkpoint, partitions: Sequence[Partition],
+                              nc_variables: dict, workers: int, subset: Union[Subset, None] = None,
+                              stats: Union[ConversionStats, None] = None,
+                              variable_packing: Union[Dict[str, Union[Tuple[np.ndarray, np.ndarray], None]],
+                                                      None] = None, sidecar: bool = False):
+    """
+    Reads partitions on a process pool and writes them to netCDF from the calling process
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        engine (str): Engine used to read SWMM output
+        checkpoint (Checkpoint): Checkpoint of the conversion committed after each partition is written
+        partitions: Partitions to read
+        nc_variables (dict): Mapping of element type codes to the netCDF timeseries variables of the layout
+        workers (int): Number of worker processes
+        subset (Subset): Selected elements, attributes and periods. None for all
+        stats (ConversionStats): Statistics of the conversion. Reads are the time spent waiting for workers
+        variable_packing: Mapping of timeseries variable names to the scale_factor and add_offset of each attribute
+            of int16 variables. None when no variable is packed
+        sidecar (bool): Read the index persisted next to the SWMM output file in worker processes
+    """
+    stats = ConversionStats() if stats is None else stats
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(swmm_output_file, engine, subset, sidecar)) as executor:
+        results = imap_bounded(executor, read_partition, partitions, max_pending=2 * workers)
+
+        for partition in partitions:
+            with stats.phase('read'):
+                read_values = next(results)
+            stats.bytes_read += read_values.size * 4
+
+            for nc_variable in nc_variables[partition.element_type]:
+                packing = None if variable_packing is None else variable_packing.get(nc_variable.name)
+                values = read_values if packing is None else pack_attributes(read_values, *packing,
+                                                                             axis=read_values.ndim - 2)
+
+                with stats.phase('write'):
+                    if is_time_major(nc_variable) and partition.element_type == SYSTEM:
+                        nc_variable[partition.start_period:partition.end_period, :] = values.T
+                    elif is_time_major(nc_variable):
+                        nc_variable[partition.start_period:partition.end_period,
+                                    partition.element_start:partition.element_end, :] = np.moveaxis(values, -1, 0)
+                    elif partition.element_type == SYSTEM:
+                        nc_variable[:, partition.start_period:partition.end_period] = values
+                    else:
+                        nc_variable[partition.element_start:partition.element_end, :,
+                                    partition.start_period:partition.end_period] = values
+
+                stats.bytes_written += values.size * nc_variable.dtype.itemsize
+
+            with stats.phase('sync'):
+                checkpoint.commit()
+            stats.advance()
@@ -0,0 +1,107 @@
+# python imports
+import queue
+import threading
+from typing import Iterator, List, Sequence, Tuple, Union
+
+# external imports
+import numpy as np
+
+# local imports
+from swmmtonetcdf.subset import Subset, get_subset_block
+
+
+class BlockPrefetcher(object):
+    """
+    Reads blocks of periods on a background thread into a bounded pool of reusable buffers so that reading the
+    SWMM output file overlaps with writing the previous block. Reads through the memory map and the toolkit, and
+    writes through netCDF4, spend much of their time outside of the GIL
+    """
+
+    def __init__(self, swmm_output, subset: Union[Subset, None], element_types: Sequence[int],
+                 windows: Sequence[Tuple[int, int]], depth: int = 2):
+        """
+        Args:
+            swmm_output: SWMM output reader. It must not be used by other threads until the prefetcher is closed,
+                except to release pages of periods that were already written
+            subset (Subset): Selected elements, attributes and periods. None for all
+            element_types: Element types read for each window
+            windows: First and after last periods of the blocks to read, relative to the selected periods
+            depth (int): Number of blocks read ahead of the block being written
+        """
+        if depth < 1:
+            raise ValueError(f'Prefetch depth must be at least 1, not {depth}')
+
+        self.swmm_output = swmm_output
+        self.subset = subset
+        self.element_types = list(element_types)
+        self.windows = list(windows)
+        self.max_window = max((end_period - start_period for start_period, end_period in self.windows), default=0)
+
+        # one buffer set is written while the others are filled
+        self._free = queue.Queue()
+        for _ in range(depth + 1):
+            self._free.put([None] * len(self.element_types))
+
+        self._filled = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._read, name='swmmtonetcdf-prefetch', daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        """
+        Fills free buffers with the blocks of each window in order
+        """
+        try:
+            for start_period, end_period in self.windows:
+                buffers = self._free.get()
+
+                if buffers is None or self._stop.is_set():
+                    return
+
+                for i, element_type in enumerate(self.element_types):
+                    block = get_subset_block(self.swmm_output, self.subset, element_type, start_period, end_period)
+
+                    if buffers[i] is None:
+                        buffers[i] = np.empty((self.max_window,) + block.shape[1:], dtype=block.dtype)
+
+                    np.copyto(buffers[i][0:end_period - start_period], block)
+
+                self._filled.put((start_period, end_period, buffers))
+
+            self._filled.put(None)
+        except BaseException as e:
+            self._filled.put(e)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, List[np.ndarray]]]:
+        """
+        Iterates over prefetched blocks. Buffers of a block are reused once the next block is requested
+
+        Returns:
+            Iterator over first period, period after last period and blocks of each element type
+        """
+        while True:
+            item = self._filled.get()
+
+            if item is None:
+                return
+            elif isinstance(item, BaseException):
+                raise item
+
+            start_period, end_period, buffers = item
+            yield start_period, end_period, [buffer[0:end_period - start_period] for buffer in buffers]
+
+            self._free.put(buffers)
+
+    def close(self):
+        """
+        Stops reading ahead and waits for the background thread
+        """
+        self._stop.set()
+        self._free.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
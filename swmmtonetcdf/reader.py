@@ -0,0 +1,388 @@
+# python imports
+import datetime
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from typing import Dict, List
+
+# external imports
+import numpy as np
+
+# local imports
+from swmmtonetcdf.header import DATE_SIZE, MAGIC_NUMBER, NUM_CLOSING_RECORDS, NUM_OPENING_RECORDS, RECORD_SIZE, \
+    SWMM_EPOCH
+
+# Element type codes. These mirror the values of swmm.toolkit.shared_enum.ElementType so that either
+# the toolkit enumerations or plain integers can be used to address elements.
+SUBCATCH = 0
+NODE = 1
+LINK = 2
+SYSTEM = 3
+POLLUT = 4
+
+# Field names of the period record for each element type
+RECORD_FIELDS = OrderedDict([
+    (SUBCATCH, 'subcatchments'),
+    (NODE, 'nodes'),
+    (LINK, 'links'),
+    (SYSTEM, 'system'),
+])
+
+
+def element_type_value(element_type) -> int:
+    """
+    Get integer code of an element type
+    Args:
+        element_type: Element type as a swmm.toolkit.shared_enum.ElementType or an integer code
+
+    Returns:
+        Integer code of element type
+    """
+    return int(getattr(element_type, 'value', element_type))
+
+
+class SwmmOutputReader(object):
+    """
+    Pure NumPy reader for SWMM binary output (.out) files. The header and metadata are parsed once and the
+    computed results are exposed as a numpy.memmap of period records so that blocks of results can be sliced
+    without copying.
+    """
+
+    def __init__(self, swmm_output_file: str, partial: bool = False):
+        """
+        Opens SWMM output file and parses its metadata
+
+        Args:
+            swmm_output_file (str): SWMM output filepath
+            partial (bool): Allow an output file that SWMM is still writing. The closing records are then
+                optional and only the period records written so far are mapped
+        """
+        self.path = swmm_output_file
+        self.partial = partial
+        self.file_size = os.path.getsize(swmm_output_file)
+        self.complete = True
+
+        with open(swmm_output_file, 'rb') as f:
+            self._read_header(f)
+
+        self.record_dtype = np.dtype([
+            ('date', '<f8'),
+            ('subcatchments', '<f4', (self.num_subcatchments, self.num_subcatchment_variables)),
+            ('nodes', '<f4', (self.num_nodes, self.num_node_variables)),
+            ('links', '<f4', (self.num_links, self.num_link_variables)),
+            ('system', '<f4', (self.num_system_variables,)),
+        ])
+
+        with open(swmm_output_file, 'rb') as f:
+            self._read_footer(f)
+
+        self.records = self._map_records(self.num_periods)
+
+    def _read_header(self, f):
+        """
+        Reads opening records, element names, input properties and reporting variables
+        Args:
+            f: Binary file object positioned at start of file
+        """
+        magic, version, flow_units, num_subcatchments, num_nodes, num_links, num_pollutants = \
+            self._read_ints(f, NUM_OPENING_RECORDS)
+
+        if magic != MAGIC_NUMBER:
+            raise ValueError(f'{self.path} is not a valid SWMM output file')
+
+        self.version = version
+        self.flow_units = flow_units
+        self.num_subcatchments = num_subcatchments
+        self.num_nodes = num_nodes
+        self.num_links = num_links
+        self.num_pollutants = num_pollutants
+
+        # element names
+        self.names = OrderedDict()
+        for element_type, count in ((SUBCATCH, num_subcatchments), (NODE, num_nodes), (LINK, num_links),
+                                    (POLLUT, num_pollutants)):
+            names = []
+            for i in range(count):
+                length, = self._read_ints(f, 1)
+                names.append(f.read(length).decode('utf-8', errors='replace'))
+            self.names[element_type] = names
+
+        self.pollutant_units = self._read_ints(f, num_pollutants)
+
+        # input properties
+        self.properties = OrderedDict()
+        for element_type, count in ((SUBCATCH, num_subcatchments), (NODE, num_nodes), (LINK, num_links)):
+            num_properties, = self._read_ints(f, 1)
+            codes = self._read_ints(f, num_properties)
+            values = np.fromfile(f, dtype='<f4', count=count * num_properties).reshape((count, num_properties))
+            self.properties[element_type] = (codes, values)
+
+        # reporting variables
+        self.variable_codes = OrderedDict()
+        for element_type in (SUBCATCH, NODE, LINK, SYSTEM):
+            num_variables, = self._read_ints(f, 1)
+            self.variable_codes[element_type] = self._read_ints(f, num_variables)
+
+        self.num_subcatchment_variables = len(self.variable_codes[SUBCATCH])
+        self.num_node_variables = len(self.variable_codes[NODE])
+        self.num_link_variables = len(self.variable_codes[LINK])
+        self.num_system_variables = len(self.variable_codes[SYSTEM])
+
+        self.start_date, = struct.unpack('<d', f.read(DATE_SIZE))
+        self.report_step, = self._read_ints(f, 1)
+        self.output_start_position = f.tell()
+
+    def _read_footer(self, f):
+        """
+        Reads closing records. When reading a partial output file without closing records, the number of
+        periods is the number of complete period records written so far
+        Args:
+            f: Binary file object
+        """
+        closing_size = NUM_CLOSING_RECORDS * RECORD_SIZE
+
+        if self.file_size >= self.output_start_position + closing_size:
+            f.seek(self.file_size - closing_size)
+            id_position, properties_position, output_start_position, num_periods, error_code, magic = \
+                self._read_ints(f, NUM_CLOSING_RECORDS)
+        else:
+            output_start_position, num_periods, error_code, magic = None, 0, 0, None
+
+        if magic == MAGIC_NUMBER and output_start_position == self.output_start_position:
+            self.num_periods = num_periods
+            self.error_code = error_code
+            self.complete = True
+        elif self.partial:
+            self.num_periods = max(self.file_size - self.output_start_position, 0) // self.record_dtype.itemsize
+            self.error_code = 0
+            self.complete = False
+        elif magic != MAGIC_NUMBER:
+            raise ValueError(f'{self.path} is not a complete SWMM output file')
+        else:
+            raise ValueError(f'{self.path} has an inconsistent results offset')
+
+    def refresh(self) -> int:
+        """
+        Maps period records written since the output file was opened or last refreshed. Views obtained before
+        refreshing remain valid but do not include new periods.
+
+        Returns:
+            Number of periods
+        """
+        self.file_size = os.path.getsize(self.path)
+
+        with open(self.path, 'rb') as f:
+            self._read_footer(f)
+
+        self.records = self._map_records(self.num_periods)
+
+        return self.num_periods
+
+    @staticmethod
+    def _read_ints(f, count: int) -> List[int]:
+        """
+        Reads 4 byte integer records
+        Args:
+            f: Binary file object
+            count (int): Number of records to read
+
+        Returns:
+            List of integers
+        """
+        return list(struct.unpack(f'<{count}i', f.read(count * RECORD_SIZE)))
+
+    def _map_records(self, num_periods: int) -> np.ndarray:
+        """
+        Memory maps period records
+        Args:
+            num_periods (int): Number of period records to map
+
+        Returns:
+            Structured array of period records
+        """
+        if num_periods == 0:
+            return np.zeros(0, dtype=self.record_dtype)
+
+        return np.memmap(
+            self.path,
+            dtype=self.record_dtype,
+            mode='r',
+            offset=self.output_start_position,
+            shape=(num_periods,)
+        )
+
+    @property
+    def project_size(self) -> List[int]:
+        """
+        Number of subcatchments, nodes, links, systems and pollutants in the same order as
+        swmm.toolkit.output.get_proj_size
+        """
+        return [self.num_subcatchments, self.num_nodes, self.num_links, 1, self.num_pollutants]
+
+    @property
+    def subcatchments(self) -> np.ndarray:
+        """
+        Subcatchment results view with shape (time, subcatchment, attribute)
+        """
+        return self.records['subcatchments']
+
+    @property
+    def nodes(self) -> np.ndarray:
+        """
+        Node results view with shape (time, node, attribute)
+        """
+        return self.records['nodes']
+
+    @property
+    def links(self) -> np.ndarray:
+        """
+        Link results view with shape (time, link, attribute)
+        """
+        return self.records['links']
+
+    @property
+    def system(self) -> np.ndarray:
+        """
+        System results view with shape (time, attribute)
+        """
+        return self.records['system']
+
+    def get_results(self, element_type) -> np.ndarray:
+        """
+        Get results view for element type
+        Args:
+            element_type: Element type
+
+        Returns:
+            View of results with shape (time, element, attribute) or (time, attribute) for the system
+        """
+        return self.records[RECORD_FIELDS[element_type_value(element_type)]]
+
+    def get_num_attributes(self, element_type) -> int:
+        """
+        Get number of attributes reported for element type
+        Args:
+            element_type: Element type
+
+        Returns:
+            Number of attributes
+        """
+        return len(self.variable_codes[element_type_value(element_type)])
+
+    def get_block(self, element_type, start_period: int, end_period: int) -> np.ndarray:
+        """
+        Get results of all elements of a type over a window of periods
+        Args:
+            element_type: Element type
+            start_period (int): First period
+            end_period (int): Period after last period
+
+        Returns:
+            View of results with shape (time, element, attribute) or (time, attribute) for the system
+        """
+        return self.get_results(element_type)[start_period:end_period]
+
+    def get_element_names(self, element_type) -> Dict[str, int]:
+        """
+        Get element names
+        Args:
+            element_type: Element type
+
+        Returns:
+            Ordered mapping of element names to element indexes
+        """
+        names = OrderedDict()
+        for i, name in enumerate(self.names[element_type_value(element_type)]):
+            names[name] = i
+
+        return names
+
+    def get_dates(self) -> np.ndarray:
+        """
+        Get timestamps for output file
+        Returns:
+            Array of timestamps for output file
+        """
+        start_date_time = SWMM_EPOCH + datetime.timedelta(days=self.start_date) + \
+            datetime.timedelta(seconds=self.report_step)
+        end_date_time = start_date_time + datetime.timedelta(seconds=self.num_periods * self.report_step)
+
+        return np.arange(
+            start=start_date_time.timestamp(),
+            stop=end_date_time.timestamp(),
+            step=self.report_step
+        )
+
+    def get_series(self, element_type, element_index: int, attribute_index: int, start_period: int,
+                   end_period: int) -> np.ndarray:
+        """
+        Get timeseries of an element attribute
+        Args:
+            element_type: Element type
+            element_index (int): Element index. Ignored for the system
+            attribute_index (int): Attribute index
+            start_period (int): First period
+            end_period (int): Period after last period
+
+        Returns:
+            View of timeseries values
+        """
+        results = self.get_results(element_type)
+
+        if element_type_value(element_type) == SYSTEM:
+            return results[start_period:end_period, attribute_index]
+        else:
+            return results[start_period:end_period, element_index, attribute_index]
+
+    def get_result(self, element_type, time_index: int, element_index: int) -> np.ndarray:
+        """
+        Get values of all attributes of an element at a period
+        Args:
+            element_type: Element type
+            time_index (int): Period index
+            element_index (int): Element index. Ignored for the system
+
+        Returns:
+            View of attribute values
+        """
+        results = self.get_results(element_type)
+
+        if element_type_value(element_type) == SYSTEM:
+            return results[time_index]
+        else:
+            return results[time_index, element_index]
+
+    def release(self, start_period: int, end_period: int):
+        """
+        Drops the resident pages of a window of period records so that reading a large output file does not keep it
+        in memory. Pages are read from the file again when they are next accessed, so views remain valid
+        Args:
+            start_period (int): First period
+            end_period (int): Period after last period
+        """
+        mapping = getattr(self.records, '_mmap', None)
+
+        if mapping is None or not hasattr(mmap, 'MADV_DONTNEED') or end_period <= start_period:
+            return
+
+        # numpy maps from the allocation boundary preceding the first period record
+        offset = self.output_start_position % mmap.ALLOCATIONGRANULARITY
+        start = offset + start_period * self.record_dtype.itemsize
+        end = offset + end_period * self.record_dtype.itemsize
+
+        start -= start % mmap.PAGESIZE
+        end = min(end + (-end) % mmap.PAGESIZE, len(mapping))
+        mapping.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def close(self):
+        """
+        Releases memory map of period records. Views obtained from the reader remain valid until they are released.
+        """
+        self.records = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
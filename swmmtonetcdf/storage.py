@@ -0,0 +1,275 @@
+# python imports
+from typing import Dict, List, Sequence, Tuple, Union
+
+# external imports
+import numpy as np
+
+# local imports
+from swmmtonetcdf.options import PRECISIONS
+
+DATATYPES = {
+    'double': np.float64,
+    'single': np.float32,
+    'int16': np.int16,
+}
+
+# Number of packed int16 steps. Leaves headroom below the int16 limits and keeps the default short fill
+# value (-32767) out of the packed range.
+PACKED_STEPS = 65532
+
+# Default number of decimal digits retained for each attribute when quantizing. Depths and elevations are
+# kept to a thousandth, flows and rates to a ten thousandth and volumes to a hundredth. Attributes not listed,
+# such as pollutant concentrations which span several orders of magnitude, are stored at full precision.
+DEFAULT_LEAST_SIGNIFICANT_DIGITS = {
+    # subcatchments
+    'RAINFALL': 4,
+    'SNOW_DEPTH': 3,
+    'EVAP_LOSS': 5,
+    'INFIL_LOSS': 4,
+    'RUNOFF_RATE': 4,
+    'GW_OUTFLOW_RATE': 4,
+    'GW_TABLE_ELEV': 3,
+    'SOIL_MOISTURE': 4,
+    # nodes
+    'INVERT_DEPTH': 3,
+    'HYDRAULIC_HEAD': 3,
+    'PONDED_VOLUME': 2,
+    'LATERAL_INFLOW': 4,
+    'TOTAL_INFLOW': 4,
+    'FLOODING_LOSSES': 4,
+    # links
+    'FLOW_RATE': 4,
+    'FLOW_DEPTH': 3,
+    'FLOW_VELOCITY': 3,
+    'FLOW_VOLUME': 2,
+    'CAPACITY': 4,
+    # system
+    'AIR_TEMP': 2,
+    'EVAP_INFIL_LOSS': 4,
+    'RUNOFF_FLOW': 4,
+    'DRY_WEATHER_INFLOW': 4,
+    'GW_INFLOW': 4,
+    'RDII_INFLOW': 4,
+    'DIRECT_INFLOW': 4,
+    'TOTAL_LATERAL_INFLOW': 4,
+    'FLOOD_LOSSES': 4,
+    'OUTFALL_FLOWS': 4,
+    'VOLUME_STORED': 2,
+    'EVAP_RATE': 5,
+    'PTNL_EVAP_RATE': 5,
+}
+
+
+def get_datatype(precision: str):
+    """
+    Get storage datatype of timeseries variables
+    Args:
+        precision (str): 'double', 'single' or 'int16'
+
+    Returns:
+        NumPy datatype
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f'Unknown precision {precision}. Expected one of {PRECISIONS}')
+
+    return DATATYPES[precision]
+
+
+def get_least_significant_digits(least_significant_digit: Union[int, str, Dict[str, int], None],
+                                 attribute_names: Sequence[str],
+                                 pollutant_names: Sequence[str] = ()) -> List[Union[int, None]]:
+    """
+    Resolves number of decimal digits retained for each attribute
+    Args:
+        least_significant_digit: None for full precision, an integer applied to all attributes, 'auto' for
+            attribute aware defaults or a mapping of attribute names to digits
+        attribute_names: Attribute names of timeseries variable
+        pollutant_names: Pollutant names which are not assigned defaults
+
+    Returns:
+        Digits retained for each attribute or None for full precision
+    """
+    if least_significant_digit is None:
+        return [None] * len(attribute_names)
+    elif isinstance(least_significant_digit, str):
+        if least_significant_digit != 'auto':
+            raise ValueError(f'Unknown least significant digit {least_significant_digit}. Expected auto, an '
+                             f'integer or a mapping of attribute names')
+
+        return [None if name in pollutant_names else DEFAULT_LEAST_SIGNIFICANT_DIGITS.get(name)
+                for name in attribute_names]
+    elif isinstance(least_significant_digit, dict):
+        return [least_significant_digit.get(name) for name in attribute_names]
+    else:
+        return [int(least_significant_digit)] * len(attribute_names)
+
+
+def quantize(values: np.ndarray, least_significant_digit: Union[int, None]) -> np.ndarray:
+    """
+    Quantizes values so that they are precise to the specified number of decimal digits. Trailing bits are
+    zeroed in the same way as the netCDF4 least_significant_digit option so that values compress better.
+    Args:
+        values (np.ndarray): Values to quantize
+        least_significant_digit (int): Number of decimal digits to retain or None to retain all
+
+    Returns:
+        Quantized values
+    """
+    if least_significant_digit is None:
+        return values
+
+    bits = np.ceil(np.log2(10.0 ** least_significant_digit))
+    scale = 2.0 ** bits
+
+    return np.around(scale * values) / scale
+
+
+def quantize_attributes(values: np.ndarray, least_significant_digits: Sequence[Union[int, None]],
+                        axis: int) -> np.ndarray:
+    """
+    Quantizes each attribute of an array of values in place
+    Args:
+        values (np.ndarray): Values to quantize
+        least_significant_digits: Digits retained for each attribute
+        axis (int): Attribute axis of values
+
+    Returns:
+        Quantized values
+    """
+    for i, least_significant_digit in enumerate(least_significant_digits):
+        if least_significant_digit is not None:
+            index = [slice(None)] * values.ndim
+            index[axis] = i
+            values[tuple(index)] = quantize(values[tuple(index)], least_significant_digit)
+
+    return values
+
+
+def get_packing(minimum: float, maximum: float) -> Tuple[float, float]:
+    """
+    Get int16 packing parameters for a range of values
+    Args:
+        minimum (float): Minimum value
+        maximum (float): Maximum value
+
+    Returns:
+        scale_factor and add_offset
+    """
+    if minimum is None or maximum is None or not np.isfinite(minimum) or not np.isfinite(maximum):
+        return 1.0, 0.0
+
+    add_offset = (maximum + minimum) / 2.0
+    scale_factor = (maximum - minimum) / PACKED_STEPS
+
+    if scale_factor == 0.0:
+        scale_factor = 1.0
+
+    return float(scale_factor), float(add_offset)
+
+
+def get_packed_range(scale_factor: float, add_offset: float) -> Tuple[float, float]:
+    """
+    Get range of values that int16 packing parameters can represent
+    Args:
+        scale_factor (float): Packing scale factor
+        add_offset (float): Packing offset
+
+    Returns:
+        Minimum and maximum values
+    """
+    return add_offset - scale_factor * PACKED_STEPS / 2.0, add_offset + scale_factor * PACKED_STEPS / 2.0
+
+
+def get_attribute_packing(minimums: np.ndarray, maximums: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get int16 packing parameters of each attribute from the range of its values, so that attributes with small
+    values such as capacities are not packed at the resolution of attributes with large values such as volumes
+    Args:
+        minimums (np.ndarray): Minimum value of each attribute. NaN for attributes without values
+        maximums (np.ndarray): Maximum value of each attribute. NaN for attributes without values
+
+    Returns:
+        scale_factor and add_offset of each attribute
+    """
+    packing = [get_packing(minimum, maximum) for minimum, maximum in zip(minimums, maximums)]
+
+    return np.array([scale_factor for scale_factor, _ in packing], dtype=np.float64), \
+        np.array([add_offset for _, add_offset in packing], dtype=np.float64)
+
+
+def get_packing_attributes(prefix: str) -> Dict[str, str]:
+    """
+    Get the attributes of an int16 timeseries variable packed by attribute. CF readers only apply scalar
+    scale_factor and add_offset attributes, so the comment tells them that the stored values are packed counts
+    Args:
+        prefix (str): Prefix of the variables of an element type such as node
+
+    Returns:
+        Mapping of attribute names to values
+    """
+    scale_factor_variable = f'{prefix}_scale_factor'
+    add_offset_variable = f'{prefix}_add_offset'
+
+    return {
+        'scale_factor_variable': scale_factor_variable,
+        'add_offset_variable': add_offset_variable,
+        'comment': f'Values are int16 counts packed separately for each attribute. Unpack them as value * '
+                   f'{scale_factor_variable} + {add_offset_variable} of their attribute, or read them with '
+                   f'swmmtonetcdf.constant.read_timeseries',
+    }
+
+
+def get_variable_packing(netcdf_output, nc_variable) -> Union[Tuple[np.ndarray, np.ndarray], None]:
+    """
+    Get the per attribute int16 packing parameters of a timeseries variable, which are stored in the variables
+    named by its scale_factor_variable and add_offset_variable attributes
+    Args:
+        netcdf_output: NetCDF dataset of the variable
+        nc_variable: NetCDF timeseries variable
+
+    Returns:
+        scale_factor and add_offset of each attribute or None when the variable is not packed
+    """
+    if 'scale_factor_variable' not in nc_variable.ncattrs():
+        return None
+
+    return np.asarray(netcdf_output.variables[nc_variable.scale_factor_variable][:], dtype=np.float64), \
+        np.asarray(netcdf_output.variables[nc_variable.add_offset_variable][:], dtype=np.float64)
+
+
+def pack_attributes(values: np.ndarray, scale_factors: np.ndarray, add_offsets: np.ndarray,
+                    axis: int) -> np.ndarray:
+    """
+    Packs each attribute of an array of values as int16
+    Args:
+        values (np.ndarray): Values to pack
+        scale_factors (np.ndarray): scale_factor of each attribute
+        add_offsets (np.ndarray): add_offset of each attribute
+        axis (int): Attribute axis of values
+
+    Returns:
+        Packed values
+    """
+    shape = [1] * values.ndim
+    shape[axis] = len(scale_factors)
+
+    return np.around((values - add_offsets.reshape(shape)) / scale_factors.reshape(shape)).astype(np.int16)
+
+
+def unpack_attributes(values: np.ndarray, scale_factors: np.ndarray, add_offsets: np.ndarray,
+                      axis: int) -> np.ndarray:
+    """
+    Unpacks each attribute of an array of values packed by pack_attributes
+    Args:
+        values (np.ndarray): Packed values. Masked values stay masked
+        scale_factors (np.ndarray): scale_factor of each attribute
+        add_offsets (np.ndarray): add_offset of each attribute
+        axis (int): Attribute axis of values
+
+    Returns:
+        Values
+    """
+    shape = [1] * values.ndim
+    shape[axis] = len(scale_factors)
+
+    return values * scale_factors.reshape(shape) + add_offsets.reshape(shape)
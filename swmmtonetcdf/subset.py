@@ -0,0 +1,129 @@
+# python imports
+import datetime
+import re
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+# external imports
+import numpy as np
+
+# local imports
+from swmmtonetcdf.reader import SYSTEM, element_type_value
+
+# Element selections are keyed by the netCDF element dimension names
+ELEMENT_DIMENSIONS = ('catchments', 'nodes', 'links')
+
+
+class Subset(NamedTuple):
+    """
+    Elements, attributes and periods selected for conversion. Elements and attributes are source indexes keyed
+    by element type code and periods are the window [start_period, end_period) of source periods
+    """
+    element_indexes: Dict[int, List[int]]
+    attribute_indexes: Dict[int, List[int]]
+    start_period: int
+    end_period: int
+
+
+def select_elements(names: Dict[str, int], selection: Union[Sequence[str], str, None]) -> Dict[str, int]:
+    """
+    Selects elements by ID
+    Args:
+        names: Ordered mapping of element names to element indexes
+        selection: None for all elements, a sequence of element IDs or a regular expression matching whole IDs
+
+    Returns:
+        Ordered mapping of selected element names to element indexes in the order of the output file
+    """
+    if selection is None:
+        return names
+    elif isinstance(selection, (str, re.Pattern)):
+        pattern = re.compile(selection)
+        return OrderedDict((name, index) for name, index in names.items() if pattern.fullmatch(name))
+
+    selection = set(selection)
+    missing = selection.difference(names)
+
+    if missing:
+        raise ValueError(f'Unknown elements {sorted(missing)}')
+
+    return OrderedDict((name, index) for name, index in names.items() if name in selection)
+
+
+def select_attributes(names: Sequence[str], selection: Union[Sequence[str], None]) -> List[int]:
+    """
+    Selects attributes by name
+    Args:
+        names: Attribute names of an element type
+        selection: None for all attributes or a sequence of attribute names. Names reported by other element
+            types are ignored
+
+    Returns:
+        Indexes of selected attributes
+    """
+    if selection is None:
+        return list(range(len(names)))
+
+    selection = set(selection)
+
+    return [i for i, name in enumerate(names) if name in selection]
+
+
+def select_periods(timestamps: np.ndarray, start_date: Union[datetime.datetime, None] = None,
+                   end_date: Union[datetime.datetime, None] = None) -> Tuple[int, int]:
+    """
+    Selects the periods reported within a time window
+    Args:
+        timestamps (np.ndarray): POSIX timestamps of periods
+        start_date (datetime.datetime): First date of window or None to start at the first period
+        end_date (datetime.datetime): Last date of window or None to end at the last period
+
+    Returns:
+        First period and period after the last period within the window
+    """
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise ValueError(f'Start date {start_date} is after end date {end_date}')
+
+    start_period = 0 if start_date is None else int(np.searchsorted(timestamps, start_date.timestamp(), 'left'))
+    end_period = len(timestamps) if end_date is None else int(np.searchsorted(timestamps, end_date.timestamp(),
+                                                                             'right'))
+
+    return start_period, max(start_period, end_period)
+
+
+def get_subset_block(swmm_output, subset: Union[Subset, None], element_type, start_period: int,
+                     end_period: int) -> np.ndarray:
+    """
+    Get results of the selected elements and attributes of a type over a window of periods
+    Args:
+        swmm_output: SWMM output reader
+        subset (Subset): Selection or None for all elements, attributes and periods
+        element_type: Element type
+        start_period (int): First period relative to the start of the selected periods
+        end_period (int): Period after last period relative to the start of the selected periods
+
+    Returns:
+        Results with shape (time, element, attribute) or (time, attribute) for the system
+    """
+    if subset is None:
+        return swmm_output.get_block(element_type, start_period, end_period)
+
+    element_type = element_type_value(element_type)
+    block = swmm_output.get_block(element_type, subset.start_period + start_period,
+                                  subset.start_period + end_period)
+
+    # leading attributes and elements are selected as views
+    attribute_indexes = subset.attribute_indexes[element_type]
+    if attribute_indexes == list(range(len(attribute_indexes))):
+        block = block[..., 0:len(attribute_indexes)]
+    else:
+        block = block[..., attribute_indexes]
+
+    if element_type != SYSTEM:
+        element_indexes = subset.element_indexes[element_type]
+        if element_indexes == list(range(len(element_indexes))):
+            block = block[:, 0:len(element_indexes)]
+        else:
+            block = block[:, element_indexes]
+
+    return block
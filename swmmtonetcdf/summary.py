@@ -0,0 +1,157 @@
+# python imports
+import datetime
+from typing import Dict, Sequence, Tuple
+
+# external imports
+import cftime
+import netCDF4 as nc
+import numpy as np
+
+# local imports
+from swmmtonetcdf.aggregation import CELL_METHODS
+
+# Statistics of each element and attribute over all converted periods. 'volume' integrates rates by multiplying the
+# sum of the values by the reporting time step in seconds and 'nonzero_count' is the number of nonzero periods
+SUMMARY_STATISTICS = ('max', 'time_of_max', 'min', 'mean', 'volume', 'nonzero_count')
+
+
+def define_summary_variables(netcdf_output: nc.Dataset, timeseries: Sequence[Tuple[str, Tuple[str, ...]]], datatype,
+                             zlib: bool = False, complevel: int = 4, shuffle: bool = True,
+                             statistics: Sequence[str] = SUMMARY_STATISTICS) -> Dict[str, Dict[str, nc.Variable]]:
+    """
+    Defines summary variables of each element type, such as node_max, with the element and attribute dimensions of
+    its timeseries variable and no time dimension. Times of maxima share the units of the time variable
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset opened for writing
+        timeseries: Element type prefixes and the element and attribute dimensions of their timeseries variables
+        datatype: Storage datatype of summaries of values
+        zlib (bool): Compress summary variables with zlib
+        complevel (int): Compression level from 1 to 9
+        shuffle (bool): Apply HDF5 shuffle filter before compression
+        statistics: Statistics to define
+
+    Returns:
+        Mapping of element type prefixes to mappings of statistics to summary variables
+    """
+    nc_time_variable = netcdf_output.variables['time']
+
+    variables = {}
+    for prefix, dimensions in timeseries:
+        variables[prefix] = {}
+
+        for statistic in statistics:
+            statistic_datatype = np.float64 if statistic == 'time_of_max' else \
+                np.int32 if statistic == 'nonzero_count' else datatype
+            nc_variable = netcdf_output.createVariable(f'{prefix}_{statistic}', statistic_datatype, dimensions,
+                                                       zlib=zlib, complevel=complevel, shuffle=shuffle)
+
+            if statistic == 'time_of_max':
+                nc_variable.units = nc_time_variable.units
+                nc_variable.calendar = nc_time_variable.calendar
+            elif statistic in CELL_METHODS:
+                nc_variable.cell_methods = CELL_METHODS[statistic]
+
+            variables[prefix][statistic] = nc_variable
+
+    return variables
+
+
+def get_summary_variables(netcdf_output: nc.Dataset, prefixes: Sequence[str]) -> Dict[str, Dict[str, nc.Variable]]:
+    """
+    Get the summary variables of a netCDF file defined by define_summary_variables
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset
+        prefixes: Element type prefixes
+
+    Returns:
+        Mapping of element type prefixes to mappings of statistics to summary variables
+    """
+    return {prefix: {statistic: netcdf_output.variables[f'{prefix}_{statistic}'] for statistic in SUMMARY_STATISTICS}
+            for prefix in prefixes}
+
+
+class ElementSummary(object):
+    """
+    Computes the summary statistics of the timeseries of an element type as blocks of results are converted, so
+    that queries such as which nodes flooded and when read one value per element instead of every period
+    """
+
+    def __init__(self, variables: Dict[str, nc.Variable], report_step: int, first_timestamp: float,
+                 num_attributes: int):
+        """
+        Args:
+            variables: Mapping of statistics to summary variables
+            report_step (int): Reporting time step in seconds
+            first_timestamp (float): POSIX timestamp of the first converted period
+            num_attributes (int): Number of attributes
+        """
+        self.variables = variables
+        self.report_step = report_step
+        self.first_timestamp = first_timestamp
+        self.num_attributes = num_attributes
+
+        # running statistics with shape (element, attribute) or (attribute,) for the system
+        self.maximums = None
+        self.max_periods = None
+        self.minimums = None
+        self.sums = None
+        self.nonzero_counts = None
+        self.num_periods = 0
+
+    def add(self, start_period: int, block: np.ndarray):
+        """
+        Adds a block of results. Blocks must be added in order of periods
+        Args:
+            start_period (int): Period of first record in block
+            block (np.ndarray): Results with shape (time, element, attribute) or (time, attribute) for the system
+        """
+        if block.shape[0] == 0 or (block.ndim == 3 and block.shape[1] == 0):
+            return
+
+        values = block[..., 0:self.num_attributes]
+
+        max_indexes = values.argmax(axis=0)
+        maximums = np.take_along_axis(values, max_indexes[np.newaxis], axis=0)[0].astype(np.float64)
+        minimums = values.min(axis=0).astype(np.float64)
+        sums = values.sum(axis=0, dtype=np.float64)
+        nonzero_counts = np.count_nonzero(values, axis=0)
+
+        if self.maximums is None:
+            self.maximums, self.minimums, self.sums, self.nonzero_counts = maximums, minimums, sums, nonzero_counts
+            self.max_periods = max_indexes + start_period
+        else:
+            # the first period a maximum is reached is kept
+            greater = maximums > self.maximums
+            self.maximums[greater] = maximums[greater]
+            self.max_periods[greater] = max_indexes[greater] + start_period
+            np.minimum(self.minimums, minimums, out=self.minimums)
+            self.sums += sums
+            self.nonzero_counts += nonzero_counts
+
+        self.num_periods += values.shape[0]
+
+    def finish(self):
+        """
+        Writes the summary statistics of the periods added
+        """
+        if self.maximums is None:
+            return
+
+        # times are linear in periods so only the first two periods are converted to the units of the time variable
+        nc_time_variable = self.variables['time_of_max']
+        first_time, second_time = cftime.date2num(
+            [datetime.datetime.fromtimestamp(self.first_timestamp),
+             datetime.datetime.fromtimestamp(self.first_timestamp + self.report_step)],
+            units=nc_time_variable.units, calendar=nc_time_variable.calendar)
+
+        statistics = {
+            'max': lambda: self.maximums,
+            'time_of_max': lambda: first_time + self.max_periods * (second_time - first_time),
+            'min': lambda: self.minimums,
+            'mean': lambda: self.sums / self.num_periods,
+            'volume': lambda: self.sums * self.report_step,
+            'nonzero_count': lambda: self.nonzero_counts,
+        }
+
+        for statistic, nc_variable in self.variables.items():
+            nc_variable[...] = statistics[statistic]()
@@ -1,17 +1,39 @@
 # python imports
-from typing import Dict, Union
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple, Union
 import datetime
+import time
 
 # external imports
-import julian
 import numpy as np
-from swmm.toolkit import output, shared_enum, output_metadata
+from swmm.toolkit import output, shared_enum
 import netCDF4 as nc
 import cftime
 from collections import OrderedDict
 
-
 # local imports
+from swmmtonetcdf.aggregation import AGGREGATION_GROUP_PREFIX, WindowAggregator, define_aggregation_group, \
+    get_aggregation_windows, get_num_windows, get_window_label
+from swmmtonetcdf.checkpoint import Checkpoint, read_checkpoint, write_source_signature
+from swmmtonetcdf.chunking import ACCESS_PATTERNS, DEFAULT_CHUNK_BYTES, get_variable_chunk_sizes
+from swmmtonetcdf.constant import define_constant_attributes, define_constant_series, find_constant_series, \
+    get_constant_attributes, plan_written_regions
+from swmmtonetcdf.geometry import write_netcdf_geometry
+from swmmtonetcdf.index import forget_swmm_output_index, get_swmm_output_index, load_swmm_output_index
+from swmmtonetcdf.instrumentation import ConversionStats
+from swmmtonetcdf.layout import LAYOUTS, get_layout_variables, is_time_major, to_time_major
+from swmmtonetcdf.memory import DEFAULT_SERIES_VALUES, parse_memory_size, plan_memory
+from swmmtonetcdf.options import AGGREGATIONS, DEFAULT_AGGREGATIONS, ENGINES, PRECISIONS
+from swmmtonetcdf.parallel import DEFAULT_PARTITION_BYTES, plan_partitions, write_partitions_parallel
+from swmmtonetcdf.pipeline import BlockPrefetcher
+from swmmtonetcdf.reader import SWMM_EPOCH, SwmmOutputReader, element_type_value
+from swmmtonetcdf.storage import get_attribute_packing, get_datatype, get_least_significant_digits, \
+    get_packing_attributes, get_variable_packing, pack_attributes, quantize, quantize_attributes
+from swmmtonetcdf.summary import ElementSummary, define_summary_variables, get_summary_variables
+from swmmtonetcdf.subset import ELEMENT_DIMENSIONS, Subset, get_subset_block, select_attributes, select_elements, \
+    select_periods
+from swmmtonetcdf.tail import FOLLOW_PLANNING_PERIODS, follow_swmm_output, wait_for_swmm_output
+
+
 def get_swmm_output_dates(file_handle):
     """
     Get timestamps for output file
@@ -20,20 +42,7 @@ def get_swmm_output_dates(file_handle):
     Returns:
         Array of timestamps for output file
     """
-    num_steps = output.get_times(file_handle, shared_enum.Time.NUM_PERIODS)
-    report_step = output.get_times(file_handle, shared_enum.Time.REPORT_STEP)
-    report_start_date_time = output.get_start_date(file_handle)
-
-    start_date_time = julian.from_jd(report_start_date_time + 2415018.5) + datetime.timedelta(seconds=report_step)
-    end_date_time = start_date_time + datetime.timedelta(seconds=num_steps * report_step)
-
-    date_times = np.arange(
-        start=start_date_time.timestamp(),
-        stop=end_date_time.timestamp(),
-        step=report_step
-    )
-
-    return date_times
+    return get_swmm_output_index(file_handle).get_dates().copy()
 
 
 def get_swmm_output_element_names(file_handle, element_type: shared_enum.ElementType) -> Dict[str, int]:
@@ -42,20 +51,12 @@ def get_swmm_output_element_names(file_handle, element_type: shared_enum.Element
 
     Args:
         file_handle: SWMM output file handle
-        element_type:
+        element_type: Element type
 
     Returns:
-
+        Ordered mapping of element names to element indexes
     """
-    names = OrderedDict()
-    project_size = output.get_proj_size(file_handle)
-
-    count = project_size[element_type.value]
-    for i in range(count):
-        name = output.get_elem_name(file_handle, element_type, i)
-        names[name] = i
-
-    return names
+    return OrderedDict(get_swmm_output_index(file_handle).get_element_names(element_type))
 
 
 def get_pollutant_enum_name(file_handle, pollutant_name: str) -> str:
@@ -63,13 +64,12 @@ def get_pollutant_enum_name(file_handle, pollutant_name: str) -> str:
     Get name of pollutant
     Args:
         file_handle: SWMM output file handle
-        pollutant_name:
+        pollutant_name (str): Pollutant name
 
     Returns:
-
+        Enumeration name
     """
-    pollutant_names = get_swmm_output_element_names(file_handle, shared_enum.ElementType.POLLUT)
-    return f'POLLUT_CONC_{pollutant_names[pollutant_name]}'
+    return get_swmm_output_index(file_handle).get_pollutant_enum_name(pollutant_name)
 
 
 def get_pollutant_enum(
@@ -96,73 +96,557 @@ def get_pollutant_enum(
     return element_attribute[pollutant_enum_name]
 
 
-def create_netcdf_from_swmm(swmm_output_file: str, netcdf_output_file: str, read_by_series=True):
+def get_swmm_output_attribute_names(element_type, pollutant_names: Sequence[str] = ()) -> List[str]:
     """
-    Creates netcdf output from SWMM output
-
+    Get names of attributes reported for an element type
     Args:
-        read_by_series (bool): Read whole timeseries at time
+        element_type: Element type
+        pollutant_names: Pollutant names reported after the attributes of subcatchments, nodes and links
+
+    Returns:
+        Attribute names in the order of the output file
+    """
+    attribute_type = ToolkitOutputReader.ATTRIBUTE_TYPES[element_type_value(element_type)]
+    attribute_names = [r.name for r in attribute_type if 'POLLUT_CONC_' not in r.name]
+
+    if element_type_value(element_type) != shared_enum.ElementType.SYSTEM.value:
+        attribute_names.extend(pollutant_names)
+
+    return attribute_names
+
+
+class ToolkitAttribute(NamedTuple):
+    """
+    Attribute code passed to swmm.toolkit.output functions. The toolkit enumerations only define the first
+    pollutant so higher pollutant attributes are passed by value.
+    """
+    value: int
 
+
+class ToolkitOutputReader(object):
+    """
+    Reads SWMM output through swmm.toolkit.output using the same interface as SwmmOutputReader
+    """
+
+    ATTRIBUTE_TYPES = {
+        shared_enum.ElementType.SUBCATCH.value: shared_enum.SubcatchAttribute,
+        shared_enum.ElementType.NODE.value: shared_enum.NodeAttribute,
+        shared_enum.ElementType.LINK.value: shared_enum.LinkAttribute,
+        shared_enum.ElementType.SYSTEM.value: shared_enum.SystemAttribute,
+    }
+
+    ATTRIBUTE_FUNCTIONS = {
+        shared_enum.ElementType.SUBCATCH.value: output.get_subcatch_attribute,
+        shared_enum.ElementType.NODE.value: output.get_node_attribute,
+        shared_enum.ElementType.LINK.value: output.get_link_attribute,
+    }
+
+    SERIES_FUNCTIONS = {
+        shared_enum.ElementType.SUBCATCH.value: output.get_subcatch_series,
+        shared_enum.ElementType.NODE.value: output.get_node_series,
+        shared_enum.ElementType.LINK.value: output.get_link_series,
+    }
+
+    RESULT_FUNCTIONS = {
+        shared_enum.ElementType.SUBCATCH.value: output.get_subcatch_result,
+        shared_enum.ElementType.NODE.value: output.get_node_result,
+        shared_enum.ElementType.LINK.value: output.get_link_result,
+        shared_enum.ElementType.SYSTEM.value: output.get_system_result,
+    }
+
+    def __init__(self, swmm_output_file: str, sidecar: bool = False):
+        """
+        Opens SWMM output file
+
+        Args:
+            swmm_output_file (str): SWMM output filepath
+            sidecar (bool): Read element names and reporting periods from the index persisted next to the output
+                file when it is up to date, and persist the index otherwise
+        """
+        self.path = swmm_output_file
+        self.file_handle = output.init()
+        output.open(p_handle=self.file_handle, path=swmm_output_file)
+
+        self.index = load_swmm_output_index(swmm_output_file, self.file_handle, sidecar=sidecar)
+        self.project_size = list(self.index.project_size)
+        self.num_periods = self.index.num_periods
+        self.report_step = self.index.report_step
+        self.start_date = self.index.start_date
+
+    def get_attribute(self, element_type, attribute_index: int):
+        """
+        Get toolkit attribute code
+        Args:
+            element_type: Element type
+            attribute_index (int): Attribute index
+
+        Returns:
+            Toolkit attribute enumeration or attribute value
+        """
+        attribute_type = ToolkitOutputReader.ATTRIBUTE_TYPES[element_type_value(element_type)]
+
+        try:
+            return attribute_type(attribute_index)
+        except ValueError:
+            return ToolkitAttribute(attribute_index)
+
+    def get_num_attributes(self, element_type) -> int:
+        """
+        Get number of attributes reported for element type
+        Args:
+            element_type: Element type
+
+        Returns:
+            Number of attributes
+        """
+        element_type = element_type_value(element_type)
+        attribute_type = ToolkitOutputReader.ATTRIBUTE_TYPES[element_type]
+        num_attributes = len([a for a in attribute_type if 'POLLUT_CONC_' not in a.name])
+
+        if element_type != shared_enum.ElementType.SYSTEM.value:
+            num_attributes += self.project_size[shared_enum.ElementType.POLLUT.value]
+
+        return num_attributes
+
+    def get_block(self, element_type, start_period: int, end_period: int) -> np.ndarray:
+        """
+        Get results of all elements of a type over a window of periods
+        Args:
+            element_type: Element type
+            start_period (int): First period
+            end_period (int): Period after last period
+
+        Returns:
+            Array of results with shape (time, element, attribute) or (time, attribute) for the system
+        """
+        element_type = element_type_value(element_type)
+        num_attributes = self.get_num_attributes(element_type)
+
+        if element_type == shared_enum.ElementType.SYSTEM.value:
+            block = np.empty((end_period - start_period, num_attributes), dtype=np.float32)
+            for t in range(start_period, end_period):
+                block[t - start_period, :] = output.get_system_result(self.file_handle, t, 0)
+        else:
+            num_elements = self.project_size[element_type]
+            block = np.empty((end_period - start_period, num_elements, num_attributes), dtype=np.float32)
+
+            if num_elements > 0:
+                attribute_function = ToolkitOutputReader.ATTRIBUTE_FUNCTIONS[element_type]
+                for t in range(start_period, end_period):
+                    for i in range(num_attributes):
+                        block[t - start_period, :, i] = attribute_function(
+                            self.file_handle, t, self.get_attribute(element_type, i)
+                        )
+
+        return block
+
+    def get_element_names(self, element_type) -> Dict[str, int]:
+        """
+        Get element names
+        Args:
+            element_type: Element type
+
+        Returns:
+            Ordered mapping of element names to element indexes
+        """
+        return OrderedDict(self.index.get_element_names(element_type))
+
+    def get_dates(self) -> np.ndarray:
+        """
+        Get timestamps for output file
+        Returns:
+            Array of timestamps for output file
+        """
+        return self.index.get_dates().copy()
+
+    def get_series(self, element_type, element_index: int, attribute_index: int, start_period: int,
+                   end_period: int) -> np.ndarray:
+        """
+        Get timeseries of an element attribute
+        Args:
+            element_type: Element type
+            element_index (int): Element index. Ignored for the system
+            attribute_index (int): Attribute index
+            start_period (int): First period
+            end_period (int): Period after last period
+
+        Returns:
+            Array of timeseries values
+        """
+        element_type = element_type_value(element_type)
+        attribute = self.get_attribute(element_type, attribute_index)
+
+        if element_type == shared_enum.ElementType.SYSTEM.value:
+            series = output.get_system_series(self.file_handle, attribute, start_period, end_period)
+        else:
+            series = ToolkitOutputReader.SERIES_FUNCTIONS[element_type](
+                self.file_handle, element_index, attribute, start_period, end_period
+            )
+
+        return np.array(series, dtype=np.float32)
+
+    def get_result(self, element_type, time_index: int, element_index: int) -> np.ndarray:
+        """
+        Get values of all attributes of an element at a period
+        Args:
+            element_type: Element type
+            time_index (int): Period index
+            element_index (int): Element index. Ignored for the system
+
+        Returns:
+            Array of attribute values
+        """
+        element_type = element_type_value(element_type)
+
+        if element_type == shared_enum.ElementType.SYSTEM.value:
+            element_index = 0
+
+        result = ToolkitOutputReader.RESULT_FUNCTIONS[element_type](self.file_handle, time_index, element_index)
+
+        return np.array(result, dtype=np.float32)
+
+    def release(self, start_period: int, end_period: int):
+        """
+        Does nothing. Results read through swmm.toolkit.output are not memory mapped
+        Args:
+            start_period (int): First period
+            end_period (int): Period after last period
+        """
+
+    def close(self):
+        """
+        Closes SWMM output file
+        """
+        forget_swmm_output_index(self.file_handle)
+        output.close(self.file_handle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def open_swmm_output(swmm_output_file: str, engine: str = 'toolkit',
+                     sidecar: bool = False) -> Union[ToolkitOutputReader, SwmmOutputReader]:
+    """
+    Opens SWMM output file with the specified reading engine
+    Args:
         swmm_output_file (str): SWMM output filepath
+        engine (str): 'toolkit' to read through swmm.toolkit.output or 'native' to memory map the output file
+        sidecar (bool): Use the index persisted next to the output file when reading through swmm.toolkit.output.
+            The native engine parses the same metadata in a single read of the header
 
-        netcdf_output_file (str): NetCDF
+    Returns:
+        SWMM output reader
+    """
+    if engine == 'toolkit':
+        return ToolkitOutputReader(swmm_output_file, sidecar=sidecar)
+    elif engine == 'native':
+        return SwmmOutputReader(swmm_output_file)
+    else:
+        raise ValueError(f'Unknown engine {engine}. Expected one of {ENGINES}')
+
+
+def write_timeseries_block(nc_variable: nc.Variable, block: np.ndarray, start_period: int, num_attributes: int,
+                           least_significant_digits: Sequence[Union[int, None]] = (),
+                           stats: Union[ConversionStats, None] = None,
+                           regions: Union[Sequence[Tuple[slice, ...]], None] = None,
+                           packing: Union[Tuple[np.ndarray, np.ndarray], None] = None):
+    """
+    Writes a block of results read for all elements of a type as a single hyperslab. Blocks are transposed into
+    the (element, attribute, time) layout unless the variable is time-major, in which case they are written in the
+    order they are read
+    Args:
+        nc_variable (nc.Variable): NetCDF timeseries variable
+        block (np.ndarray): Results with shape (time, element, attribute) or (time, attribute) for the system
+        start_period (int): Period of first record in block
+        num_attributes (int): Number of attributes to write
+        least_significant_digits: Digits retained for each attribute
+        stats (ConversionStats): Statistics the transpose and write are recorded in
+        regions: Element and attribute slices, or attribute slices for the system, written as a hyperslab each
+            instead of the whole block. None to write the whole block
+        packing: scale_factor and add_offset of each attribute of int16 variables. None to write values unpacked
 
     Returns:
 
     """
-    file_handle = output.init()
-    output.open(p_handle=file_handle, path=swmm_output_file)
-    output_metadata.OutputMetadata(file_handle)
+    stats = ConversionStats() if stats is None else stats
+    end_period = start_period + block.shape[0]
+
+    if block.ndim == 3 and block.shape[1] == 0:
+        return
+
+    with stats.phase('transpose'):
+        if is_time_major(nc_variable):
+            values = quantize_attributes(np.ascontiguousarray(block[..., 0:num_attributes], dtype=np.float64),
+                                         least_significant_digits, axis=block.ndim - 1)
+            index = (slice(start_period, end_period),)
+        elif block.ndim == 2:
+            values = quantize_attributes(np.ascontiguousarray(block[:, 0:num_attributes].T, dtype=np.float64),
+                                         least_significant_digits, axis=0)
+            index = (slice(None), slice(start_period, end_period))
+        else:
+            values = quantize_attributes(
+                np.ascontiguousarray(block[:, :, 0:num_attributes].transpose((1, 2, 0)), dtype=np.float64),
+                least_significant_digits, axis=1)
+            index = (slice(None), slice(None), slice(start_period, end_period))
+
+        if packing is not None:
+            values = pack_attributes(values, *packing, axis=values.ndim - 1 if is_time_major(nc_variable)
+                                     else values.ndim - 2)
+
+    if regions is None:
+        with stats.phase('write'):
+            nc_variable[index] = values
+
+        stats.bytes_written += values.size * nc_variable.dtype.itemsize
+        return
+
+    for region in regions:
+        region_index = index[:1] + region if is_time_major(nc_variable) else region + index[-1:]
+        region_values = values[(slice(None),) + region] if is_time_major(nc_variable) else values[region]
+
+        with stats.phase('write'):
+            nc_variable[region_index] = region_values
+
+        stats.bytes_written += region_values.size * nc_variable.dtype.itemsize
+
+
+def get_attribute_ranges(swmm_output: Union[ToolkitOutputReader, SwmmOutputReader], element_type,
+                         num_attributes: int, num_steps: int, block_size: int = 256,
+                         subset: Union[Subset, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get range of results of each attribute over all elements of a type
+    Args:
+        swmm_output: SWMM output reader
+        element_type: Element type
+        num_attributes (int): Number of attributes
+        num_steps (int): Number of periods
+        block_size (int): Number of periods read per block
+        subset (Subset): Selected elements, attributes and periods. None for all
 
-    netcdf_output = nc.Dataset(netcdf_output_file, mode='w', format="NETCDF4")
+    Returns:
+        Minimum and maximum value of each attribute. NaN for attributes without values
+    """
+    minimum = np.full(num_attributes, np.nan)
+    maximum = np.full(num_attributes, np.nan)
+    first_period = 0 if subset is None else subset.start_period
 
-    # output size
-    project_size = output.get_proj_size(file_handle)
-    num_catchments = project_size[shared_enum.ElementType.SUBCATCH.value]
-    num_nodes = project_size[shared_enum.ElementType.NODE.value]
-    num_links = project_size[shared_enum.ElementType.LINK.value]
-    num_steps = output.get_times(file_handle, shared_enum.Time.NUM_PERIODS)
-    swmm_output_timestamps = get_swmm_output_dates(file_handle=file_handle)
+    for start_period in range(0, num_steps, block_size):
+        end_period = min(start_period + block_size, num_steps)
+        block = get_subset_block(swmm_output, subset, element_type, start_period, end_period)
+        block = block[..., 0:num_attributes].reshape(-1, num_attributes)
 
-    # Timestamps
-    netcdf_output.createDimension(dimname='time', size=None)
-    nc_time_variable = netcdf_output.createVariable(
-        varname="time",
-        datatype=np.float,
-        dimensions=("time",),
+        if block.size > 0:
+            # fmin and fmax ignore the NaN of attributes without values so far
+            minimum = np.fmin(minimum, block.min(axis=0))
+            maximum = np.fmax(maximum, block.max(axis=0))
+
+        # the range is scanned in a pass of its own, so the block is not read again until it is converted
+        swmm_output.release(first_period + start_period, first_period + end_period)
+
+    return minimum, maximum
+
+
+class ConversionSelection(NamedTuple):
+    """
+    Elements, attributes and periods selected for conversion with the names written to the output
+    """
+    subset: Subset
+    timestamps: np.ndarray
+    nodes: Dict[str, int]
+    links: Dict[str, int]
+    catchments: Dict[str, int]
+    node_attributes: List[str]
+    link_attributes: List[str]
+    catchment_attributes: List[str]
+    system_attributes: List[str]
+    pollutant_names: Dict[str, int]
+
+
+def select_conversion(swmm_output: Union[ToolkitOutputReader, SwmmOutputReader],
+                      elements: Union[Dict[str, Union[Sequence[str], str]], None] = None,
+                      attributes: Union[Sequence[str], None] = None,
+                      start_date: Union[datetime.datetime, None] = None,
+                      end_date: Union[datetime.datetime, None] = None) -> ConversionSelection:
+    """
+    Selects the elements, attributes and periods of a SWMM output file to convert
+    Args:
+        swmm_output: SWMM output reader
+        elements: Mapping of 'nodes', 'links' or 'catchments' to a sequence of element IDs or a regular expression
+            matching whole IDs. None for all elements
+        attributes: Names of attributes to convert. None for all attributes
+        start_date (datetime.datetime): First date of periods to convert. None to start at the first period
+        end_date (datetime.datetime): Last date of periods to convert. None to end at the last period
+
+    Returns:
+        Selection
+    """
+    timestamps = swmm_output.get_dates()
+    start_period, end_period = select_periods(timestamps, start_date, end_date)
 
+    # Element names
+    elements = {} if elements is None else elements
+    unknown_dimensions = set(elements).difference(ELEMENT_DIMENSIONS)
+    if unknown_dimensions:
+        raise ValueError(f'Unknown element types {sorted(unknown_dimensions)}. Expected {ELEMENT_DIMENSIONS}')
+
+    pollutants_names = swmm_output.get_element_names(element_type=shared_enum.ElementType.POLLUT)
+
+    links = select_elements(swmm_output.get_element_names(element_type=shared_enum.ElementType.LINK),
+                            elements.get('links'))
+    nodes = select_elements(swmm_output.get_element_names(element_type=shared_enum.ElementType.NODE),
+                            elements.get('nodes'))
+    catchments = select_elements(swmm_output.get_element_names(element_type=shared_enum.ElementType.SUBCATCH),
+                                 elements.get('catchments'))
+
+    node_attributes = get_swmm_output_attribute_names(shared_enum.ElementType.NODE, list(pollutants_names.keys()))
+    link_attributes = get_swmm_output_attribute_names(shared_enum.ElementType.LINK, list(pollutants_names.keys()))
+    catchment_attributes = get_swmm_output_attribute_names(shared_enum.ElementType.SUBCATCH,
+                                                           list(pollutants_names.keys()))
+    system_attributes = get_swmm_output_attribute_names(shared_enum.ElementType.SYSTEM)
+
+    if attributes is not None:
+        unknown_attributes = set(attributes).difference(
+            node_attributes + link_attributes + catchment_attributes + system_attributes)
+        if unknown_attributes:
+            raise ValueError(f'Unknown attributes {sorted(unknown_attributes)}')
+
+    subset = Subset(
+        element_indexes={
+            shared_enum.ElementType.SUBCATCH.value: list(catchments.values()),
+            shared_enum.ElementType.NODE.value: list(nodes.values()),
+            shared_enum.ElementType.LINK.value: list(links.values()),
+        },
+        attribute_indexes={
+            shared_enum.ElementType.SUBCATCH.value: select_attributes(catchment_attributes, attributes),
+            shared_enum.ElementType.NODE.value: select_attributes(node_attributes, attributes),
+            shared_enum.ElementType.LINK.value: select_attributes(link_attributes, attributes),
+            shared_enum.ElementType.SYSTEM.value: select_attributes(system_attributes, attributes),
+        },
+        start_period=start_period,
+        end_period=end_period
     )
-    nc_time_variable.units = "hours since 0001-01-01 00:00:00.0"
-    nc_time_variable.calendar = "gregorian"
 
-    nc_time_variable[:] = cftime.date2num(
-        [datetime.datetime.fromtimestamp(t) for t in swmm_output_timestamps],
-        units=nc_time_variable.units,
-        calendar=nc_time_variable.calendar
+    return ConversionSelection(
+        subset=subset,
+        timestamps=timestamps[start_period:end_period],
+        nodes=nodes,
+        links=links,
+        catchments=catchments,
+        node_attributes=[node_attributes[i] for i in subset.attribute_indexes[shared_enum.ElementType.NODE.value]],
+        link_attributes=[link_attributes[i] for i in subset.attribute_indexes[shared_enum.ElementType.LINK.value]],
+        catchment_attributes=[catchment_attributes[i]
+                              for i in subset.attribute_indexes[shared_enum.ElementType.SUBCATCH.value]],
+        system_attributes=[system_attributes[i]
+                           for i in subset.attribute_indexes[shared_enum.ElementType.SYSTEM.value]],
+        pollutant_names=pollutants_names
     )
 
-    # Element names
-    pollutants_names = get_swmm_output_element_names(file_handle=file_handle,
-                                                     element_type=shared_enum.ElementType.POLLUT)
 
-    links = get_swmm_output_element_names(file_handle=file_handle, element_type=shared_enum.ElementType.LINK)
-    nodes = get_swmm_output_element_names(file_handle=file_handle, element_type=shared_enum.ElementType.NODE)
-    catchments = get_swmm_output_element_names(file_handle=file_handle, element_type=shared_enum.ElementType.SUBCATCH)
+def select_varying_attributes(selection: ConversionSelection, constant_values: Dict[int, np.ndarray]) -> \
+        Tuple[ConversionSelection, Dict[int, np.ndarray], Dict[int, Tuple[List[str], np.ndarray]]]:
+    """
+    Drops the attributes whose series are constant for every element from a selection
+    Args:
+        selection (ConversionSelection): Selection
+        constant_values: Mapping of element type codes to the values of constant series from find_constant_series
 
-    node_attributes = [r.name for r in shared_enum.NodeAttribute if 'POLLUT_CONC_' not in r.name]
-    node_attributes.extend(list(pollutants_names.keys()))
-    num_node_attributes = len(node_attributes)
+    Returns:
+        Selection of the remaining attributes, the values of their constant series and a mapping of element type
+        codes to the names and values of the dropped attributes
+    """
+    attribute_indexes = dict(selection.subset.attribute_indexes)
+    attribute_names = {}
+    varying_values = {}
+    dropped_attributes = {}
+
+    for element_type, field in ((shared_enum.ElementType.SUBCATCH, 'catchment_attributes'),
+                                (shared_enum.ElementType.NODE, 'node_attributes'),
+                                (shared_enum.ElementType.LINK, 'link_attributes'),
+                                (shared_enum.ElementType.SYSTEM, 'system_attributes')):
+        names = getattr(selection, field)
+        values = constant_values[element_type.value]
+        constant = get_constant_attributes(values)
+
+        attribute_indexes[element_type.value] = [index for index, dropped in
+                                                 zip(attribute_indexes[element_type.value], constant) if not dropped]
+        attribute_names[field] = [name for name, dropped in zip(names, constant) if not dropped]
+        varying_values[element_type.value] = values[..., ~constant]
+        dropped_attributes[element_type.value] = ([name for name, dropped in zip(names, constant) if dropped],
+                                                  values[..., constant])
+
+    selection = selection._replace(subset=selection.subset._replace(attribute_indexes=attribute_indexes),
+                                   **attribute_names)
+
+    return selection, varying_values, dropped_attributes
+
+
+def define_netcdf_output(netcdf_output: nc.Dataset, swmm_output: Union[ToolkitOutputReader, SwmmOutputReader],
+                         timestamps: np.ndarray, nodes: Dict[str, int], links: Dict[str, int],
+                         catchments: Dict[str, int], node_attributes: List[str], link_attributes: List[str],
+                         catchment_attributes: List[str], system_attributes: List[str], datatype, zlib: bool,
+                         complevel: int, shuffle: bool, chunk_sizes: Union[str, Dict[str, Tuple[int, ...]], None],
+                         access_pattern: str, planned_steps: int, precision: str, block_size: int,
+                         subset: Union[Subset, None] = None, layout: str = 'series',
+                         chunk_bytes: int = DEFAULT_CHUNK_BYTES, raw: bool = True,
+                         stats: Union[ConversionStats, None] = None) -> Dict[str, nc.Variable]:
+    """
+    Defines the dimensions and variables of a new netCDF file and writes timestamps, element names and
+    attribute names
+    Args:
+        netcdf_output (nc.Dataset): NetCDF dataset opened for writing
+        swmm_output: SWMM output reader
+        timestamps (np.ndarray): POSIX timestamps of periods
+        nodes: Ordered mapping of node names to indexes
+        links: Ordered mapping of link names to indexes
+        catchments: Ordered mapping of catchment names to indexes
+        node_attributes: Node attribute names
+        link_attributes: Link attribute names
+        catchment_attributes: Catchment attribute names
+        system_attributes: System attribute names
+        datatype: Storage datatype of timeseries variables
+        zlib (bool): Compress timeseries variables with zlib
+        complevel (int): Compression level from 1 to 9
+        shuffle (bool): Apply HDF5 shuffle filter before compression
+        chunk_sizes: Chunk sizes of timeseries variables
+        access_pattern (str): Expected read access used by the 'auto' chunk planner for series layout variables
+        planned_steps (int): Number of periods used to plan chunk sizes
+        precision (str): Storage precision of timeseries variables
+        block_size (int): Number of periods per block of timestamps written and of results read when computing the
+            range of packed variables
+        subset (Subset): Selected elements, attributes and periods. None for all
+        layout (str): Layout of timeseries variables. 'series', 'snapshot' or 'both'
+        chunk_bytes (int): Target uncompressed size of chunks planned by the 'auto' chunk planner
+        raw (bool): Define timeseries variables. Otherwise only dimensions, timestamps and names are defined
+        stats (ConversionStats): Statistics the reads of the range of packed variables are recorded in
 
-    link_attributes = [r.name for r in shared_enum.LinkAttribute if 'POLLUT_CONC_' not in r.name]
-    link_attributes.extend(list(pollutants_names.keys()))
-    num_link_attributes = len(link_attributes)
+    Returns:
+        Mapping of names to netCDF time and timeseries variables
+    """
+    stats = ConversionStats() if stats is None else stats
+    item_size = np.dtype(datatype).itemsize
+    num_steps = len(timestamps)
 
-    catchment_attributes = [r.name for r in shared_enum.SubcatchAttribute if 'POLLUT_CONC_' not in r.name]
-    catchment_attributes.extend(list(pollutants_names.keys()))
-    num_catchment_attributes = len(catchment_attributes)
+    # Timestamps
+    netcdf_output.createDimension(dimname='time', size=None)
+    nc_time_variable = netcdf_output.createVariable(
+        varname="time",
+        datatype=np.float64,
+        dimensions=("time",),
 
-    system_attributes = [r.name for r in shared_enum.SystemAttribute]
-    num_system_attributes = len(system_attributes)
+    )
+    nc_time_variable.units = "hours since 0001-01-01 00:00:00.0"
+    nc_time_variable.calendar = "gregorian"
+
+    for start_period in range(0, num_steps, block_size):
+        end_period = min(start_period + block_size, num_steps)
+        nc_time_variable[start_period:end_period] = cftime.date2num(
+            [datetime.datetime.fromtimestamp(t) for t in timestamps[start_period:end_period]],
+            units=nc_time_variable.units,
+            calendar=nc_time_variable.calendar
+        )
 
     netcdf_output.createDimension(dimname='nodes', size=len(nodes))
     netcdf_output.createDimension(dimname='links', size=len(links))
@@ -216,29 +700,50 @@ def create_netcdf_from_swmm(swmm_output_file: str, netcdf_output_file: str, read
         dimensions=('system_attributes',)
     )
 
-    nc_node_timeseries = netcdf_output.createVariable(
-        varname='node_timeseries',
-        datatype=np.float,
-        dimensions=('nodes', 'node_attributes', 'time',)
-    )
-
-    nc_link_timeseries = netcdf_output.createVariable(
-        varname='link_timeseries',
-        datatype=np.float,
-        dimensions=('links', 'link_attributes', 'time',)
-    )
+    nc_variables = {'time': nc_time_variable}
+    netcdf_output.layout = layout
+
+    for element_type, prefix, dimensions, dimension_sizes in (
+            (shared_enum.ElementType.SUBCATCH, 'catchment', ('catchments', 'catchment_attributes', 'time'),
+             (len(catchments), len(catchment_attributes), planned_steps)),
+            (shared_enum.ElementType.NODE, 'node', ('nodes', 'node_attributes', 'time'),
+             (len(nodes), len(node_attributes), planned_steps)),
+            (shared_enum.ElementType.LINK, 'link', ('links', 'link_attributes', 'time'),
+             (len(links), len(link_attributes), planned_steps)),
+            (shared_enum.ElementType.SYSTEM, 'system', ('system_attributes', 'time'),
+             (len(system_attributes), planned_steps))):
+        if not raw:
+            continue
+
+        if precision == 'int16':
+            # attributes are packed separately because their ranges differ by orders of magnitude
+            with stats.phase('read'):
+                packing = get_attribute_packing(*get_attribute_ranges(swmm_output, element_type, dimension_sizes[-2],
+                                                                      num_steps, block_size, subset))
+
+            for name, values in zip(('scale_factor', 'add_offset'), packing):
+                nc_packing_variable = netcdf_output.createVariable(f'{prefix}_{name}', np.float64, dimensions[-2:-1])
+                nc_packing_variable[:] = values
+
+        for variable_name, time_major in get_layout_variables(prefix, layout):
+            # time-major variables are planned for reading snapshots
+            variable_access_pattern = 'snapshot' if time_major else access_pattern
+
+            nc_variable = netcdf_output.createVariable(
+                varname=variable_name,
+                datatype=datatype,
+                dimensions=to_time_major(dimensions) if time_major else dimensions,
+                zlib=zlib,
+                complevel=complevel,
+                shuffle=shuffle,
+                chunksizes=get_variable_chunk_sizes(chunk_sizes, variable_name, dimension_sizes,
+                                                    variable_access_pattern, item_size, time_major, chunk_bytes)
+            )
 
-    nc_catchment_timeseries = netcdf_output.createVariable(
-        varname='catchment_timeseries',
-        datatype=np.float,
-        dimensions=('catchments', 'catchment_attributes', 'time',)
-    )
+            if precision == 'int16':
+                nc_variable.setncatts(get_packing_attributes(prefix))
 
-    nc_system_timeseries = netcdf_output.createVariable(
-        varname='system_timeseries',
-        datatype=np.float,
-        dimensions=('system_attributes', 'time',)
-    )
+            nc_variables[variable_name] = nc_variable
 
     # node attributes
     nc_node_element_names_variable[:] = np.array(list(nodes.keys()), dtype=object)
@@ -255,105 +760,712 @@ def create_netcdf_from_swmm(swmm_output_file: str, netcdf_output_file: str, read
     # system attributes
     nc_system_attributes_names_variable[:] = np.array(system_attributes, dtype=object)
 
-    if read_by_series:
-        # catchment attributes
-        for i in range(len(catchment_attributes)):
-            catchment_attribute = catchment_attributes[i]
-            catchment_attribute_enum = shared_enum.SubcatchAttribute[catchment_attribute]
-
-            j: int = 0
-            for catchment_id, catchment_index in catchments.items():
-                catchment_series = output.get_subcatch_series(
-                    p_handle=file_handle,
-                    subcatchIndex=catchment_index,
-                    attr=catchment_attribute_enum,
-                    startPeriod=0,
-                    endPeriod=num_steps
-                )
+    return nc_variables
+
+
+def create_netcdf_from_swmm(swmm_output_file: str, netcdf_output_file: str, read_by_series=True, engine='toolkit',
+                            block_size: int = 256, zlib: bool = False, complevel: int = 4, shuffle: bool = True,
+                            chunk_sizes: Union[str, Dict[str, Tuple[int, ...]], None] = None,
+                            access_pattern: str = 'series', layout: str = 'series', precision: str = 'double',
+                            least_significant_digit: Union[int, str, Dict[str, int], None] = None,
+                            workers: int = 1, follow: bool = False, poll_interval: float = 5.0,
+                            follow_timeout: Union[float, None] = None, resume: bool = False,
+                            checkpoint_interval: Union[int, None] = None,
+                            elements: Union[Dict[str, Union[Sequence[str], str]], None] = None,
+                            attributes: Union[Sequence[str], None] = None,
+                            start_date: Union[datetime.datetime, None] = None,
+                            end_date: Union[datetime.datetime, None] = None,
+                            max_memory: Union[int, str, None] = None, prefetch: int = 0,
+                            aggregation_windows: Sequence[Union[str, int]] = (),
+                            aggregations: Sequence[str] = DEFAULT_AGGREGATIONS, summary: bool = False,
+                            raw: bool = True, skip_constant: bool = False, drop_constant: bool = False,
+                            inp_file: Union[str, None] = None, projection: str = 'EPSG:4326',
+                            sidecar: bool = False,
+                            progress: Union[Callable[[int, int], None], None] = None) -> ConversionStats:
+    """
+    Creates netcdf output from SWMM output
 
-                nc_catchment_timeseries[j, i, :] = np.array(catchment_series, dtype=np.float)
-                netcdf_output.sync()
-                j += 1
-
-        # node attributes
-        for i in range(len(node_attributes)):
-            node_attribute = node_attributes[i]
-            node_attribute_enum = shared_enum.NodeAttribute[node_attribute]
-
-            j: int = 0
-            for node_id, node_index in nodes.items():
-                node_series = output.get_node_series(
-                    p_handle=file_handle,
-                    nodeIndex=node_index,
-                    attr=node_attribute_enum,
-                    startPeriod=0,
-                    endPeriod=num_steps
-                )
+    Args:
+        read_by_series (bool): Read whole timeseries at time. The series of an attribute of consecutive elements are
+            buffered and written as a single hyperslab. Otherwise, results of all elements are read in blocks of
+            periods and each block is written as a single hyperslab
+
+        swmm_output_file (str): SWMM output filepath
+
+        netcdf_output_file (str): NetCDF
+
+        engine (str): Engine used to read SWMM output. 'toolkit' reads through swmm.toolkit.output and
+            'native' memory maps the SWMM output file
+
+        block_size (int): Number of periods read and written per block when not reading by series
+
+        zlib (bool): Compress timeseries variables with zlib
+
+        complevel (int): Compression level from 1 to 9
+
+        shuffle (bool): Apply HDF5 shuffle filter before compression
+
+        chunk_sizes: Chunk sizes of timeseries variables. None for library defaults, 'auto' to plan chunk sizes
+            from the model size and access pattern, or a mapping of timeseries variable names to chunk sizes
+
+        access_pattern (str): Expected read access used by the 'auto' chunk planner. 'series' for histories of
+            individual elements and 'snapshot' for all elements at individual periods. Time-major variables are
+            always planned for snapshots
+
+        layout (str): Layout of timeseries variables. 'series' for (element, attribute, time), 'snapshot' for
+            (time, element, attribute) or 'both' to also write time-major copies as *_snapshots variables.
+            Time-major layouts are written in blocks of periods, matching the record order of the SWMM output file,
+            instead of by series
+
+        precision (str): Storage precision of timeseries variables. 'double' for float64, 'single' for float32
+            which is the precision SWMM writes results at, or 'int16' to pack values using a scale_factor and
+            add_offset computed from the range of each attribute. The packing of each attribute is stored in
+            variables such as node_scale_factor and node_add_offset, named by the scale_factor_variable and
+            add_offset_variable attributes of the timeseries variables, and packed values are unpacked by
+            swmmtonetcdf.constant.read_timeseries. Readers that only apply CF packing attributes, such as
+            netCDF4 and xarray, return the packed counts, which the comment attribute of the variables notes
+
+        least_significant_digit: Quantizes timeseries values to improve compression. None for full precision,
+            an integer number of decimal digits for all attributes, 'auto' for attribute aware defaults or a
+            mapping of attribute names to decimal digits
+
+        workers (int): Number of worker processes. When greater than one, the timeseries are partitioned by
+            element range (toolkit engine) or by windows of periods (native engine) and each worker reads its
+            partitions from the SWMM output file independently while this process writes them to netCDF
+
+        follow (bool): Follow a SWMM output file that SWMM is still writing. The periods written so far are
+            converted and newly completed periods are then appended to the time axis until SWMM closes the
+            output file. Requires the native engine
+
+        poll_interval (float): Seconds between polls of the SWMM output file when following
+
+        follow_timeout (float): Seconds to wait for the output file or for new periods when following before
+            giving up. None to wait indefinitely
+
+        resume (bool): Resume an unfinished conversion to netcdf_output_file from its last committed block. Raises
+            ValueError if the SWMM output file or the conversion options changed since the conversion started.
+            A new conversion is started when there is no unfinished conversion to resume
+
+        checkpoint_interval (int): Number of units of work (attributes when reading by series, blocks of periods or
+            partitions) between checkpoints that an interrupted conversion resumes from. Each checkpoint syncs the
+            dataset twice. 0 for no checkpoints, which cannot be combined with resume. None for a checkpoint after
+            every unit when resuming and no checkpoints otherwise
+
+        elements: Elements to convert as a mapping of 'nodes', 'links' or 'catchments' to a sequence of element IDs
+            or a regular expression matching whole IDs. Element types that are not specified are converted whole
+
+        attributes: Names of attributes to convert. Each element type keeps the selected attributes it reports.
+            None for all attributes
 
-                nc_node_timeseries[j, i, :] = np.array(node_series, dtype=np.float)
-                netcdf_output.sync()
-                j += 1
-
-        # link attributes
-        for i in range(len(link_attributes)):
-            link_attribute = link_attributes[i]
-            link_attribute_enum = shared_enum.LinkAttribute[link_attribute]
-
-            j: int = 0
-            for link_id, link_index in links.items():
-                link_series = output.get_link_series(
-                    p_handle=file_handle,
-                    linkIndex=link_index,
-                    attr=link_attribute_enum,
-                    startPeriod=0,
-                    endPeriod=num_steps
+        start_date (datetime.datetime): First date of periods to convert. None to start at the first period
+
+        end_date (datetime.datetime): Last date of periods to convert. None to end at the last period
+
+        max_memory: Memory budget of the conversion in bytes or as a size such as '8G'. Blocks are limited to the
+            periods that fit in the budget, series are read in windows of periods, partitions in flight are sized
+            to fit and pages of the SWMM output file mapped by the native engine are released once converted.
+            Chunk sizes are planned to fit the chunk caches of the budget when they are not given. None for no limit
+
+        prefetch (int): Number of blocks read ahead on a background thread into reusable buffers while the previous
+            block is written, overlapping reads of the SWMM output file with netCDF writes. Blocks of periods are
+            read instead of series. 0 to read and write in turn
+
+        aggregation_windows: Lengths of windows to compute statistics over, in seconds or with an s, min, h or d
+            suffix such as 1h or 1d. Statistics are computed in the same pass as the timeseries, reading blocks of
+            periods instead of series, and written to an aggregate_<window> group per window length
+
+        aggregations: Statistics computed over each window. 'mean', 'min', 'max', 'sum' or 'volume', which
+            integrates rates over the window
+
+        summary (bool): Write the maximum, time of maximum, minimum, mean, volume and number of nonzero periods of
+            each element and attribute to variables such as node_max, computed in the same pass as the timeseries
+            by reading blocks of periods
+
+        raw (bool): Write the timeseries variables. False to write only the statistics of aggregation_windows and
+            summary
+
+        skip_constant (bool): Find the series whose value does not change over the converted periods, such as
+            concentrations of pollutants that never reach an element, in a pass before conversion. Their values are
+            written to variables such as node_constant and they are left unwritten where they fill whole chunks of
+            the timeseries variables, or whole series when reading by series, so that they take no space. Unwritten
+            series read as fill values and are restored by swmmtonetcdf.constant.read_timeseries
+
+        drop_constant (bool): Drop the attributes whose series are constant for every element from the timeseries
+            variables. Their names and values are written to variables such as node_constant_attribute_names and
+            node_constant_attribute_values
+
+        inp_file (str): SWMM input filepath of the model to write node coordinates, link lines and subcatchment
+            polygons from. None to write no geometry
+
+        projection (str): EPSG code, WKT, or path of a .prj file of the coordinates of inp_file
+
+        sidecar (bool): Read element names and reporting periods from the index persisted next to the SWMM output
+            file when reading through swmm.toolkit.output, and persist the index when it is missing or stale. Worker
+            processes share the index persisted by this process
+
+        progress: Callback called with the number of completed and total units of work (attributes when reading by
+            series, blocks of periods or partitions) after each unit is committed
+
+    Returns:
+        ConversionStats: Phase timings, bytes read and written, and progress of the conversion
+    """
+    stats = ConversionStats(progress)
+    datatype = get_datatype(precision)
+
+    if layout not in LAYOUTS:
+        raise ValueError(f'Unknown layout {layout}. Expected one of {LAYOUTS}')
+    elif layout != 'series':
+        # reading series would write each time-major chunk once per element
+        read_by_series = False
+
+    if checkpoint_interval is None:
+        checkpoint_interval = 1 if resume else 0
+    elif checkpoint_interval < 0:
+        raise ValueError(f'Checkpoint interval must not be negative, not {checkpoint_interval}')
+    elif resume and not checkpoint_interval:
+        raise ValueError('Resuming a conversion requires a positive checkpoint interval')
+
+    if prefetch < 0:
+        raise ValueError(f'Number of blocks to prefetch must not be negative, not {prefetch}')
+    elif prefetch > 0 and workers > 1:
+        raise ValueError('Prefetching blocks does not apply to multiple workers, which read partitions ahead')
+    elif prefetch > 0:
+        read_by_series = False
+
+    if not raw and not aggregation_windows and not summary:
+        raise ValueError('Timeseries can only be skipped when aggregation windows or summaries are written')
+    elif (aggregation_windows or summary) and workers > 1:
+        raise ValueError('Aggregating windows and summaries requires blocks of periods to be converted in order by '
+                         'one worker')
+    elif aggregation_windows or summary:
+        read_by_series = False
+
+    if skip_constant and workers > 1:
+        raise ValueError('Skipping constant series requires blocks of periods to be written by one worker')
+
+    if follow:
+        if engine != 'native':
+            raise ValueError('Following a SWMM output file requires the native engine')
+        elif precision == 'int16':
+            raise ValueError('Packing requires the range of complete results and cannot be used when following')
+        elif workers > 1:
+            raise ValueError('Following a SWMM output file does not support multiple workers')
+        elif resume:
+            raise ValueError('Following a SWMM output file cannot resume a conversion')
+        elif start_date is not None or end_date is not None:
+            raise ValueError('Following a SWMM output file does not support a time window')
+        elif skip_constant or drop_constant:
+            raise ValueError('Constant series are found from complete results and cannot be found when following')
+
+        swmm_output = wait_for_swmm_output(swmm_output_file, poll_interval, follow_timeout)
+    else:
+        swmm_output = open_swmm_output(swmm_output_file=swmm_output_file, engine=engine, sidecar=sidecar)
+
+    selection = select_conversion(swmm_output, elements, attributes, start_date, end_date)
+    constant_values = {}
+    dropped_attributes = {}
+
+    if skip_constant or drop_constant:
+        with stats.phase('read'):
+            constant_values = {
+                element_type.value: find_constant_series(swmm_output, element_type, len(attribute_names),
+                                                         selection.subset.end_period - selection.subset.start_period,
+                                                         block_size, selection.subset)
+                for element_type, attribute_names in (
+                    (shared_enum.ElementType.SUBCATCH, selection.catchment_attributes),
+                    (shared_enum.ElementType.NODE, selection.node_attributes),
+                    (shared_enum.ElementType.LINK, selection.link_attributes),
+                    (shared_enum.ElementType.SYSTEM, selection.system_attributes))
+            }
+
+        if drop_constant:
+            selection, constant_values, dropped_attributes = select_varying_attributes(selection, constant_values)
+
+        if not skip_constant:
+            constant_values = {}
+
+    subset = selection.subset
+    nodes, links, catchments = selection.nodes, selection.links, selection.catchments
+    pollutants_names = selection.pollutant_names
+
+    # output size
+    start_period, end_period = subset.start_period, subset.end_period
+    num_steps = end_period - start_period
+    planned_steps = FOLLOW_PLANNING_PERIODS if follow else num_steps
+
+    catchment_attribute_indexes = subset.attribute_indexes[shared_enum.ElementType.SUBCATCH.value]
+    catchment_attributes = selection.catchment_attributes
+    num_catchment_attributes = len(catchment_attributes)
+
+    node_attribute_indexes = subset.attribute_indexes[shared_enum.ElementType.NODE.value]
+    node_attributes = selection.node_attributes
+    num_node_attributes = len(node_attributes)
+
+    link_attribute_indexes = subset.attribute_indexes[shared_enum.ElementType.LINK.value]
+    link_attributes = selection.link_attributes
+    num_link_attributes = len(link_attributes)
+
+    system_attribute_indexes = subset.attribute_indexes[shared_enum.ElementType.SYSTEM.value]
+    system_attributes = selection.system_attributes
+    num_system_attributes = len(system_attributes)
+
+    catchment_digits = get_least_significant_digits(least_significant_digit, catchment_attributes, pollutants_names)
+    node_digits = get_least_significant_digits(least_significant_digit, node_attributes, pollutants_names)
+    link_digits = get_least_significant_digits(least_significant_digit, link_attributes, pollutants_names)
+    system_digits = get_least_significant_digits(least_significant_digit, system_attributes)
+
+    # constant series are quantized as they would have been written
+    for element_type, digits in ((shared_enum.ElementType.SUBCATCH, catchment_digits),
+                                 (shared_enum.ElementType.NODE, node_digits),
+                                 (shared_enum.ElementType.LINK, link_digits),
+                                 (shared_enum.ElementType.SYSTEM, system_digits)):
+        if element_type.value in constant_values:
+            values = constant_values[element_type.value]
+            quantize_attributes(values, digits, axis=values.ndim - 1)
+
+    windows = get_aggregation_windows(aggregation_windows, swmm_output.report_step)
+
+    memory_plan = None
+    series_window = max(num_steps, 1)
+    series_values = DEFAULT_SERIES_VALUES
+    partition_bytes = DEFAULT_PARTITION_BYTES
+    chunk_bytes = DEFAULT_CHUNK_BYTES
+
+    if max_memory is not None:
+        memory_plan = plan_memory(
+            max_memory=parse_memory_size(max_memory),
+            period_values=max(len(catchments) * num_catchment_attributes, len(nodes) * num_node_attributes,
+                              len(links) * num_link_attributes, num_system_attributes),
+            record_bytes=swmm_output.record_dtype.itemsize if isinstance(swmm_output, SwmmOutputReader) else 0,
+            num_steps=num_steps,
+            num_variables=4 * len(get_layout_variables('', layout)),
+            workers=workers,
+            block_size=block_size,
+            prefetch_bytes=(prefetch + 1) * 4 * (len(catchments) * num_catchment_attributes +
+                                                 len(nodes) * num_node_attributes + len(links) * num_link_attributes +
+                                                 num_system_attributes) if prefetch > 0 else 0
+        )
+        block_size, series_window, series_values, partition_bytes = \
+            memory_plan.block_size, memory_plan.series_window, memory_plan.series_values, memory_plan.partition_bytes
+
+        # library default chunks along the unlimited time dimension hold a single period, so the chunk index
+        # would grow with the number of periods. Planned chunks fit in the chunk cache of their variable
+        chunk_sizes = 'auto' if chunk_sizes is None else chunk_sizes
+        chunk_bytes = min(DEFAULT_CHUNK_BYTES, memory_plan.chunk_cache_bytes)
+
+    if workers > 1:
+        checkpoint_options = dict(mode='parallel',
+                                  partition_by='time' if engine == 'native' or layout != 'series' else 'element')
+
+        if memory_plan is not None:
+            checkpoint_options.update(partition_bytes=partition_bytes)
+    elif read_by_series:
+        checkpoint_options = dict(mode='series')
+    else:
+        checkpoint_options = dict(mode='block', block_size=block_size)
+
+    checkpoint_options.update(layout=layout, precision=precision, least_significant_digit=least_significant_digit,
+                              elements={name: element_selection if isinstance(element_selection, str)
+                                        else list(element_selection)
+                                        for name, element_selection in (elements or {}).items()},
+                              attributes=None if attributes is None else list(attributes),
+                              start_period=start_period, end_period=end_period)
+
+    if windows:
+        checkpoint_options.update(aggregation_windows=[seconds for seconds, _ in windows],
+                                  aggregations=list(aggregations), raw=raw)
+
+    if summary:
+        checkpoint_options.update(summary=summary, raw=raw)
+
+    if skip_constant or drop_constant:
+        checkpoint_options.update(skip_constant=skip_constant, drop_constant=drop_constant)
+    committed = read_checkpoint(netcdf_output_file, swmm_output_file, checkpoint_options) if resume else None
+
+    if committed is None:
+        netcdf_output = nc.Dataset(netcdf_output_file, mode='w', format="NETCDF4")
+        write_source_signature(netcdf_output, swmm_output_file)
+
+        nc_variables = define_netcdf_output(
+            netcdf_output=netcdf_output,
+            swmm_output=swmm_output,
+            timestamps=selection.timestamps,
+            nodes=nodes,
+            links=links,
+            catchments=catchments,
+            node_attributes=node_attributes,
+            link_attributes=link_attributes,
+            catchment_attributes=catchment_attributes,
+            system_attributes=system_attributes,
+            datatype=datatype,
+            zlib=zlib,
+            complevel=complevel,
+            shuffle=shuffle,
+            chunk_sizes=chunk_sizes,
+            access_pattern=access_pattern,
+            planned_steps=planned_steps,
+            precision=precision,
+            block_size=block_size,
+            subset=subset,
+            layout=layout,
+            chunk_bytes=chunk_bytes,
+            raw=raw,
+            stats=stats
+        )
+
+        aggregation_datatype = np.float64 if precision == 'double' else np.float32
+        aggregation_groups = [
+            define_aggregation_group(
+                netcdf_output=netcdf_output,
+                seconds=seconds,
+                aggregations=aggregations,
+                timeseries=(('catchment', ('catchments', 'catchment_attributes', 'time')),
+                            ('node', ('nodes', 'node_attributes', 'time')),
+                            ('link', ('links', 'link_attributes', 'time')),
+                            ('system', ('system_attributes', 'time'))),
+                datatype=aggregation_datatype,
+                num_windows=None if follow else get_num_windows(num_steps, window_periods),
+                zlib=zlib,
+                complevel=complevel,
+                shuffle=shuffle
+            )
+            for seconds, window_periods in windows
+        ]
+
+        summary_variables = define_summary_variables(
+            netcdf_output=netcdf_output,
+            timeseries=(('catchment', ('catchments', 'catchment_attributes')),
+                        ('node', ('nodes', 'node_attributes')),
+                        ('link', ('links', 'link_attributes')),
+                        ('system', ('system_attributes',))),
+            datatype=aggregation_datatype,
+            zlib=zlib,
+            complevel=complevel,
+            shuffle=shuffle
+        ) if summary else {}
+
+        for element_type, prefix, element_dimension, attribute_dimension in (
+                (shared_enum.ElementType.SUBCATCH, 'catchment', 'catchments', 'catchment_attributes'),
+                (shared_enum.ElementType.NODE, 'node', 'nodes', 'node_attributes'),
+                (shared_enum.ElementType.LINK, 'link', 'links', 'link_attributes'),
+                (shared_enum.ElementType.SYSTEM, 'system', None, 'system_attributes')):
+            if skip_constant and raw:
+                define_constant_series(
+                    netcdf_output=netcdf_output,
+                    prefix=prefix,
+                    dimensions=(attribute_dimension,) if element_dimension is None
+                    else (element_dimension, attribute_dimension),
+                    constant_values=constant_values[element_type.value],
+                    datatype=aggregation_datatype,
+                    timeseries_variables=[nc_variables[name] for name, _ in get_layout_variables(prefix, layout)]
                 )
 
-                nc_link_timeseries[j, i, :] = np.array(link_series, dtype=np.float)
-                netcdf_output.sync()
-                j += 1
+            if drop_constant:
+                define_constant_attributes(netcdf_output, prefix, element_dimension,
+                                           *dropped_attributes[element_type.value], datatype=aggregation_datatype)
 
-        # system attributes
-        for i in range(len(system_attributes)):
-            system_attribute = system_attributes[i]
-            system_attribute_enum = shared_enum.SystemAttribute[system_attribute]
+        if inp_file is not None:
+            write_netcdf_geometry(netcdf_output, inp_file, nodes, links, catchments, projection)
+    else:
+        netcdf_output = nc.Dataset(netcdf_output_file, mode='a')
+        nc_variables = netcdf_output.variables
+
+        aggregation_groups = []
+        for seconds, _ in windows:
+            group = netcdf_output.groups[f'{AGGREGATION_GROUP_PREFIX}{get_window_label(seconds)}']
+            aggregation_groups.append((group, {prefix: {aggregation: group.variables[f'{prefix}_{aggregation}']
+                                                        for aggregation in aggregations}
+                                               for prefix in ('catchment', 'node', 'link', 'system')}))
+
+        summary_variables = get_summary_variables(netcdf_output, ('catchment', 'node', 'link', 'system')) \
+            if summary else {}
+
+    timeseries_prefixes = (
+        (shared_enum.ElementType.SUBCATCH, 'catchment', num_catchment_attributes, catchment_digits),
+        (shared_enum.ElementType.NODE, 'node', num_node_attributes, node_digits),
+        (shared_enum.ElementType.LINK, 'link', num_link_attributes, link_digits),
+        (shared_enum.ElementType.SYSTEM, 'system', num_system_attributes, system_digits)
+    )
 
-            system_series = output.get_system_series(
-                p_handle=file_handle,
-                attr=system_attribute_enum,
-                startPeriod=0,
-                endPeriod=num_steps
+    # element types with the timeseries variables of the layout each block is written to
+    timeseries = [
+        (element_type, [nc_variables[name] for name, _ in get_layout_variables(prefix, layout)] if raw else [],
+         num_attributes, digits)
+        for element_type, prefix, num_attributes, digits in timeseries_prefixes
+    ]
+
+    if memory_plan is not None:
+        for _, element_variables, _, _ in timeseries:
+            for nc_variable in element_variables:
+                nc_variable.set_var_chunk_cache(size=memory_plan.chunk_cache_bytes)
+
+    # regions of each timeseries variable written so that chunks of constant series are skipped
+    written_regions = {
+        nc_variable.name: plan_written_regions(nc_variable, constant_values.get(element_type.value))
+        for element_type, element_variables, _, _ in timeseries for nc_variable in element_variables
+    }
+
+    # per attribute int16 packing of each timeseries variable
+    variable_packing = {
+        nc_variable.name: get_variable_packing(netcdf_output, nc_variable)
+        for _, element_variables, _, _ in timeseries for nc_variable in element_variables
+    }
+
+    # statistics of each element type computed as blocks are written. Windows start at the first converted period
+    first_timestamp = selection.timestamps[0] if len(selection.timestamps) > 0 else (
+        SWMM_EPOCH + datetime.timedelta(days=swmm_output.start_date, seconds=swmm_output.report_step)).timestamp()
+    aggregators = {
+        element_type.value: [
+            WindowAggregator(group, variables[prefix], window_periods, swmm_output.report_step, first_timestamp,
+                             num_attributes)
+            for (group, variables), (_, window_periods) in zip(aggregation_groups, windows)
+        ]
+        for element_type, prefix, num_attributes, _ in timeseries_prefixes
+    }
+    summaries = {
+        element_type.value: ElementSummary(summary_variables[prefix], swmm_output.report_step, first_timestamp,
+                                           num_attributes)
+        for element_type, prefix, num_attributes, _ in timeseries_prefixes if summary
+    }
+
+    def write_block(element_type, element_variables: List[nc.Variable], block: np.ndarray, block_start: int,
+                    num_attributes: int, digits: Sequence[Union[int, None]]):
+        stats.bytes_read += block.nbytes
+
+        for aggregator in aggregators[element_type.value]:
+            with stats.phase('transpose'):
+                aggregator.add(block_start, block)
+
+        if summary:
+            with stats.phase('transpose'):
+                summaries[element_type.value].add(block_start, block)
+
+        for nc_variable in element_variables:
+            write_timeseries_block(
+                nc_variable=nc_variable,
+                block=block,
+                start_period=block_start,
+                num_attributes=num_attributes,
+                least_significant_digits=digits,
+                stats=stats,
+                regions=written_regions[nc_variable.name],
+                packing=variable_packing[nc_variable.name]
             )
 
-            nc_system_timeseries[i, :] = np.array(system_series)
-            netcdf_output.sync()
+    def release_periods(block_start: int, block_end: int):
+        if memory_plan is not None:
+            swmm_output.release(subset.start_period + block_start, subset.start_period + block_end)
+
+    def write_periods(start_period: int, end_period: int):
+        for block_start in range(start_period, end_period, block_size):
+            block_end = min(block_start + block_size, end_period)
+
+            for element_type, element_variables, num_attributes, digits in timeseries:
+                with stats.phase('read'):
+                    block = get_subset_block(swmm_output, subset, element_type, block_start, block_end)
+
+                write_block(element_type, element_variables, block, block_start, num_attributes, digits)
+
+            release_periods(block_start, block_end)
+
+    checkpoint = Checkpoint(netcdf_output, checkpoint_options, committed or 0, checkpoint_interval)
+    checkpoint.save()
+
+    def commit():
+        with stats.phase('sync'):
+            checkpoint.commit()
+        stats.advance()
+
+    if checkpoint.committed and (windows or summary):
+        # statistics of windows left incomplete by the interrupted conversion are recomputed from their start and
+        # summaries from the first period
+        resume_period = min(checkpoint.committed * block_size, num_steps)
+
+        for element_type, _, _, _ in timeseries:
+            for block_start in range(0, resume_period if summary else 0, block_size):
+                with stats.phase('read'):
+                    block = get_subset_block(swmm_output, subset, element_type, block_start,
+                                             min(block_start + block_size, resume_period))
+
+                with stats.phase('transpose'):
+                    summaries[element_type.value].add(block_start, block)
+
+            for aggregator in aggregators[element_type.value]:
+                window_start = resume_period - resume_period % aggregator.window_periods
+
+                with stats.phase('read'):
+                    block = get_subset_block(swmm_output, subset, element_type, window_start, resume_period)
+
+                with stats.phase('transpose'):
+                    aggregator.add(window_start, block)
+
+    # everything up to the first unit of work, including opening and defining the output, that is not timed in
+    # another phase such as the scans of the int16 ranges and constant series
+    stats.timings['metadata'] = time.perf_counter() - stats.start_time - sum(stats.timings.values())
+
+    if workers > 1:
+        partition_by = checkpoint_options['partition_by']
+        partitions = []
+        for element_type, num_elements, num_attributes, digits in (
+                (shared_enum.ElementType.SUBCATCH, len(catchments), num_catchment_attributes, catchment_digits),
+                (shared_enum.ElementType.NODE, len(nodes), num_node_attributes, node_digits),
+                (shared_enum.ElementType.LINK, len(links), num_link_attributes, link_digits),
+                (shared_enum.ElementType.SYSTEM, 1, num_system_attributes, system_digits)):
+            partitions.extend(plan_partitions(element_type, num_elements, num_attributes, num_steps, partition_by,
+                                              digits, partition_bytes))
+
+        stats.start(len(partitions), checkpoint.committed)
+        write_partitions_parallel(
+            swmm_output_file=swmm_output_file,
+            engine=engine,
+            checkpoint=checkpoint,
+            stats=stats,
+            subset=subset,
+            partitions=[partition for partition in partitions if not checkpoint.skip()],
+            nc_variables={element_type.value: element_variables
+                          for element_type, element_variables, _, _ in timeseries},
+            workers=workers,
+            variable_packing=variable_packing,
+            sidecar=sidecar
+        )
+    elif read_by_series:
+        nc_node_timeseries = nc_variables['node_timeseries']
+        nc_link_timeseries = nc_variables['link_timeseries']
+        nc_catchment_timeseries = nc_variables['catchment_timeseries']
+        nc_system_timeseries = nc_variables['system_timeseries']
+
+        series_timeseries = (
+            (shared_enum.ElementType.SUBCATCH, nc_catchment_timeseries, list(catchments.values()),
+             catchment_attribute_indexes, catchment_digits),
+            (shared_enum.ElementType.NODE, nc_node_timeseries, list(nodes.values()), node_attribute_indexes,
+             node_digits),
+            (shared_enum.ElementType.LINK, nc_link_timeseries, list(links.values()), link_attribute_indexes,
+             link_digits),
+            (shared_enum.ElementType.SYSTEM, nc_system_timeseries, [0], system_attribute_indexes, system_digits),
+        )
+
+        stats.start(sum(len(attribute_indexes) for _, _, _, attribute_indexes, _ in series_timeseries),
+                    checkpoint.committed)
+        series_elements = max(series_values // series_window, 1)
+
+        for element_type, nc_variable, element_indexes, attribute_indexes, digits in series_timeseries:
+            element_constant_values = constant_values.get(element_type.value)
+            packing = variable_packing[nc_variable.name]
+
+            for i, attribute_index in enumerate(attribute_indexes):
+                if checkpoint.skip():
+                    continue
+
+                # series are read whole unless they do not fit in the memory budget
+                for window_start in range(0, num_steps, series_window):
+                    window_end = min(window_start + series_window, num_steps)
+
+                    # series of consecutive elements are buffered and written together as one hyperslab
+                    for element_start in range(0, len(element_indexes), series_elements):
+                        element_end = min(element_start + series_elements, len(element_indexes))
+
+                        # constant series are not read or written
+                        written = [j for j in range(element_start, element_end)
+                                   if element_constant_values is None or not np.isfinite(
+                                       element_constant_values[i] if element_type == shared_enum.ElementType.SYSTEM
+                                       else element_constant_values[j, i])]
+                        values = np.empty((len(written), window_end - window_start), dtype=np.float64)
+
+                        for k, j in enumerate(written):
+                            with stats.phase('read'):
+                                values[k] = swmm_output.get_series(
+                                    element_type=element_type,
+                                    element_index=element_indexes[j],
+                                    attribute_index=attribute_index,
+                                    start_period=subset.start_period + window_start,
+                                    end_period=subset.start_period + window_end
+                                )
+
+                        with stats.phase('transpose'):
+                            values = quantize(values, digits[i])
+
+                            if packing is not None:
+                                values = pack_attributes(values[np.newaxis], packing[0][i:i + 1],
+                                                         packing[1][i:i + 1], axis=0)[0]
+
+                        # runs of consecutive written elements
+                        for run in np.split(np.arange(len(written)), np.flatnonzero(np.diff(written) != 1) + 1):
+                            if len(run) == 0:
+                                continue
+
+                            with stats.phase('write'):
+                                if element_type == shared_enum.ElementType.SYSTEM:
+                                    nc_variable[i, window_start:window_end] = values[0]
+                                else:
+                                    nc_variable[written[run[0]]:written[run[-1]] + 1, i, window_start:window_end] = \
+                                        values[run[0]:run[-1] + 1]
+
+                        stats.bytes_read += values.size * 4
+                        stats.bytes_written += values.size * nc_variable.dtype.itemsize
+
+                    if memory_plan is not None:
+                        swmm_output.release(subset.start_period + window_start, subset.start_period + window_end)
+
+                commit()
+    elif prefetch > 0:
+        stats.start(len(range(0, num_steps, block_size)), checkpoint.committed)
+        block_windows = [(start_period, min(start_period + block_size, num_steps))
+                         for start_period in range(0, num_steps, block_size) if not checkpoint.skip()]
+
+        with BlockPrefetcher(swmm_output, subset, [element_type for element_type, _, _, _ in timeseries], block_windows,
+                             prefetch) as prefetcher:
+            blocks = iter(prefetcher)
+
+            for _ in block_windows:
+                # time spent waiting for the background thread to read the block
+                with stats.phase('read'):
+                    start_period, end_period, element_blocks = next(blocks)
+
+                for (element_type, element_variables, num_attributes, digits), block in zip(timeseries,
+                                                                                             element_blocks):
+                    write_block(element_type, element_variables, block, start_period, num_attributes, digits)
+
+                release_periods(start_period, end_period)
+                commit()
     else:
-        for t in range(num_steps):
-            # catchment attributes
-            for j in range(num_catchments):
-                catchment_results = output.get_subcatch_result(p_handle=file_handle, timeIndex=t, subcatchIndex=j)
-                nc_catchment_timeseries[j, :, t] = np.array(catchment_results[0:num_catchment_attributes],
-                                                            dtype=np.float)
-
-            # node attributes
-            for j in range(num_nodes):
-                node_results = output.get_node_result(p_handle=file_handle, timeIndex=t, nodeIndex=j)
-                nc_node_timeseries[j, :, t] = np.array(node_results[0:num_node_attributes], dtype=np.float)
-
-            # link attributes
-            for j in range(num_links):
-                link_results = output.get_link_result(p_handle=file_handle, timeIndex=t, linkIndex=j)
-                nc_link_timeseries[j, :, t] = np.array(link_results[0:num_link_attributes], dtype=np.float)
-
-            # system attributes
-            system_results = output.get_system_result(p_handle=file_handle, timeIndex=t, dummyIndex=0)
-            nc_system_timeseries[:, t] = np.array(system_results[0:num_system_attributes], dtype=np.float)
-
-            if t % 5000 == 0:
-                netcdf_output.sync()
-
-            progress = int(t * 100 / num_steps)
-            print(rf'Progress: {progress}%/{100}', end='\r')
-
-    netcdf_output.close()
-    output.close(file_handle)
+        stats.start(len(range(0, num_steps, block_size)), checkpoint.committed)
+
+        for start_period in range(0, num_steps, block_size):
+            if checkpoint.skip():
+                continue
+
+            end_period = min(start_period + block_size, num_steps)
+            write_periods(start_period, end_period)
+
+            commit()
+
+    if follow:
+        netcdf_output.source_complete = int(follow_swmm_output(
+            swmm_output=swmm_output,
+            netcdf_output=netcdf_output,
+            start_period=num_steps,
+            write_periods=write_periods,
+            poll_interval=poll_interval,
+            timeout=follow_timeout
+        ))
+
+    for element_aggregators in aggregators.values():
+        for aggregator in element_aggregators:
+            with stats.phase('write'):
+                aggregator.finish()
+
+    for element_summary in summaries.values():
+        with stats.phase('write'):
+            element_summary.finish()
+
+    with stats.phase('sync'):
+        # source signature used to detect up to date conversions
+        write_source_signature(netcdf_output, swmm_output_file)
+        checkpoint.finish()
+
+        netcdf_output.close()
+
+    swmm_output.close()
+    stats.finish()
+
+    return stats
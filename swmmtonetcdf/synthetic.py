@@ -0,0 +1,197 @@
+# python imports
+import datetime
+import struct
+
+# external imports
+import numpy as np
+
+# local imports
+from swmmtonetcdf.reader import MAGIC_NUMBER, NUM_OPENING_RECORDS, RECORD_SIZE, SWMM_EPOCH
+
+# Version and flow units (CMS) written to synthetic output files
+SYNTHETIC_VERSION = 51015
+SYNTHETIC_FLOW_UNITS = 3
+
+# Number of reporting variables of each element type before pollutants and of the system
+NUM_SUBCATCHMENT_VARIABLES = 8
+NUM_NODE_VARIABLES = 6
+NUM_LINK_VARIABLES = 5
+NUM_SYSTEM_VARIABLES = 15
+
+
+def pack_ints(*values: int) -> bytes:
+    """
+    Packs 4 byte integer records
+    Args:
+        *values: Integers to pack
+
+    Returns:
+        Packed records
+    """
+    return struct.pack(f'<{len(values)}i', *values)
+
+
+def get_synthetic_hydrograph(num_periods: int, start_period: int = 0, end_period: int = None,
+                             storm_periods: int = 288) -> np.ndarray:
+    """
+    Get a dimensionless hydrograph of recurring storms that rise and recede smoothly between dry periods
+    Args:
+        num_periods (int): Number of periods of the run
+        start_period (int): First period
+        end_period (int): Period after last period. None for num_periods
+        storm_periods (int): Periods between storm peaks
+
+    Returns:
+        Hydrograph values between 0 and 1 for each period
+    """
+    end_period = num_periods if end_period is None else end_period
+    phase = (np.arange(start_period, end_period) % storm_periods) / storm_periods
+
+    return np.exp(-((phase - 0.25) / 0.08) ** 2)
+
+
+def write_synthetic_swmm_output(swmm_output_file: str, num_subcatchments: int = 10, num_nodes: int = 10,
+                                num_links: int = 10, num_pollutants: int = 0, num_periods: int = 100,
+                                report_step: int = 300, start_date: datetime.datetime = datetime.datetime(2020, 1, 1),
+                                seed: int = 0, block_size: int = 1024) -> int:
+    """
+    Writes a valid SWMM binary output file of a synthetic model. Results follow recurring storm hydrographs
+    scaled per element and attribute with a small amount of noise so that conversions and compression behave
+    as they would on simulated results. Files are written in blocks of periods so that models larger than memory
+    can be generated.
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        num_subcatchments (int): Number of subcatchments
+        num_nodes (int): Number of nodes
+        num_links (int): Number of links
+        num_pollutants (int): Number of pollutants
+        num_periods (int): Number of reporting periods
+        report_step (int): Reporting time step in seconds
+        start_date (datetime.datetime): Start date of the run
+        seed (int): Seed of the random number generator
+        block_size (int): Number of periods generated and written per block
+
+    Returns:
+        Size of the output file in bytes
+    """
+    rng = np.random.default_rng(seed)
+    counts = (num_subcatchments, num_nodes, num_links)
+    num_variables = (NUM_SUBCATCHMENT_VARIABLES + num_pollutants, NUM_NODE_VARIABLES + num_pollutants,
+                     NUM_LINK_VARIABLES + num_pollutants)
+
+    record_dtype = np.dtype([
+        ('date', '<f8'),
+        ('subcatchments', '<f4', (num_subcatchments, num_variables[0])),
+        ('nodes', '<f4', (num_nodes, num_variables[1])),
+        ('links', '<f4', (num_links, num_variables[2])),
+        ('system', '<f4', (NUM_SYSTEM_VARIABLES,)),
+    ])
+
+    # per element and attribute peaks of the hydrograph and dry weather base values
+    scales = {field: rng.lognormal(mean=0.0, sigma=1.0, size=shape).astype(np.float32)
+              for field, shape in (('subcatchments', (num_subcatchments, num_variables[0])),
+                                   ('nodes', (num_nodes, num_variables[1])),
+                                   ('links', (num_links, num_variables[2])),
+                                   ('system', (NUM_SYSTEM_VARIABLES,)))}
+    bases = {field: 0.05 * scale for field, scale in scales.items()}
+
+    with open(swmm_output_file, 'wb') as f:
+        f.write(pack_ints(MAGIC_NUMBER, SYNTHETIC_VERSION, SYNTHETIC_FLOW_UNITS, num_subcatchments, num_nodes,
+                          num_links, num_pollutants))
+
+        # element names
+        id_position = NUM_OPENING_RECORDS * RECORD_SIZE
+        for prefix, count in (('S', num_subcatchments), ('J', num_nodes), ('C', num_links), ('P', num_pollutants)):
+            for i in range(count):
+                name = f'{prefix}{i + 1}'.encode('utf-8')
+                f.write(pack_ints(len(name)) + name)
+
+        # pollutant units in mg/L
+        f.write(pack_ints(*[0] * num_pollutants))
+
+        # input properties: subcatchment area, node type, invert and maximum depth, and link type, offsets,
+        # maximum depth and length
+        properties_position = f.tell()
+        f.write(pack_ints(1, 1))
+        np.full(num_subcatchments, 10.0, dtype='<f4').tofile(f)
+        f.write(pack_ints(3, 0, 2, 3))
+        np.tile(np.array([0.0, 100.0, 5.0], dtype='<f4'), num_nodes).tofile(f)
+        f.write(pack_ints(5, 0, 4, 4, 3, 5))
+        np.tile(np.array([0.0, 0.0, 0.0, 1.0, 100.0], dtype='<f4'), num_links).tofile(f)
+
+        # reporting variables
+        for count in num_variables + (NUM_SYSTEM_VARIABLES,):
+            f.write(pack_ints(count, *range(count)))
+
+        start_days = (start_date - SWMM_EPOCH).total_seconds() / 86400.0
+        f.write(struct.pack('<d', start_days) + pack_ints(report_step))
+
+        # period records
+        output_start_position = f.tell()
+        for start_period in range(0, num_periods, block_size):
+            end_period = min(start_period + block_size, num_periods)
+            hydrograph = get_synthetic_hydrograph(num_periods, start_period, end_period).astype(np.float32)
+
+            records = np.zeros(end_period - start_period, dtype=record_dtype)
+            records['date'] = start_days + np.arange(start_period + 1, end_period + 1) * report_step / 86400.0
+
+            for field, scale in scales.items():
+                shape = (-1,) + (1,) * scale.ndim
+                noise = rng.random(size=records[field].shape, dtype=np.float32)
+                records[field] = bases[field] + scale * (hydrograph.reshape(shape) + 0.01 * noise)
+
+            records.tofile(f)
+
+        f.write(pack_ints(id_position, properties_position, output_start_position, num_periods, 0, MAGIC_NUMBER))
+
+        return f.tell()
+
+
+def write_synthetic_swmm_input(inp_file: str, num_subcatchments: int = 10, num_nodes: int = 10, num_links: int = 10,
+                               vertices_per_link: int = 0, polygon_points: int = 4, seed: int = 0):
+    """
+    Writes the network and geometry sections of a SWMM input file of the synthetic model of
+    write_synthetic_swmm_output. Nodes lie on a line, each link connects a node to the next one through random
+    vertices and each subcatchment is a regular polygon around a node
+    Args:
+        inp_file (str): SWMM input filepath
+        num_subcatchments (int): Number of subcatchments
+        num_nodes (int): Number of nodes
+        num_links (int): Number of links
+        vertices_per_link (int): Number of vertices of each link
+        polygon_points (int): Number of points of each subcatchment polygon
+        seed (int): Seed of the random number generator
+    """
+    rng = np.random.default_rng(seed)
+    node_x, node_y = np.arange(num_nodes) * 100.0, np.zeros(num_nodes)
+
+    def write_section(f, section: str, header: str, names, *columns):
+        f.write(f'[{section}]\n;;{header}\n')
+        f.writelines(f'{name} ' + ' '.join(str(column[i]) for column in columns) + '\n'
+                     for i, name in enumerate(names))
+        f.write('\n')
+
+    with open(inp_file, 'w') as f:
+        f.write('[TITLE]\n;;Synthetic model\n\n')
+        write_section(f, 'JUNCTIONS', 'Name Elevation MaxDepth', [f'J{i + 1}' for i in range(num_nodes)],
+                      [0.0] * num_nodes, [5.0] * num_nodes)
+
+        inlets = np.arange(num_links) % num_nodes
+        outlets = (inlets + 1) % num_nodes
+        write_section(f, 'CONDUITS', 'Name FromNode ToNode Length Roughness',
+                      [f'C{i + 1}' for i in range(num_links)], [f'J{i + 1}' for i in inlets],
+                      [f'J{i + 1}' for i in outlets], [100.0] * num_links, [0.01] * num_links)
+
+        write_section(f, 'COORDINATES', 'Node X-Coord Y-Coord', [f'J{i + 1}' for i in range(num_nodes)], node_x,
+                      node_y)
+
+        vertex_links = np.repeat(np.arange(num_links), vertices_per_link)
+        write_section(f, 'VERTICES', 'Link X-Coord Y-Coord', [f'C{i + 1}' for i in vertex_links],
+                      node_x[inlets[vertex_links]] + rng.random(len(vertex_links)) * 100.0,
+                      rng.random(len(vertex_links)) * 10.0)
+
+        polygon_catchments = np.repeat(np.arange(num_subcatchments), polygon_points)
+        angles = np.tile(np.arange(polygon_points) * 2 * np.pi / max(polygon_points, 1), num_subcatchments)
+        center_x = (polygon_catchments % max(num_nodes, 1)) * 100.0
+        write_section(f, 'Polygons', 'Subcatchment X-Coord Y-Coord', [f'S{i + 1}' for i in polygon_catchments],
+                      center_x + 40.0 * np.cos(angles), 40.0 * np.sin(angles))
@@ -0,0 +1,96 @@
+# python imports
+import datetime
+import struct
+import time
+from typing import Callable, Sequence, Union
+
+# external imports
+import cftime
+import netCDF4 as nc
+
+# local imports
+from swmmtonetcdf.reader import SwmmOutputReader
+
+# Number of periods assumed when planning chunk sizes of an output file that is still growing
+FOLLOW_PLANNING_PERIODS = 2 ** 31 - 1
+
+
+def wait_for_swmm_output(swmm_output_file: str, poll_interval: float = 5.0,
+                         timeout: Union[float, None] = None) -> SwmmOutputReader:
+    """
+    Opens a SWMM output file that SWMM is still writing, waiting until it exists and its header is complete
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        poll_interval (float): Seconds between attempts to open the output file
+        timeout (float): Seconds to wait before giving up. None to wait indefinitely
+
+    Returns:
+        Partial SWMM output reader
+    """
+    start = time.monotonic()
+
+    while True:
+        try:
+            return SwmmOutputReader(swmm_output_file, partial=True)
+        except (OSError, ValueError, struct.error):
+            if timeout is not None and time.monotonic() - start >= timeout:
+                raise
+
+        time.sleep(poll_interval)
+
+
+def append_time(nc_time_variable: nc.Variable, timestamps: Sequence[float], start_period: int):
+    """
+    Appends timestamps to the netCDF time variable
+    Args:
+        nc_time_variable (nc.Variable): NetCDF time variable
+        timestamps: POSIX timestamps of periods to append
+        start_period (int): Period of first timestamp
+    """
+    nc_time_variable[start_period:start_period + len(timestamps)] = cftime.date2num(
+        [datetime.datetime.fromtimestamp(t) for t in timestamps],
+        units=nc_time_variable.units,
+        calendar=nc_time_variable.calendar
+    )
+
+
+def follow_swmm_output(swmm_output: SwmmOutputReader, netcdf_output: nc.Dataset, start_period: int,
+                       write_periods: Callable[[int, int], None], poll_interval: float = 5.0,
+                       timeout: Union[float, None] = None) -> bool:
+    """
+    Polls a growing SWMM output file and appends newly completed periods to the netCDF time axis until SWMM
+    writes the closing records. The netCDF file is synced after each append so that readers reopening it see
+    the partial results.
+    Args:
+        swmm_output (SwmmOutputReader): Partial SWMM output reader
+        netcdf_output (nc.Dataset): NetCDF dataset
+        start_period (int): Number of periods already written
+        write_periods (Callable): Writes timeseries of all element types for a window of periods given the first
+            period and the period after the last period
+        poll_interval (float): Seconds between polls of the output file
+        timeout (float): Seconds without new periods before giving up. None to wait indefinitely
+
+    Returns:
+        True if the output file was completed, False if the timeout elapsed first
+    """
+    nc_time_variable = netcdf_output.variables['time']
+    last_growth = time.monotonic()
+
+    while True:
+        num_periods = swmm_output.refresh()
+
+        if num_periods > start_period:
+            dates = swmm_output.get_dates()
+            append_time(nc_time_variable, dates[start_period:num_periods], start_period)
+            write_periods(start_period, num_periods)
+            netcdf_output.sync()
+
+            start_period = num_periods
+            last_growth = time.monotonic()
+
+        if swmm_output.complete:
+            return True
+        elif timeout is not None and time.monotonic() - last_growth >= timeout:
+            return False
+
+        time.sleep(poll_interval)
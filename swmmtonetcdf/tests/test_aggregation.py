@@ -0,0 +1,149 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.aggregation import get_aggregation_windows, get_window_label, parse_window
+from swmmtonetcdf.tests.test_checkpoint import InterruptedCheckpoint
+import numpy as np
+
+import netCDF4 as nc
+
+
+def aggregate(values: np.ndarray, window_periods: int, report_step: int) -> dict:
+    """
+    Computes the statistics of windows of a (..., time) timeseries with numpy
+    """
+    windows = [values[..., start:start + window_periods] for start in range(0, values.shape[-1], window_periods)]
+
+    return {
+        'mean': np.stack([window.mean(axis=-1) for window in windows], axis=-1),
+        'min': np.stack([window.min(axis=-1) for window in windows], axis=-1),
+        'max': np.stack([window.max(axis=-1) for window in windows], axis=-1),
+        'sum': np.stack([window.sum(axis=-1) for window in windows], axis=-1),
+        'volume': np.stack([window.sum(axis=-1) * report_step for window in windows], axis=-1),
+    }
+
+
+class TestAggregationWindows(unittest.TestCase):
+
+    def test_parse_window(self):
+        self.assertEqual(parse_window('15min'), 900)
+        self.assertEqual(parse_window('1D'), 86400)
+        self.assertEqual(parse_window('300'), 300)
+        self.assertEqual(parse_window(7200), 7200)
+        self.assertRaises(ValueError, parse_window, '1 fortnight')
+        self.assertRaises(ValueError, parse_window, '0h')
+
+    def test_window_label(self):
+        self.assertEqual(get_window_label(86400), '1d')
+        self.assertEqual(get_window_label(7 * 3600), '7h')
+        self.assertEqual(get_window_label(900), '15min')
+        self.assertEqual(get_window_label(90), '90s')
+
+    def test_aggregation_windows(self):
+        self.assertEqual(get_aggregation_windows(['1d', '1h', '3600'], 300), [(3600, 12), (86400, 288)])
+        self.assertRaises(ValueError, get_aggregation_windows, ['7min'], 300)
+
+
+class TestSWMMtoNetCDFAggregation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.reference_file = self.get_path('reference.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, self.reference_file, engine='native')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def assert_aggregations(self, netcdf_file: str, windows=((3600, 12), (7 * 3600, 84)),
+                            aggregations=('mean', 'min', 'max', 'sum', 'volume')):
+        with nc.Dataset(self.reference_file, mode='r') as reference, nc.Dataset(netcdf_file, mode='r') as output:
+            times = reference.variables['time'][:]
+            report_step = 300
+
+            for seconds, window_periods in windows:
+                group = output.groups[f'aggregate_{get_window_label(seconds)}']
+                self.assertEqual(group.window_seconds, seconds)
+
+                # windows start one reporting time step before their first period
+                starts = times[::window_periods] - report_step / 3600
+                np.testing.assert_allclose(group.variables['time'][:], starts)
+                np.testing.assert_allclose(group.variables['time_bounds'][:, 0], starts)
+                np.testing.assert_allclose(group.variables['time_bounds'][-1, 1], times[-1])
+
+                for prefix in ('catchment', 'node', 'link', 'system'):
+                    expected = aggregate(reference.variables[f'{prefix}_timeseries'][:], window_periods, report_step)
+
+                    for aggregation in aggregations:
+                        np.testing.assert_allclose(group.variables[f'{prefix}_{aggregation}'][:],
+                                                   expected[aggregation], rtol=1e-12)
+
+    def test_aggregation(self):
+        # blocks do not line up with windows and the last 7h window is not complete
+        for name, options in (('block', dict(read_by_series=False, block_size=50, engine='native')),
+                              ('toolkit', dict(block_size=1000)),
+                              ('prefetch', dict(block_size=50, prefetch=2, engine='native'))):
+            netcdf_file = self.get_path(f'aggregation_{name}.nc')
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, aggregation_windows=['7h', 3600],
+                                    aggregations=['mean', 'min', 'max', 'sum', 'volume'], **options)
+
+            self.assert_aggregations(netcdf_file)
+
+            with nc.Dataset(self.reference_file, mode='r') as reference, \
+                    nc.Dataset(netcdf_file, mode='r') as output:
+                np.testing.assert_array_equal(output.variables['node_timeseries'][:],
+                                              reference.variables['node_timeseries'][:])
+
+    def test_statistics_only(self):
+        netcdf_file = self.get_path('aggregation_statistics.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, engine='native', aggregation_windows=['1h'], raw=False)
+
+        with nc.Dataset(netcdf_file, mode='r') as output:
+            self.assertFalse([variable for variable in output.variables if variable.endswith('_timeseries')])
+            self.assertEqual(set(output.groups['aggregate_1h'].variables),
+                             {'time', 'time_bounds'} | {f'{prefix}_{aggregation}'
+                                                        for prefix in ('catchment', 'node', 'link', 'system')
+                                                        for aggregation in ('mean', 'min', 'max')})
+
+        self.assert_aggregations(netcdf_file, windows=((3600, 12),), aggregations=('mean', 'min', 'max'))
+
+        self.assertRaises(ValueError, create_netcdf_from_swmm, TRIVIAL_OUTPUT, netcdf_file, raw=False)
+        self.assertRaises(ValueError, create_netcdf_from_swmm, TRIVIAL_OUTPUT, netcdf_file,
+                          aggregation_windows=['1h'], workers=2)
+        self.assertRaises(ValueError, create_netcdf_from_swmm, TRIVIAL_OUTPUT, netcdf_file,
+                          aggregation_windows=['1h'], aggregations=['median'])
+
+    def test_subset_aggregation(self):
+        netcdf_file = self.get_path('aggregation_subset.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, engine='native', elements={'links': ['C13', 'C17']},
+                                attributes=['FLOW_RATE', 'RAINFALL'], start_date=datetime.datetime(2019, 4, 1, 3),
+                                aggregation_windows=['1h'])
+
+        with nc.Dataset(netcdf_file, mode='r') as output:
+            group = output.groups['aggregate_1h']
+            expected = aggregate(output.variables['link_timeseries'][:], 12, 300)
+
+            np.testing.assert_allclose(group.variables['link_mean'][:], expected['mean'], rtol=1e-12)
+            np.testing.assert_allclose(group.variables['time'][0], output.variables['time'][0] - 300 / 3600)
+
+    def test_resume_aggregation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            netcdf_file = os.path.join(directory, 'resumed.nc')
+            options = dict(engine='native', read_by_series=False, block_size=1000, aggregation_windows=['7h', '1h'],
+                           checkpoint_interval=1,
+                           aggregations=['mean', 'min', 'max', 'sum', 'volume'])
+
+            # the interrupted conversion stops within a 7h window
+            with mock.patch('swmmtonetcdf.swmmtonetcdf.Checkpoint', InterruptedCheckpoint):
+                with self.assertRaises(RuntimeError):
+                    create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, **options)
+
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, resume=True, **options)
+
+            self.assert_aggregations(netcdf_file)
@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf.batch import ConversionJob, convert_batch, find_conversion_jobs, is_up_to_date
+
+
+class TestBatchConversion(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        for name in ('scenario_a.out', 'scenario_b.out'):
+            shutil.copyfile(TRIVIAL_OUTPUT, os.path.join(self.directory, name))
+
+    def test_find_conversion_jobs(self):
+        manifest_file = os.path.join(self.directory, 'manifest.txt')
+        with open(manifest_file, 'w') as f:
+            f.write('# scenarios\n')
+            f.write('scenario_a.out, renamed.nc\n')
+            f.write('\n')
+
+        jobs = find_conversion_jobs([manifest_file, self.directory])
+        self.assertEqual(jobs, [
+            ConversionJob(os.path.join(self.directory, 'scenario_a.out'), os.path.join(self.directory, 'renamed.nc')),
+            ConversionJob(os.path.join(self.directory, 'scenario_b.out'), os.path.join(self.directory, 'scenario_b.nc')),
+        ])
+
+        output_dir = os.path.join(self.directory, 'nc')
+        jobs = find_conversion_jobs([os.path.join(self.directory, '*.out')], output_dir=output_dir)
+        self.assertEqual([job.netcdf_output_file for job in jobs],
+                         [os.path.join(output_dir, 'scenario_a.nc'), os.path.join(output_dir, 'scenario_b.nc')])
+
+    def test_convert_batch(self):
+        jobs = find_conversion_jobs([self.directory])
+        summary_file = os.path.join(self.directory, 'summary.json')
+
+        summaries = convert_batch(jobs, max_jobs=2, summary_file=summary_file, engine='native')
+        self.assertEqual([summary['status'] for summary in summaries], ['converted', 'converted'])
+        self.assertTrue(all(is_up_to_date(job.swmm_output_file, job.netcdf_output_file) for job in jobs))
+
+        with open(summary_file, 'r') as f:
+            summary = json.load(f)
+        self.assertEqual(summary['converted'], 2)
+        self.assertEqual(len(summary['jobs']), 2)
+
+        # unchanged outputs are skipped
+        summaries = convert_batch(jobs, engine='native')
+        self.assertEqual([summary['status'] for summary in summaries], ['skipped', 'skipped'])
+
+        # modified outputs are converted again
+        stat = os.stat(jobs[0].swmm_output_file)
+        os.utime(jobs[0].swmm_output_file, (stat.st_atime, stat.st_mtime + 10))
+        summaries = convert_batch(jobs, engine='native')
+        self.assertEqual([summary['status'] for summary in summaries], ['converted', 'skipped'])
+
+    def test_convert_batch_hash(self):
+        jobs = find_conversion_jobs([self.directory])[0:1]
+
+        summaries = convert_batch(jobs, check='hash', engine='native')
+        self.assertEqual(summaries[0]['status'], 'converted')
+
+        os.utime(jobs[0].swmm_output_file)
+        summaries = convert_batch(jobs, check='hash', engine='native')
+        self.assertEqual(summaries[0]['status'], 'skipped')
+
+    def test_convert_batch_failure(self):
+        invalid_file = os.path.join(self.directory, 'invalid.out')
+        with open(invalid_file, 'wb') as f:
+            f.write(b'\x00' * 64)
+
+        summaries = convert_batch([ConversionJob(invalid_file, os.path.join(self.directory, 'invalid.nc'))],
+                                  engine='native')
+        self.assertEqual(summaries[0]['status'], 'failed')
+        self.assertIn('ValueError', summaries[0]['error'])
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
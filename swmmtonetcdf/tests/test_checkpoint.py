@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.batch import is_up_to_date
+from swmmtonetcdf.checkpoint import CHECKPOINT_ATTRIBUTE, Checkpoint
+import numpy as np
+
+import netCDF4 as nc
+
+
+class InterruptedCheckpoint(Checkpoint):
+    """
+    Checkpoint that stops the conversion after a number of committed units
+    """
+    interrupt_after = 2
+
+    def commit(self):
+        super().commit()
+        if self.committed == InterruptedCheckpoint.interrupt_after:
+            self.netcdf_output.close()
+            raise RuntimeError('Conversion interrupted')
+
+
+class TestResumeConversion(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.swmm_output_file = os.path.join(self.directory, 'trivial.out')
+        shutil.copy2(TRIVIAL_OUTPUT, self.swmm_output_file)
+
+        self.complete_file = os.path.join(self.directory, 'complete.nc')
+        create_netcdf_from_swmm(self.swmm_output_file, self.complete_file, engine='native')
+
+    def interrupt(self, netcdf_output_file: str, **options):
+        with mock.patch('swmmtonetcdf.swmmtonetcdf.Checkpoint', InterruptedCheckpoint):
+            with self.assertRaises(RuntimeError):
+                create_netcdf_from_swmm(self.swmm_output_file, netcdf_output_file, engine='native', **options)
+
+        with nc.Dataset(netcdf_output_file, mode='r') as netcdf_output:
+            self.assertIn(CHECKPOINT_ATTRIBUTE, netcdf_output.ncattrs())
+
+        self.assertFalse(is_up_to_date(self.swmm_output_file, netcdf_output_file))
+
+    def test_resume(self):
+        for name, options in (('series', dict(read_by_series=True, checkpoint_interval=1)),
+                              ('block', dict(read_by_series=False, block_size=1000, checkpoint_interval=2)),
+                              ('parallel', dict(workers=2, checkpoint_interval=1))):
+            resumed_file = os.path.join(self.directory, f'resumed_{name}.nc')
+            self.interrupt(resumed_file, **options)
+            create_netcdf_from_swmm(self.swmm_output_file, resumed_file, engine='native', resume=True, **options)
+            self.assert_resumed(resumed_file)
+
+    def test_resume_default_interval(self):
+        resumed_file = os.path.join(self.directory, 'resumed.nc')
+        # resuming checkpoints every unit unless another interval is given
+        self.interrupt(resumed_file, resume=True)
+
+        with mock.patch('swmmtonetcdf.swmmtonetcdf.Checkpoint', wraps=Checkpoint) as checkpoint:
+            create_netcdf_from_swmm(self.swmm_output_file, resumed_file, engine='native', resume=True)
+
+        self.assertEqual(checkpoint.call_args[0][2], InterruptedCheckpoint.interrupt_after)
+        self.assert_resumed(resumed_file)
+
+        with self.assertRaises(ValueError):
+            create_netcdf_from_swmm(self.swmm_output_file, resumed_file, engine='native', resume=True,
+                                    checkpoint_interval=0)
+
+    def assert_resumed(self, resumed_file: str):
+        with nc.Dataset(self.complete_file, mode='r') as complete_output, \
+                nc.Dataset(resumed_file, mode='r') as resumed_output:
+            self.assertNotIn(CHECKPOINT_ATTRIBUTE, resumed_output.ncattrs())
+            for variable in ('time', 'node_timeseries', 'link_timeseries', 'catchment_timeseries',
+                             'system_timeseries'):
+                np.testing.assert_equal(complete_output.variables[variable][:],
+                                        resumed_output.variables[variable][:])
+
+        self.assertTrue(is_up_to_date(self.swmm_output_file, resumed_file))
+
+    def test_checkpoint_interval(self):
+        netcdf_output = mock.Mock(spec=nc.Dataset)
+        checkpoint = Checkpoint(netcdf_output, dict(mode='block'), interval=2)
+
+        for _ in range(5):
+            checkpoint.commit()
+
+        self.assertEqual(checkpoint.committed, 4)
+        self.assertEqual(netcdf_output.sync.call_count, 4)
+
+        # without checkpoints the dataset is not synced until the conversion finishes
+        netcdf_output.reset_mock()
+        checkpoint = Checkpoint(netcdf_output, dict(mode='block'))
+
+        for _ in range(5):
+            checkpoint.commit()
+
+        self.assertEqual(checkpoint.committed, 0)
+        netcdf_output.sync.assert_not_called()
+
+    def test_resume_changed_source(self):
+        resumed_file = os.path.join(self.directory, 'resumed.nc')
+        self.interrupt(resumed_file, checkpoint_interval=1)
+
+        stat = os.stat(self.swmm_output_file)
+        os.utime(self.swmm_output_file, (stat.st_atime, stat.st_mtime + 10))
+
+        with self.assertRaises(ValueError):
+            create_netcdf_from_swmm(self.swmm_output_file, resumed_file, engine='native', resume=True)
+
+    def test_resume_changed_options(self):
+        resumed_file = os.path.join(self.directory, 'resumed.nc')
+        self.interrupt(resumed_file, checkpoint_interval=1)
+
+        with self.assertRaises(ValueError):
+            create_netcdf_from_swmm(self.swmm_output_file, resumed_file, engine='native', resume=True,
+                                    read_by_series=False)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
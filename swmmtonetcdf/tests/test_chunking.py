@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.chunking import plan_chunk_sizes, get_variable_chunk_sizes, DEFAULT_CHUNK_BYTES
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestChunkPlanner(unittest.TestCase):
+
+    def test_plan_series(self):
+        element_chunk, attribute_chunk, time_chunk = plan_chunk_sizes(5000, 6, 1000000, access_pattern='series')
+        self.assertEqual((element_chunk, attribute_chunk), (1, 1))
+        self.assertEqual(time_chunk, DEFAULT_CHUNK_BYTES // 8)
+
+    def test_plan_series_whole_history(self):
+        element_chunk, attribute_chunk, time_chunk = plan_chunk_sizes(5000, 6, 1000, access_pattern='series')
+        self.assertEqual((attribute_chunk, time_chunk), (6, 1000))
+        self.assertLessEqual(element_chunk * attribute_chunk * time_chunk * 8, DEFAULT_CHUNK_BYTES)
+
+    def test_plan_snapshot(self):
+        element_chunk, attribute_chunk, time_chunk = plan_chunk_sizes(5000, 6, 100000, access_pattern='snapshot')
+        self.assertEqual((element_chunk, attribute_chunk), (5000, 6))
+        self.assertLessEqual(element_chunk * attribute_chunk * time_chunk * 8, DEFAULT_CHUNK_BYTES)
+        self.assertGreater(time_chunk, 1)
+
+    def test_plan_empty_dimensions(self):
+        self.assertEqual(plan_chunk_sizes(0, 0, 0), (1, 1, 1))
+
+    def test_variable_chunk_sizes(self):
+        self.assertIsNone(get_variable_chunk_sizes(None, 'node_timeseries', (5, 6, 10)))
+        self.assertEqual(get_variable_chunk_sizes({'node_timeseries': [1, 6, 10]}, 'node_timeseries', (5, 6, 10)),
+                         (1, 6, 10))
+        self.assertIsNone(get_variable_chunk_sizes({'node_timeseries': [1, 6, 10]}, 'link_timeseries', (5, 6, 10)))
+        self.assertEqual(len(get_variable_chunk_sizes('auto', 'system_timeseries', (15, 10))), 2)
+
+        with self.assertRaises(ValueError):
+            get_variable_chunk_sizes('other', 'node_timeseries', (5, 6, 10))
+
+        with self.assertRaises(ValueError):
+            plan_chunk_sizes(5, 6, 10, access_pattern='other')
+
+
+class TestSWMMtoNetCDFCompression(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_compressed_auto_chunks(self):
+        reference_file = self.get_path('uncompressed.nc')
+        compressed_file = self.get_path('compressed.nc')
+
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, reference_file, engine='native')
+
+        for access_pattern in ('series', 'snapshot'):
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, compressed_file, engine='native', zlib=True, complevel=5,
+                                    chunk_sizes='auto', access_pattern=access_pattern)
+
+            with nc.Dataset(reference_file, mode='r') as reference_output, \
+                    nc.Dataset(compressed_file, mode='r') as compressed_output:
+                for variable in ('node_timeseries', 'link_timeseries', 'catchment_timeseries', 'system_timeseries'):
+                    compressed_variable = compressed_output.variables[variable]
+                    self.assertTrue(compressed_variable.filters()['zlib'])
+                    self.assertEqual(compressed_variable.filters()['complevel'], 5)
+                    self.assertNotEqual(compressed_variable.chunking(), 'contiguous')
+
+                    np.testing.assert_equal(reference_output.variables[variable][:], compressed_variable[:])
+
+    def test_explicit_chunks(self):
+        chunked_file = self.get_path('chunked.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, chunked_file, engine='native',
+                                chunk_sizes={'node_timeseries': (1, 6, 512)})
+
+        with nc.Dataset(chunked_file, mode='r') as chunked_output:
+            self.assertEqual(chunked_output.variables['node_timeseries'].chunking(), [1, 6, 512])
@@ -0,0 +1,121 @@
+import datetime
+import json
+import os
+import tempfile
+import unittest
+from swmmtonetcdf import create_netcdf_from_swmm, append_netcdf_from_swmm
+from swmmtonetcdf.concat import APPENDED_FILES_ATTRIBUTE
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+import numpy as np
+
+import netCDF4 as nc
+
+START_DATE = datetime.datetime(2020, 1, 1)
+
+
+class TestSWMMAppend(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.first_run = os.path.join(self.directory.name, 'first.out')
+        self.second_run = os.path.join(self.directory.name, 'second.out')
+
+        # the second run is continued from a hot start file saved 10 periods before the end of the first run
+        write_synthetic_swmm_output(self.first_run, num_subcatchments=3, num_nodes=5, num_links=4, num_pollutants=1,
+                                    num_periods=100, start_date=START_DATE, seed=0)
+        write_synthetic_swmm_output(self.second_run, num_subcatchments=3, num_nodes=6, num_links=4, num_pollutants=1,
+                                    num_periods=50, start_date=START_DATE + datetime.timedelta(seconds=90 * 300),
+                                    seed=1)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_append_continuation(self):
+        first_file, second_file = self.get_path('first.nc'), self.get_path('second.nc')
+        create_netcdf_from_swmm(self.first_run, first_file, engine='native', layout='both')
+        create_netcdf_from_swmm(self.second_run, second_file, engine='native', layout='both',
+                                elements={'nodes': ['J1', 'J2', 'J3', 'J4', 'J5']})
+
+        with nc.Dataset(first_file, mode='r') as first, nc.Dataset(second_file, mode='r') as second:
+            expected = {name: np.concatenate((first.variables[name][:], second.variables[name][..., 10:]), axis=-1)
+                        for name in ('time', 'catchment_timeseries', 'node_timeseries', 'link_timeseries',
+                                     'system_timeseries')}
+
+        for engine in ('native', 'toolkit'):
+            netcdf_file = self.get_path(f'appended_{engine}.nc')
+            create_netcdf_from_swmm(self.first_run, netcdf_file, engine='native', layout='both')
+
+            stats = append_netcdf_from_swmm(self.second_run, netcdf_file, engine=engine, block_size=16)
+            self.assertEqual(stats.total, 3)
+
+            # appending the run again does not write any periods
+            self.assertEqual(append_netcdf_from_swmm(self.second_run, netcdf_file, engine=engine).total, 0)
+
+            with nc.Dataset(netcdf_file, mode='r') as output:
+                self.assertEqual(len(output.dimensions['time']), 140)
+                self.assertEqual(json.loads(output.getncattr(APPENDED_FILES_ATTRIBUTE)), ['second.out'])
+                np.testing.assert_allclose(output.variables['time'][:], expected['time'])
+
+                for name in ('catchment_timeseries', 'node_timeseries', 'link_timeseries', 'system_timeseries'):
+                    np.testing.assert_array_equal(output.variables[name][:], expected[name])
+                    np.testing.assert_array_equal(np.moveaxis(output.variables[name.replace('timeseries',
+                                                                                            'snapshots')][:], 0, -1),
+                                                  expected[name])
+
+    def test_append_interrupted(self):
+        netcdf_file = self.get_path('interrupted.nc')
+        create_netcdf_from_swmm(self.first_run, netcdf_file, engine='native', attributes=['TOTAL_INFLOW'],
+                                elements={'nodes': ['J4', 'J2']})
+
+        # values of a block written before its time
+        with nc.Dataset(netcdf_file, mode='a') as output:
+            output.variables['node_timeseries'][:, :, 100:116] = -1.0
+
+        append_netcdf_from_swmm(self.second_run, netcdf_file, engine='native')
+
+        reference_file = self.get_path('reference.nc')
+        create_netcdf_from_swmm(self.second_run, reference_file, engine='native', attributes=['TOTAL_INFLOW'],
+                                elements={'nodes': ['J4', 'J2']})
+
+        with nc.Dataset(netcdf_file, mode='r') as output, nc.Dataset(reference_file, mode='r') as reference:
+            self.assertEqual(len(output.variables['time']), 140)
+            self.assertFalse(np.ma.is_masked(output.variables['time'][:]))
+            np.testing.assert_array_equal(output.variables['node_timeseries'][:, :, 100:],
+                                          reference.variables['node_timeseries'][:, :, 10:])
+
+    def test_append_mismatch(self):
+        netcdf_file = self.get_path('first.nc')
+        create_netcdf_from_swmm(self.first_run, netcdf_file, engine='native')
+
+        for name, options in (('gap', dict(start_date=START_DATE + datetime.timedelta(seconds=110 * 300))),
+                              ('misaligned', dict(start_date=START_DATE + datetime.timedelta(seconds=90 * 300 + 60))),
+                              ('step', dict(start_date=START_DATE + datetime.timedelta(seconds=100 * 300),
+                                            report_step=600)),
+                              ('nodes', dict(start_date=START_DATE + datetime.timedelta(seconds=100 * 300),
+                                             num_nodes=4)),
+                              ('pollutants', dict(start_date=START_DATE + datetime.timedelta(seconds=100 * 300),
+                                                  num_pollutants=0))):
+            swmm_output_file = self.get_path(f'{name}.out')
+            write_synthetic_swmm_output(swmm_output_file, num_subcatchments=3, num_nodes=options.pop('num_nodes', 5),
+                                        num_links=4, num_pollutants=options.pop('num_pollutants', 1), num_periods=10,
+                                        **options)
+
+            self.assertRaises(ValueError, append_netcdf_from_swmm, swmm_output_file, netcdf_file, engine='native')
+
+        summary_file = self.get_path('summary.nc')
+        create_netcdf_from_swmm(self.first_run, summary_file, engine='native', summary=True)
+        self.assertRaises(ValueError, append_netcdf_from_swmm, self.second_run, summary_file, engine='native')
+
+        with nc.Dataset(netcdf_file, mode='r') as output:
+            self.assertEqual(len(output.dimensions['time']), 100)
+            self.assertNotIn(APPENDED_FILES_ATTRIBUTE, output.ncattrs())
+
+    def test_append_packed(self):
+        netcdf_file = self.get_path('packed.nc')
+        create_netcdf_from_swmm(self.first_run, netcdf_file, engine='native', precision='int16')
+
+        # the continuation run is scaled beyond the range of the first run
+        self.assertRaises(ValueError, append_netcdf_from_swmm, self.second_run, netcdf_file, engine='native')
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf import create_netcdf_from_swmm, append_netcdf_from_swmm
+from swmmtonetcdf.constant import find_constant_series, plan_written_regions, read_timeseries
+from swmmtonetcdf.reader import NODE, SYSTEM, SwmmOutputReader
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+import numpy as np
+
+import netCDF4 as nc
+
+
+def write_constant_series(swmm_output_file: str):
+    """
+    Makes pollutant P1 zero everywhere, the flooding losses of the first three nodes zero and the air temperature
+    constant in a synthetic SWMM output file
+    """
+    with SwmmOutputReader(swmm_output_file) as reader:
+        record_dtype, offset, num_periods = reader.record_dtype, reader.output_start_position, reader.num_periods
+
+    records = np.memmap(swmm_output_file, dtype=record_dtype, mode='r+', offset=offset, shape=(num_periods,))
+    records['subcatchments'][:, :, 8] = 0.0
+    records['nodes'][:, :, 6] = 0.0
+    records['nodes'][:, 0:3, 5] = 0.0
+    records['links'][:, :, 5] = 0.0
+    records['system'][:, 0] = 20.0
+    records.flush()
+    del records
+
+
+class TestConstantSeries(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.swmm_output_file = os.path.join(self.directory.name, 'constant.out')
+
+        write_synthetic_swmm_output(self.swmm_output_file, num_subcatchments=3, num_nodes=6, num_links=4,
+                                    num_pollutants=1, num_periods=100)
+        write_constant_series(self.swmm_output_file)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_find_constant_series(self):
+        with SwmmOutputReader(self.swmm_output_file) as reader:
+            node_values = find_constant_series(reader, NODE, 7, 100, block_size=16)
+            system_values = find_constant_series(reader, SYSTEM, 15, 100, block_size=16)
+
+        expected = np.full((6, 7), np.nan)
+        expected[:, 6] = 0.0
+        expected[0:3, 5] = 0.0
+        np.testing.assert_array_equal(node_values, expected)
+
+        self.assertEqual(system_values[0], 20.0)
+        self.assertTrue(np.isnan(system_values[1:]).all())
+
+    def test_plan_written_regions(self):
+        with nc.Dataset(self.get_path('regions.nc'), mode='w', diskless=True) as dataset:
+            dataset.createDimension('nodes', 6)
+            dataset.createDimension('node_attributes', 7)
+            dataset.createDimension('time', None)
+            nc_variable = dataset.createVariable('node_timeseries', np.float64, ('nodes', 'node_attributes', 'time'),
+                                                 chunksizes=(2, 2, 10))
+            nc_snapshots = dataset.createVariable('node_snapshots', np.float64, ('time', 'nodes', 'node_attributes'),
+                                                  chunksizes=(10, 6, 7))
+
+            constant_values = np.full((6, 7), np.nan)
+            self.assertIsNone(plan_written_regions(nc_variable, constant_values))
+
+            constant_values[:, 6] = 0.0
+            constant_values[0:4, 4:6] = 0.0
+
+            self.assertEqual(plan_written_regions(nc_variable, constant_values),
+                             [(slice(0, 4), slice(0, 4)), (slice(4, 6), slice(0, 6))])
+
+            # chunks of the time-major variable hold varying series
+            self.assertIsNone(plan_written_regions(nc_snapshots, constant_values))
+
+    def test_skip_constant(self):
+        reference_file = self.get_path('reference.nc')
+        create_netcdf_from_swmm(self.swmm_output_file, reference_file, engine='native', layout='both')
+
+        chunk_sizes = {f'{prefix}_timeseries': (1, 1, 100) for prefix in ('catchment', 'node', 'link')}
+        chunk_sizes.update({f'{prefix}_snapshots': (100, 1, 1) for prefix in ('catchment', 'node', 'link')})
+        chunk_sizes.update(system_timeseries=(1, 100), system_snapshots=(100, 1))
+
+        for name, options in (('series', dict(layout='series')),
+                              ('blocks', dict(layout='both', read_by_series=False, block_size=16)),
+                              ('prefetch', dict(layout='both', prefetch=2, block_size=16))):
+            netcdf_file = self.get_path(f'{name}.nc')
+            create_netcdf_from_swmm(self.swmm_output_file, netcdf_file, engine='native', chunk_sizes=chunk_sizes,
+                                    skip_constant=True, **options)
+
+            with nc.Dataset(netcdf_file, mode='r') as output, nc.Dataset(reference_file, mode='r') as reference:
+                self.assertEqual(output.variables['node_timeseries'].ancillary_variables, 'node_constant')
+
+                node_constant = output.variables['node_constant'][:]
+                self.assertEqual(int(np.ma.count(node_constant)), 9)
+                self.assertEqual(output.variables['system_constant'][0], 20.0)
+
+                # constant series read as fill values until they are restored
+                self.assertTrue(np.ma.getmaskarray(output.variables['node_timeseries'][:, 6]).all())
+
+                for variable_name in output.variables:
+                    if variable_name.endswith(('_timeseries', '_snapshots')):
+                        np.testing.assert_array_equal(read_timeseries(output, variable_name),
+                                                      reference.variables[variable_name][:])
+
+        self.assertLess(os.path.getsize(self.get_path('series.nc')), os.path.getsize(reference_file))
+
+    def test_drop_constant(self):
+        reference_file = self.get_path('reference.nc')
+        create_netcdf_from_swmm(self.swmm_output_file, reference_file, engine='native')
+
+        for name, options in (('series', dict()), ('parallel', dict(workers=2))):
+            netcdf_file = self.get_path(f'{name}.nc')
+            create_netcdf_from_swmm(self.swmm_output_file, netcdf_file, engine='native', drop_constant=True,
+                                    **options)
+
+            with nc.Dataset(netcdf_file, mode='r') as output, nc.Dataset(reference_file, mode='r') as reference:
+                for prefix, dropped in (('catchment', 8), ('node', 6), ('link', 5), ('system', 0)):
+                    reference_names = list(reference.variables[f'{prefix}_attribute_names'][:])
+                    kept = [i for i in range(len(reference_names)) if i != dropped]
+
+                    self.assertEqual(list(output.variables[f'{prefix}_attribute_names'][:]),
+                                     [reference_names[i] for i in kept])
+                    self.assertEqual(list(output.variables[f'{prefix}_constant_attribute_names'][:]),
+                                     [reference_names[dropped]])
+                    np.testing.assert_array_equal(output.variables[f'{prefix}_timeseries'][:],
+                                                  reference.variables[f'{prefix}_timeseries'][..., kept, :])
+
+                np.testing.assert_array_equal(output.variables['node_constant_attribute_values'][:], np.zeros((6, 1)))
+                self.assertEqual(output.variables['system_constant_attribute_values'][0], 20.0)
+
+    def test_constant_errors(self):
+        netcdf_file = self.get_path('constant.nc')
+
+        self.assertRaises(ValueError, create_netcdf_from_swmm, self.swmm_output_file, netcdf_file, engine='native',
+                          skip_constant=True, workers=2)
+
+        create_netcdf_from_swmm(self.swmm_output_file, netcdf_file, engine='native', skip_constant=True)
+        self.assertRaises(ValueError, append_netcdf_from_swmm, self.swmm_output_file, netcdf_file, engine='native')
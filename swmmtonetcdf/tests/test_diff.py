@@ -0,0 +1,124 @@
+import datetime
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm, create_netcdf_diff_from_swmm
+from swmmtonetcdf.diff import match_names
+from swmmtonetcdf.reader import SwmmOutputReader
+from swmmtonetcdf.subset import Subset, get_subset_block
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestMatchScenarios(unittest.TestCase):
+
+    def test_match_names(self):
+        self.assertEqual(match_names(['J1', 'J2', 'J3', 'J4'], ['J4', 'J2', 'J5', 'J1']), ([0, 1, 3], [3, 1, 0]))
+
+    def test_reordered_subset_block(self):
+        reader = SwmmOutputReader(TRIVIAL_OUTPUT)
+        block = reader.get_block(1, 0, 10)
+        subset = Subset(element_indexes={1: [4, 3, 2, 1, 0]}, attribute_indexes={1: [0, 1]}, start_period=0,
+                        end_period=10)
+
+        np.testing.assert_array_equal(get_subset_block(reader, subset, 1, 0, 10), block[:, ::-1, 0:2])
+
+
+class TestSWMMDiff(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_identical_scenarios(self):
+        netcdf_file = self.get_path('diff_identical.nc')
+        stats = create_netcdf_diff_from_swmm(TRIVIAL_OUTPUT, TRIVIAL_OUTPUT, netcdf_file, engine='native')
+        self.assertEqual(stats.completed, stats.total)
+
+        with nc.Dataset(netcdf_file, mode='r') as output:
+            self.assertEqual(len(output.variables['time']), 8640)
+
+            for prefix in ('catchment', 'node', 'link', 'system'):
+                self.assertFalse(np.any(output.variables[f'{prefix}_timeseries'][:]))
+                self.assertFalse(np.any(output.variables[f'{prefix}_abs_diff_max'][:]))
+                self.assertFalse(np.any(output.variables[f'{prefix}_abs_diff_nonzero_count'][:]))
+
+    def test_scenario_differences(self):
+        with tempfile.TemporaryDirectory() as directory:
+            base_file = os.path.join(directory, 'base.out')
+            alternative_file = os.path.join(directory, 'alternative.out')
+
+            # the alternative starts 10 periods later, drops a node and does not report the pollutant
+            write_synthetic_swmm_output(base_file, num_subcatchments=3, num_nodes=5, num_links=4, num_pollutants=1,
+                                        num_periods=200, seed=0)
+            write_synthetic_swmm_output(alternative_file, num_subcatchments=3, num_nodes=4, num_links=4,
+                                        num_periods=200, seed=1,
+                                        start_date=datetime.datetime(2020, 1, 1) + datetime.timedelta(seconds=3000))
+
+            converted = {}
+            for name, swmm_output_file in (('base', base_file), ('alternative', alternative_file)):
+                converted[name] = os.path.join(directory, f'{name}.nc')
+                create_netcdf_from_swmm(swmm_output_file, converted[name], engine='native')
+
+            for engine, layout in (('native', 'series'), ('toolkit', 'both')):
+                netcdf_file = os.path.join(directory, f'diff_{engine}.nc')
+                create_netcdf_diff_from_swmm(base_file, alternative_file, netcdf_file, engine=engine, layout=layout,
+                                             block_size=64)
+
+                with nc.Dataset(converted['base'], mode='r') as base, \
+                        nc.Dataset(converted['alternative'], mode='r') as alternative, \
+                        nc.Dataset(netcdf_file, mode='r') as output:
+                    np.testing.assert_allclose(output.variables['time'][:], base.variables['time'][10:])
+                    np.testing.assert_array_equal(output.variables['nodes'][:], alternative.variables['nodes'][:])
+                    np.testing.assert_array_equal(output.variables['node_attribute_names'][:],
+                                                  alternative.variables['node_attribute_names'][:])
+
+                    for prefix, elements in (('catchment', slice(None)), ('node', slice(0, 4)),
+                                             ('link', slice(None)), ('system', None)):
+                        base_values = base.variables[f'{prefix}_timeseries'][:]
+                        alternative_values = alternative.variables[f'{prefix}_timeseries'][:]
+
+                        if elements is None:
+                            expected = alternative_values[:, 0:190] - base_values[:, 10:]
+                        else:
+                            num_attributes = alternative_values.shape[1]
+                            expected = alternative_values[:, :, 0:190] - base_values[elements, 0:num_attributes, 10:]
+
+                        np.testing.assert_allclose(output.variables[f'{prefix}_timeseries'][:], expected)
+                        np.testing.assert_allclose(output.variables[f'{prefix}_abs_diff_max'][:],
+                                                   np.abs(expected).max(axis=-1))
+                        np.testing.assert_allclose(output.variables[f'{prefix}_abs_diff_time_of_max'][:],
+                                                   output.variables['time'][:][np.abs(expected).argmax(axis=-1)])
+                        np.testing.assert_array_equal(output.variables[f'{prefix}_abs_diff_nonzero_count'][:],
+                                                      np.count_nonzero(expected, axis=-1))
+
+                        if layout == 'both':
+                            np.testing.assert_allclose(np.moveaxis(output.variables[f'{prefix}_snapshots'][:], 0, -1),
+                                                       expected)
+
+    def test_incompatible_scenarios(self):
+        with tempfile.TemporaryDirectory() as directory:
+            netcdf_file = os.path.join(directory, 'diff.nc')
+
+            for name, options in (('step', dict(report_step=600)),
+                                  ('misaligned', dict(start_date=datetime.datetime(2020, 1, 1, 0, 1))),
+                                  ('disjoint', dict(start_date=datetime.datetime(2021, 1, 1)))):
+                alternative_file = os.path.join(directory, f'{name}.out')
+                write_synthetic_swmm_output(alternative_file, num_periods=10, **options)
+
+                base_file = os.path.join(directory, 'base.out')
+                write_synthetic_swmm_output(base_file, num_periods=10)
+
+                self.assertRaises(ValueError, create_netcdf_diff_from_swmm, base_file, alternative_file, netcdf_file,
+                                  engine='native')
+
+            self.assertRaises(ValueError, create_netcdf_diff_from_swmm, base_file, base_file, netcdf_file,
+                              precision='int16')
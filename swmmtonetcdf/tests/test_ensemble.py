@@ -0,0 +1,96 @@
+import datetime
+import os
+import tempfile
+import unittest
+from swmmtonetcdf import create_netcdf_from_swmm, create_netcdf_ensemble_from_swmm
+from swmmtonetcdf.ensemble import get_ensemble_chunk_sizes
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestSWMMEnsemble(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.members = []
+
+        for seed in range(3):
+            swmm_output_file = os.path.join(self.directory.name, f'member_{seed}.out')
+            write_synthetic_swmm_output(swmm_output_file, num_subcatchments=3, num_nodes=5, num_links=4,
+                                        num_pollutants=1, num_periods=50, seed=seed)
+            self.members.append(swmm_output_file)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_chunk_sizes(self):
+        self.assertEqual(get_ensemble_chunk_sizes('auto', 'node_timeseries', (100, 6, 1000), 10, 8, 80000),
+                         (1, 1, 10, 1000))
+        self.assertEqual(get_ensemble_chunk_sizes('auto', 'system_timeseries', (15, 10000), 100, 4, 400000),
+                         (1, 100, 1000))
+        self.assertIsNone(get_ensemble_chunk_sizes(None, 'node_timeseries', (100, 6, 1000), 10))
+
+    def test_ensemble(self):
+        options = dict(elements={'nodes': ['J4', 'J2', 'J1']}, attributes=['TOTAL_INFLOW', 'RUNOFF_RATE', 'P1',
+                                                                          'RAINFALL', 'FLOW_RATE', 'AIR_TEMP'],
+                       start_date=datetime.datetime(2020, 1, 1, 1))
+        references = []
+
+        for swmm_output_file in self.members:
+            references.append(swmm_output_file.replace('.out', '.nc'))
+            create_netcdf_from_swmm(swmm_output_file, references[-1], engine='native', **options)
+
+        for name, ensemble_options in (('native', dict(engine='native', block_size=16)),
+                                       ('parallel', dict(engine='toolkit', block_size=7, workers=2))):
+            netcdf_file = self.get_path(f'ensemble_{name}.nc')
+            stats = create_netcdf_ensemble_from_swmm(self.members, netcdf_file, **ensemble_options, **options)
+            self.assertEqual(stats.completed, stats.total)
+
+            with nc.Dataset(netcdf_file, mode='r') as output:
+                self.assertEqual(list(output.variables['ensemble'][:]), ['member_0', 'member_1', 'member_2'])
+                self.assertEqual(output.variables['node_timeseries'].dimensions,
+                                 ('nodes', 'node_attributes', 'ensemble', 'time'))
+                self.assertEqual(output.variables['node_timeseries'].chunking()[2], 3)
+
+                for member, reference_file in enumerate(references):
+                    with nc.Dataset(reference_file, mode='r') as reference:
+                        np.testing.assert_array_equal(output.variables['time'][:], reference.variables['time'][:])
+                        np.testing.assert_array_equal(output.variables['nodes'][:], reference.variables['nodes'][:])
+
+                        for prefix in ('catchment', 'node', 'link', 'system'):
+                            np.testing.assert_array_equal(
+                                output.variables[f'{prefix}_attribute_names'][:],
+                                reference.variables[f'{prefix}_attribute_names'][:])
+                            np.testing.assert_array_equal(output.variables[f'{prefix}_timeseries'][..., member, :],
+                                                          reference.variables[f'{prefix}_timeseries'][:])
+
+    def test_mismatched_members(self):
+        netcdf_file = self.get_path('ensemble.nc')
+
+        for name, options in (('nodes', dict(num_nodes=6)), ('periods', dict(num_periods=40)),
+                              ('start', dict(start_date=datetime.datetime(2020, 1, 2)))):
+            swmm_output_file = self.get_path(f'{name}.out')
+            write_synthetic_swmm_output(swmm_output_file, num_subcatchments=3, num_links=4, num_pollutants=1,
+                                        **dict(dict(num_nodes=5, num_periods=50), **options))
+
+            self.assertRaises(ValueError, create_netcdf_ensemble_from_swmm, self.members + [swmm_output_file],
+                              netcdf_file)
+
+        os.makedirs(self.get_path('copy'))
+        duplicate = os.path.join(self.get_path('copy'), 'member_0.out')
+        write_synthetic_swmm_output(duplicate, num_subcatchments=3, num_nodes=5, num_links=4, num_pollutants=1,
+                                    num_periods=50, seed=5)
+
+        self.assertRaises(ValueError, create_netcdf_ensemble_from_swmm, self.members + [duplicate], netcdf_file)
+        self.assertRaises(ValueError, create_netcdf_ensemble_from_swmm, self.members, netcdf_file, precision='int16')
+
+        create_netcdf_ensemble_from_swmm(self.members + [duplicate], netcdf_file, engine='native',
+                                         member_names=['a', 'b', 'c', 'd'])
+
+        with nc.Dataset(netcdf_file, mode='r') as output:
+            self.assertEqual(len(output.dimensions['ensemble']), 4)
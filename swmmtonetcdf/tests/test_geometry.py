@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.geometry import get_crs_attributes, get_link_lines, lookup_element_indexes, read_inp_geometry
+from swmmtonetcdf.synthetic import write_synthetic_swmm_input, write_synthetic_swmm_output
+import numpy as np
+
+import netCDF4 as nc
+
+INP = """[TITLE]
+;;Project Title/Notes
+Geometry test ; with [brackets] in a comment
+
+[JUNCTIONS]
+;;Name           Elevation  MaxDepth
+J1               10         5
+
+[CONDUITS]
+;;Name           From Node        To Node          Length     Roughness
+C1               J1               J2               400        0.01
+C2               J2               O1               400        0.01  ; inline comment
+
+[pumps]
+P1               J2               J1               Pump1      ON
+
+[COORDINATES]
+;;Node           X-Coord            Y-Coord
+J1               0.0                0.0
+J2               100.0              50.0
+  O1             200.0              50.0
+
+[VERTICES]
+;;Link           X-Coord            Y-Coord
+C2               150.0              75.0
+C1               25.0               10.0
+C2               175.0              60.0
+X9               1.0                1.0
+
+[Polygons]
+;;Subcatchment   X-Coord            Y-Coord
+S1               0.0                0.0
+S1               10.0               0.0
+S1               10.0               10.0
+"""
+
+
+class TestInpGeometry(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.inp_file = os.path.join(self.directory.name, 'model.inp')
+
+        with open(self.inp_file, 'w') as f:
+            f.write(INP)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_read_inp_geometry(self):
+        geometry = read_inp_geometry(self.inp_file)
+
+        np.testing.assert_array_equal(geometry.node_names, ['J1', 'J2', 'O1'])
+        np.testing.assert_array_equal(geometry.node_y, [0.0, 50.0, 50.0])
+        np.testing.assert_array_equal(geometry.link_names, ['C1', 'C2', 'P1'])
+        np.testing.assert_array_equal(geometry.link_outlets, ['J2', 'O1', 'J1'])
+        np.testing.assert_array_equal(geometry.vertex_links, ['C2', 'C1', 'C2', 'X9'])
+        np.testing.assert_array_equal(geometry.polygon_x, [0.0, 10.0, 10.0])
+
+    def test_uneven_columns(self):
+        # rows are parsed on their own even when their tokens add up to three per row
+        with open(self.inp_file, 'w') as f:
+            f.write('[COORDINATES]\nJ1 5.0\nJ2 100.0 50.0 extra\n[CONDUITS]\nC1 J1 J2 400 0.01\nC2 J2\n')
+
+        geometry = read_inp_geometry(self.inp_file)
+
+        np.testing.assert_array_equal(geometry.node_names, ['J1', 'J2'])
+        np.testing.assert_array_equal(geometry.node_x, [5.0, 100.0])
+        np.testing.assert_array_equal(geometry.node_y, [np.nan, 50.0])
+        np.testing.assert_array_equal(geometry.link_inlets, ['J1', 'J2'])
+        np.testing.assert_array_equal(geometry.link_outlets, ['J2', 'nan'])
+
+    def test_lookup_element_indexes(self):
+        np.testing.assert_array_equal(lookup_element_indexes(['J2', 'O1', 'J1'], np.array(['J1', 'X', 'O1', 'J1'])),
+                                      [2, -1, 1, 2])
+        np.testing.assert_array_equal(lookup_element_indexes([], np.array(['J1'])), [-1])
+
+    def test_link_lines(self):
+        # links are in the order of the output file, which does not report O1 or P1
+        link_nodes, counts, x, y = get_link_lines(read_inp_geometry(self.inp_file), ['J1', 'J2'], ['C2', 'C1'])
+
+        np.testing.assert_array_equal(link_nodes, [[1, -1], [0, 1]])
+        np.testing.assert_array_equal(counts, [4, 3])
+        np.testing.assert_array_equal(x, [100.0, 150.0, 175.0, np.nan, 0.0, 25.0, 100.0])
+        np.testing.assert_array_equal(y, [50.0, 75.0, 60.0, np.nan, 0.0, 10.0, 50.0])
+
+    def test_crs_attributes(self):
+        self.assertEqual(get_crs_attributes('epsg:4326'), {'epsg_code': 'EPSG:4326',
+                                                           'grid_mapping_name': 'latitude_longitude'})
+        self.assertEqual(get_crs_attributes('EPSG:2278'), {'epsg_code': 'EPSG:2278'})
+
+        prj_file = os.path.join(self.directory.name, 'model.prj')
+        with open(prj_file, 'w') as f:
+            f.write('PROJCS["NAD83 / Texas South Central (ftUS)"]\n')
+
+        self.assertEqual(get_crs_attributes(prj_file)['crs_wkt'], 'PROJCS["NAD83 / Texas South Central (ftUS)"]')
+
+
+class TestSWMMtoNetCDFGeometry(unittest.TestCase):
+
+    def test_geometry_conversion(self):
+        with tempfile.TemporaryDirectory() as directory:
+            swmm_output_file = os.path.join(directory, 'synthetic.out')
+            inp_file = os.path.join(directory, 'synthetic.inp')
+            netcdf_file = os.path.join(directory, 'synthetic.nc')
+
+            write_synthetic_swmm_output(swmm_output_file, num_subcatchments=3, num_nodes=5, num_links=4,
+                                        num_periods=20)
+            write_synthetic_swmm_input(inp_file, num_subcatchments=3, num_nodes=5, num_links=4, vertices_per_link=2,
+                                       polygon_points=6)
+
+            create_netcdf_from_swmm(swmm_output_file, netcdf_file, engine='native', elements={'links': ['C2', 'C4']},
+                                    summary=True, inp_file=inp_file, projection='EPSG:2278')
+
+            with nc.Dataset(netcdf_file, mode='r') as output:
+                np.testing.assert_array_equal(output.variables['node_x'][:], [0.0, 100.0, 200.0, 300.0, 400.0])
+                np.testing.assert_array_equal(output.variables['link_nodes'][:], [[1, 2], [3, 4]])
+                np.testing.assert_array_equal(output.variables['link_point_count'][:], [4, 4])
+                np.testing.assert_array_equal(output.variables['link_x'][:][[0, 3, 4, 7]],
+                                              [100.0, 200.0, 300.0, 400.0])
+                np.testing.assert_array_equal(output.variables['catchment_point_count'][:], [6, 6, 6])
+                self.assertEqual(len(output.dimensions['catchment_points']), 18)
+
+                self.assertEqual(output.variables['network'].cf_role, 'mesh_topology')
+                self.assertEqual(output.variables['crs'].epsg_code, 'EPSG:2278')
+                self.assertEqual(output.variables['link_timeseries'].location, 'edge')
+                self.assertEqual(output.variables['node_max'].mesh, 'network')
+                self.assertEqual(output.variables['catchment_timeseries'].geometry, 'catchment_geometry')
+                self.assertNotIn('mesh', output.variables['link_nodes'].ncattrs())
@@ -0,0 +1,96 @@
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf.header import read_swmm_output_header, read_swmm_output_signature
+from swmmtonetcdf.reader import SwmmOutputReader
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+
+# Modules that the command line interface must not import before running a conversion
+HEAVY_MODULES = ('numpy', 'netCDF4', 'cftime', 'julian', 'swmm.toolkit')
+
+
+class TestSwmmOutputHeader(unittest.TestCase):
+
+    def test_read_header(self):
+        header = read_swmm_output_header(TRIVIAL_OUTPUT)
+
+        with SwmmOutputReader(TRIVIAL_OUTPUT) as reader:
+            self.assertEqual([header.num_subcatchments, header.num_nodes, header.num_links, 1,
+                              header.num_pollutants], reader.project_size)
+            self.assertEqual(header.num_periods, reader.num_periods)
+            self.assertEqual(header.report_step, reader.report_step)
+            self.assertEqual(header.version, reader.version)
+
+        self.assertEqual(header.flow_units, 'CMS')
+        self.assertEqual(header.start_date, datetime.datetime(2019, 4, 1))
+        self.assertEqual(header.end_date, datetime.datetime(2019, 5, 1))
+
+    def test_read_pollutants(self):
+        with tempfile.TemporaryDirectory() as directory:
+            swmm_output_file = os.path.join(directory, 'synthetic.out')
+            write_synthetic_swmm_output(swmm_output_file, num_subcatchments=3, num_nodes=4, num_links=2,
+                                        num_pollutants=2, num_periods=10, start_date=datetime.datetime(2020, 1, 1, 6))
+
+            header = read_swmm_output_header(swmm_output_file)
+
+            self.assertEqual(header.pollutants, ['P1', 'P2'])
+            self.assertEqual(header.pollutant_units, ['mg/L', 'mg/L'])
+            self.assertEqual(header.end_date, datetime.datetime(2020, 1, 1, 6, 50))
+
+            # a run that SWMM is still writing has no closing records
+            with open(swmm_output_file, 'rb') as f:
+                data = f.read()
+
+            with open(swmm_output_file, 'wb') as f:
+                f.write(data[:-24])
+
+            self.assertRaises(ValueError, read_swmm_output_header, swmm_output_file)
+
+            with open(swmm_output_file, 'wb') as f:
+                f.write(b'not a swmm output file')
+
+            self.assertRaises(ValueError, read_swmm_output_header, swmm_output_file)
+
+    def test_read_signature(self):
+        with tempfile.TemporaryDirectory() as directory:
+            signatures = []
+
+            for seed, num_nodes in ((0, 4), (1, 4), (0, 5)):
+                swmm_output_file = os.path.join(directory, f'synthetic_{seed}_{num_nodes}.out')
+                write_synthetic_swmm_output(swmm_output_file, num_subcatchments=3, num_nodes=num_nodes, num_links=2,
+                                            num_pollutants=1, num_periods=10, seed=seed)
+                signatures.append(read_swmm_output_signature(swmm_output_file))
+
+            # runs of the same network differ in their results only
+            self.assertEqual(signatures[0], signatures[1])
+            self.assertNotEqual(signatures[0], signatures[2])
+
+    def test_star_import(self):
+        namespace = {}
+        exec('from swmmtonetcdf import *', namespace)
+
+        for name in ('create_netcdf_from_swmm', 'get_pollutant_enum_name', 'ToolkitOutputReader',
+                     'append_netcdf_from_swmm', 'read_swmm_output_header', 'main'):
+            self.assertTrue(callable(namespace[name]), name)
+
+    def test_info_command(self):
+        # the parser and the info sub-command run in a fresh interpreter so that earlier imports do not count
+        script = 'import sys\n' \
+                 'from swmmtonetcdf import main\n' \
+                 f'sys.argv = ["swmmtonetcdf", "info", "--out", {TRIVIAL_OUTPUT!r}]\n' \
+                 'main()\n' \
+                 f'print(sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules), file=sys.stderr)\n'
+
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stderr.strip(), '[]')
+
+        info = json.loads(result.stdout)
+        self.assertEqual(info['num_nodes'], 5)
+        self.assertEqual(info['num_periods'], 8640)
+        self.assertEqual(info['start_date'], '2019-04-01T00:00:00')
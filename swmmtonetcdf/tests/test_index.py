@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from swmm.toolkit import output, shared_enum
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.batch import ConversionJob, convert_batch
+from swmmtonetcdf.index import SwmmOutputIndex, forget_swmm_output_index, get_index_sidecar_path, \
+    get_swmm_output_index, read_index_sidecar
+from swmmtonetcdf.reader import SwmmOutputReader
+from swmmtonetcdf.swmmtonetcdf import ToolkitOutputReader, get_pollutant_enum, get_pollutant_enum_name, \
+    get_swmm_output_attribute_names
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+import numpy as np
+
+
+class TestSwmmOutputIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.swmm_output_file = os.path.join(self.directory.name, 'synthetic.out')
+        write_synthetic_swmm_output(self.swmm_output_file, num_subcatchments=3, num_nodes=4, num_links=5,
+                                    num_pollutants=3, num_periods=20)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_index(self):
+        reader = SwmmOutputReader(self.swmm_output_file)
+
+        with ToolkitOutputReader(self.swmm_output_file) as toolkit_reader:
+            index = toolkit_reader.index
+
+            self.assertEqual(index.project_size, reader.project_size)
+            self.assertEqual(index.get_element_names(shared_enum.ElementType.NODE), reader.get_element_names(1))
+            self.assertEqual(index.get_attribute_names(0), get_swmm_output_attribute_names(0, ['P1', 'P2', 'P3']))
+            np.testing.assert_allclose(index.get_dates(), reader.get_dates())
+            # lookups check the size and modification time of the output file instead of asking the toolkit
+            with mock.patch.object(output, 'get_proj_size', side_effect=AssertionError):
+                self.assertIs(get_swmm_output_index(toolkit_reader.file_handle), index)
+
+            # pollutant lookups reuse the index instead of reading every element name again
+            with mock.patch.object(output, 'get_elem_name', side_effect=AssertionError):
+                for pollutant_index, pollutant_name in enumerate(('P1', 'P2', 'P3')):
+                    self.assertEqual(get_pollutant_enum_name(toolkit_reader.file_handle, pollutant_name),
+                                     f'POLLUT_CONC_{pollutant_index}')
+
+                self.assertEqual(get_pollutant_enum(toolkit_reader.file_handle, shared_enum.LinkAttribute, 'P1'),
+                                 shared_enum.LinkAttribute.POLLUT_CONC_0)
+
+        # the index is shared by handles opened on the unchanged output file
+        with mock.patch.object(output, 'get_elem_name', side_effect=AssertionError):
+            with ToolkitOutputReader(self.swmm_output_file) as toolkit_reader:
+                self.assertIs(toolkit_reader.index, index)
+
+        write_synthetic_swmm_output(self.swmm_output_file, num_links=2, num_periods=20)
+        stat = os.stat(self.swmm_output_file)
+        os.utime(self.swmm_output_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        with ToolkitOutputReader(self.swmm_output_file) as toolkit_reader:
+            self.assertEqual(toolkit_reader.index.project_size[2], 2)
+
+        self.assertEqual(SwmmOutputIndex.from_dict(json.loads(json.dumps(index.to_dict()))).to_dict(),
+                         index.to_dict())
+
+    def test_raw_handle(self):
+        file_handle = output.init()
+        output.open(file_handle, self.swmm_output_file)
+
+        try:
+            # handles opened without ToolkitOutputReader are indexed once on first use
+            with mock.patch.object(output, 'get_elem_name', wraps=output.get_elem_name) as get_elem_name:
+                for _ in range(5):
+                    self.assertEqual(get_pollutant_enum_name(file_handle, 'P3'), 'POLLUT_CONC_2')
+
+            self.assertEqual(get_elem_name.call_count, 3 + 4 + 5 + 3)
+        finally:
+            forget_swmm_output_index(file_handle)
+            output.close(file_handle)
+
+    def test_sidecar(self):
+        sidecar_path = get_index_sidecar_path(self.swmm_output_file)
+
+        with ToolkitOutputReader(self.swmm_output_file, sidecar=True) as toolkit_reader:
+            names = toolkit_reader.get_element_names(2)
+
+        self.assertTrue(os.path.exists(sidecar_path))
+
+        with mock.patch.object(output, 'get_elem_name', side_effect=AssertionError):
+            with ToolkitOutputReader(self.swmm_output_file, sidecar=True) as toolkit_reader:
+                self.assertEqual(toolkit_reader.get_element_names(2), names)
+
+        # sidecars of a rewritten output file are stale
+        write_synthetic_swmm_output(self.swmm_output_file, num_links=2, num_periods=20)
+        stat = os.stat(self.swmm_output_file)
+        os.utime(self.swmm_output_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(read_index_sidecar(self.swmm_output_file))
+
+        with ToolkitOutputReader(self.swmm_output_file, sidecar=True) as toolkit_reader:
+            self.assertEqual(list(toolkit_reader.get_element_names(2)), ['C1', 'C2'])
+
+        self.assertEqual(read_index_sidecar(self.swmm_output_file).project_size[2], 2)
+
+    def test_conversion_sidecar(self):
+        sidecar_path = get_index_sidecar_path(self.swmm_output_file)
+
+        create_netcdf_from_swmm(self.swmm_output_file, os.path.join(self.directory.name, 'synthetic.nc'),
+                                engine='toolkit', workers=2, sidecar=True)
+        self.assertTrue(os.path.exists(sidecar_path))
+
+        os.remove(sidecar_path)
+        summaries = convert_batch([ConversionJob(self.swmm_output_file,
+                                                 os.path.join(self.directory.name, 'batch.nc'))], sidecar=True)
+        self.assertEqual(summaries[0]['status'], 'converted')
+        self.assertEqual(read_index_sidecar(self.swmm_output_file).project_size, [3, 4, 5, 1, 3])
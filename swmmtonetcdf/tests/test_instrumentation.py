@@ -0,0 +1,113 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.instrumentation import PHASES, ConversionStats
+from swmmtonetcdf.reader import SwmmOutputReader
+from swmmtonetcdf.swmmtonetcdf import get_attribute_ranges
+
+
+class TestConversionStats(unittest.TestCase):
+
+    def test_phases_and_progress(self):
+        reports = []
+        stats = ConversionStats(lambda completed, total: reports.append((completed, total)))
+
+        stats.start(3, completed=1)
+        with stats.phase('read'):
+            stats.bytes_read += 16
+        stats.advance()
+        stats.advance()
+        stats.finish()
+
+        self.assertEqual(reports, [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(list(stats.to_dict()['phases']), list(PHASES))
+        self.assertGreater(stats.timings['read'], 0.0)
+        self.assertEqual(stats.to_dict()['bytes_read'], 16)
+
+
+class TestSWMMtoNetCDFInstrumentation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_conversion_stats(self):
+        reader = SwmmOutputReader(TRIVIAL_OUTPUT)
+        num_values = reader.num_periods * (reader.num_subcatchments * reader.num_subcatchment_variables +
+                                           reader.num_nodes * reader.num_node_variables +
+                                           reader.num_links * reader.num_link_variables +
+                                           reader.num_system_variables)
+
+        for name, options, total in (('series', dict(engine='native'), 8 + 6 + 5 + 15),
+                                     ('block', dict(engine='native', read_by_series=False, block_size=1000), 9),
+                                     ('parallel', dict(engine='native', workers=2), 4)):
+            netcdf_file = self.get_path(f'stats_{name}.nc')
+            reports = []
+
+            stats = create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, precision='single',
+                                            progress=lambda completed, total: reports.append((completed, total)),
+                                            **options)
+
+            self.assertEqual(reports, [(i, total) for i in range(total + 1)])
+            self.assertEqual(stats.bytes_read, num_values * 4)
+            self.assertEqual(stats.bytes_written, num_values * 4)
+
+            stats_file = netcdf_file.replace('.nc', '.json')
+            stats.write_json(stats_file)
+            with open(stats_file) as f:
+                summary = json.load(f)
+
+            self.assertEqual(summary['units_completed'], total)
+            self.assertGreater(summary['phases']['read'], 0.0)
+            self.assertGreater(summary['phases']['write'], 0.0)
+            self.assertGreaterEqual(summary['seconds'], sum(summary['phases'][phase] for phase in
+                                                            ('metadata', 'read', 'write', 'sync')) * 0.99)
+
+    def test_scan_stats(self):
+        def slow_attribute_ranges(*args):
+            time.sleep(0.1)
+            return get_attribute_ranges(*args)
+
+        # scanning the ranges of packed attributes reads results before the first unit of work
+        with mock.patch('swmmtonetcdf.swmmtonetcdf.get_attribute_ranges', side_effect=slow_attribute_ranges):
+            stats = create_netcdf_from_swmm(TRIVIAL_OUTPUT, self.get_path('int16.nc'), engine='native',
+                                            precision='int16')
+
+        self.assertGreaterEqual(stats.timings['read'], 0.4)
+        self.assertLess(stats.timings['metadata'], 0.4)
+
+    def test_stats_option(self):
+        num_periods = SwmmOutputReader(TRIVIAL_OUTPUT).num_periods
+
+        # files without a folder are written to the current folder
+        for options, total in (([], 8 + 6 + 5 + 15),
+                               (['--read', 'block', '--block-size', '500'], -(-num_periods // 500))):
+            subprocess.run([sys.executable, '-m', 'swmmtonetcdf', 'convert', '--out', TRIVIAL_OUTPUT, '--nc',
+                            'trivial.nc', '--engine', 'native', '--stats', 'out.json'] + options,
+                           cwd=self.directory.name, env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(
+                               os.path.dirname(os.path.abspath(__file__))))), capture_output=True, check=True)
+
+            with open(self.get_path('out.json')) as f:
+                self.assertEqual(json.load(f)['units_completed'], total)
+
+    def test_required_options(self):
+        for options in (['--out', TRIVIAL_OUTPUT], ['--nc', 'trivial.nc']):
+            result = subprocess.run([sys.executable, '-m', 'swmmtonetcdf', 'convert'] + options,
+                                    cwd=self.directory.name, env=dict(os.environ, PYTHONPATH=os.path.dirname(
+                                        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+                                    capture_output=True, text=True)
+
+            self.assertEqual(result.returncode, 2)
+            self.assertIn('the following arguments are required', result.stderr)
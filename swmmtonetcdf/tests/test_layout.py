@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.layout import get_layout_variables, to_time_major
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestLayout(unittest.TestCase):
+
+    def test_layout_variables(self):
+        self.assertEqual(get_layout_variables('node', 'series'), [('node_timeseries', False)])
+        self.assertEqual(get_layout_variables('node', 'snapshot'), [('node_timeseries', True)])
+        self.assertEqual(get_layout_variables('node', 'both'), [('node_timeseries', False),
+                                                                ('node_snapshots', True)])
+        self.assertEqual(to_time_major(('nodes', 'node_attributes', 'time')), ('time', 'nodes', 'node_attributes'))
+
+        with self.assertRaises(ValueError):
+            get_layout_variables('node', 'unknown')
+
+
+class TestSWMMtoNetCDFLayout(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_layouts_match_series(self):
+        series_file = self.get_path('layout_series.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, series_file, engine='native')
+
+        for name, options in (('snapshot', dict(layout='snapshot', engine='native', block_size=100,
+                                                chunk_sizes='auto')),
+                              ('both', dict(layout='both', engine='toolkit', attributes=['FLOW_RATE', 'RAINFALL'])),
+                              ('parallel', dict(layout='both', engine='toolkit', workers=2))):
+            layout_file = self.get_path(f'layout_{name}.nc')
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, layout_file, **options)
+
+            with nc.Dataset(series_file, mode='r') as series_output, \
+                    nc.Dataset(layout_file, mode='r') as layout_output:
+                self.assertEqual(layout_output.layout, options['layout'])
+
+                for prefix, attribute_names in (('node', 'node_attribute_names'), ('link', 'link_attribute_names'),
+                                                ('catchment', 'catchment_attribute_names'),
+                                                ('system', 'system_attribute_names')):
+                    all_attributes = list(series_output.variables[attribute_names][:])
+                    attribute_indexes = [all_attributes.index(a) for a in layout_output.variables[attribute_names][:]]
+                    series = series_output.variables[f'{prefix}_timeseries'][:][..., attribute_indexes, :]
+
+                    for variable_name, time_major in get_layout_variables(prefix, options['layout']):
+                        nc_variable = layout_output.variables[variable_name]
+
+                        if time_major:
+                            self.assertEqual(nc_variable.dimensions[0], 'time')
+                            np.testing.assert_equal(nc_variable[:], np.moveaxis(series, -1, 0))
+                        else:
+                            np.testing.assert_equal(nc_variable[:], series)
+
+                if name == 'snapshot':
+                    # snapshots of all node attributes fit in a chunk so chunks run along time
+                    self.assertEqual(layout_output.variables['node_timeseries'].chunking()[1:],
+                                     [len(layout_output.dimensions['nodes']),
+                                      len(layout_output.dimensions['node_attributes'])])
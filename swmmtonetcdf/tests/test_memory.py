@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.memory import parse_memory_size, plan_memory
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+import numpy as np
+
+import netCDF4 as nc
+
+
+def read_memory_status(field: str) -> int:
+    """
+    Reads a memory field of /proc/self/status in bytes
+    """
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(f'{field}:'):
+                return int(line.split()[1]) * 1024
+
+
+def convert_measuring_rss_growth(swmm_output_file: str, netcdf_output_file: str, options: dict) -> int:
+    """
+    Converts in a fresh process and returns the growth of peak resident memory during the conversion
+    """
+    # reset the high water mark to the memory of the process before converting
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+    rss = read_memory_status('VmRSS')
+    create_netcdf_from_swmm(swmm_output_file, netcdf_output_file, **options)
+
+    return read_memory_status('VmHWM') - rss
+
+
+class TestMemoryPlan(unittest.TestCase):
+
+    def test_parse_memory_size(self):
+        self.assertEqual(parse_memory_size('512M'), 512 * 2 ** 20)
+        self.assertEqual(parse_memory_size('8GiB'), 8 * 2 ** 30)
+        self.assertEqual(parse_memory_size('1.5k'), 1536)
+        self.assertEqual(parse_memory_size('4096'), 4096)
+        self.assertRaises(ValueError, parse_memory_size, '8 gallons')
+
+    def test_plan_memory(self):
+        plan = plan_memory(2 ** 20, period_values=1000, record_bytes=4008, num_steps=10000, num_variables=4)
+
+        self.assertEqual(plan.chunk_cache_bytes, 2 ** 20 // 8 // 4)
+        self.assertLessEqual(plan.block_size * (1000 * 24 + 4008) + 4 * plan.chunk_cache_bytes, 2 ** 20)
+        self.assertLess(plan.series_window, 10000)
+        self.assertEqual(plan.series_values, plan.series_window)
+
+        # whole series of many elements are buffered together when they fit
+        plan = plan_memory(2 ** 24, period_values=1000, record_bytes=4008, num_steps=1000, num_variables=4)
+        self.assertEqual(plan.series_window, 1000)
+        self.assertGreater(plan.series_values, 100 * plan.series_window)
+        self.assertLessEqual(plan.series_window * (56 + 4008) + plan.series_values * 24 + 4 * plan.chunk_cache_bytes,
+                             2 ** 24)
+        self.assertEqual(plan_memory(2 ** 30, 1000, 4008, num_steps=100, num_variables=4,
+                                     block_size=256).block_size, 100)
+        self.assertRaises(ValueError, plan_memory, 2 ** 10, 1000, 4008, 100, 4)
+
+
+class TestSWMMtoNetCDFMemoryBudget(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_budgeted_conversion(self):
+        reference_file = self.get_path('unbudgeted.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, reference_file, engine='native', read_by_series=False)
+
+        with nc.Dataset(reference_file, mode='r') as reference:
+            for name, options in (('series', dict(engine='native')),
+                                  ('block', dict(engine='toolkit', read_by_series=False)),
+                                  ('snapshot', dict(engine='native', layout='snapshot')),
+                                  ('parallel', dict(engine='native', workers=2))):
+                netcdf_file = self.get_path(f'budgeted_{name}.nc')
+                create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, max_memory='96K', **options)
+
+                with nc.Dataset(netcdf_file, mode='r') as netcdf_output:
+                    for variable in ('node_timeseries', 'link_timeseries', 'catchment_timeseries',
+                                     'system_timeseries'):
+                        values = netcdf_output.variables[variable][:]
+                        if name == 'snapshot':
+                            values = np.moveaxis(values, 0, -1)
+                        np.testing.assert_array_equal(values, reference.variables[variable][:])
+
+        self.assertRaises(ValueError, create_netcdf_from_swmm, TRIVIAL_OUTPUT, reference_file, max_memory=128)
+
+    @unittest.skipIf(not os.path.exists('/proc/self/clear_refs'), 'Peak resident memory requires Linux')
+    def test_peak_rss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            swmm_output_file = os.path.join(directory, 'large.out')
+            file_size = write_synthetic_swmm_output(swmm_output_file, num_subcatchments=2, num_nodes=4, num_links=4,
+                                                    num_periods=200000, block_size=8192)
+            budget = 8 * 2 ** 20
+
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                for options in (dict(engine='native', precision='single'),
+                                dict(engine='native', read_by_series=False, block_size=100000)):
+                    growth = executor.submit(convert_measuring_rss_growth, swmm_output_file,
+                                             os.path.join(directory, 'large.nc'),
+                                             dict(options, max_memory=budget)).result()
+
+                    # allow for allocator and library overheads outside of the conversion buffers
+                    self.assertLess(growth, budget + 16 * 2 ** 20)
+                    self.assertLess(growth, file_size / 2)
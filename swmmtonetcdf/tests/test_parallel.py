@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.parallel import plan_partitions
+from swmmtonetcdf.reader import NODE, SYSTEM
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestPartitionPlanner(unittest.TestCase):
+
+    def test_plan_by_time(self):
+        partitions = plan_partitions(NODE, 10, 6, 1000, 'time', partition_bytes=10 * 6 * 4 * 300)
+        self.assertEqual([(p.start_period, p.end_period) for p in partitions], [(0, 300), (300, 600), (600, 900),
+                                                                                 (900, 1000)])
+        self.assertTrue(all(p.element_start == 0 and p.element_end == 10 for p in partitions))
+
+    def test_plan_by_element(self):
+        partitions = plan_partitions(NODE, 10, 6, 1000, 'element', partition_bytes=6 * 4 * 1000 * 4)
+        self.assertEqual([(p.element_start, p.element_end) for p in partitions], [(0, 4), (4, 8), (8, 10)])
+        self.assertTrue(all(p.start_period == 0 and p.end_period == 1000 for p in partitions))
+
+    def test_plan_system(self):
+        partitions = plan_partitions(SYSTEM, 0, 15, 1000, 'element')
+        self.assertEqual(len(partitions), 1)
+        self.assertEqual((partitions[0].start_period, partitions[0].end_period), (0, 1000))
+
+    def test_plan_empty(self):
+        self.assertEqual(plan_partitions(NODE, 0, 6, 1000, 'time'), [])
+
+
+class TestSWMMtoNetCDFParallel(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_parallel_matches_serial(self):
+        serial_file = self.get_path('serial.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, serial_file, engine='native')
+
+        for engine in ('native', 'toolkit'):
+            parallel_file = self.get_path(f'parallel_{engine}.nc')
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, parallel_file, engine=engine, workers=2)
+
+            with nc.Dataset(serial_file, mode='r') as serial_output, \
+                    nc.Dataset(parallel_file, mode='r') as parallel_output:
+                for variable in ('time', 'node_timeseries', 'link_timeseries', 'catchment_timeseries',
+                                 'system_timeseries'):
+                    np.testing.assert_equal(serial_output.variables[variable][:],
+                                            parallel_output.variables[variable][:])
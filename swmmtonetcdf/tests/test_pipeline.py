@@ -0,0 +1,89 @@
+import datetime
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.pipeline import BlockPrefetcher
+from swmmtonetcdf.reader import SwmmOutputReader
+from swmmtonetcdf.swmmtonetcdf import select_conversion
+from swmmtonetcdf.subset import get_subset_block
+import numpy as np
+
+import netCDF4 as nc
+
+
+class FailingReader(object):
+
+    def get_block(self, element_type, start_period, end_period):
+        raise OSError('Read failed')
+
+
+class TestBlockPrefetcher(unittest.TestCase):
+
+    def test_prefetched_blocks(self):
+        reader = SwmmOutputReader(TRIVIAL_OUTPUT)
+        subset = select_conversion(reader, {'nodes': ['J10', 'T3']}, ['FLOW_RATE', 'INVERT_DEPTH', 'RAINFALL'],
+                                   None, None).subset
+        windows = [(start_period, min(start_period + 100, reader.num_periods))
+                   for start_period in range(0, reader.num_periods, 100)]
+        buffers = set()
+
+        with BlockPrefetcher(reader, subset, [0, 1, 2, 3], windows, depth=2) as prefetcher:
+            for (start_period, end_period, blocks), window in zip(prefetcher, windows):
+                self.assertEqual((start_period, end_period), window)
+
+                for element_type, block in enumerate(blocks):
+                    np.testing.assert_array_equal(block, get_subset_block(reader, subset, element_type,
+                                                                          start_period, end_period))
+                    buffers.add(id(block.base))
+
+        self.assertEqual(len(buffers), 3 * 4)
+
+    def test_errors_and_close(self):
+        with BlockPrefetcher(FailingReader(), None, [1], [(0, 10)]) as prefetcher:
+            self.assertRaises(OSError, list, prefetcher)
+
+        reader = SwmmOutputReader(TRIVIAL_OUTPUT)
+        with BlockPrefetcher(reader, None, [1], [(t, t + 1) for t in range(reader.num_periods)], depth=1) as prefetcher:
+            next(iter(prefetcher))
+
+        self.assertRaises(ValueError, BlockPrefetcher, reader, None, [1], [(0, 10)], depth=0)
+
+
+class TestSWMMtoNetCDFPipeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_prefetched_conversion(self):
+        for engine in ('native', 'toolkit'):
+            for name, options in (('all', dict()),
+                                  ('subset', dict(elements={'links': ['C13', 'C17']},
+                                                  attributes=['FLOW_RATE', 'RAINFALL'],
+                                                  start_date=datetime.datetime(2019, 4, 1, 3),
+                                                  layout='both', max_memory='64K'))):
+                reference_file = self.get_path(f'block_{engine}_{name}.nc')
+                create_netcdf_from_swmm(TRIVIAL_OUTPUT, reference_file, engine=engine, read_by_series=False,
+                                        block_size=50, **options)
+
+                netcdf_file = self.get_path(f'prefetch_{engine}_{name}.nc')
+                stats = create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, engine=engine, block_size=50,
+                                                prefetch=2, **options)
+                self.assertEqual(stats.completed, stats.total)
+
+                with nc.Dataset(reference_file, mode='r') as reference, nc.Dataset(netcdf_file, mode='r') as output:
+                    self.assertEqual(set(output.variables), set(reference.variables))
+
+                    for variable in reference.variables:
+                        if variable.endswith(('_timeseries', '_snapshots')):
+                            np.testing.assert_array_equal(output.variables[variable][:],
+                                                          reference.variables[variable][:])
+
+        self.assertRaises(ValueError, create_netcdf_from_swmm, TRIVIAL_OUTPUT, netcdf_file, prefetch=2, workers=2)
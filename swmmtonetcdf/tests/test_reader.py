@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm, get_swmm_output_dates, get_swmm_output_element_names
+from swmmtonetcdf.reader import SwmmOutputReader
+import numpy as np
+from swmm.toolkit import output, shared_enum
+
+import netCDF4 as nc
+
+
+class TestSwmmOutputReader(unittest.TestCase):
+    reader: SwmmOutputReader = None
+    swmm_output_handle = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.reader = SwmmOutputReader(TRIVIAL_OUTPUT)
+
+        cls.swmm_output_handle = output.init()
+        output.open(cls.swmm_output_handle, TRIVIAL_OUTPUT)
+
+    def test_read_metadata(self):
+        reader = TestSwmmOutputReader.reader
+        handle = TestSwmmOutputReader.swmm_output_handle
+
+        self.assertEqual(reader.project_size, output.get_proj_size(handle))
+        self.assertEqual(reader.num_periods, output.get_times(handle, shared_enum.Time.NUM_PERIODS))
+        self.assertEqual(reader.report_step, output.get_times(handle, shared_enum.Time.REPORT_STEP))
+        self.assertAlmostEqual(reader.start_date, output.get_start_date(handle))
+        self.assertEqual(reader.version, output.get_version(handle))
+
+    def test_read_element_names(self):
+        for element_type in (shared_enum.ElementType.SUBCATCH, shared_enum.ElementType.NODE,
+                             shared_enum.ElementType.LINK, shared_enum.ElementType.POLLUT):
+            self.assertEqual(
+                TestSwmmOutputReader.reader.get_element_names(element_type),
+                get_swmm_output_element_names(TestSwmmOutputReader.swmm_output_handle, element_type)
+            )
+
+    def test_read_dates(self):
+        np.testing.assert_almost_equal(
+            TestSwmmOutputReader.reader.get_dates(),
+            get_swmm_output_dates(TestSwmmOutputReader.swmm_output_handle)
+        )
+
+    def test_read_results_shape(self):
+        reader = TestSwmmOutputReader.reader
+        self.assertEqual(reader.nodes.shape, (reader.num_periods, reader.num_nodes, reader.num_node_variables))
+        self.assertEqual(reader.links.shape, (reader.num_periods, reader.num_links, reader.num_link_variables))
+        self.assertEqual(reader.system.shape, (reader.num_periods, reader.num_system_variables))
+
+    def test_read_node_series(self):
+        reader = TestSwmmOutputReader.reader
+        for i in range(reader.num_nodes):
+            for enum_value in shared_enum.NodeAttribute:
+                if 'POLLUT_CONC' not in enum_value.name:
+                    swmm_values = output.get_node_series(
+                        p_handle=TestSwmmOutputReader.swmm_output_handle,
+                        nodeIndex=i,
+                        attr=enum_value,
+                        startPeriod=0,
+                        endPeriod=reader.num_periods
+                    )
+
+                    np.testing.assert_equal(
+                        np.array(swmm_values, dtype=np.float32),
+                        reader.get_series(shared_enum.ElementType.NODE, i, enum_value.value, 0, reader.num_periods)
+                    )
+
+    def test_read_system_result(self):
+        reader = TestSwmmOutputReader.reader
+        for t in (0, reader.num_periods // 2, reader.num_periods - 1):
+            swmm_values = output.get_system_result(TestSwmmOutputReader.swmm_output_handle, t, 0)
+            np.testing.assert_equal(
+                np.array(swmm_values, dtype=np.float32),
+                reader.get_result(shared_enum.ElementType.SYSTEM, t, 0)
+            )
+
+    def test_invalid_file(self):
+        with self.assertRaises(ValueError):
+            SwmmOutputReader(__file__)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.reader.close()
+        output.close(cls.swmm_output_handle)
+
+
+class TestSWMMtoNetCDFNativeEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_engines_match(self):
+        for read_by_series in (True, False):
+            toolkit_file = self.get_path(f'toolkit_{read_by_series}.nc')
+            native_file = self.get_path(f'native_{read_by_series}.nc')
+
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, toolkit_file, read_by_series=read_by_series, engine='toolkit')
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, native_file, read_by_series=read_by_series, engine='native')
+
+            with nc.Dataset(toolkit_file, mode='r') as toolkit_output, \
+                    nc.Dataset(native_file, mode='r') as native_output:
+                for variable in ('time', 'node_timeseries', 'link_timeseries', 'catchment_timeseries',
+                                 'system_timeseries'):
+                    np.testing.assert_equal(toolkit_output.variables[variable][:],
+                                            native_output.variables[variable][:])
+
+                for variable in ('nodes', 'links', 'catchments', 'node_attribute_names'):
+                    self.assertEqual(list(toolkit_output.variables[variable][:]),
+                                     list(native_output.variables[variable][:]))
+
+    def test_block_sizes(self):
+        series_file = self.get_path('native_series.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, series_file, read_by_series=True, engine='native')
+
+        for block_size in (1, 1000, 100000):
+            block_file = self.get_path(f'native_block_{block_size}.nc')
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, block_file, read_by_series=False, engine='native',
+                                    block_size=block_size)
+
+            with nc.Dataset(series_file, mode='r') as series_output, nc.Dataset(block_file, mode='r') as block_output:
+                for variable in ('node_timeseries', 'link_timeseries', 'catchment_timeseries', 'system_timeseries'):
+                    np.testing.assert_equal(series_output.variables[variable][:],
+                                            block_output.variables[variable][:])
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, self.get_path('unknown.nc'), engine='unknown')
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.constant import read_timeseries
+from swmmtonetcdf.storage import get_attribute_packing, get_datatype, get_least_significant_digits, get_packing, \
+    pack_attributes, quantize, unpack_attributes, PACKED_STEPS
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestStorage(unittest.TestCase):
+
+    def test_datatype(self):
+        self.assertEqual(get_datatype('single'), np.float32)
+        with self.assertRaises(ValueError):
+            get_datatype('half')
+
+    def test_least_significant_digits(self):
+        attributes = ['INVERT_DEPTH', 'FLOW_RATE', 'TSS']
+        self.assertEqual(get_least_significant_digits(None, attributes), [None, None, None])
+        self.assertEqual(get_least_significant_digits(2, attributes), [2, 2, 2])
+        self.assertEqual(get_least_significant_digits('auto', attributes, ['TSS']), [3, 4, None])
+        self.assertEqual(get_least_significant_digits({'TSS': 1}, attributes), [None, None, 1])
+
+    def test_quantize(self):
+        values = np.random.uniform(0.0, 100.0, 1000)
+        np.testing.assert_allclose(quantize(values, 2), values, atol=0.005)
+        self.assertIs(quantize(values, None), values)
+
+    def test_packing(self):
+        scale_factor, add_offset = get_packing(-10.0, 30.0)
+        self.assertEqual(add_offset, 10.0)
+        self.assertAlmostEqual(scale_factor, 40.0 / PACKED_STEPS)
+        self.assertEqual(get_packing(None, None), (1.0, 0.0))
+        self.assertEqual(get_packing(5.0, 5.0), (1.0, 5.0))
+
+        scale_factors, add_offsets = get_attribute_packing(np.array([0.0, -10.0, np.nan]),
+                                                           np.array([0.066, 30.0, np.nan]))
+        np.testing.assert_allclose(scale_factors, [0.066 / PACKED_STEPS, 40.0 / PACKED_STEPS, 1.0])
+        np.testing.assert_allclose(add_offsets, [0.033, 10.0, 0.0])
+
+        values = np.array([[0.0, 0.02, 0.066], [-10.0, 3.0, 30.0]])
+        packed = pack_attributes(values, scale_factors[0:2], add_offsets[0:2], axis=0)
+        self.assertEqual(packed.dtype, np.int16)
+        np.testing.assert_allclose(unpack_attributes(packed, scale_factors[0:2], add_offsets[0:2], axis=0), values,
+                                   atol=40.0 / PACKED_STEPS / 2.0)
+
+
+class TestSWMMtoNetCDFPrecision(unittest.TestCase):
+    reference_output: nc.Dataset = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = tempfile.TemporaryDirectory()
+        reference_file = os.path.join(cls.directory.name, 'double.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, reference_file, engine='native')
+        cls.reference_output = nc.Dataset(reference_file, mode='r')
+
+    def convert(self, precision, least_significant_digit=None, read_by_series=True):
+        netcdf_output_file = os.path.join(self.directory.name, f'{precision}_{least_significant_digit}.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_output_file, engine='native', read_by_series=read_by_series,
+                                precision=precision, least_significant_digit=least_significant_digit)
+        return nc.Dataset(netcdf_output_file, mode='r')
+
+    def test_single_precision(self):
+        with self.convert('single') as netcdf_output:
+            for variable in ('node_timeseries', 'link_timeseries', 'catchment_timeseries', 'system_timeseries'):
+                self.assertEqual(netcdf_output.variables[variable].dtype, np.float32)
+                np.testing.assert_equal(TestSWMMtoNetCDFPrecision.reference_output.variables[variable][:],
+                                        netcdf_output.variables[variable][:])
+
+    def test_int16_packing(self):
+        for read_by_series in (True, False):
+            with self.convert('int16', read_by_series=read_by_series) as netcdf_output:
+                for prefix in ('node', 'link', 'catchment', 'system'):
+                    variable = f'{prefix}_timeseries'
+                    self.assertEqual(netcdf_output.variables[variable].dtype, np.int16)
+                    # CF readers see the packed counts, which the comment explains how to unpack
+                    self.assertNotIn('scale_factor', netcdf_output.variables[variable].ncattrs())
+                    self.assertIn(f'{prefix}_scale_factor', netcdf_output.variables[variable].comment)
+
+                    reference = np.moveaxis(TestSWMMtoNetCDFPrecision.reference_output.variables[variable][:], -2, 0)
+                    values = np.moveaxis(read_timeseries(netcdf_output, variable), -2, 0)
+                    scale_factors = netcdf_output.variables[f'{prefix}_scale_factor'][:]
+
+                    # every attribute is packed at the resolution of its own range
+                    for attribute_reference, attribute_values, scale_factor in zip(reference, values, scale_factors):
+                        attribute_range = attribute_reference.max() - attribute_reference.min()
+                        self.assertLessEqual(scale_factor, max(attribute_range / PACKED_STEPS, 0.0) or 1.0)
+                        self.assertLessEqual(np.abs(attribute_values - attribute_reference).max(),
+                                             scale_factor / 2.0 * (1.0 + 1e-6))
+
+    def test_auto_least_significant_digit(self):
+        for read_by_series in (True, False):
+            with self.convert('single', 'auto', read_by_series=read_by_series) as netcdf_output:
+                np.testing.assert_allclose(TestSWMMtoNetCDFPrecision.reference_output.variables['node_timeseries'][:],
+                                           netcdf_output.variables['node_timeseries'][:], atol=0.005)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.reference_output.close()
+        cls.directory.cleanup()
@@ -0,0 +1,106 @@
+import datetime
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.subset import select_attributes, select_elements, select_periods
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestSelection(unittest.TestCase):
+    names = OrderedDict([('CSO8', 0), ('J10', 1), ('J11', 2), ('J12', 3), ('T3', 4)])
+
+    def test_select_elements(self):
+        self.assertEqual(list(select_elements(self.names, None).items()), list(self.names.items()))
+        self.assertEqual(list(select_elements(self.names, ['J12', 'CSO8']).items()), [('CSO8', 0), ('J12', 3)])
+        self.assertEqual(list(select_elements(self.names, 'J1[01]').items()), [('J10', 1), ('J11', 2)])
+
+        with self.assertRaises(ValueError):
+            select_elements(self.names, ['J99'])
+
+    def test_select_attributes(self):
+        self.assertEqual(select_attributes(['A', 'B', 'C'], None), [0, 1, 2])
+        self.assertEqual(select_attributes(['A', 'B', 'C'], ['C', 'A', 'Z']), [0, 2])
+
+    def test_select_periods(self):
+        start = datetime.datetime(2020, 1, 1)
+        timestamps = np.array([(start + datetime.timedelta(hours=h)).timestamp() for h in range(1, 11)])
+
+        self.assertEqual(select_periods(timestamps), (0, 10))
+        self.assertEqual(select_periods(timestamps, start + datetime.timedelta(hours=3),
+                                        start + datetime.timedelta(hours=5, minutes=30)), (2, 5))
+        self.assertEqual(select_periods(timestamps, end_date=start), (0, 0))
+
+        with self.assertRaises(ValueError):
+            select_periods(timestamps, start + datetime.timedelta(hours=2), start)
+
+
+class TestSWMMtoNetCDFSubset(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_subset_matches_full(self):
+        full_file = self.get_path('subset_full.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, full_file, engine='native')
+
+        start_date = datetime.datetime(2019, 4, 10, 0, 0)
+        end_date = datetime.datetime(2019, 4, 12, 12, 0)
+        attributes = ['TOTAL_INFLOW', 'INVERT_DEPTH', 'FLOW_RATE', 'RUNOFF_RATE', 'RAINFALL']
+
+        for name, options in (('series', dict(engine='toolkit')),
+                              ('block', dict(engine='native', read_by_series=False, block_size=100)),
+                              ('parallel', dict(engine='toolkit', workers=2))):
+            subset_file = self.get_path(f'subset_{name}.nc')
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, subset_file, elements={'nodes': ['T3', 'J10'], 'links': 'C1[57]'},
+                                    attributes=attributes, start_date=start_date, end_date=end_date, **options)
+
+            with nc.Dataset(full_file, mode='r') as full_output, nc.Dataset(subset_file, mode='r') as subset_output:
+                times = nc.num2date(full_output.variables['time'][:], full_output.variables['time'].units)
+                periods = [i for i, t in enumerate(times) if start_date <= t <= end_date]
+                self.assertEqual(len(subset_output.dimensions['time']), len(periods))
+                np.testing.assert_equal(subset_output.variables['time'][:], full_output.variables['time'][periods])
+
+                for element_dimension, attribute_dimension, variable in (
+                        ('nodes', 'node_attributes', 'node_timeseries'),
+                        ('links', 'link_attributes', 'link_timeseries'),
+                        ('catchments', 'catchment_attributes', 'catchment_timeseries')):
+                    full_names = list(full_output.variables[element_dimension][:])
+                    full_attributes = list(full_output.variables[attribute_dimension.replace('attributes',
+                                                                                             'attribute_names')][:])
+
+                    element_indexes = [full_names.index(n) for n in subset_output.variables[element_dimension][:]]
+                    attribute_indexes = [full_attributes.index(a) for a in
+                                         subset_output.variables[attribute_dimension.replace('attributes',
+                                                                                             'attribute_names')][:]]
+
+                    np.testing.assert_equal(
+                        subset_output.variables[variable][:],
+                        full_output.variables[variable][:][element_indexes][:, attribute_indexes][:, :, periods]
+                    )
+
+                self.assertEqual(list(subset_output.variables['nodes'][:]), ['J10', 'T3'])
+                self.assertEqual(list(subset_output.variables['links'][:]), ['C15', 'C17'])
+                self.assertEqual(len(subset_output.dimensions['catchments']), 3)
+                self.assertEqual(list(subset_output.variables['system_attribute_names'][:]), ['RAINFALL'])
+                np.testing.assert_equal(subset_output.variables['system_timeseries'][:],
+                                        full_output.variables['system_timeseries'][:][[1]][:, periods])
+
+    def test_unknown_selection(self):
+        with self.assertRaises(ValueError):
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, self.get_path('unknown.nc'), engine='native',
+                                    attributes=['UNKNOWN'])
+
+        with self.assertRaises(ValueError):
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, self.get_path('unknown.nc'), engine='native',
+                                    elements={'junctions': ['J10']})
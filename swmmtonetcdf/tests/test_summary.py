@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.summary import SUMMARY_STATISTICS
+from swmmtonetcdf.tests.test_checkpoint import InterruptedCheckpoint
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestSWMMtoNetCDFSummary(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.reference_file = self.get_path('reference.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, self.reference_file, engine='native')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def assert_summaries(self, netcdf_file: str):
+        with nc.Dataset(self.reference_file, mode='r') as reference, nc.Dataset(netcdf_file, mode='r') as output:
+            times = reference.variables['time'][:]
+
+            for prefix in ('catchment', 'node', 'link', 'system'):
+                values = reference.variables[f'{prefix}_timeseries'][:]
+
+                np.testing.assert_array_equal(output.variables[f'{prefix}_max'][:], values.max(axis=-1))
+                np.testing.assert_allclose(output.variables[f'{prefix}_time_of_max'][:],
+                                           times[values.argmax(axis=-1)])
+                np.testing.assert_array_equal(output.variables[f'{prefix}_min'][:], values.min(axis=-1))
+                np.testing.assert_allclose(output.variables[f'{prefix}_mean'][:], values.mean(axis=-1), rtol=1e-12)
+                np.testing.assert_allclose(output.variables[f'{prefix}_volume'][:], values.sum(axis=-1) * 300,
+                                           rtol=1e-12)
+                np.testing.assert_array_equal(output.variables[f'{prefix}_nonzero_count'][:],
+                                              np.count_nonzero(values, axis=-1))
+
+    def test_summary(self):
+        # blocks are not a divisor of the number of periods
+        for name, options in (('native', dict(engine='native', block_size=700)),
+                              ('toolkit', dict(engine='toolkit', block_size=1000, raw=False)),
+                              ('prefetch', dict(engine='native', block_size=700, prefetch=2))):
+            netcdf_file = self.get_path(f'summary_{name}.nc')
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, summary=True, **options)
+
+            self.assert_summaries(netcdf_file)
+
+            with nc.Dataset(netcdf_file, mode='r') as output:
+                self.assertEqual(output.variables['node_max'].dimensions, ('nodes', 'node_attributes'))
+                self.assertEqual(output.variables['system_nonzero_count'].dimensions, ('system_attributes',))
+                self.assertEqual('node_timeseries' in output.variables, options.get('raw', True))
+
+        self.assertRaises(ValueError, create_netcdf_from_swmm, TRIVIAL_OUTPUT, netcdf_file, summary=True, workers=2)
+
+    def test_resume_summary(self):
+        with tempfile.TemporaryDirectory() as directory:
+            netcdf_file = os.path.join(directory, 'resumed.nc')
+            options = dict(engine='native', block_size=1000, summary=True, checkpoint_interval=1)
+
+            with mock.patch('swmmtonetcdf.swmmtonetcdf.Checkpoint', InterruptedCheckpoint):
+                with self.assertRaises(RuntimeError):
+                    create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, **options)
+
+            with nc.Dataset(netcdf_file, mode='r') as output:
+                self.assertTrue(all(f'node_{statistic}' in output.variables for statistic in SUMMARY_STATISTICS))
+
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, resume=True, **options)
+
+            self.assert_summaries(netcdf_file)
@@ -0,0 +1,58 @@
+import datetime
+import os
+import tempfile
+import unittest
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.reader import SwmmOutputReader
+from swmmtonetcdf.swmmtonetcdf import ToolkitOutputReader
+from swmmtonetcdf.synthetic import write_synthetic_swmm_output
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestSyntheticOutput(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.swmm_output_file = os.path.join(cls.directory.name, 'synthetic.out')
+        cls.file_size = write_synthetic_swmm_output(cls.swmm_output_file, num_subcatchments=3, num_nodes=7,
+                                                    num_links=6, num_pollutants=2, num_periods=500, report_step=60,
+                                                    start_date=datetime.datetime(2021, 6, 1), block_size=128)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.directory.cleanup()
+
+    def test_readers(self):
+        self.assertEqual(os.path.getsize(self.swmm_output_file), self.file_size)
+
+        reader = SwmmOutputReader(self.swmm_output_file)
+        toolkit_reader = ToolkitOutputReader(self.swmm_output_file)
+
+        self.assertEqual(reader.project_size, [3, 7, 6, 1, 2])
+        self.assertEqual(toolkit_reader.project_size, reader.project_size)
+        self.assertEqual(reader.num_periods, 500)
+        self.assertEqual(list(reader.get_element_names(1).keys()), [f'J{i}' for i in range(1, 8)])
+        self.assertEqual(list(toolkit_reader.get_element_names(4).keys()), ['P1', 'P2'])
+        self.assertEqual(reader.get_num_attributes(0), 10)
+        self.assertEqual(datetime.datetime.fromtimestamp(reader.get_dates()[0]), datetime.datetime(2021, 6, 1, 0, 1))
+        np.testing.assert_allclose(toolkit_reader.get_dates(), reader.get_dates())
+
+        for element_type, element_index, attribute_index in ((0, 2, 9), (1, 6, 0), (2, 0, 4), (3, 0, 14)):
+            np.testing.assert_array_equal(
+                toolkit_reader.get_series(element_type, element_index, attribute_index, 0, 500),
+                reader.get_series(element_type, element_index, attribute_index, 0, 500))
+
+        self.assertTrue(np.all(reader.nodes > 0.0))
+        toolkit_reader.close()
+
+    def test_conversion(self):
+        netcdf_file = os.path.join(self.directory.name, 'synthetic.nc')
+        create_netcdf_from_swmm(self.swmm_output_file, netcdf_file, engine='native', read_by_series=False)
+
+        with nc.Dataset(netcdf_file, mode='r') as netcdf_output:
+            self.assertEqual(netcdf_output.variables['link_timeseries'].shape, (6, 7, 500))
+            np.testing.assert_array_equal(netcdf_output.variables['link_timeseries'][:],
+                                          np.moveaxis(SwmmOutputReader(self.swmm_output_file).links, 0, -1))
@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+from swmmtonetcdf.reader import NUM_CLOSING_RECORDS, RECORD_SIZE, SwmmOutputReader
+import numpy as np
+
+import netCDF4 as nc
+
+
+class TestFollowSwmmOutput(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.partial_file = os.path.join(self.directory, 'partial.out')
+
+        with SwmmOutputReader(TRIVIAL_OUTPUT) as reader:
+            self.results_start = reader.output_start_position
+            self.record_size = reader.record_dtype.itemsize
+            self.num_periods = reader.num_periods
+
+        with open(TRIVIAL_OUTPUT, 'rb') as f:
+            self.contents = f.read()
+
+    def write_partial(self, num_periods: int, closing_records: bool = False):
+        start = os.path.getsize(self.partial_file) if os.path.exists(self.partial_file) else 0
+        end = self.results_start + num_periods * self.record_size
+        with open(self.partial_file, 'ab') as f:
+            f.write(self.contents[start:end])
+            if closing_records:
+                f.write(self.contents[-NUM_CLOSING_RECORDS * RECORD_SIZE:])
+
+    def test_partial_reader(self):
+        self.write_partial(100)
+
+        with self.assertRaises(ValueError):
+            SwmmOutputReader(self.partial_file)
+
+        reader = SwmmOutputReader(self.partial_file, partial=True)
+        self.assertFalse(reader.complete)
+        self.assertEqual(reader.num_periods, 100)
+
+        self.write_partial(self.num_periods, closing_records=True)
+        self.assertEqual(reader.refresh(), self.num_periods)
+        self.assertTrue(reader.complete)
+
+        with SwmmOutputReader(TRIVIAL_OUTPUT) as complete_reader:
+            np.testing.assert_equal(reader.nodes, complete_reader.nodes)
+
+        reader.close()
+
+    def test_follow_matches_complete(self):
+        complete_file = os.path.join(self.directory, 'complete.nc')
+        follow_file = os.path.join(self.directory, 'follow.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, complete_file, engine='native')
+
+        self.write_partial(0)
+
+        def simulate():
+            for num_periods in range(1000, self.num_periods, 2500):
+                time.sleep(0.05)
+                self.write_partial(num_periods)
+            time.sleep(0.05)
+            self.write_partial(self.num_periods, closing_records=True)
+
+        writer = threading.Thread(target=simulate)
+        writer.start()
+        create_netcdf_from_swmm(self.partial_file, follow_file, engine='native', follow=True, poll_interval=0.01,
+                                follow_timeout=30)
+        writer.join()
+
+        with nc.Dataset(complete_file, mode='r') as complete_output, \
+                nc.Dataset(follow_file, mode='r') as follow_output:
+            self.assertEqual(follow_output.source_complete, 1)
+            for variable in ('time', 'node_timeseries', 'link_timeseries', 'catchment_timeseries',
+                             'system_timeseries'):
+                np.testing.assert_equal(complete_output.variables[variable][:],
+                                        follow_output.variables[variable][:])
+
+    def test_follow_timeout(self):
+        follow_file = os.path.join(self.directory, 'follow.nc')
+        self.write_partial(100)
+
+        create_netcdf_from_swmm(self.partial_file, follow_file, engine='native', follow=True, poll_interval=0.01,
+                                follow_timeout=0.1)
+
+        with nc.Dataset(follow_file, mode='r') as follow_output:
+            self.assertEqual(follow_output.source_complete, 0)
+            self.assertEqual(len(follow_output.dimensions['time']), 100)
+
+    def test_follow_requires_native_engine(self):
+        with self.assertRaises(ValueError):
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, os.path.join(self.directory, 'follow.nc'), engine='toolkit',
+                                    follow=True)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
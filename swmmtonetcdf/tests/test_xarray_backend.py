@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+import numpy as np
+
+try:
+    import xarray as xr
+    from swmmtonetcdf.xarray_backend import SwmmBackendEntrypoint
+except ImportError:
+    xr = None
+
+
+@unittest.skipIf(xr is None, 'xarray is not installed')
+class TestSwmmBackend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.netcdf_file = os.path.join(cls.directory.name, 'xarray.nc')
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, cls.netcdf_file, engine='native')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.directory.cleanup()
+
+    def test_matches_netcdf(self):
+        with xr.open_dataset(self.netcdf_file) as netcdf_dataset, \
+                xr.open_dataset(TRIVIAL_OUTPUT, engine=SwmmBackendEntrypoint) as swmm_dataset:
+            for variable in ('node_timeseries', 'link_timeseries', 'catchment_timeseries', 'system_timeseries',
+                             'node_attribute_names', 'link_attribute_names', 'catchment_attribute_names',
+                             'system_attribute_names'):
+                self.assertEqual(netcdf_dataset[variable].dims, swmm_dataset[variable].dims)
+                np.testing.assert_equal(netcdf_dataset[variable].values, swmm_dataset[variable].values)
+
+            for coordinate in ('nodes', 'links', 'catchments'):
+                self.assertEqual(list(netcdf_dataset[coordinate].values), list(swmm_dataset[coordinate].values))
+
+            np.testing.assert_array_less(
+                np.abs(netcdf_dataset['time'].values - swmm_dataset['time'].values), np.timedelta64(1, 's'))
+
+    def test_lazy_selection(self):
+        with xr.open_dataset(TRIVIAL_OUTPUT, engine=SwmmBackendEntrypoint) as swmm_dataset, \
+                xr.open_dataset(self.netcdf_file) as netcdf_dataset:
+            selection = dict(node_attributes=[4], time=slice(100, 200))
+            np.testing.assert_equal(swmm_dataset['node_timeseries'].sel(nodes=['T3', 'J10']).isel(selection).values,
+                                    netcdf_dataset['node_timeseries'].sel(nodes=['T3', 'J10']).isel(selection).values)
+
+    def test_dask_chunks(self):
+        with xr.open_dataset(TRIVIAL_OUTPUT, engine=SwmmBackendEntrypoint, chunks={'time': 1000}) as swmm_dataset, \
+                xr.open_dataset(self.netcdf_file) as netcdf_dataset:
+            self.assertEqual(swmm_dataset['link_timeseries'].chunks[-1][0], 1000)
+            np.testing.assert_equal(swmm_dataset['link_timeseries'].max(dim='time').values,
+                                    netcdf_dataset['link_timeseries'].max(dim='time').values)
+
+    def test_guess_can_open(self):
+        entrypoint = SwmmBackendEntrypoint()
+        self.assertTrue(entrypoint.guess_can_open(TRIVIAL_OUTPUT))
+        self.assertFalse(entrypoint.guess_can_open(self.netcdf_file))
@@ -0,0 +1,79 @@
+import datetime
+import os
+import tempfile
+import unittest
+from swmmtonetcdf.tests.data import TRIVIAL_OUTPUT
+from swmmtonetcdf import create_netcdf_from_swmm
+import numpy as np
+
+import netCDF4 as nc
+
+try:
+    import zarr
+    from swmmtonetcdf.zarr_output import create_zarr_from_swmm
+except ImportError:
+    zarr = None
+
+try:
+    import xarray as xr
+except ImportError:
+    xr = None
+
+
+@unittest.skipIf(zarr is None, 'zarr is not installed')
+class TestSWMMtoZarr(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_matches_netcdf(self):
+        options = dict(elements={'links': 'C1[57]'}, attributes=['TOTAL_INFLOW', 'FLOW_RATE', 'RAINFALL'],
+                       start_date=datetime.datetime(2019, 4, 10), end_date=datetime.datetime(2019, 4, 12, 12))
+
+        for name, zarr_options in (('series', dict(engine='toolkit', chunk_sizes='auto', zlib=True)),
+                                   ('parallel', dict(engine='toolkit', workers=2,
+                                                     chunk_sizes={'node_timeseries': (2, 1, 100)})),
+                                   ('both', dict(engine='native', workers=2, layout='both', precision='single')),
+                                   ('int16', dict(engine='native', precision='int16'))):
+            netcdf_file = self.get_path(f'zarr_{name}.nc')
+            zarr_path = self.get_path(f'{name}.zarr')
+
+            create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, **{key: value for key, value in zarr_options.items()
+                                                                    if key != 'workers'}, **options)
+            create_zarr_from_swmm(TRIVIAL_OUTPUT, zarr_path, **zarr_options, **options)
+
+            group = zarr.open_consolidated(zarr_path, mode='r')
+
+            with nc.Dataset(netcdf_file, mode='r') as netcdf_output:
+                netcdf_output.set_auto_scale(False)
+
+                for variable_name, nc_variable in netcdf_output.variables.items():
+                    self.assertEqual(tuple(group[variable_name].attrs['_ARRAY_DIMENSIONS']), nc_variable.dimensions)
+                    np.testing.assert_equal(group[variable_name][:], nc_variable[:])
+
+                    if name == 'int16' and variable_name.endswith('_timeseries'):
+                        self.assertEqual(group[variable_name].dtype, np.int16)
+                        for attribute in ('scale_factor_variable', 'add_offset_variable', 'comment'):
+                            self.assertEqual(group[variable_name].attrs[attribute], nc_variable.getncattr(attribute))
+
+                self.assertEqual(group.attrs['layout'], netcdf_output.layout)
+
+    @unittest.skipIf(xr is None, 'xarray is not installed')
+    def test_open_zarr(self):
+        netcdf_file = self.get_path('zarr_xarray.nc')
+        zarr_path = self.get_path('xarray.zarr')
+
+        create_netcdf_from_swmm(TRIVIAL_OUTPUT, netcdf_file, engine='native', precision='int16')
+        create_zarr_from_swmm(TRIVIAL_OUTPUT, zarr_path, engine='native', precision='int16', workers=2)
+
+        with xr.open_dataset(netcdf_file) as netcdf_dataset, xr.open_zarr(zarr_path) as zarr_dataset:
+            for variable in ('node_timeseries', 'link_timeseries', 'catchment_timeseries', 'system_timeseries',
+                             'nodes', 'node_attribute_names', 'time'):
+                self.assertEqual(netcdf_dataset[variable].dims, zarr_dataset[variable].dims)
+                np.testing.assert_equal(netcdf_dataset[variable].values, zarr_dataset[variable].values)
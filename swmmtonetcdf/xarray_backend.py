@@ -0,0 +1,174 @@
+# python imports
+import datetime
+import os
+import struct
+from typing import Dict, Iterable, Tuple, Union
+
+# external imports
+import numpy as np
+import xarray as xr
+from xarray.backends import BackendArray, BackendEntrypoint, CachingFileManager
+from xarray.core import indexing
+
+# local imports
+from swmmtonetcdf.parallel import DEFAULT_PARTITION_BYTES
+from swmmtonetcdf.reader import LINK, MAGIC_NUMBER, NODE, POLLUT, SUBCATCH, SWMM_EPOCH, SYSTEM, SwmmOutputReader
+from swmmtonetcdf.swmmtonetcdf import get_swmm_output_attribute_names
+
+# Names of the variables and dimensions of each element type, matching create_netcdf_from_swmm
+ELEMENT_VARIABLES = {
+    SUBCATCH: ('catchments', 'catchment_attributes', 'catchment_attribute_names', 'catchment_timeseries'),
+    NODE: ('nodes', 'node_attributes', 'node_attribute_names', 'node_timeseries'),
+    LINK: ('links', 'link_attributes', 'link_attribute_names', 'link_timeseries'),
+    SYSTEM: (None, 'system_attributes', 'system_attribute_names', 'system_timeseries'),
+}
+
+
+class SwmmBackendArray(BackendArray):
+    """
+    Lazily indexed timeseries of an element type in the (element, attribute, time) layout of
+    create_netcdf_from_swmm, backed by the memory map of the SWMM output file
+    """
+
+    def __init__(self, manager: CachingFileManager, element_type: int, shape: Tuple[int, ...]):
+        """
+        Args:
+            manager (CachingFileManager): Manager of the SWMM output reader
+            element_type (int): Element type code
+            shape: Shape of the timeseries variable
+        """
+        self.manager = manager
+        self.element_type = element_type
+        self.shape = shape
+        self.dtype = np.dtype(np.float32)
+
+    def __getitem__(self, key: indexing.ExplicitIndexer) -> np.ndarray:
+        return indexing.explicit_indexing_adapter(key, self.shape, indexing.IndexingSupport.OUTER_1VECTOR,
+                                                  self._raw_indexing_method)
+
+    def _raw_indexing_method(self, key: tuple) -> np.ndarray:
+        """
+        Reads the selected values. Only the pages of the memory map holding the selected periods are touched.
+        Args:
+            key: Tuple of integers, slices and at most one integer array
+
+        Returns:
+            Selected values
+        """
+        results = self.manager.acquire().get_results(self.element_type)
+        return np.array(np.moveaxis(results, 0, -1)[key])
+
+
+def get_time_coordinate(reader: SwmmOutputReader) -> np.ndarray:
+    """
+    Get dates of periods as the naive datetimes stored by create_netcdf_from_swmm
+    Args:
+        reader (SwmmOutputReader): SWMM output reader
+
+    Returns:
+        Array of datetime64 values
+    """
+    start_date_time = SWMM_EPOCH + datetime.timedelta(days=reader.start_date) + \
+        datetime.timedelta(seconds=reader.report_step)
+
+    return np.datetime64(start_date_time, 'ns') + \
+        np.arange(reader.num_periods) * np.timedelta64(reader.report_step, 's')
+
+
+def get_preferred_chunks(dimensions: Tuple[str, ...], shape: Tuple[int, ...],
+                         chunk_bytes: int = DEFAULT_PARTITION_BYTES) -> Dict[str, int]:
+    """
+    Get preferred dask chunks of a timeseries variable. Chunks cover all elements and attributes over a window of
+    periods because each period is a contiguous record of the SWMM output file
+    Args:
+        dimensions: Dimension names with time last
+        shape: Dimension sizes with time last
+        chunk_bytes (int): Target chunk size
+
+    Returns:
+        Mapping of dimension names to chunk sizes
+    """
+    period_bytes = 4 * max(int(np.prod(shape[:-1])), 1)
+    chunks = {dimension: max(size, 1) for dimension, size in zip(dimensions[:-1], shape[:-1])}
+    chunks[dimensions[-1]] = max(min(chunk_bytes // period_bytes, shape[-1]), 1)
+
+    return chunks
+
+
+def open_swmm_dataset(filename: Union[str, os.PathLike], drop_variables: Union[Iterable[str], None] = None) -> \
+        xr.Dataset:
+    """
+    Opens a SWMM output file as an xarray dataset with the variables and coordinates of create_netcdf_from_swmm.
+    Timeseries are lazily indexed float32 arrays read directly from the output file.
+    Args:
+        filename: SWMM output filepath
+        drop_variables: Names of variables to exclude
+
+    Returns:
+        Dataset
+    """
+    filename = os.fspath(filename)
+    drop_variables = set([] if drop_variables is None else [drop_variables] if isinstance(drop_variables, str)
+                         else drop_variables)
+
+    manager = CachingFileManager(SwmmOutputReader, filename)
+    reader = manager.acquire()
+
+    pollutant_names = reader.names[POLLUT]
+    variables = {'time': xr.Variable(('time',), get_time_coordinate(reader))}
+
+    for element_type, (element_dimension, attribute_dimension, attribute_variable, timeseries_variable) in \
+            ELEMENT_VARIABLES.items():
+        attribute_names = get_swmm_output_attribute_names(element_type, pollutant_names)
+        num_attributes = reader.get_num_attributes(element_type)
+
+        if element_type == SYSTEM:
+            dimensions = (attribute_dimension, 'time')
+            shape = (num_attributes, reader.num_periods)
+        else:
+            dimensions = (element_dimension, attribute_dimension, 'time')
+            shape = (reader.project_size[element_type], num_attributes, reader.num_periods)
+            variables[element_dimension] = xr.Variable((element_dimension,),
+                                                       np.array(reader.names[element_type], dtype=object))
+
+        variables[attribute_variable] = xr.Variable((attribute_dimension,),
+                                                    np.array(attribute_names[0:num_attributes], dtype=object))
+        variables[timeseries_variable] = xr.Variable(
+            dimensions,
+            indexing.LazilyIndexedArray(SwmmBackendArray(manager, element_type, shape)),
+            encoding={'preferred_chunks': get_preferred_chunks(dimensions, shape)}
+        )
+
+    coordinates = [name for name in ('time', 'catchments', 'nodes', 'links') if name not in drop_variables]
+    dataset = xr.Dataset(
+        data_vars={name: variable for name, variable in variables.items()
+                   if name not in drop_variables and name not in coordinates},
+        coords={name: variables[name] for name in coordinates},
+        attrs={'source_file': os.path.basename(filename)}
+    )
+    dataset.set_close(manager.close)
+
+    return dataset
+
+
+class SwmmBackendEntrypoint(BackendEntrypoint):
+    """
+    xarray backend opening SWMM output files with xr.open_dataset(path, engine='swmm'). Pass chunks={} to read
+    the timeseries as dask arrays chunked along time.
+    """
+
+    description = 'Open SWMM binary output (.out) files lazily'
+    url = 'https://github.com/cbuahin/swmmtonetcdf'
+    open_dataset_parameters = ('filename_or_obj', 'drop_variables')
+
+    def open_dataset(self, filename_or_obj, *, drop_variables=None) -> xr.Dataset:
+        return open_swmm_dataset(filename_or_obj, drop_variables=drop_variables)
+
+    def guess_can_open(self, filename_or_obj) -> bool:
+        try:
+            with open(filename_or_obj, 'rb') as f:
+                magic, = struct.unpack('<i', f.read(4))
+        except (TypeError, OSError, struct.error):
+            return False
+
+        return magic == MAGIC_NUMBER
@@ -0,0 +1,364 @@
+# python imports
+import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+# external imports
+import cftime
+import numcodecs
+import numpy as np
+import zarr
+from swmm.toolkit import shared_enum
+
+# local imports
+from swmmtonetcdf.checkpoint import get_source_signature
+from swmmtonetcdf.chunking import get_variable_chunk_sizes
+from swmmtonetcdf.instrumentation import ConversionStats
+from swmmtonetcdf.layout import LAYOUTS, get_layout_variables, to_time_major
+from swmmtonetcdf.memory import parse_memory_size, plan_memory
+from swmmtonetcdf.parallel import DEFAULT_PARTITION_BYTES, Partition, imap_bounded, init_worker, plan_partitions, \
+    read_partition, read_partition_values
+from swmmtonetcdf.reader import SYSTEM, SwmmOutputReader
+from swmmtonetcdf.storage import get_attribute_packing, get_datatype, get_least_significant_digits, \
+    get_packing_attributes, pack_attributes
+from swmmtonetcdf.swmmtonetcdf import get_attribute_ranges, open_swmm_output, select_conversion
+
+# Zarr group opened once in each worker process and the arrays each element type is written to
+_worker_group = None
+_worker_variables = None
+
+
+def get_zarr_compression(zlib: bool, complevel: int, shuffle: bool, item_size: int) -> Tuple:
+    """
+    Get the zarr compressor and filters matching the netCDF compression options
+    Args:
+        zlib (bool): Compress with zlib
+        complevel (int): Compression level from 1 to 9
+        shuffle (bool): Shuffle bytes before compression
+        item_size (int): Size of a stored value in bytes
+
+    Returns:
+        Compressor and filters
+    """
+    if not zlib:
+        return None, None
+
+    return numcodecs.Zlib(level=complevel), [numcodecs.Shuffle(elementsize=item_size)] if shuffle else None
+
+
+def write_partition_values(group: zarr.Group, variables: Dict[int, List[Tuple[str, bool, Union[Tuple, None]]]],
+                           partition: Partition, values: np.ndarray):
+    """
+    Writes the values of a partition to the arrays of its element type. Partitions cover whole chunks, so
+    concurrent writers never write to the same chunk
+    Args:
+        group (zarr.Group): Zarr group
+        variables: Mapping of element type codes to array names, whether each array is time-major and int16
+            packing or None
+        partition (Partition): Partition
+        values (np.ndarray): Values with shape (element, attribute, time) or (attribute, time) for the system
+    """
+    if partition.element_type == SYSTEM:
+        selection = (slice(None), slice(partition.start_period, partition.end_period))
+    else:
+        selection = (slice(partition.element_start, partition.element_end), slice(None),
+                     slice(partition.start_period, partition.end_period))
+
+    for name, time_major, packing in variables[partition.element_type]:
+        stored_values = values
+
+        if packing is not None:
+            stored_values = pack_attributes(values, *packing, axis=values.ndim - 2)
+
+        if time_major:
+            group[name][to_time_major(selection)] = np.moveaxis(stored_values, -1, 0)
+        else:
+            group[name][selection] = stored_values
+
+
+def init_zarr_worker(swmm_output_file: str, engine: str, subset, zarr_output_path: str,
+                     variables: Dict[int, List[Tuple[str, bool, Union[Tuple, None]]]], sidecar: bool = False):
+    """
+    Opens SWMM output reader and zarr group in a worker process
+    Args:
+        swmm_output_file (str): SWMM output filepath
+        engine (str): Engine used to read SWMM output
+        subset (Subset): Selected elements, attributes and periods
+        zarr_output_path (str): Zarr store path
+        variables: Mapping of element type codes to array names, whether each array is time-major and int16
+            packing or None
+        sidecar (bool): Read the index persisted next to the SWMM output file
+    """
+    global _worker_group, _worker_variables
+
+    init_worker(swmm_output_file, engine, subset, sidecar)
+    _worker_group = zarr.open_group(zarr_output_path, mode='r+')
+    _worker_variables = variables
+
+
+def write_zarr_partition(partition: Partition):
+    """
+    Reads partition and writes it to the zarr group of the worker process
+    Args:
+        partition (Partition): Partition to read and write
+    """
+    write_partition_values(_worker_group, _worker_variables, partition, read_partition(partition))
+
+
+def get_partition_alignment(group: zarr.Group, names: Sequence[Tuple[str, bool]], partition_by: str) -> int:
+    """
+    Get the number of periods or elements that partitions of an element type must be a multiple of to cover
+    whole chunks of all of its arrays
+    Args:
+        group (zarr.Group): Zarr group
+        names: Array names and whether each array is time-major
+        partition_by (str): 'time' or 'element'
+
+    Returns:
+        Alignment
+    """
+    if partition_by == 'time':
+        chunks = [group[name].chunks[0 if time_major else -1] for name, time_major in names]
+    else:
+        chunks = [group[name].chunks[1 if time_major else 0] for name, time_major in names]
+
+    return int(np.lcm.reduce(chunks))
+
+
+def get_partition_size(partition: Partition) -> int:
+    """
+    Get the number of values of a partition
+    Args:
+        partition (Partition): Partition
+
+    Returns:
+        Number of values
+    """
+    num_elements = 1 if partition.element_type == SYSTEM else partition.element_end - partition.element_start
+
+    return num_elements * partition.num_attributes * (partition.end_period - partition.start_period)
+
+
+def create_zarr_from_swmm(swmm_output_file: str, zarr_output_path: str, engine='toolkit', zlib: bool = False,
+                          complevel: int = 4, shuffle: bool = True,
+                          chunk_sizes: Union[str, Dict[str, Tuple[int, ...]], None] = None,
+                          access_pattern: str = 'series', layout: str = 'series', precision: str = 'double',
+                          least_significant_digit: Union[int, str, Dict[str, int], None] = None,
+                          workers: int = 1, elements: Union[Dict[str, Union[Sequence[str], str]], None] = None,
+                          attributes: Union[Sequence[str], None] = None,
+                          start_date: Union[datetime.datetime, None] = None,
+                          end_date: Union[datetime.datetime, None] = None,
+                          max_memory: Union[int, str, None] = None, sidecar: bool = False,
+                          progress: Union[Callable[[int, int], None], None] = None) -> ConversionStats:
+    """
+    Creates a zarr store from SWMM output with the variables, dimensions and attributes written by
+    create_netcdf_from_swmm. Dimension names are stored in the _ARRAY_DIMENSIONS attribute of each array so that
+    the store can be opened with xarray.open_zarr. Partitions are aligned to chunks and, with more than one worker,
+    each worker process reads its partitions and writes their chunks to the store independently.
+
+    Args:
+        swmm_output_file (str): SWMM output filepath
+
+        zarr_output_path (str): Zarr store directory
+
+        engine (str): Engine used to read SWMM output. 'toolkit' or 'native'
+
+        zlib (bool): Compress timeseries arrays with zlib
+
+        complevel (int): Compression level from 1 to 9
+
+        shuffle (bool): Shuffle bytes before compression
+
+        chunk_sizes: Chunk sizes of timeseries arrays. None for zarr defaults, 'auto' to plan chunk sizes from the
+            model size and access pattern, or a mapping of timeseries variable names to chunk sizes
+
+        access_pattern (str): Expected read access used by the 'auto' chunk planner. 'series' or 'snapshot'
+
+        layout (str): Layout of timeseries arrays. 'series', 'snapshot' or 'both'
+
+        precision (str): Storage precision of timeseries arrays. 'double', 'single' or 'int16'
+
+        least_significant_digit: Quantizes timeseries values to improve compression. None for full precision,
+            an integer number of decimal digits for all attributes, 'auto' for attribute aware defaults or a
+            mapping of attribute names to decimal digits
+
+        workers (int): Number of worker processes writing chunks concurrently
+
+        elements: Elements to convert as a mapping of 'nodes', 'links' or 'catchments' to a sequence of element IDs
+            or a regular expression matching whole IDs
+
+        attributes: Names of attributes to convert. None for all attributes
+
+        start_date (datetime.datetime): First date of periods to convert. None to start at the first period
+
+        end_date (datetime.datetime): Last date of periods to convert. None to end at the last period
+
+        max_memory: Memory budget in bytes or as a size such as '8G' that partitions are sized to. Partitions still
+            cover at least one chunk. None for no limit
+
+        sidecar (bool): Read element names and reporting periods from the index persisted next to the SWMM output
+            file when reading through swmm.toolkit.output, and persist the index when it is missing or stale
+
+        progress: Callback called with the number of completed and total partitions after each partition is written
+
+    Returns:
+        ConversionStats: Phase timings, bytes read and written, and progress of the conversion. With more than one
+            worker, partitions are read and written by the workers and the time spent waiting for them is recorded
+            as writes
+    """
+    stats = ConversionStats(progress)
+    datatype = get_datatype(precision)
+    item_size = np.dtype(datatype).itemsize
+
+    if layout not in LAYOUTS:
+        raise ValueError(f'Unknown layout {layout}. Expected one of {LAYOUTS}')
+
+    swmm_output = open_swmm_output(swmm_output_file=swmm_output_file, engine=engine, sidecar=sidecar)
+    selection = select_conversion(swmm_output, elements, attributes, start_date, end_date)
+    subset = selection.subset
+    num_steps = subset.end_period - subset.start_period
+
+    block_size = 256
+    partition_bytes = DEFAULT_PARTITION_BYTES
+
+    if max_memory is not None:
+        memory_plan = plan_memory(
+            max_memory=parse_memory_size(max_memory),
+            period_values=max(len(selection.catchments) * len(selection.catchment_attributes),
+                              len(selection.nodes) * len(selection.node_attributes),
+                              len(selection.links) * len(selection.link_attributes),
+                              len(selection.system_attributes)),
+            record_bytes=swmm_output.record_dtype.itemsize if isinstance(swmm_output, SwmmOutputReader) else 0,
+            num_steps=num_steps,
+            num_variables=0,
+            workers=workers,
+            block_size=block_size
+        )
+        block_size, partition_bytes = memory_plan.block_size, memory_plan.partition_bytes
+
+    group = zarr.open_group(zarr_output_path, mode='w')
+    group.attrs.update(layout=layout, **get_source_signature(swmm_output_file))
+
+    # Timestamps
+    time_units, calendar = 'hours since 0001-01-01 00:00:00.0', 'gregorian'
+    time_array = group.create_dataset('time', data=cftime.date2num(
+        [datetime.datetime.fromtimestamp(t) for t in selection.timestamps], units=time_units, calendar=calendar),
+        dtype=np.float64, fill_value=None)
+    time_array.attrs.update(units=time_units, calendar=calendar, _ARRAY_DIMENSIONS=['time'])
+
+    # Element and attribute names
+    for name, dimension, names in (
+            ('nodes', 'nodes', list(selection.nodes.keys())),
+            ('links', 'links', list(selection.links.keys())),
+            ('catchments', 'catchments', list(selection.catchments.keys())),
+            ('node_attribute_names', 'node_attributes', selection.node_attributes),
+            ('link_attribute_names', 'link_attributes', selection.link_attributes),
+            ('catchment_attribute_names', 'catchment_attributes', selection.catchment_attributes),
+            ('system_attribute_names', 'system_attributes', selection.system_attributes)):
+        names_array = group.create_dataset(name, data=np.array(names, dtype=object), shape=(len(names),),
+                                           dtype=str, fill_value=None)
+        names_array.attrs['_ARRAY_DIMENSIONS'] = [dimension]
+
+    # Timeseries
+    compressor, filters = get_zarr_compression(zlib, complevel, shuffle, item_size)
+    partition_by = 'time' if engine == 'native' or layout != 'series' else 'element'
+    variables = {}
+    partitions = []
+
+    for element_type, prefix, dimensions, num_elements, attribute_names in (
+            (shared_enum.ElementType.SUBCATCH, 'catchment', ('catchments', 'catchment_attributes', 'time'),
+             len(selection.catchments), selection.catchment_attributes),
+            (shared_enum.ElementType.NODE, 'node', ('nodes', 'node_attributes', 'time'),
+             len(selection.nodes), selection.node_attributes),
+            (shared_enum.ElementType.LINK, 'link', ('links', 'link_attributes', 'time'),
+             len(selection.links), selection.link_attributes),
+            (shared_enum.ElementType.SYSTEM, 'system', ('system_attributes', 'time'),
+             1, selection.system_attributes)):
+        num_attributes = len(attribute_names)
+        shape = (num_attributes, num_steps) if element_type == shared_enum.ElementType.SYSTEM else \
+            (num_elements, num_attributes, num_steps)
+        digits = get_least_significant_digits(least_significant_digit, attribute_names,
+                                              selection.pollutant_names)
+        packing = None
+
+        if precision == 'int16':
+            # attributes are packed separately, matching create_netcdf_from_swmm
+            packing = get_attribute_packing(*get_attribute_ranges(swmm_output, element_type, num_attributes,
+                                                                  num_steps, block_size, subset))
+
+            for name, values in zip(('scale_factor', 'add_offset'), packing):
+                packing_array = group.create_dataset(f'{prefix}_{name}', data=values, dtype=np.float64,
+                                                     fill_value=None)
+                packing_array.attrs['_ARRAY_DIMENSIONS'] = [dimensions[-2]]
+
+        names = get_layout_variables(prefix, layout)
+        for name, time_major in names:
+            # time-major arrays are planned for reading snapshots
+            chunks = get_variable_chunk_sizes(chunk_sizes, name, shape, 'snapshot' if time_major else access_pattern,
+                                              item_size, time_major)
+
+            timeseries = group.create_dataset(
+                name,
+                shape=to_time_major(shape) if time_major else shape,
+                chunks=True if chunks is None else chunks,
+                dtype=datatype,
+                compressor=compressor,
+                filters=filters,
+                fill_value=None
+            )
+            timeseries.attrs['_ARRAY_DIMENSIONS'] = list(to_time_major(dimensions) if time_major else dimensions)
+
+            if packing is not None:
+                timeseries.attrs.update(get_packing_attributes(prefix))
+
+        variables[element_type.value] = [(name, time_major, packing) for name, time_major in names]
+
+        element_partition_by = 'time' if element_type == shared_enum.ElementType.SYSTEM else partition_by
+        partitions.extend(plan_partitions(element_type, num_elements, num_attributes, num_steps, element_partition_by,
+                                          digits, partition_bytes,
+                                          get_partition_alignment(group, names, element_partition_by)))
+
+    stats.timings['metadata'] = time.perf_counter() - stats.start_time
+    stats.start(len(partitions))
+
+    if workers > 1:
+        swmm_output.close()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_zarr_worker,
+                                 initargs=(swmm_output_file, engine, subset, zarr_output_path, variables,
+                                           sidecar)) as executor:
+            results = imap_bounded(executor, write_zarr_partition, partitions, max_pending=2 * workers)
+
+            for partition in partitions:
+                with stats.phase('write'):
+                    next(results)
+
+                stats.bytes_read += get_partition_size(partition) * 4
+                stats.bytes_written += get_partition_size(partition) * item_size * \
+                    len(variables[partition.element_type])
+                stats.advance()
+    else:
+        for partition in partitions:
+            with stats.phase('read'):
+                values = read_partition_values(swmm_output, partition, subset)
+
+            with stats.phase('write'):
+                write_partition_values(group, variables, partition, values)
+
+            if max_memory is not None:
+                swmm_output.release(subset.start_period + partition.start_period,
+                                    subset.start_period + partition.end_period)
+
+            stats.bytes_read += values.size * 4
+            stats.bytes_written += values.size * item_size * len(variables[partition.element_type])
+            stats.advance()
+
+        swmm_output.close()
+
+    with stats.phase('sync'):
+        zarr.consolidate_metadata(zarr_output_path)
+
+    stats.finish()
+
+    return stats